@@ -15,32 +15,8 @@ sys.path.insert(0, str(workspace_root))
 
 from workspace.db import WorkspaceDB
 from workspace.wms.architecture_validator import ArchitectureValidator
-
-
-def count_files_in_repo(repo_path: Path, extensions: set = None) -> int:
-    """Count files in a repository directory."""
-    if not repo_path.exists():
-        return 0
-    
-    count = 0
-    # Common ignore patterns
-    ignore_dirs = {'.git', '__pycache__', 'venv', '.venv', 'node_modules', 
-                   'build', 'dist', '.pytest_cache', '.mypy_cache', '.tox',
-                   'venv*', '*.egg-info', '.eggs', '.env', 'logs'}
-    
-    for file_path in repo_path.rglob('*'):
-        if file_path.is_file():
-            # Skip ignored directories
-            if any(ignore in file_path.parts for ignore in ignore_dirs):
-                continue
-            
-            # Filter by extension if specified
-            if extensions and file_path.suffix.lower() not in extensions:
-                continue
-            
-            count += 1
-    
-    return count
+from workspace.wms.coverage import TARGET_COVERAGE, CoverageTracker
+from workspace.wms.file_inventory import FileInventory
 
 
 def analyze_file_mapping():
@@ -65,47 +41,42 @@ def analyze_file_mapping():
         mapped_count = session.query(CodeComponentMapping).count()
         print(f"Mapped files in database: {mapped_count}")
         
-        # Count total files in repos (Python files only for now)
-        repos = {
-            "meridian-core": workspace_root / "meridian-core",
-            "meridian-research": workspace_root / "meridian-research",
-            "meridian-trading": workspace_root / "meridian-trading",
-            "workspace": workspace_root / "workspace",
-        }
+        repos = ["meridian-core", "meridian-research", "meridian-trading", "workspace"]
         
         print("\n" + "-"*60)
-        print("Counting total files in repos...")
+        print("Reading coverage counts...")
         print("-"*60)
         
-        total_files = {}
-        code_extensions = {'.py', '.md', '.json', '.yaml', '.yml', '.toml'}
+        # Counts are maintained incrementally (see workspace/wms/coverage.py)
+        FileInventory(db.engine, workspace_root).scan()
+        tracker = CoverageTracker(db.engine)
+        tracker.update()
+        coverage_by_repo = {row.repo: row for row in tracker.counts("repo")}
         
-        for repo_name, repo_path in repos.items():
-            count = count_files_in_repo(repo_path, extensions=code_extensions)
-            total_files[repo_name] = count
-            print(f"{repo_name}: {count} files")
+        total_files = {}
+        for repo_name in repos:
+            row = coverage_by_repo.get(repo_name)
+            total_files[repo_name] = row.total if row else 0
+            print(f"{repo_name}: {total_files[repo_name]} files")
         
         grand_total = sum(total_files.values())
         print(f"\nTotal files across all repos: {grand_total}")
         
-        # Calculate coverage
+        # Coverage = mapped / (mapped + unregistered); reviewed-ignored files are left out
+        total = tracker.total()
         total_unregistered = len(unregistered)
-        # Note: mapped_count might be less accurate, use unregistered as baseline
-        # Coverage = (total - unregistered) / total * 100
-        if grand_total > 0:
-            current_coverage = ((grand_total - total_unregistered) / grand_total) * 100
-        else:
-            current_coverage = 0
+        current_coverage = total.coverage or 0
         
         print("\n" + "="*60)
         print("COVERAGE SUMMARY")
         print("="*60)
         print(f"Total files: {grand_total}")
-        print(f"Unregistered: {total_unregistered}")
-        print(f"Mapped (estimated): {grand_total - total_unregistered}")
+        print(f"Unregistered: {total.unregistered}")
+        print(f"Ignored: {total.ignored}")
+        print(f"Mapped: {total.mapped}")
         print(f"Current coverage: {current_coverage:.1f}%")
-        print(f"Target coverage: 70.0%")
-        print(f"Gap to target: {70.0 - current_coverage:.1f}%")
+        print(f"Target coverage: {TARGET_COVERAGE:.1f}%")
+        print(f"Gap to target: {TARGET_COVERAGE - current_coverage:.1f}%")
         
         # Analyze patterns
         print("\n" + "="*60)
@@ -192,8 +163,9 @@ def analyze_file_mapping():
 ## Summary
 
 - **Total Files:** {grand_total}
-- **Unregistered Files:** {total_unregistered}
-- **Mapped Files (estimated):** {grand_total - total_unregistered}
+- **Unregistered Files:** {total.unregistered}
+- **Ignored Files:** {total.ignored}
+- **Mapped Files:** {total.mapped}
 - **Current Coverage:** {current_coverage:.1f}%
 - **Target Coverage:** 70.0%
 - **Gap to Target:** {max(0, 70.0 - current_coverage):.1f}%
@@ -205,9 +177,10 @@ def analyze_file_mapping():
 """
         
         for repo_name, repo_total in sorted(total_files.items()):
-            repo_unregistered = len(by_repo[repo_name])
-            repo_mapped = repo_total - repo_unregistered
-            repo_coverage = (repo_mapped / repo_total * 100) if repo_total > 0 else 0
+            row = coverage_by_repo.get(repo_name)
+            repo_unregistered = row.unregistered if row else 0
+            repo_mapped = row.mapped if row else 0
+            repo_coverage = (row.coverage or 0) if row else 0
             
             analysis_content += f"""### {repo_name}
 - **Total files:** {repo_total}
@@ -349,7 +322,7 @@ These can be mapped later or skipped:
         return {
             "total_files": grand_total,
             "unregistered": total_unregistered,
-            "mapped": grand_total - total_unregistered,
+            "mapped": total.mapped,
             "coverage": current_coverage,
             "high_value_count": len(high_value),
         }
@@ -266,6 +266,7 @@ echo "  3. ✅ Tasks must link files to components"
 echo "  4. ✅ No unregistered files allowed"
 echo ""
 echo -e "${YELLOW}Violations will block commits and deployments.${NC}"
+echo "Pre-commit hooks (all repos): python workspace/wms/precommit.py install"
 echo ""
 
 # Check for unregistered files in current context
@@ -0,0 +1,17 @@
+"""
+Workspace Database Benchmarks
+
+Synthetic-scale benchmarks for WorkspaceDB.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Measure how WorkspaceDB scales beyond today's production data
+DOMAIN: Cross-repo workspace management
+
+Usage:
+    python -m workspace.benchmarks.run_benchmarks --scales small,medium
+"""
+
+from .data_generator import SCALES, DataGenerator, populate_database
+
+__all__ = ["SCALES", "DataGenerator", "populate_database"]
@@ -0,0 +1,309 @@
+"""
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Deterministic synthetic data for WorkspaceDB benchmarks
+DOMAIN: Cross-repo workspace management
+
+Generates realistic rows (including JSON columns) for the workspace tables and
+bulk-loads them into a WorkspaceDB. The same seed always produces the same data,
+so results are comparable between runs and machines.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+import json
+import random
+
+from sqlalchemy import insert
+
+from workspace.db.models import (
+    WorkspaceTask,
+    WorkspaceSession,
+    SessionActivity,
+    CrossRepoIssue,
+    ArchitectureDecision,
+    DriftDetection,
+    CodeChange,
+)
+from workspace.wms.constants import REPOS
+
+
+# Row counts per scale. Sessions, issues, decisions and drift detections are
+# derived from these (see scale_counts).
+SCALES = {
+    "small": {"tasks": 1_000, "activities": 10_000, "code_changes": 5_000},
+    "medium": {"tasks": 10_000, "activities": 100_000, "code_changes": 50_000},
+    "large": {"tasks": 100_000, "activities": 1_000_000, "code_changes": 500_000},
+}
+
+# Weighted roughly like the production database
+TASK_STATUSES = ["approved"] * 23 + ["closed"] * 22 + ["backlog"] * 10 + ["deferred"] * 9 + \
+    ["completed"] * 6 + ["pending"] * 5 + ["in_progress"] * 3 + ["blocked"] * 2
+PRIORITIES = ["HIGH", "MEDIUM", "MEDIUM", "LOW"]
+ISSUE_TYPES = ["code_creep", "governance", "task_tracking", "drift", "dependency"]
+SEVERITIES = ["HIGH", "MEDIUM", "MEDIUM", "LOW", "LOW"]
+ACTIVITY_TYPES = ["documentation", "analysis", "governance", "implementation", "review", "testing"]
+VIOLATION_TYPES = ["component_placement", "dependency", "scope", "pattern"]
+CHANGE_TYPES = ["modified"] * 6 + ["added"] * 2 + ["deleted", "renamed"]
+AUTHORS = ["simonerses", "claude-code", "cursor", "gemini", "chatgpt"]
+
+VERBS = ["Implement", "Refactor", "Fix", "Migrate", "Document", "Validate", "Remove", "Extract", "Review"]
+NOUNS = [
+    "learning engine", "proposal manager", "voting system", "task queue", "credential bridge",
+    "orchestrator", "preflight checks", "drift scanner", "session handover", "research pipeline",
+    "TDOM strategy", "market data adapter", "architecture validator", "governance engine",
+]
+PACKAGES = {
+    "meridian-core": ["orchestration", "learning", "connectors", "utils", "voting", "review"],
+    "meridian-trading": ["strategies", "signals", "adapters", "backtest", "learning"],
+    "meridian-research": ["pipeline", "sources", "synthesis", "learning", "exporters"],
+    "workspace": ["db", "wms", "scripts", "benchmarks"],
+}
+MODULES = [
+    "engine", "manager", "models", "client", "config", "service", "handler", "registry",
+    "validator", "scheduler", "adapter", "store", "cache", "router", "utils",
+]
+
+BASE_TIME = datetime(2024, 1, 1)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+
+def scale_counts(scale: str) -> Dict[str, int]:
+    """Row counts for every generated table at a named scale."""
+    base = SCALES[scale]
+    return {
+        "tasks": base["tasks"],
+        "sessions": max(1, base["activities"] // 50),
+        "activities": base["activities"],
+        "issues": max(1, base["tasks"] // 20),
+        "decisions": max(1, base["tasks"] // 50),
+        "drift_detections": max(1, base["tasks"] // 10),
+        "code_changes": base["code_changes"],
+    }
+
+
+class DataGenerator:
+    """Deterministic generator of workspace rows as plain dicts."""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    def _rng(self, stream: str) -> random.Random:
+        """Independent RNG per table so generation order doesn't matter."""
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _timestamp(self, rng: random.Random) -> datetime:
+        return BASE_TIME + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+    def _file_path(self, rng: random.Random, repo: str) -> str:
+        package = rng.choice(PACKAGES[repo])
+        module = rng.choice(MODULES)
+        if repo == "workspace":
+            return f"{package}/{module}.py"
+        src = repo.replace("-", "_")
+        return f"src/{src}/{package}/{module}_{rng.randrange(40)}.py"
+
+    def _repos(self, rng: random.Random) -> List[str]:
+        return rng.sample(REPOS, rng.choice([1, 1, 1, 2, 3]))
+
+    def tasks(self, count: int) -> Iterator[Dict]:
+        rng = self._rng("tasks")
+        for i in range(1, count + 1):
+            repos = self._repos(rng)
+            created = self._timestamp(rng)
+            deps = [f"WS-TASK-{rng.randrange(1, i):06d}" for _ in range(rng.choice([0, 0, 1, 2]))] if i > 1 else []
+            title = f"{rng.choice(VERBS)} {rng.choice(NOUNS)}"
+            yield {
+                "id": f"WS-TASK-{i:06d}",
+                "title": title,
+                "description": f"{title} in {', '.join(repos)}. " * rng.randrange(1, 6),
+                "status": rng.choice(TASK_STATUSES),
+                "priority": rng.choice(PRIORITIES),
+                "repos_affected": json.dumps(repos),
+                "dependencies": json.dumps(deps) if deps else None,
+                "created": created,
+                "updated": created + timedelta(hours=rng.randrange(0, 500)),
+                "session_created": f"bench-session-{rng.randrange(1, 1000):04d}",
+                "assigned_to": rng.choice(AUTHORS),
+                "notes": rng.choice([None, "Blocked on review", "Needs ADR", "See handover"]),
+                "related_files": json.dumps([self._file_path(rng, repos[0]) for _ in range(rng.randrange(0, 5))]),
+                "extra_metadata": json.dumps({
+                    "estimate_hours": rng.randrange(1, 40),
+                    "source": rng.choice(["architecture_review", "manual", "housekeeping"]),
+                    "tags": rng.sample(["phase-1", "phase-2", "bastard", "governance", "infra"], 2),
+                }),
+                "assigned_repo": repos[0],
+            }
+
+    def sessions(self, count: int) -> Iterator[Dict]:
+        rng = self._rng("sessions")
+        for i in range(1, count + 1):
+            start = self._timestamp(rng)
+            completed = i < count
+            yield {
+                "id": f"bench-session-{i:07d}",
+                "start_time": start,
+                "end_time": start + timedelta(minutes=rng.randrange(10, 480)) if completed else None,
+                "status": "completed" if completed else "in_progress",
+                "user": "simonerses",
+                "ai_assistant": rng.choice(AUTHORS[1:]),
+                "handoff_notes": rng.choice([None, "Continue with next phase", "Tests failing in trading"]),
+            }
+
+    def activities(self, count: int, session_count: int) -> Iterator[Dict]:
+        rng = self._rng("activities")
+        for i in range(1, count + 1):
+            repo = rng.choice(REPOS)
+            yield {
+                "id": f"bench-activity-{i:08d}",
+                "session_id": f"bench-session-{rng.randrange(1, session_count + 1):07d}",
+                "activity_type": rng.choice(ACTIVITY_TYPES),
+                "description": f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+                "files_created": json.dumps([self._file_path(rng, repo) for _ in range(rng.randrange(0, 3))]),
+                "files_modified": json.dumps([self._file_path(rng, repo) for _ in range(rng.randrange(0, 6))]),
+                "outcome": rng.choice(["success", "partial", "failed", None]),
+                "time": self._timestamp(rng),
+                "extra_metadata": json.dumps({"duration_minutes": rng.randrange(1, 120), "repo": repo}),
+            }
+
+    def issues(self, count: int, task_count: int) -> Iterator[Dict]:
+        rng = self._rng("issues")
+        for i in range(1, count + 1):
+            status = rng.choice(["open", "open", "resolved", "closed"])
+            yield {
+                "id": f"ISSUE-{i:06d}",
+                "issue_type": rng.choice(ISSUE_TYPES),
+                "severity": rng.choice(SEVERITIES),
+                "title": f"{rng.choice(NOUNS).capitalize()} drifted from architecture",
+                "description": "Detected during synthetic benchmark generation.",
+                "repos_affected": json.dumps(self._repos(rng)),
+                "detected": self._timestamp(rng),
+                "detected_by": rng.choice(["automated", "manual", "ci_cd"]),
+                "status": status,
+                "action_required": "Move component to the correct repo",
+                "related_task_id": f"WS-TASK-{rng.randrange(1, task_count + 1):06d}",
+                "extra_metadata": json.dumps({"confidence": round(rng.random(), 3)}),
+            }
+
+    def decisions(self, count: int) -> Iterator[Dict]:
+        rng = self._rng("decisions")
+        for i in range(1, count + 1):
+            yield {
+                "id": f"DEC-{i:06d}",
+                "date": self._timestamp(rng),
+                "session": f"bench-session-{rng.randrange(1, 1000):07d}",
+                "decision": f"{rng.choice(NOUNS).capitalize()} belongs in {rng.choice(REPOS)}",
+                "repos_affected": json.dumps(self._repos(rng)),
+                "rationale": "Keeps domain logic out of meridian-core.",
+                "status": rng.choice(["implemented", "in_progress", "maintained"]),
+                "impact": rng.choice(PRIORITIES),
+                "related_files": json.dumps([self._file_path(rng, "meridian-core")]),
+                "documentation": json.dumps([f"ADR-{rng.randrange(1, 30):03d}.md"]),
+                "extra_metadata": None,
+            }
+
+    def drift_detections(self, count: int) -> Iterator[Dict]:
+        rng = self._rng("drift")
+        for i in range(1, count + 1):
+            repo = rng.choice(REPOS)
+            yield {
+                "id": f"drift-{i:07d}",
+                "repo": repo,
+                "violation_type": rng.choice(VIOLATION_TYPES),
+                "severity": rng.choice(SEVERITIES),
+                "file_path": self._file_path(rng, repo),
+                "component_name": rng.choice(NOUNS),
+                "detected_rule": f"rule-{rng.randrange(1, 50):03d}",
+                "violation_details": "Synthetic drift detection",
+                "detected_at": self._timestamp(rng),
+                "detected_by": "automated",
+                "status": rng.choice(["open", "open", "resolved", "ignored"]),
+            }
+
+    def code_changes(self, count: int) -> Iterator[Dict]:
+        rng = self._rng("code_changes")
+        commit = None
+        for i in range(1, count + 1):
+            # ~8 files per commit on average
+            if commit is None or rng.random() < 0.125:
+                commit = f"{rng.getrandbits(160):040x}"
+                repo = rng.choice(REPOS)
+                changed_at = self._timestamp(rng)
+                author = rng.choice(AUTHORS)
+            tracked = rng.random() < 0.6
+            yield {
+                "id": f"change-{i:08d}",
+                "commit_hash": commit,
+                "repo": repo,
+                "change_type": rng.choice(CHANGE_TYPES),
+                "file_path": self._file_path(rng, repo),
+                "is_tracked": tracked,
+                "is_validated": rng.random() < 0.3,
+                "validation_status": "pending" if tracked else "untracked",
+                "within_component_scope": True,
+                "lines_added": rng.randrange(0, 400),
+                "lines_removed": rng.randrange(0, 200),
+                "changed_at": changed_at,
+                "changed_by": author,
+                "commit_message": f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+                "branch": rng.choice(["main", "main", "develop", "feature/wms"]),
+            }
+
+
+def _bulk_insert(db, model, rows: Iterator[Dict], chunk_size: int) -> int:
+    """Insert rows in explicit transactions of chunk_size rows."""
+    total = 0
+    with db.engine.connect() as conn:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                conn.exec_driver_sql("BEGIN")
+                conn.execute(insert(model), chunk)
+                conn.exec_driver_sql("COMMIT")
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            conn.exec_driver_sql("BEGIN")
+            conn.execute(insert(model), chunk)
+            conn.exec_driver_sql("COMMIT")
+            total += len(chunk)
+    return total
+
+
+def populate_database(
+    db,
+    scale: str = "small",
+    seed: int = 42,
+    chunk_size: int = 5000,
+    counts: Optional[Dict[str, int]] = None,
+) -> Dict[str, int]:
+    """
+    Fill a WorkspaceDB with synthetic data.
+
+    Args:
+        db: WorkspaceDB instance (should be empty)
+        scale: Scale name from SCALES
+        seed: Random seed
+        chunk_size: Rows per insert transaction
+        counts: Explicit row counts (overrides scale)
+
+    Returns:
+        Dictionary with inserted row counts per table
+    """
+    counts = counts or scale_counts(scale)
+    gen = DataGenerator(seed)
+
+    return {
+        "tasks": _bulk_insert(db, WorkspaceTask, gen.tasks(counts["tasks"]), chunk_size),
+        "sessions": _bulk_insert(db, WorkspaceSession, gen.sessions(counts["sessions"]), chunk_size),
+        "activities": _bulk_insert(
+            db, SessionActivity, gen.activities(counts["activities"], counts["sessions"]), chunk_size
+        ),
+        "issues": _bulk_insert(db, CrossRepoIssue, gen.issues(counts["issues"], counts["tasks"]), chunk_size),
+        "decisions": _bulk_insert(db, ArchitectureDecision, gen.decisions(counts["decisions"]), chunk_size),
+        "drift_detections": _bulk_insert(
+            db, DriftDetection, gen.drift_detections(counts["drift_detections"]), chunk_size
+        ),
+        "code_changes": _bulk_insert(db, CodeChange, gen.code_changes(counts["code_changes"]), chunk_size),
+    }
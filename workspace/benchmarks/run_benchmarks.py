@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Time WorkspaceDB operations at synthetic scales
+DOMAIN: Cross-repo workspace management
+
+For each requested scale, builds a fresh database from the deterministic
+generator and times add_*, get_* (every filter), statistics, export_to_json
+and import_from_json. Reports latency percentiles and peak RSS, and saves
+the results as JSON.
+
+Usage:
+    python -m workspace.benchmarks.run_benchmarks
+    python -m workspace.benchmarks.run_benchmarks --scales small,medium,large --ops 500
+"""
+
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import platform
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add workspace to path
+workspace_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(workspace_root))
+
+from workspace.db import WorkspaceDB
+from workspace.benchmarks.data_generator import (
+    SCALES,
+    REPOS,
+    TASK_STATUSES,
+    PRIORITIES,
+    ISSUE_TYPES,
+    SEVERITIES,
+    VIOLATION_TYPES,
+    populate_database,
+    scale_counts,
+)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already-sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_samples))))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[int], object], repeat: int) -> List[float]:
+    """Call fn(i) repeat times and return per-call durations in seconds."""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class ScaleBenchmark:
+    """Benchmarks for one scale against a freshly populated database."""
+
+    def __init__(self, scale: str, work_dir: Path, ops: int, heavy_repeat: int, seed: int):
+        self.scale = scale
+        self.work_dir = work_dir
+        self.ops = ops
+        self.heavy_repeat = heavy_repeat
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.operations: Dict[str, Dict[str, float]] = {}
+        self.counts = scale_counts(scale)
+
+    def record(self, name: str, samples: List[float]):
+        summary = summarize(samples)
+        summary["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        self.operations[name] = summary
+        print(f"   {name:<45} p50 {summary['p50_ms']:>10.3f} ms   p95 {summary['p95_ms']:>10.3f} ms")
+
+    def run(self) -> Dict:
+        print(f"\n📊 Scale: {self.scale} {self.counts}")
+        db = WorkspaceDB(db_path=str(self.work_dir / f"bench-{self.scale}.db"), workspace_root=self.work_dir)
+
+        start = time.perf_counter()
+        inserted = populate_database(db, self.scale, seed=self.seed)
+        populate_seconds = time.perf_counter() - start
+        total_rows = sum(inserted.values())
+        print(f"   Populated {total_rows:,} rows in {populate_seconds:.1f}s "
+              f"({total_rows / populate_seconds:,.0f} rows/s)")
+
+        self.bench_adds(db)
+        self.bench_gets(db)
+        self.bench_statistics(db)
+        self.bench_export_import(db)
+
+        return {
+            "counts": inserted,
+            "populate_seconds": round(populate_seconds, 3),
+            "populate_rows_per_second": round(total_rows / populate_seconds, 1),
+            "db_size_mb": round(Path(db.db_path).stat().st_size / (1024 * 1024), 2),
+            "operations": self.operations,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+    def bench_adds(self, db: WorkspaceDB):
+        n = self.ops
+        self.record("add_task", time_calls(lambda i: db.add_task(
+            f"BENCH-TASK-{i:06d}", "Benchmark task", priority="MEDIUM",
+            repos_affected=["meridian-core"], related_files=["src/meridian_core/x.py"],
+            metadata={"bench": True},
+        ), n))
+        self.record("add_session", time_calls(lambda i: db.add_session(f"bench-new-session-{i:06d}"), n))
+        self.record("add_session_activity", time_calls(lambda i: db.add_session_activity(
+            "bench-new-session-000000", "analysis", f"Benchmark activity {i}",
+            files_modified=["db/models.py"], metadata={"i": i},
+        ), n))
+        self.record("add_issue", time_calls(lambda i: db.add_issue(
+            f"BENCH-ISSUE-{i:06d}", "code_creep", "HIGH", "Benchmark issue", repos_affected=["meridian-core"],
+        ), n))
+        self.record("add_decision", time_calls(lambda i: db.add_decision(
+            f"BENCH-DEC-{i:06d}", "bench-session", "Benchmark decision", repos_affected=["workspace"],
+        ), n))
+        self.record("add_drift_detection", time_calls(lambda i: db.add_drift_detection(
+            f"BENCH-DRIFT-{i:06d}", "meridian-core", "scope", "LOW", "src/x.py", "Benchmark drift",
+        ), n))
+
+    def bench_gets(self, db: WorkspaceDB):
+        n = self.ops
+        heavy = self.heavy_repeat
+        rng = self.rng
+        task_count = self.counts["tasks"]
+
+        self.record("get_task", time_calls(
+            lambda i: db.get_task(f"WS-TASK-{rng.randrange(1, task_count + 1):06d}"), n))
+        self.record("get_tasks(all)", time_calls(lambda i: db.get_tasks(), heavy))
+        self.record("get_tasks(limit=50)", time_calls(lambda i: db.get_tasks(limit=50), n))
+        self.record("get_tasks(status)", time_calls(lambda i: db.get_tasks(status=rng.choice(TASK_STATUSES)), heavy))
+        self.record("get_tasks(status, limit=50)", time_calls(
+            lambda i: db.get_tasks(status=rng.choice(TASK_STATUSES), limit=50), n))
+        self.record("get_tasks(priority)", time_calls(lambda i: db.get_tasks(priority=rng.choice(PRIORITIES)), heavy))
+        self.record("get_tasks(repo)", time_calls(lambda i: db.get_tasks(repo=rng.choice(REPOS)), heavy))
+        self.record("get_tasks(repo, limit=50)", time_calls(
+            lambda i: db.get_tasks(repo=rng.choice(REPOS), limit=50), n))
+        self.record("get_tasks(status, priority, repo)", time_calls(lambda i: db.get_tasks(
+            status=rng.choice(TASK_STATUSES), priority=rng.choice(PRIORITIES), repo=rng.choice(REPOS)), heavy))
+
+        self.record("get_issues(all)", time_calls(lambda i: db.get_issues(), heavy))
+        self.record("get_issues(status)", time_calls(lambda i: db.get_issues(status="open"), heavy))
+        self.record("get_issues(severity)", time_calls(lambda i: db.get_issues(severity=rng.choice(SEVERITIES)), heavy))
+        self.record("get_issues(issue_type)", time_calls(
+            lambda i: db.get_issues(issue_type=rng.choice(ISSUE_TYPES)), heavy))
+        self.record("get_issues(repo)", time_calls(lambda i: db.get_issues(repo=rng.choice(REPOS)), heavy))
+        self.record("get_issues(status, limit=50)", time_calls(lambda i: db.get_issues(status="open", limit=50), n))
+
+        self.record("get_decisions(all)", time_calls(lambda i: db.get_decisions(), heavy))
+        self.record("get_decisions(status)", time_calls(lambda i: db.get_decisions(status="implemented"), heavy))
+        self.record("get_decisions(repo, limit=50)", time_calls(
+            lambda i: db.get_decisions(repo=rng.choice(REPOS), limit=50), n))
+
+        self.record("get_drift_detections(repo)", time_calls(
+            lambda i: db.get_drift_detections(repo=rng.choice(REPOS)), heavy))
+        self.record("get_drift_detections(status)", time_calls(
+            lambda i: db.get_drift_detections(status="open"), heavy))
+        self.record("get_drift_detections(severity)", time_calls(
+            lambda i: db.get_drift_detections(severity=rng.choice(SEVERITIES)), heavy))
+        self.record("get_drift_detections(violation_type)", time_calls(
+            lambda i: db.get_drift_detections(violation_type=rng.choice(VIOLATION_TYPES)), heavy))
+        self.record("get_drift_detections(repo, status, limit=50)", time_calls(
+            lambda i: db.get_drift_detections(repo=rng.choice(REPOS), status="open", limit=50), n))
+
+        self.record("get_current_session", time_calls(lambda i: db.get_current_session(), n))
+
+    def bench_statistics(self, db: WorkspaceDB):
+        self.record("get_task_statistics", time_calls(lambda i: db.get_task_statistics(), self.ops))
+        self.record("get_issue_statistics", time_calls(lambda i: db.get_issue_statistics(), self.ops))
+
+    def bench_export_import(self, db: WorkspaceDB):
+        exported = {}
+
+        def export(i):
+            exported["data"] = db.export_to_json()
+
+        self.record("export_to_json", time_calls(export, self.heavy_repeat))
+
+        def import_fresh(i):
+            target = WorkspaceDB(
+                db_path=str(self.work_dir / f"bench-{self.scale}-import-{i}.db"),
+                workspace_root=self.work_dir,
+            )
+            target.import_from_json(exported["data"], merge=False)
+
+        self.record("import_from_json(fresh)", time_calls(import_fresh, self.heavy_repeat))
+        self.record("import_from_json(merge, all existing)", time_calls(
+            lambda i: db.import_from_json(exported["data"], merge=True), self.heavy_repeat))
+
+
+def run(scales: List[str], ops: int, heavy_repeat: int, seed: int, work_dir: Optional[Path]) -> Dict:
+    """Run benchmarks for the given scales and return the results document."""
+    results = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite_version": sqlite3.sqlite_version,
+        "seed": seed,
+        "ops": ops,
+        "heavy_repeat": heavy_repeat,
+        "scales": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="wms-bench-") as tmp:
+        base = work_dir or Path(tmp)
+        base.mkdir(parents=True, exist_ok=True)
+        for scale in scales:
+            results["scales"][scale] = ScaleBenchmark(scale, base, ops, heavy_repeat, seed).run()
+
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorkspaceDB synthetic-scale benchmarks")
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"Comma-separated scales ({', '.join(SCALES)})")
+    parser.add_argument("--ops", type=int, default=200, help="Calls per cheap operation")
+    parser.add_argument("--heavy-repeat", type=int, default=3,
+                        help="Calls per full-table operation (unfiltered gets, export/import)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", type=Path, help="Keep benchmark databases here instead of a temp dir")
+    parser.add_argument("--output", type=Path, help="Results JSON path")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"Unknown scale(s): {', '.join(unknown)}")
+
+    print("=" * 70)
+    print("  WORKSPACE DATABASE BENCHMARKS")
+    print("=" * 70)
+
+    results = run(scales, args.ops, args.heavy_repeat, args.seed, args.work_dir)
+
+    output = args.output or (
+        workspace_root / "workspace" / "reports" / "benchmarks"
+        / f"workspace-db-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print()
+    print(f"Peak RSS: {results['peak_rss_mb']} MB")
+    print(f"📄 Results saved: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Hammer task lifecycle transitions from many processes at once
+DOMAIN: Cross-repo workspace management
+
+Every worker process loops over a small set of shared tasks. It reads a
+task's status and version and applies the next transition of the cycle
+
+    planning --approve--> approved --start--> in_progress --block--> blocked --unblock--> planning
+
+so that agents keep racing for the same rows. Afterwards it checks two
+invariants. A task that has had k transitions applied has version k + 1
+and status CYCLE[k % 4]. Also, the applied transitions the workers counted
+add up to the sum of (version - 1).
+
+Modes:
+- optimistic: task_lifecycle.apply_transition with the version that was read.
+  Losers get a conflict result and nothing is written.
+- naive: read, check the status in Python, then write unconditionally (the
+  former ORM read-modify-write). Interleaved agents double-apply transitions,
+  which shows up as tasks whose status disagrees with their version.
+
+Usage:
+    python -m workspace.benchmarks.task_transitions
+    python -m workspace.benchmarks.task_transitions --workers 32 --tasks 16 --ops 300 --mode both
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+
+# Add workspace to path
+workspace_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(workspace_root))
+
+from sqlalchemy import insert, select, update
+
+from workspace.db import WorkspaceDB
+from workspace.db.models import WorkspaceTask
+from workspace.benchmarks.run_benchmarks import summarize
+from workspace.wms.task_lifecycle import APPLIED, TRANSITIONS, apply_transition
+
+# Status after k applied transitions is CYCLE[k % 4]
+CYCLE = ("planning", "approved", "in_progress", "blocked")
+NEXT_TRANSITION = {"planning": "approve", "approved": "start", "in_progress": "block", "blocked": "unblock"}
+MODES = ("optimistic", "naive")
+
+# Set in each worker by _init_worker
+_start_barrier = None
+
+
+def _init_worker(barrier):
+    global _start_barrier
+    _start_barrier = barrier
+
+
+def _naive_transition(conn, task_id: str, name: str, status: str) -> str:
+    """Check in Python, then write unconditionally (what the lifecycle replaces)."""
+    transition = TRANSITIONS[name]
+    if status not in transition.sources:
+        return "invalid"
+    conn.execute(
+        update(WorkspaceTask)
+        .where(WorkspaceTask.id == task_id)
+        .values(status=transition.target, version=WorkspaceTask.version + 1, updated=datetime.utcnow())
+    )
+    return APPLIED
+
+
+def hammer(db_path: str, task_ids: List[str], ops: int, mode: str, seed: int) -> Dict:
+    """Worker entry point: ops read-then-transition attempts on random tasks."""
+    db = WorkspaceDB(db_path=db_path, workspace_root=Path(db_path).parent)
+    rng = random.Random(seed)
+    outcomes: Dict[str, int] = {}
+    latencies: List[float] = []
+    _start_barrier.wait()
+    began = time.perf_counter()
+    with db.engine.connect() as conn:
+        for _ in range(ops):
+            task_id = rng.choice(task_ids)
+            start = time.perf_counter()
+            status, version = conn.execute(
+                select(WorkspaceTask.status, WorkspaceTask.version).where(WorkspaceTask.id == task_id)
+            ).one()
+            name = NEXT_TRANSITION[status]
+            if mode == "optimistic":
+                outcome = apply_transition(conn, task_id, name, expected_version=version).outcome
+            else:
+                outcome = _naive_transition(conn, task_id, name, status)
+            latencies.append(time.perf_counter() - start)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    elapsed = time.perf_counter() - began
+    db.engine.dispose()
+    return {"outcomes": outcomes, "latencies": latencies, "elapsed": elapsed}
+
+
+def check_invariants(db: WorkspaceDB, applied: int) -> Dict:
+    """Tasks whose status disagrees with their version, and the applied/version balance."""
+    with db.engine.connect() as conn:
+        rows = conn.execute(select(WorkspaceTask.status, WorkspaceTask.version)).all()
+    mismatched = sum(1 for status, version in rows if status != CYCLE[(version - 1) % len(CYCLE)])
+    version_total = sum(version - 1 for _, version in rows)
+    return {
+        "tasks": len(rows),
+        "status_version_mismatches": mismatched,
+        "applied_counted": applied,
+        "version_increments": version_total,
+        "ok": mismatched == 0 and version_total == applied,
+    }
+
+
+def run_mode(mode: str, workers: int, tasks: int, ops: int, seed: int, work_dir: Path) -> Dict:
+    """Fresh database with `tasks` planning tasks, hammered by `workers` processes."""
+    db_path = work_dir / f"transitions-{mode}.db"
+    if db_path.exists():
+        db_path.unlink()
+    db = WorkspaceDB(db_path=str(db_path), workspace_root=work_dir)
+    task_ids = [f"BENCH-TASK-{i:04d}" for i in range(tasks)]
+    now = datetime.utcnow()
+    with db.engine.connect() as conn:
+        conn.execute(insert(WorkspaceTask), [
+            {"id": task_id, "title": f"Transition benchmark {task_id}", "status": "planning",
+             "version": 1, "created": now, "updated": now}
+            for task_id in task_ids
+        ])
+
+    print(f"\n📊 Mode: {mode} ({workers} workers × {ops} ops on {tasks} tasks)")
+    # spawn: forked children would inherit the parent's SQLite connections
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(barrier,),
+    ) as pool:
+        futures = [pool.submit(hammer, str(db_path), task_ids, ops, mode, seed + n) for n in range(workers)]
+        results = [future.result() for future in futures]
+    # From the barrier release to the last worker finishing (excludes process startup)
+    elapsed = max(result["elapsed"] for result in results)
+
+    outcomes: Dict[str, int] = {}
+    latencies: List[float] = []
+    for result in results:
+        latencies.extend(result["latencies"])
+        for outcome, count in result["outcomes"].items():
+            outcomes[outcome] = outcomes.get(outcome, 0) + count
+    invariants = check_invariants(db, outcomes.get(APPLIED, 0))
+    db.engine.dispose()
+
+    latency = summarize(latencies)
+    print(f"   outcomes   {outcomes}")
+    print(f"   latency    p50 {latency['p50_ms']:.3f} ms   p95 {latency['p95_ms']:.3f} ms   "
+          f"p99 {latency['p99_ms']:.3f} ms")
+    print(f"   throughput {len(latencies) / elapsed:,.0f} attempts/s "
+          f"({outcomes.get(APPLIED, 0) / elapsed:,.0f} applied/s)")
+    print(f"   invariants {'✅ hold' if invariants['ok'] else '❌ violated'}: "
+          f"{invariants['status_version_mismatches']} status/version mismatches, "
+          f"{invariants['applied_counted']} applied vs {invariants['version_increments']} version increments")
+    return {
+        "outcomes": outcomes,
+        "latency": latency,
+        "elapsed_s": round(elapsed, 3),
+        "attempts_per_s": round(len(latencies) / elapsed, 1),
+        "invariants": invariants,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent task lifecycle transition benchmark")
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent agent processes")
+    parser.add_argument("--tasks", type=int, default=16, help="Shared tasks the workers race for")
+    parser.add_argument("--ops", type=int, default=200, help="Transition attempts per worker")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="optimistic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", type=Path, help="Keep benchmark databases here instead of a temp dir")
+    parser.add_argument("--output", type=Path, help="Results JSON path")
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+
+    print("=" * 70)
+    print("  TASK TRANSITION CONCURRENCY BENCHMARK")
+    print("=" * 70)
+
+    results = {
+        "benchmark": "task_transitions",
+        "timestamp": datetime.now().isoformat(),
+        "workers": args.workers,
+        "tasks": args.tasks,
+        "ops_per_worker": args.ops,
+        "modes": {},
+    }
+    temp_dir: Optional[tempfile.TemporaryDirectory] = None
+    if args.work_dir:
+        base = args.work_dir
+        base.mkdir(parents=True, exist_ok=True)
+    else:
+        temp_dir = tempfile.TemporaryDirectory(prefix="wms-transitions-")
+        base = Path(temp_dir.name)
+    try:
+        for mode in modes:
+            results["modes"][mode] = run_mode(mode, args.workers, args.tasks, args.ops, args.seed, base)
+    finally:
+        if temp_dir:
+            temp_dir.cleanup()
+
+    output = args.output or (
+        workspace_root / "workspace" / "reports" / "benchmarks"
+        / f"task-transitions-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print()
+    print(f"📄 Results saved: {output}")
+    # Naive mode is expected to break the invariants; optimistic mode must not
+    optimistic = results["modes"].get("optimistic")
+    return 1 if optimistic and not optimistic["invariants"]["ok"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
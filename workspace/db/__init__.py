@@ -10,7 +10,7 @@ PURPOSE: Workspace-level task tracking, architecture tracking, drift detection
 DOMAIN: Cross-repo workspace management
 """
 
-from .workspace_db import WorkspaceDB
+from .workspace_db import WorkspaceDB, atomic
 from .models import (
     Base,
     WorkspaceTask,
@@ -25,6 +25,7 @@ from .models import (
 
 __all__ = [
     "WorkspaceDB",
+    "atomic",
     "Base",
     "WorkspaceTask",
     "WorkspaceSession",
@@ -0,0 +1,115 @@
+"""
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Bring existing databases' indexes in line with the models
+DOMAIN: Cross-repo workspace management
+
+Base.metadata.create_all only creates indexes together with new tables, so
+databases created before an index change keep their old indexes forever.
+This module creates declared indexes that are missing and drops undeclared
+indexes that are redundant, i.e. whose columns are a leading prefix of another
+full index on the same table (such as the ix_* copies produced by index=True
+next to an explicit Index on the same column).
+"""
+
+from typing import Dict, List, Tuple
+import logging
+
+from sqlalchemy.engine import Connection, Engine
+
+from .models import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _index_columns(conn: Connection, index_name: str) -> Tuple[str, ...]:
+    rows = conn.exec_driver_sql(f'PRAGMA index_info("{index_name}")').fetchall()
+    return tuple(row[2] for row in sorted(rows))
+
+
+def _table_indexes(conn: Connection, table: str) -> List[Dict]:
+    """Indexes on a table with their columns (includes PK/UNIQUE autoindexes)."""
+    return [
+        {
+            "name": row[1],
+            "partial": bool(row[4]),
+            "columns": _index_columns(conn, row[1]),
+        }
+        for row in conn.exec_driver_sql(f'PRAGMA index_list("{table}")').fetchall()
+    ]
+
+
+def _create_missing(conn: Connection, existing_tables: set) -> List[str]:
+    existing = {
+        row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    created = []
+    for table in Base.metadata.tables.values():
+        if table.name not in existing_tables:
+            continue
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return sorted(created)
+
+
+def _drop_redundant(conn: Connection, existing_tables: set) -> List[str]:
+    dropped = []
+    for table in Base.metadata.tables.values():
+        if table.name not in existing_tables:
+            continue
+        declared = {index.name for index in table.indexes}
+        indexes = _table_indexes(conn, table.name)
+        for index in sorted(indexes, key=lambda i: i["name"]):
+            if index["name"] in declared or index["name"].startswith("sqlite_autoindex_"):
+                continue
+            width = len(index["columns"])
+            covered = any(
+                other is not index
+                and other["name"] not in dropped
+                and not other["partial"]
+                and other["columns"][:width] == index["columns"]
+                for other in indexes
+            )
+            if covered and not index["partial"]:
+                conn.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+                dropped.append(index["name"])
+    return sorted(dropped)
+
+
+def rationalize_indexes(engine: Engine, dry_run: bool = False) -> Dict[str, List[str]]:
+    """
+    Create missing declared indexes and drop redundant undeclared ones.
+
+    Runs in a single transaction. With dry_run the transaction is rolled back,
+    so the reported changes are exactly what a real run would do.
+
+    Args:
+        engine: Engine bound to the workspace database
+        dry_run: Only report what would change
+
+    Returns:
+        Dict with "create" and "drop" lists of index names
+    """
+    with engine.connect() as conn:
+        existing_tables = {
+            row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            plan = {
+                "create": _create_missing(conn, existing_tables),
+                "drop": _drop_redundant(conn, existing_tables),
+            }
+            conn.exec_driver_sql("ROLLBACK" if dry_run else "COMMIT")
+        except Exception:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+
+        if not dry_run and (plan["create"] or plan["drop"]):
+            # Refresh planner statistics for the new indexes
+            conn.exec_driver_sql("ANALYZE")
+            logger.info(f"Indexes rationalized: created {len(plan['create'])}, dropped {len(plan['drop'])}")
+
+    return plan
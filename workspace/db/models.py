@@ -21,6 +21,7 @@ from sqlalchemy import (
     Integer,
     Float,
     Boolean,
+    LargeBinary,
     ForeignKey,
     Index,
     UniqueConstraint,
@@ -47,11 +48,11 @@ class WorkspaceTask(Base):
     id = Column(String(50), primary_key=True)  # WS-TASK-XXX
     title = Column(String(500), nullable=False)
     description = Column(Text)
-    status = Column(String(50), nullable=False, index=True)  # pending, in_progress, completed, blocked
-    priority = Column(String(20), index=True)  # HIGH, MEDIUM, LOW
+    status = Column(String(50), nullable=False)  # pending, in_progress, completed, blocked
+    priority = Column(String(20))  # HIGH, MEDIUM, LOW
     repos_affected = Column(Text)  # JSON array: ["meridian-core", "meridian-trading"]
     dependencies = Column(Text)  # JSON array: ["WS-TASK-001", "WS-TASK-002"]
-    created = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    created = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     session_created = Column(String(100))  # Session ID where task was created
     assigned_to = Column(String(100))
@@ -68,6 +69,7 @@ class WorkspaceTask(Base):
     scale_tier = Column(Integer)  # Appropriate tier (1, 2, 3)
     started_at = Column(DateTime)  # When task started
     completed_at = Column(DateTime)  # When task completed (already have updated, but this is explicit)
+    version = Column(Integer, nullable=False, default=1, server_default=text('1'))  # Bumped by every lifecycle transition (optimistic concurrency)
     
     # Relationships
     related_issues = relationship("CrossRepoIssue", back_populates="related_task", foreign_keys="CrossRepoIssue.related_task_id")
@@ -79,8 +81,9 @@ class WorkspaceTask(Base):
     # bastard_reports = relationship("BastardReport", back_populates="task")
     
     __table_args__ = (
-        Index('idx_tasks_status', 'status'),
-        Index('idx_tasks_priority', 'priority'),
+        # get_tasks(status=...) / stale-task checks filter on status and sort by created
+        Index('idx_tasks_status_created', 'status', text('created DESC')),
+        Index('idx_tasks_priority_created', 'priority', text('created DESC')),
         Index('idx_tasks_created', 'created'),
     )
     
@@ -114,9 +117,9 @@ class WorkspaceSession(Base):
     __tablename__ = 'workspace_sessions'
     
     id = Column(String(100), primary_key=True)  # session ID: 2025-11-20-session-001
-    start_time = Column(DateTime, nullable=False, index=True)
+    start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime)
-    status = Column(String(50), nullable=False, index=True)  # in_progress, completed
+    status = Column(String(50), nullable=False)  # in_progress, completed
     user = Column(String(100))
     ai_assistant = Column(String(100))
     handoff_notes = Column(Text)
@@ -128,7 +131,7 @@ class WorkspaceSession(Base):
     
     __table_args__ = (
         Index('idx_sessions_start', 'start_time'),
-        Index('idx_sessions_status', 'status'),
+        Index('idx_sessions_status_start', 'status', text('start_time DESC')),
     )
     
     def to_dict(self) -> dict:
@@ -150,20 +153,20 @@ class SessionActivity(Base):
     __tablename__ = 'session_activities'
     
     id = Column(String(50), primary_key=True)
-    session_id = Column(String(100), ForeignKey('workspace_sessions.id', ondelete='CASCADE'), nullable=False, index=True)
+    session_id = Column(String(100), ForeignKey('workspace_sessions.id', ondelete='CASCADE'), nullable=False)
     activity_type = Column(String(50), nullable=False)  # documentation, analysis, governance, etc.
     description = Column(Text, nullable=False)
     files_created = Column(Text)  # JSON array
     files_modified = Column(Text)  # JSON array
     outcome = Column(Text)
-    time = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    time = Column(DateTime, nullable=False, default=datetime.utcnow)
     extra_metadata = Column(Text)  # JSON object (renamed from 'metadata' - SQLAlchemy reserved)
     
     # Relationships
     session = relationship("WorkspaceSession", back_populates="activities")
     
     __table_args__ = (
-        Index('idx_activities_session', 'session_id'),
+        Index('idx_activities_session_time', 'session_id', 'time'),
         Index('idx_activities_type', 'activity_type'),
         Index('idx_activities_time', 'time'),
     )
@@ -175,7 +178,7 @@ class SessionDecision(Base):
     __tablename__ = 'session_decisions'
     
     id = Column(String(50), primary_key=True)
-    session_id = Column(String(100), ForeignKey('workspace_sessions.id', ondelete='CASCADE'), nullable=False, index=True)
+    session_id = Column(String(100), ForeignKey('workspace_sessions.id', ondelete='CASCADE'), nullable=False)
     decision_id = Column(String(50), ForeignKey('architecture_decisions.id'), nullable=True)
     
     # Relationships
@@ -193,7 +196,7 @@ class SessionIssue(Base):
     __tablename__ = 'session_issues'
     
     id = Column(String(50), primary_key=True)
-    session_id = Column(String(100), ForeignKey('workspace_sessions.id', ondelete='CASCADE'), nullable=False, index=True)
+    session_id = Column(String(100), ForeignKey('workspace_sessions.id', ondelete='CASCADE'), nullable=False)
     issue_id = Column(String(50), ForeignKey('cross_repo_issues.id'), nullable=True)
     
     # Relationships
@@ -215,14 +218,14 @@ class CrossRepoIssue(Base):
     __tablename__ = 'cross_repo_issues'
     
     id = Column(String(50), primary_key=True)  # ISSUE-XXX
-    issue_type = Column(String(50), nullable=False, index=True)  # code_creep, governance, task_tracking, etc.
-    severity = Column(String(20), nullable=False, index=True)  # HIGH, MEDIUM, LOW
+    issue_type = Column(String(50), nullable=False)  # code_creep, governance, task_tracking, etc.
+    severity = Column(String(20), nullable=False)  # HIGH, MEDIUM, LOW
     title = Column(String(500), nullable=False)
     description = Column(Text)
     repos_affected = Column(Text)  # JSON array
-    detected = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    detected = Column(DateTime, nullable=False, default=datetime.utcnow)
     detected_by = Column(String(100))  # automated, manual, ci_cd
-    status = Column(String(50), nullable=False, default='open', index=True)  # open, resolved, closed
+    status = Column(String(50), nullable=False, default='open')  # open, resolved, closed
     action_required = Column(Text)
     assigned_to = Column(String(100))
     related_task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=True)
@@ -238,8 +241,9 @@ class CrossRepoIssue(Base):
     __table_args__ = (
         Index('idx_issues_type', 'issue_type'),
         Index('idx_issues_severity', 'severity'),
-        Index('idx_issues_status', 'status'),
+        Index('idx_issues_status_detected', 'status', text('detected DESC')),
         Index('idx_issues_detected', 'detected'),
+        Index('idx_issues_open_severity', 'severity', sqlite_where=text("status = 'open'")),
     )
     
     def to_dict(self) -> dict:
@@ -274,12 +278,12 @@ class ArchitectureDecision(Base):
     __tablename__ = 'architecture_decisions'
     
     id = Column(String(50), primary_key=True)  # DEC-XXX
-    date = Column(DateTime, nullable=False, index=True)
-    session = Column(String(100), nullable=False, index=True)  # Session ID
+    date = Column(DateTime, nullable=False)
+    session = Column(String(100), nullable=False)  # Session ID
     decision = Column(Text, nullable=False)
     repos_affected = Column(Text)  # JSON array
     rationale = Column(Text)
-    status = Column(String(50), nullable=False, index=True)  # implemented, in_progress, maintained
+    status = Column(String(50), nullable=False)  # implemented, in_progress, maintained
     impact = Column(String(20))  # HIGH, MEDIUM, LOW
     related_files = Column(Text)  # JSON array
     documentation = Column(Text)  # JSON array
@@ -290,7 +294,7 @@ class ArchitectureDecision(Base):
     
     __table_args__ = (
         Index('idx_decisions_date', 'date'),
-        Index('idx_decisions_status', 'status'),
+        Index('idx_decisions_status_date', 'status', text('date DESC')),
         Index('idx_decisions_session', 'session'),
     )
     
@@ -323,7 +327,7 @@ class ArchitectureState(Base):
     id = Column(String(50), primary_key=True)
     state_name = Column(String(200), nullable=False, unique=True)
     state_type = Column(String(50), nullable=False)  # master, current, target
-    repo = Column(String(100), nullable=False, index=True)
+    repo = Column(String(100), nullable=False)
     architecture_doc_path = Column(String(500))  # Path to architecture document
     state_data = Column(Text)  # JSON with architecture state
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -351,7 +355,7 @@ class ComponentPlacement(Base):
     id = Column(String(50), primary_key=True)
     component_name = Column(String(200), nullable=False)
     component_type = Column(String(50), nullable=False)  # class, module, package
-    correct_repo = Column(String(100), nullable=False, index=True)
+    correct_repo = Column(String(100), nullable=False)
     correct_location = Column(String(500))  # Path where it should be
     architecture_state_id = Column(String(50), ForeignKey('architecture_states.id'), nullable=True)
     rationale = Column(Text)
@@ -375,13 +379,13 @@ class ArchitectureTask(Base):
     __tablename__ = 'architecture_tasks'
     
     id = Column(String(50), primary_key=True)
-    task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=False, index=True)
+    task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=False)
     architecture_state_id = Column(String(50), ForeignKey('architecture_states.id'), nullable=True)
     architectural_goal = Column(Text)
     component_id = Column(String(50), ForeignKey('component_placements.id'), nullable=True)
     milestone = Column(String(200))  # Future state milestone
     priority = Column(String(20))  # HIGH, MEDIUM, LOW
-    status = Column(String(50), nullable=False, index=True)  # pending, in_progress, completed
+    status = Column(String(50), nullable=False)  # pending, in_progress, completed
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     
     # Relationships
@@ -406,18 +410,18 @@ class DriftDetection(Base):
     __tablename__ = 'drift_detections'
     
     id = Column(String(50), primary_key=True)
-    repo = Column(String(100), nullable=False, index=True)
-    violation_type = Column(String(50), nullable=False, index=True)  # component_placement, dependency, scope, pattern
-    severity = Column(String(20), nullable=False, index=True)  # HIGH, MEDIUM, LOW
+    repo = Column(String(100), nullable=False)
+    violation_type = Column(String(50), nullable=False)  # component_placement, dependency, scope, pattern
+    severity = Column(String(20), nullable=False)  # HIGH, MEDIUM, LOW
     file_path = Column(String(500), nullable=False)
     component_name = Column(String(200))
     detected_rule = Column(String(200))  # Which rule was violated
     expected_location = Column(String(500))  # Where it SHOULD be
     actual_location = Column(String(500))  # Where it actually is
     violation_details = Column(Text)
-    detected_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    detected_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     detected_by = Column(String(100))  # automated, manual, ci_cd
-    status = Column(String(50), nullable=False, default='open', index=True)  # open, resolved, ignored
+    status = Column(String(50), nullable=False, default='open')  # open, resolved, ignored
     resolved_at = Column(DateTime)
     resolved_by = Column(String(100))
     resolution_notes = Column(Text)
@@ -428,10 +432,10 @@ class DriftDetection(Base):
     related_task = relationship("WorkspaceTask", foreign_keys=[related_task_id])
     
     __table_args__ = (
-        Index('idx_drift_repo', 'repo'),
+        Index('idx_drift_repo_status', 'repo', 'status'),
         Index('idx_drift_type', 'violation_type'),
         Index('idx_drift_severity', 'severity'),
-        Index('idx_drift_status', 'status'),
+        Index('idx_drift_status_detected', 'status', text('detected_at DESC')),
         Index('idx_drift_detected', 'detected_at'),
     )
 
@@ -443,16 +447,21 @@ class DriftScan(Base):
     
     id = Column(String(50), primary_key=True)
     scan_type = Column(String(50), nullable=False)  # full, incremental, pre_commit
-    scan_start = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    scan_start = Column(DateTime, nullable=False, default=datetime.utcnow)
     scan_end = Column(DateTime)
     repos_scanned = Column(Text)  # JSON array
     violations_found = Column(Integer, default=0)
     violations_high = Column(Integer, default=0)
     violations_medium = Column(Integer, default=0)
     violations_low = Column(Integer, default=0)
-    status = Column(String(50), nullable=False, index=True)  # running, completed, failed
+    status = Column(String(50), nullable=False)  # running, completed, failed
     triggered_by = Column(String(100))  # user, ci_cd, scheduled
     results_file = Column(String(500))  # Path to detailed results
+    repo_commits = Column(Text)  # JSON: repo -> {"commit": HEAD, "dirty": [uncommitted paths]} at scan time
+    rule_timings = Column(Text)  # JSON: rule -> seconds spent, summed over repos
+    change_seq = Column(Integer)  # change_log position of the mappings/rules the scan saw
+    detections_new = Column(Integer, default=0)  # Opened (or reopened) by this scan
+    detections_resolved = Column(Integer, default=0)  # Resolved by this scan
     
     __table_args__ = (
         Index('idx_scans_start', 'scan_start'),
@@ -470,9 +479,9 @@ class ContextSwitch(Base):
     __tablename__ = 'context_switches'
     
     id = Column(String(50), primary_key=True)
-    repo = Column(String(100), nullable=False, index=True)
+    repo = Column(String(100), nullable=False)
     repo_path = Column(String(500), nullable=False)
-    activated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    activated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     deactivated_at = Column(DateTime)
     activated_by = Column(String(100))
     context_id = Column(String(50), unique=True)
@@ -497,11 +506,11 @@ class ConfigurationSnapshot(Base):
     __tablename__ = 'configuration_snapshots'
     
     id = Column(String(50), primary_key=True)
-    repo = Column(String(100), nullable=False, index=True)
+    repo = Column(String(100), nullable=False)
     snapshot_type = Column(String(50), nullable=False)  # full, incremental
     configuration_hash = Column(String(64), nullable=False)  # Hash of configuration state
     snapshot_data = Column(Text)  # JSON object with full configuration state
-    taken_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    taken_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     taken_by = Column(String(100))
     notes = Column(Text)
     
@@ -517,13 +526,14 @@ class ConfigurationChange(Base):
     __tablename__ = 'configuration_changes'
     
     id = Column(String(50), primary_key=True)
-    repo = Column(String(100), nullable=False, index=True)
+    repo = Column(String(100), nullable=False)
     change_type = Column(String(50), nullable=False)  # added, removed, modified
     component_name = Column(String(200))
     file_path = Column(String(500))
+    config_key = Column(String(500))  # Dotted key within the file ("tool.black.line-length"), '' for the whole file
     old_value = Column(Text)
     new_value = Column(Text)
-    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     changed_by = Column(String(100))
     commit_hash = Column(String(100))
     drift_detection_id = Column(String(50), ForeignKey('drift_detections.id'), nullable=True)
@@ -538,6 +548,22 @@ class ConfigurationChange(Base):
     )
 
 
+class ConfigMerkleNode(Base):
+    """Node of a repo's configuration Merkle tree (see workspace/wms/config_tracker.py)."""
+    
+    __tablename__ = 'config_merkle_nodes'
+    
+    repo = Column(String(100), primary_key=True)
+    path = Column(String(500), primary_key=True)  # Relative to the repo root ('' is the root)
+    is_dir = Column(Boolean, nullable=False)
+    hash = Column(String(64), nullable=False)  # sha256 of the file, or of the (name, hash) list of the children
+    inode = Column(Integer)  # Files: stat the hash was computed from
+    size = Column(Integer)
+    mtime_ns = Column(Integer)
+    entries = Column(Text)  # Files: JSON object of flattened key -> value
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 # ============================================================================
 # CODE-TO-ARCHITECTURE COMPONENT TRACKING
 # ============================================================================
@@ -550,7 +576,7 @@ class ArchitectureComponent(Base):
     id = Column(String(50), primary_key=True)
     component_name = Column(String(200), nullable=False)
     component_type = Column(String(50), nullable=False)  # module, class, service, package
-    repo = Column(String(100), nullable=False, index=True)
+    repo = Column(String(100), nullable=False)
     expected_path = Column(String(500))  # Where it should be (from architecture)
     description = Column(Text)
     
@@ -559,7 +585,7 @@ class ArchitectureComponent(Base):
     boundaries = Column(Text)  # JSON: What's NOT allowed
     
     # Status
-    status = Column(String(50), nullable=False, default="active", index=True)  # active, deprecated, planned
+    status = Column(String(50), nullable=False, default="active")  # active, deprecated, planned
     version = Column(String(50))  # Architecture version this belongs to
     
     # Metadata
@@ -574,7 +600,7 @@ class ArchitectureComponent(Base):
     code_changes = relationship("CodeChange", back_populates="component")
     
     __table_args__ = (
-        Index('idx_components_repo', 'repo'),
+        Index('idx_arch_components_repo', 'repo'),
         Index('idx_components_status', 'status'),
         UniqueConstraint('component_name', 'repo', name='uq_component_name_repo'),
     )
@@ -586,8 +612,8 @@ class CodeComponentMapping(Base):
     __tablename__ = 'code_component_mappings'
     
     id = Column(String(50), primary_key=True)
-    file_path = Column(String(500), nullable=False, index=True)
-    component_id = Column(String(50), ForeignKey('architecture_components.id'), nullable=False, index=True)
+    file_path = Column(String(500), nullable=False)
+    component_id = Column(String(50), ForeignKey('architecture_components.id'), nullable=False)
     
     # Mapping details
     mapping_type = Column(String(50))  # direct, indirect, dependency
@@ -598,6 +624,9 @@ class CodeComponentMapping(Base):
     validated_by = Column(String(100))
     validated_at = Column(DateTime)
     
+    # Staleness: set while the mapped path is missing from its component's repo (file watcher)
+    missing_since = Column(DateTime)
+    
     # Metadata
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     created_by = Column(String(100))
@@ -607,30 +636,72 @@ class CodeComponentMapping(Base):
     file_changes = relationship("CodeChange", back_populates="mapping")
     
     __table_args__ = (
-        Index('idx_mappings_file', 'file_path'),
+        # file_path lookups use the uq_file_path unique index
         Index('idx_mappings_component', 'component_id'),
         UniqueConstraint('file_path', name='uq_file_path'),
     )
 
 
+class ComponentMappingRule(Base):
+    """Glob/prefix rule mapping many files to a component (explicit mappings take precedence)."""
+    
+    __tablename__ = 'component_mapping_rules'
+    
+    id = Column(String(50), primary_key=True)
+    component_id = Column(String(50), ForeignKey('architecture_components.id'), nullable=False)
+    
+    # Pattern over "<repo>/<path relative to repo root>", e.g. meridian-core/src/**/orchestration/*.py
+    pattern = Column(String(500), nullable=False)
+    pattern_type = Column(String(20), nullable=False, default="glob")  # glob, prefix
+    priority = Column(Integer, nullable=False, default=0)  # Higher wins; ties go to the more specific pattern
+    reason = Column(Text)
+    is_active = Column(Boolean, nullable=False, default=True)
+    
+    # Metadata
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_by = Column(String(100))
+    
+    # Relationships
+    component = relationship("ArchitectureComponent")
+    
+    __table_args__ = (
+        Index('idx_mapping_rules_component', 'component_id'),
+        UniqueConstraint('pattern', 'pattern_type', name='uq_mapping_rule_pattern'),
+    )
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "component_id": self.component_id,
+            "pattern": self.pattern,
+            "pattern_type": self.pattern_type,
+            "priority": self.priority,
+            "reason": self.reason,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_by": self.created_by,
+        }
+
+
 class CodeChange(Base):
     """Tracks code changes and links to components."""
     
     __tablename__ = 'code_changes'
     
     id = Column(String(50), primary_key=True)
-    commit_hash = Column(String(100), nullable=False, index=True)
-    repo = Column(String(100), nullable=False, index=True)
+    commit_hash = Column(String(100), nullable=False)
+    repo = Column(String(100), nullable=False)
     
     # Change details
     change_type = Column(String(50), nullable=False)  # added, modified, deleted, renamed
-    file_path = Column(String(500), nullable=False, index=True)
+    file_path = Column(String(500), nullable=False)
     component_id = Column(String(50), ForeignKey('architecture_components.id'), nullable=True)
     mapping_id = Column(String(50), ForeignKey('code_component_mappings.id'), nullable=True)
     
     # Validation
-    is_tracked = Column(Boolean, default=False, index=True)  # Mapped to component
-    is_validated = Column(Boolean, default=False, index=True)  # Pre-deployment validated
+    is_tracked = Column(Boolean, default=False)  # Mapped to component
+    is_validated = Column(Boolean, default=False)  # Pre-deployment validated
     validation_status = Column(String(50), index=True)  # approved, rejected, pending, untracked
     validation_notes = Column(Text)
     
@@ -654,8 +725,8 @@ class CodeChange(Base):
     mapping = relationship("CodeComponentMapping", back_populates="file_changes")
     
     __table_args__ = (
-        Index('idx_changes_commit', 'commit_hash'),
-        Index('idx_changes_repo', 'repo'),
+        Index('idx_changes_commit_file', 'commit_hash', 'file_path'),
+        Index('idx_code_changes_repo', 'repo'),
         Index('idx_changes_file', 'file_path'),
         Index('idx_changes_component', 'component_id'),
         Index('idx_changes_validated', 'is_validated'),
@@ -663,6 +734,19 @@ class CodeChange(Base):
     )
 
 
+class GitIngestState(Base):
+    """Per-repo resume point of the git history ingester (see workspace/wms/git_history.py)."""
+    
+    __tablename__ = 'git_ingest_state'
+    
+    repo = Column(String(100), primary_key=True)
+    branch = Column(String(200))  # Branch ingested (HEAD at the time)
+    last_commit = Column(String(100))  # Newest commit whose changes are all in code_changes
+    commits_ingested = Column(Integer, nullable=False, default=0)  # Since the last full walk
+    changes_ingested = Column(Integer, nullable=False, default=0)  # File changes in those commits
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class UnregisteredFile(Base):
     """Files that don't map to any architecture component."""
     
@@ -670,7 +754,7 @@ class UnregisteredFile(Base):
     
     id = Column(String(50), primary_key=True)
     file_path = Column(String(500), nullable=False, unique=True, index=True)
-    repo = Column(String(100), nullable=False, index=True)
+    repo = Column(String(100), nullable=False)
     
     # Detection
     first_detected = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -678,7 +762,7 @@ class UnregisteredFile(Base):
     detection_count = Column(Integer, default=1)
     
     # Status
-    status = Column(String(50), default="unregistered", index=True)  # unregistered, under_review, mapped, ignored
+    status = Column(String(50), default="unregistered")  # unregistered, under_review, mapped, ignored
     assigned_component_id = Column(String(50), ForeignKey('architecture_components.id'), nullable=True)
     
     # Review
@@ -690,8 +774,82 @@ class UnregisteredFile(Base):
     assigned_component = relationship("ArchitectureComponent")
     
     __table_args__ = (
-        Index('idx_unregistered_repo', 'repo'),
+        Index('idx_unregistered_repo_status', 'repo', 'status'),
         Index('idx_unregistered_status', 'status'),
+        Index('idx_unregistered_pending_repo', 'repo', sqlite_where=text("status = 'unregistered'")),
+    )
+
+
+class FileInventoryEntry(Base):
+    """File or directory under the workspace root (see workspace/wms/file_inventory.py)."""
+    
+    __tablename__ = 'file_inventory'
+    
+    repo = Column(String(100), primary_key=True)  # '' for entries outside the four repos
+    path = Column(String(500), primary_key=True)  # Relative to the repo dir ('' is the dir itself)
+    size = Column(Integer, nullable=False)
+    mtime_ns = Column(Integer, nullable=False)
+    inode = Column(Integer, nullable=False)
+    ext = Column(String(50), nullable=False)  # Lower-case suffix with the dot (".py"), '' if none
+    kind = Column(String(20), nullable=False)  # file, dir, symlink, other
+    ignored = Column(Boolean, nullable=False, default=False)  # Matched by a .gitignore (dirs are not descended)
+    head_hash = Column(String(32))  # BLAKE2 of the first 4 KB (see workspace/wms/duplicate_finder.py)
+    content_hash = Column(String(64))  # BLAKE2 of the whole file
+    hashed_stat = Column(String(100))  # "inode:mtime_ns:size" the hashes were computed at
+    
+    __table_args__ = (
+        Index('idx_file_inventory_ext', 'ext', 'repo'),
+        Index('idx_file_inventory_kind', 'kind'),
+    )
+
+
+class CoverageFile(Base):
+    """Mapping state of one inventoried file, kept by workspace/wms/coverage.py."""
+    
+    __tablename__ = 'coverage_files'
+    
+    repo = Column(String(100), primary_key=True)
+    path = Column(String(500), primary_key=True)  # Relative to the repo root
+    top_dir = Column(String(200), nullable=False)  # First path segment, '.' for files at the repo root
+    state = Column(String(20), nullable=False)  # mapped, unregistered, ignored
+    component_id = Column(String(50))  # Owning component (mapped) or assigned one (unregistered/ignored)
+    source_id = Column(String(50))  # Mapping or rule that maps the file
+    
+    __table_args__ = (
+        Index('idx_coverage_files_path', 'path'),
+        Index('idx_coverage_files_source', 'source_id'),
+    )
+
+
+class CoverageCount(Base):
+    """Current mapped/unregistered/ignored counts per repo, top-level directory and component."""
+    
+    __tablename__ = 'coverage_counts'
+    
+    repo = Column(String(100), primary_key=True)
+    scope_type = Column(String(20), primary_key=True)  # repo, dir, component
+    scope = Column(String(200), primary_key=True)  # '' for the repo, else directory name or component id
+    mapped = Column(Integer, nullable=False, default=0)
+    unregistered = Column(Integer, nullable=False, default=0)
+    ignored = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class CoverageHistory(Base):
+    """Daily coverage_counts series (last update of each day)."""
+    
+    __tablename__ = 'coverage_history'
+    
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD (UTC)
+    repo = Column(String(100), primary_key=True)
+    scope_type = Column(String(20), primary_key=True)
+    scope = Column(String(200), primary_key=True)
+    mapped = Column(Integer, nullable=False, default=0)
+    unregistered = Column(Integer, nullable=False, default=0)
+    ignored = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('idx_coverage_history_scope', 'repo', 'scope_type', 'scope', 'day'),
     )
 
 
@@ -705,11 +863,11 @@ class WorkContext(Base):
     __tablename__ = 'work_contexts'
     
     id = Column(String(50), primary_key=True)
-    repo = Column(String(100), nullable=False, index=True)  # meridian-core, meridian-research, etc.
+    repo = Column(String(100), nullable=False)  # meridian-core, meridian-research, etc.
     repo_path = Column(String(500), nullable=False)
-    activated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    activated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     activated_by = Column(String(100))
-    is_active = Column(Boolean, default=True, index=True)
+    is_active = Column(Boolean, default=True)
     
     # Metadata
     notes = Column(Text)
@@ -739,7 +897,7 @@ class Workflow(Base):
     name = Column(String(500), nullable=False)
     workflow_type = Column(String(50))  # feature, bugfix, refactor
     allowed_repos = Column(Text)  # JSON array: ["meridian-core", "meridian-trading"]
-    status = Column(String(20), default="active", index=True)
+    status = Column(String(20), default="active")
     current_stage = Column(Integer, default=1)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     completed_at = Column(DateTime)
@@ -760,12 +918,12 @@ class WorkflowStage(Base):
     __tablename__ = 'workflow_stages'
     
     id = Column(String(50), primary_key=True)
-    workflow_id = Column(String(50), ForeignKey('workflows.id'), nullable=False, index=True)
+    workflow_id = Column(String(50), ForeignKey('workflows.id'), nullable=False)
     stage_number = Column(Integer, nullable=False)
     name = Column(String(200), nullable=False)
     validation_required = Column(Boolean, default=True)
     validation_type = Column(String(50))  # governance, bastard, architecture
-    status = Column(String(20), default="pending", index=True)
+    status = Column(String(20), default="pending")
     completed_at = Column(DateTime)
     
     # Relationships
@@ -787,15 +945,15 @@ class Violation(Base):
     __tablename__ = 'violations'
     
     id = Column(String(50), primary_key=True)
-    task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=True, index=True)
-    violation_type = Column(String(50), nullable=False, index=True)  # component_placement, forbidden_import, scale_mismatch, over_engineering
-    severity = Column(String(20), nullable=False, index=True)  # CRITICAL, HIGH, MEDIUM, LOW
+    task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=True)
+    violation_type = Column(String(50), nullable=False)  # component_placement, forbidden_import, scale_mismatch, over_engineering
+    severity = Column(String(20), nullable=False)  # CRITICAL, HIGH, MEDIUM, LOW
     message = Column(Text, nullable=False)
     file_path = Column(String(500))
     line_number = Column(Integer)
     rule_violated = Column(String(500))
     fix_required = Column(Text)
-    status = Column(String(20), default="open", index=True)  # open, acknowledged, fixed
+    status = Column(String(20), default="open")  # open, acknowledged, fixed
     resolved_at = Column(DateTime)
     detected_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     
@@ -807,6 +965,7 @@ class Violation(Base):
         Index('idx_violations_type', 'violation_type'),
         Index('idx_violations_severity', 'severity'),
         Index('idx_violations_status', 'status'),
+        Index('idx_violations_open_task', 'task_id', sqlite_where=text("status = 'open'")),
     )
 
 
@@ -816,7 +975,7 @@ class ImportRule(Base):
     __tablename__ = 'import_rules'
     
     id = Column(String(50), primary_key=True)
-    source_repo = Column(String(100), nullable=False, index=True)
+    source_repo = Column(String(100), nullable=False)
     rule_type = Column(String(20), nullable=False)  # allowed, forbidden
     target_module = Column(String(200))
     reason = Column(Text, nullable=False)
@@ -828,13 +987,103 @@ class ImportRule(Base):
     )
 
 
+class KeywordRule(Base):
+    """Keyword for task routing or over-engineering checks (see workspace/wms/keyword_rules.py)."""
+    
+    __tablename__ = 'keyword_rules'
+    
+    id = Column(String(50), primary_key=True)
+    keyword = Column(String(200), nullable=False)  # Lower-case word or phrase, matched on word boundaries
+    category = Column(String(50), nullable=False)  # routing, over_engineering
+    target = Column(String(100))  # Repo a routing keyword sends tasks to
+    priority = Column(Integer, nullable=False, default=0)  # Routing: highest hit wins
+    reason = Column(Text)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_by = Column(String(100))
+    
+    __table_args__ = (
+        Index('idx_keyword_rules_category', 'category', 'is_active'),
+    )
+
+
+class ImportGraphFile(Base):
+    """Python file in the cross-repo import graph (see workspace/wms/import_graph.py)."""
+    
+    __tablename__ = 'import_graph_files'
+    
+    repo = Column(String(100), primary_key=True)
+    file_path = Column(String(500), primary_key=True)  # Relative to the repo root
+    content_hash = Column(String(40), nullable=False)  # SHA-1 of the file; key into import_cache
+    mtime_ns = Column(Integer, nullable=False)  # Stat seen when hashed; unchanged stat skips re-reading
+    size = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_import_graph_files_hash', 'content_hash'),
+    )
+
+
+class ImportCache(Base):
+    """Import statements parsed out of one file content, shared by every path with that content."""
+    
+    __tablename__ = 'import_cache'
+    
+    content_hash = Column(String(40), primary_key=True)
+    imports = Column(Text, nullable=False)  # JSON [[line, level, module, [names]], ...]
+    parse_error = Column(Text)  # SyntaxError message; imports is then []
+    parsed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class MinHashSignature(Base):
+    """MinHash signature of one Python file content (see workspace/wms/near_duplicates.py)."""
+    
+    __tablename__ = 'minhash_signatures'
+    
+    content_hash = Column(String(40), primary_key=True)  # SHA-1 of the file, as in import_graph_files
+    params = Column(String(50), nullable=False)  # Shingle size/permutations/seed the signature was built with
+    signature = Column(LargeBinary)  # uint32 array; NULL when the file has too few tokens
+    tokens = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class GovernanceVerdict(Base):
+    """Memoized governance result for one task text (see workspace/wms/verdict_cache.py)."""
+
+    __tablename__ = 'governance_verdicts'
+
+    task_hash = Column(String(40), primary_key=True)  # SHA-1 of everything the rules read from the task
+    rules_version = Column(Integer, primary_key=True)  # change_log seq of the rule tables when computed
+    assigned_repo = Column(String(100))  # Repo the task was validated against
+    findings = Column(Text, nullable=False)  # JSON array of violation fingerprints, [] when clean
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_governance_verdicts_last_used', 'last_used_at'),
+    )
+
+
+class CacheStat(Base):
+    """Hit/miss counters of a persistent cache (shown by `wms db profile`)."""
+
+    __tablename__ = 'cache_stats'
+
+    name = Column(String(50), primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
+    misses = Column(Integer, nullable=False, default=0)
+    evictions = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class ScaleTier(Base):
     """Scale tier definitions for various solutions (WMS)."""
     
     __tablename__ = 'scale_tiers'
     
     id = Column(String(50), primary_key=True)
-    domain = Column(String(50), nullable=False, index=True)  # credentials, database, deployment
+    domain = Column(String(50), nullable=False)  # credentials, database, deployment
     tier = Column(Integer, nullable=False)  # 1, 2, 3
     name = Column(String(200), nullable=False)  # "Personal Use", "Team Use", "Enterprise"
     user_range = Column(String(100))  # "1-5 users"
@@ -861,7 +1110,7 @@ class BastardReport(Base):
     __tablename__ = 'bastard_reports'
     
     id = Column(String(50), primary_key=True)
-    task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=True, index=True)
+    task_id = Column(String(50), ForeignKey('workspace_tasks.id'), nullable=True)
     evaluation_type = Column(String(50), nullable=False)  # plan, completion
     overall_grade = Column(String(1))  # F, D, C, B, A, OVER_ENGINEERED
     scale_appropriateness = Column(String(1))
@@ -876,7 +1125,7 @@ class BastardReport(Base):
     critical_blockers = Column(Text)  # JSON array
     required_fixes = Column(Text)  # JSON array
     full_report = Column(Text)  # Complete Bastard verdict
-    evaluated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    evaluated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     
     # Relationships
     task = relationship("WorkspaceTask", foreign_keys=[task_id])
@@ -888,3 +1137,102 @@ class BastardReport(Base):
         Index('idx_bastard_reports_evaluated', 'evaluated_at'),
     )
 
+
+
+# ============================================================================
+# CHANGE DATA CAPTURE
+# ============================================================================
+
+# Tables whose row changes are recorded in change_log by SQLite triggers.
+# Every table listed here must have a single-column primary key named "id".
+CHANGE_LOG_TABLES = (
+    'workspace_tasks',
+    'workspace_sessions',
+    'session_activities',
+    'cross_repo_issues',
+    'architecture_decisions',
+    'component_placements',
+    'drift_detections',
+    'architecture_components',
+    'code_component_mappings',
+    'component_mapping_rules',
+    'code_changes',
+    'unregistered_files',
+    'violations',
+    'import_rules',
+    'keyword_rules',
+)
+
+
+def change_log_trigger_sql(table: str) -> list:
+    """CREATE TRIGGER statements that feed change_log for one table (idempotent)."""
+    statements = []
+    for op, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+        statements.append(
+            f'CREATE TRIGGER IF NOT EXISTS trg_cdc_{table}_{op} '
+            f'AFTER {op.upper()} ON {table} '
+            f'BEGIN '
+            f'INSERT INTO change_log ("table", pk, op, changed_at) '
+            f"VALUES ('{table}', {row}.id, '{op}', strftime('%Y-%m-%d %H:%M:%f', 'now')); "
+            f'END;'
+        )
+    return statements
+
+
+class ChangeLogEntry(Base):
+    """Row-level change recorded by a trigger (insert, update, delete)."""
+    
+    __tablename__ = 'change_log'
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)  # Monotonic, never reused
+    table = Column('table', String(100), nullable=False)  # Source table name
+    pk = Column(String(100), nullable=False)  # Primary key of the changed row
+    op = Column(String(10), nullable=False)  # insert, update, delete
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_change_log_table_seq', 'table', 'seq'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "seq": self.seq,
+            "table": self.table,
+            "pk": self.pk,
+            "op": self.op,
+            "changed_at": self.changed_at.isoformat() if self.changed_at else None,
+        }
+
+
+class ChangeLogCursor(Base):
+    """Per-consumer position in change_log (JSON exporter, doc sync, caches)."""
+    
+    __tablename__ = 'change_log_cursors'
+    
+    consumer = Column(String(100), primary_key=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# ============================================================================
+# SCHEMA MIGRATIONS
+# ============================================================================
+
+class SchemaMigrationRecord(Base):
+    """Progress of versioned schema migrations (see workspace/db/schema_migrations.py)."""
+    
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(200), nullable=False)
+    status = Column(String(20), nullable=False)  # running, completed, failed
+    step = Column(Integer, nullable=False, default=0)  # Index of the step in progress
+    checkpoint = Column(Text)  # JSON: step-specific resume position
+    rows_processed = Column(Integer, nullable=False, default=0)
+    owner = Column(String(200))  # host:pid of the process running it
+    heartbeat_at = Column(DateTime)  # Refreshed after every chunk
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = Column(DateTime)
+    error = Column(Text)
@@ -0,0 +1,109 @@
+"""
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Capture EXPLAIN QUERY PLAN for the queries the code actually runs
+DOMAIN: Cross-repo workspace management
+
+Instead of maintaining a hand-written list of queries (which drifts from the
+code), QueryPlanCapture listens to every statement SQLAlchemy sends to SQLite
+while real code paths run, de-duplicates them by SQL text and explains each one.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryPlanCapture:
+    """Records distinct statements executed on any engine and explains them."""
+
+    CAPTURED_VERBS = ("SELECT", "UPDATE", "DELETE")
+
+    def __init__(self):
+        self.statements: Dict[str, Dict[str, Any]] = {}
+        self._label: Optional[str] = None
+
+    def __enter__(self) -> "QueryPlanCapture":
+        event.listen(Engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(Engine, "before_cursor_execute", self._record)
+
+    @contextmanager
+    def label(self, name: str) -> Iterator[None]:
+        """Attribute statements executed inside the block to name (e.g. "WorkspaceDB.get_tasks")."""
+        previous = self._label
+        self._label = name
+        try:
+            yield
+        finally:
+            self._label = previous
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        # Only statements inside a label() block belong to a code path under test
+        if self._label is None or executemany or not statement.lstrip().upper().startswith(self.CAPTURED_VERBS):
+            return
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = {
+                "sql": statement,
+                "parameters": parameters,
+                "callers": [self._label],
+                "executions": 1,
+            }
+        else:
+            entry["executions"] += 1
+            if self._label not in entry["callers"]:
+                entry["callers"].append(self._label)
+
+    def explain(self, engine: Engine) -> List[Dict[str, Any]]:
+        """
+        Run EXPLAIN QUERY PLAN for every captured statement.
+
+        Args:
+            engine: Engine to explain against (normally the one the queries ran on)
+
+        Returns:
+            One dict per statement with plan lines and full_scan / temp_sort flags
+        """
+        results = []
+        with engine.connect() as conn:
+            for entry in self.statements.values():
+                try:
+                    rows = conn.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {entry['sql']}", entry["parameters"] or ()
+                    ).fetchall()
+                    plan = [row[3] for row in rows]
+                    error = None
+                except Exception as e:
+                    plan = []
+                    error = str(e)
+                results.append({
+                    "callers": entry["callers"],
+                    "executions": entry["executions"],
+                    "sql": " ".join(entry["sql"].split()),
+                    "plan": plan,
+                    "full_scan": any(_is_full_scan(line) for line in plan),
+                    "temp_sort": any("USE TEMP B-TREE" in line for line in plan),
+                    "error": error,
+                })
+        return results
+
+
+def _is_full_scan(plan_line: str) -> bool:
+    """True for plan lines that read a whole table without any index."""
+    return plan_line.startswith("SCAN ") and " USING " not in plan_line
+
+
+def summarize_plans(plans: List[Dict[str, Any]], caller_prefix: Optional[str] = None) -> Dict[str, int]:
+    """Count statements, full scans and temp sorts (optionally for one caller prefix)."""
+    if caller_prefix:
+        plans = [p for p in plans if any(c.startswith(caller_prefix) for c in p["callers"])]
+    return {
+        "statements": len(plans),
+        "full_scans": sum(1 for p in plans if p["full_scan"]),
+        "temp_sorts": sum(1 for p in plans if p["temp_sort"]),
+    }
@@ -0,0 +1,645 @@
+"""
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Versioned, chunked and resumable schema migrations
+DOMAIN: Cross-repo workspace management
+
+Migrations are numbered; PRAGMA user_version holds the highest applied one so
+the check on every WorkspaceDB start is a single pragma read. Progress of the
+migration in flight lives in schema_migrations (step + checkpoint), so an
+interrupted run resumes where it stopped.
+
+Long-running steps (table rebuilds, backfills) work in bounded chunks. Each
+chunk is its own short BEGIN IMMEDIATE transaction that also saves the
+checkpoint, and the runner sleeps between chunks, so CLI users and agents can
+keep writing while a migration runs. Table rebuilds copy rows by rowid and then
+replay the change_log (see CHANGE_LOG_TABLES) to pick up rows written during
+the copy; only the final swap holds the write lock, and only briefly.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from .indexes import rationalize_indexes
+from .models import Base, CHANGE_LOG_TABLES, SchemaMigrationRecord, change_log_trigger_sql
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationError(Exception):
+    """A migration step cannot be applied."""
+
+
+class MigrationInProgressError(MigrationError):
+    """Another process is currently running the migration."""
+
+
+# ============================================================================
+# STEPS
+# ============================================================================
+
+class MigrationContext:
+    """Handed to each step: connection, chunking settings and checkpoint storage."""
+
+    def __init__(self, runner: "MigrationRunner", conn: Connection, migration: "Migration",
+                 step_index: int, checkpoint: Optional[Dict[str, Any]], rows_processed: int):
+        self.runner = runner
+        self.conn = conn
+        self.migration = migration
+        self.step_index = step_index
+        self.checkpoint = checkpoint or {}
+        self.rows_processed = rows_processed
+        self.chunk_size = runner.chunk_size
+
+    @contextmanager
+    def transaction(self) -> Iterator[Connection]:
+        """Short write transaction; keep the work inside it bounded by chunk_size."""
+        self.conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.exec_driver_sql("ROLLBACK")
+            raise
+        self.conn.exec_driver_sql("COMMIT")
+
+    def save(self, checkpoint: Dict[str, Any], rows: int = 0):
+        """Record progress. Call inside transaction() so it commits with the chunk."""
+        self.checkpoint = checkpoint
+        self.rows_processed += rows
+        self.conn.exec_driver_sql(
+            "UPDATE schema_migrations SET checkpoint = ?, rows_processed = ?, heartbeat_at = ? "
+            "WHERE version = ?",
+            (json.dumps(checkpoint), self.rows_processed, _timestamp(), self.migration.version),
+        )
+
+    def yield_to_writers(self):
+        """Report progress and sleep so other connections get the write lock."""
+        if self.runner.progress:
+            self.runner.progress(self.migration, self.step_index, self.rows_processed)
+        if self.runner.pause:
+            time.sleep(self.runner.pause)
+
+
+class MigrationStep:
+    """One unit of a migration. Steps must be idempotent: they may be re-run after a crash."""
+
+    description = ""
+
+    def run(self, ctx: MigrationContext):
+        raise NotImplementedError
+
+
+class SQLStep(MigrationStep):
+    """Statements that finish instantly (CREATE INDEX on small tables, DROP, RENAME)."""
+
+    def __init__(self, description: str, *statements: str):
+        self.description = description
+        self.statements = statements
+
+    def run(self, ctx: MigrationContext):
+        with ctx.transaction() as conn:
+            for statement in self.statements:
+                conn.exec_driver_sql(statement)
+
+
+class CallStep(MigrationStep):
+    """Run a function taking the engine (it manages its own transactions)."""
+
+    def __init__(self, description: str, func: Callable[[Engine], Any]):
+        self.description = description
+        self.func = func
+
+    def run(self, ctx: MigrationContext):
+        self.func(ctx.runner.engine)
+
+
+class AddColumn(MigrationStep):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists (e.g. fresh databases)."""
+
+    def __init__(self, table: str, column: str, definition: str):
+        self.table = table
+        self.column = column
+        self.definition = definition
+        self.description = f"add column {table}.{column}"
+
+    def run(self, ctx: MigrationContext):
+        with ctx.transaction() as conn:
+            if not _table_exists(conn, self.table) or self.column in _table_columns(conn, self.table):
+                return
+            conn.exec_driver_sql(f'ALTER TABLE "{self.table}" ADD COLUMN "{self.column}" {self.definition}')
+
+
+class DropTable(MigrationStep):
+    """Drop a leftover table. With only_if_empty, tables that still hold rows are kept."""
+
+    def __init__(self, table: str, only_if_empty: bool = True):
+        self.table = table
+        self.only_if_empty = only_if_empty
+        self.description = f"drop table {table}"
+
+    def run(self, ctx: MigrationContext):
+        with ctx.transaction() as conn:
+            if not _table_exists(conn, self.table):
+                return
+            if self.only_if_empty:
+                rows = conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{self.table}"').scalar()
+                if rows:
+                    logger.warning(f"Keeping {self.table}: it still has {rows} row(s)")
+                    return
+            conn.exec_driver_sql(f'DROP TABLE "{self.table}"')
+
+
+class Backfill(MigrationStep):
+    """
+    UPDATE a table in rowid-ordered chunks.
+
+    Args:
+        table: Table to update
+        assignments: SET clause, e.g. "version = 1"
+        where: Optional filter selecting rows that still need the backfill
+    """
+
+    def __init__(self, table: str, assignments: str, where: Optional[str] = None):
+        self.table = table
+        self.assignments = assignments
+        self.where = where
+        self.description = f"backfill {table}: {assignments}"
+
+    def run(self, ctx: MigrationContext):
+        if "end_rowid" not in ctx.checkpoint:
+            # Rows inserted after the backfill starts are written by code that already sets them
+            with ctx.transaction() as conn:
+                ctx.save({"last_rowid": 0, "end_rowid": _max_rowid(conn, self.table)})
+        last_rowid, end_rowid = ctx.checkpoint["last_rowid"], ctx.checkpoint["end_rowid"]
+        condition = f" AND ({self.where})" if self.where else ""
+        while True:
+            with ctx.transaction() as conn:
+                upper = _chunk_upper_rowid(conn, self.table, last_rowid, end_rowid, ctx.chunk_size, condition)
+                if upper is None:
+                    return
+                updated = conn.exec_driver_sql(
+                    f'UPDATE "{self.table}" SET {self.assignments} '
+                    f'WHERE rowid > ? AND rowid <= ?{condition}',
+                    (last_rowid, upper),
+                ).rowcount
+                last_rowid = upper
+                ctx.save({**ctx.checkpoint, "last_rowid": last_rowid}, rows=updated)
+            ctx.yield_to_writers()
+
+
+class RebuildTable(MigrationStep):
+    """
+    Rebuild a table to match its model definition without a long write lock.
+
+    Phases (all resumable from the checkpoint):
+        copy    - create <table>__rebuild and copy rows in rowid chunks
+        catchup - replay change_log entries written since the copy started
+        swap    - under one short lock: replay the rest, drop the old table,
+                  rename, recreate indexes and change_log triggers
+
+    Only tables in CHANGE_LOG_TABLES can be rebuilt online, because the
+    change_log is what captures writes made during the copy. The rebuild
+    holds a change_log_cursors row ("rebuild:<table>") at its replay position
+    from the start of the copy until the swap, so compact_change_log never
+    deletes entries it has yet to replay.
+
+    Args:
+        table: Table to rebuild (its model in Base.metadata is the target schema)
+        column_map: SQL expressions for new or changed columns, keyed by column
+            name and evaluated against the old table, e.g. {"version": "1"}
+    """
+
+    def __init__(self, table: str, column_map: Optional[Dict[str, str]] = None):
+        if table not in CHANGE_LOG_TABLES:
+            raise MigrationError(f"{table} has no change_log triggers; it cannot be rebuilt online")
+        self.table = table
+        self.column_map = column_map or {}
+        self.temp_table = f"{table}__rebuild"
+        self.cursor = f"rebuild:{table}"
+        self.description = f"rebuild table {table}"
+
+    def run(self, ctx: MigrationContext):
+        target = Base.metadata.tables[self.table]
+        phase = ctx.checkpoint.get("phase")
+
+        if phase is None:
+            with ctx.transaction() as conn:
+                start_seq = conn.exec_driver_sql("SELECT COALESCE(MAX(seq), 0) FROM change_log").scalar()
+                conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.temp_table}"')
+                conn.exec_driver_sql(self._create_sql(target))
+                self._hold_change_log(conn, start_seq)
+                # Rows past end_rowid are inserted after start_seq, so catchup copies them
+                ctx.save({"phase": "copy", "last_rowid": 0, "end_rowid": _max_rowid(conn, self.table),
+                          "seq": start_seq})
+            phase = "copy"
+        else:
+            # Resumed (possibly from a checkpoint written before rebuilds held a cursor)
+            with ctx.transaction() as conn:
+                self._hold_change_log(conn, ctx.checkpoint["seq"])
+
+        columns, expressions = self._copy_columns(ctx.conn, target)
+        insert = f'INSERT OR REPLACE INTO "{self.temp_table}" ({columns}) SELECT {expressions} FROM "{self.table}"'
+
+        if phase == "copy":
+            last_rowid, end_rowid = ctx.checkpoint["last_rowid"], ctx.checkpoint["end_rowid"]
+            while True:
+                with ctx.transaction() as conn:
+                    upper = _chunk_upper_rowid(conn, self.table, last_rowid, end_rowid, ctx.chunk_size)
+                    if upper is None:
+                        ctx.save({**ctx.checkpoint, "phase": "catchup"})
+                        break
+                    copied = conn.exec_driver_sql(
+                        f"{insert} WHERE rowid > ? AND rowid <= ?", (last_rowid, upper)
+                    ).rowcount
+                    last_rowid = upper
+                    ctx.save({**ctx.checkpoint, "last_rowid": last_rowid}, rows=copied)
+                ctx.yield_to_writers()
+            phase = "catchup"
+
+        if phase == "catchup":
+            # Replay in chunks until a partial chunk shows the backlog is nearly drained
+            while True:
+                with ctx.transaction() as conn:
+                    replayed = self._replay(conn, insert, ctx, limit=ctx.chunk_size)
+                if replayed < ctx.chunk_size:
+                    break
+                ctx.yield_to_writers()
+
+        self._swap(ctx, target, insert)
+
+    def _create_sql(self, target) -> str:
+        ddl = str(CreateTable(target).compile(dialect=sqlite.dialect())).strip()
+        prefix = f"CREATE TABLE {target.name} ("
+        if not ddl.startswith(prefix):
+            raise MigrationError(f"Unexpected DDL for {target.name}: {ddl[:60]}")
+        return f'CREATE TABLE "{self.temp_table}" (' + ddl[len(prefix):]
+
+    def _copy_columns(self, conn: Connection, target):
+        existing = set(_table_columns(conn, self.table))
+        names, expressions = [], []
+        for column in target.columns:
+            if column.name in self.column_map:
+                expression = self.column_map[column.name]
+            elif column.name in existing:
+                expression = f'"{column.name}"'
+            elif column.nullable or column.server_default is not None:
+                continue
+            else:
+                raise MigrationError(
+                    f"{self.table}.{column.name} is new and NOT NULL; give it an expression in column_map"
+                )
+            names.append(f'"{column.name}"')
+            expressions.append(expression)
+        return ", ".join(names), ", ".join(expressions)
+
+    def _replay(self, conn: Connection, insert: str, ctx: MigrationContext, limit: Optional[int]) -> int:
+        """Re-copy rows changed since the checkpointed change_log seq. Returns entries read."""
+        query = 'SELECT seq, pk FROM change_log WHERE "table" = ? AND seq > ? ORDER BY seq'
+        params = (self.table, ctx.checkpoint["seq"])
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        rows = conn.exec_driver_sql(query, params).fetchall()
+        if not rows:
+            return 0
+        pks = list(dict.fromkeys(row[1] for row in rows))
+        for start in range(0, len(pks), 500):
+            batch = pks[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            # Deleted rows disappear; inserted/updated rows are copied again from the source
+            conn.exec_driver_sql(f'DELETE FROM "{self.temp_table}" WHERE id IN ({placeholders})', tuple(batch))
+            conn.exec_driver_sql(f"{insert} WHERE id IN ({placeholders})", tuple(batch))
+        self._hold_change_log(conn, rows[-1][0])
+        ctx.save({**ctx.checkpoint, "phase": "catchup", "seq": rows[-1][0]}, rows=len(pks))
+        return len(rows)
+
+    def _hold_change_log(self, conn: Connection, seq: int):
+        """Keep change_log entries after seq from compaction (registers/moves the rebuild's cursor)."""
+        conn.exec_driver_sql(
+            "INSERT INTO change_log_cursors (consumer, last_seq, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(consumer) DO UPDATE SET last_seq = excluded.last_seq, updated_at = excluded.updated_at",
+            (self.cursor, seq, _timestamp()),
+        )
+
+    def _swap(self, ctx: MigrationContext, target, insert: str):
+        conn = ctx.conn
+        # Must be set outside a transaction; otherwise DROP TABLE would cascade/check FKs
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            with ctx.transaction():
+                self._replay(conn, insert, ctx, limit=None)
+                conn.exec_driver_sql(f'DROP TABLE "{self.table}"')
+                conn.exec_driver_sql(f'ALTER TABLE "{self.temp_table}" RENAME TO "{self.table}"')
+                for index in target.indexes:
+                    index.create(conn)
+                for statement in change_log_trigger_sql(self.table):
+                    conn.exec_driver_sql(statement)
+                problems = conn.exec_driver_sql(f'PRAGMA foreign_key_check("{self.table}")').fetchall()
+                if problems:
+                    raise MigrationError(f"{self.table}: {len(problems)} foreign key violation(s) after rebuild")
+                conn.exec_driver_sql("DELETE FROM change_log_cursors WHERE consumer = ?", (self.cursor,))
+                ctx.save({**ctx.checkpoint, "phase": "done"})
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
+def _timestamp(moment: Optional[datetime] = None) -> str:
+    """Timestamp in the format SQLAlchemy's SQLite DateTime type reads back."""
+    return (moment or datetime.utcnow()).isoformat(sep=" ")
+
+
+def _table_exists(conn: Connection, table: str) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).first() is not None
+
+
+def _table_columns(conn: Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")').fetchall()]
+
+
+def _max_rowid(conn: Connection, table: str) -> int:
+    return conn.exec_driver_sql(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"').scalar()
+
+
+def _chunk_upper_rowid(conn: Connection, table: str, after: int, end: int, size: int,
+                       condition: str = "") -> Optional[int]:
+    """Highest rowid of the next chunk of at most size rows in (after, end]."""
+    return conn.exec_driver_sql(
+        f'SELECT MAX(rowid) FROM (SELECT rowid FROM "{table}" WHERE rowid > ? AND rowid <= ?{condition} '
+        f'ORDER BY rowid LIMIT ?)',
+        (after, end, size),
+    ).scalar()
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+# Keywords GovernanceEngine and BastardIntegration had hardcoded: (category, keyword, target repo, priority)
+_DEFAULT_KEYWORD_RULES = [
+    *(("routing", kw, "meridian-trading", 30) for kw in ("trading", "tdom", "larry williams", "market", "strategy")),
+    *(("routing", kw, "meridian-research", 20) for kw in ("research", "query", "investigation", "analysis")),
+    *(("routing", kw, "meridian-core", 10) for kw in (
+        "orchestration", "learning engine", "proposal manager", "voting system", "abstract", "base class"
+    )),
+    *(("over_engineering", kw, None, 0) for kw in (
+        "kubernetes", "vault", "microservices", "service mesh", "kafka", "consul", "distributed", "cloud-native"
+    )),
+]
+
+
+def _seed_keyword_rules_sql() -> str:
+    """INSERT of the default keyword rules, only into an empty keyword_rules table."""
+    def literal(value):
+        return "NULL" if value is None else str(value) if isinstance(value, int) else f"'{value}'"
+
+    rows = ", ".join(
+        "(" + ", ".join(literal(v) for v in (
+            f"keyword-rule-{hashlib.sha1(f'{category}:{keyword}'.encode('utf-8')).hexdigest()[:12]}",
+            keyword, category, target, priority,
+        )) + ")"
+        for category, keyword, target, priority in _DEFAULT_KEYWORD_RULES
+    )
+    return (
+        "INSERT INTO keyword_rules (id, keyword, category, target, priority, reason, is_active, created_at, created_by) "
+        "SELECT column1, column2, column3, column4, column5, 'Default rule', 1, CURRENT_TIMESTAMP, 'migration' "
+        f"FROM (VALUES {rows}) WHERE NOT EXISTS (SELECT 1 FROM keyword_rules)"
+    )
+
+
+@dataclass
+class Migration:
+    """
+    A numbered schema change.
+
+    auto migrations are applied when WorkspaceDB starts; the rest (big rebuilds
+    and backfills) wait for an explicit `wms db migrate`.
+    """
+    version: int
+    name: str
+    steps: Sequence[MigrationStep] = field(default_factory=list)
+    auto: bool = True
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "rationalize_indexes", [
+        CallStep("create declared indexes, drop redundant ones", rationalize_indexes),
+    ]),
+    Migration(2, "drop_architecture_states_old", [
+        DropTable("architecture_states_old", only_if_empty=True),
+    ]),
+    Migration(3, "mapping_missing_since", [
+        AddColumn("code_component_mappings", "missing_since", "DATETIME"),
+    ]),
+    Migration(4, "drift_scan_stats", [
+        AddColumn("drift_scans", "repo_commits", "TEXT"),
+        AddColumn("drift_scans", "rule_timings", "TEXT"),
+        AddColumn("drift_scans", "change_seq", "INTEGER"),
+        AddColumn("drift_scans", "detections_new", "INTEGER DEFAULT 0"),
+        AddColumn("drift_scans", "detections_resolved", "INTEGER DEFAULT 0"),
+    ]),
+    Migration(5, "configuration_change_key", [
+        AddColumn("configuration_changes", "config_key", "VARCHAR(500)"),
+    ]),
+    Migration(6, "file_inventory_hashes", [
+        AddColumn("file_inventory", "head_hash", "VARCHAR(32)"),
+        AddColumn("file_inventory", "content_hash", "VARCHAR(64)"),
+        AddColumn("file_inventory", "hashed_stat", "VARCHAR(100)"),
+    ]),
+    Migration(7, "default_keyword_rules", [
+        SQLStep("seed keyword_rules with the former hardcoded keywords", _seed_keyword_rules_sql()),
+    ]),
+    Migration(8, "task_version", [
+        AddColumn("workspace_tasks", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ]),
+    Migration(9, "flush_reused_verdict_versions", [
+        # Before compact_change_log kept each table's newest entry, compaction could
+        # lower the rules version back to one that older verdicts were cached under
+        SQLStep("drop cached governance verdicts", "DELETE FROM governance_verdicts"),
+    ]),
+]
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+class MigrationRunner:
+    """
+    Applies pending migrations in version order.
+
+    Args:
+        engine: Engine bound to the workspace database
+        migrations: Registry to apply (defaults to MIGRATIONS)
+        chunk_size: Rows per chunk transaction for rebuilds/backfills
+        pause: Seconds to sleep between chunks so other writers get through
+        stale_after: Seconds without a heartbeat after which another process's
+            in-flight migration is considered crashed and taken over
+        progress: Optional callback(migration, step_index, rows_processed)
+    """
+
+    def __init__(self, engine: Engine, migrations: Optional[Sequence[Migration]] = None,
+                 chunk_size: int = 5000, pause: float = 0.05, stale_after: int = 120,
+                 progress: Optional[Callable[[Migration, int, int], None]] = None):
+        self.engine = engine
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.stale_after = stale_after
+        self.progress = progress
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        SchemaMigrationRecord.__table__.create(engine, checkfirst=True)
+
+    def current_version(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+    def pending(self, auto_only: bool = False) -> List[Migration]:
+        """Migrations above PRAGMA user_version (auto_only stops at the first manual one)."""
+        current = self.current_version()
+        pending = []
+        for migration in self.migrations:
+            if migration.version <= current:
+                continue
+            if auto_only and not migration.auto:
+                break
+            pending.append(migration)
+        return pending
+
+    def status(self) -> List[Dict[str, Any]]:
+        """One entry per registered migration with its recorded progress."""
+        with self.engine.connect() as conn:
+            records = {
+                row["version"]: dict(row)
+                for row in conn.exec_driver_sql("SELECT * FROM schema_migrations").mappings()
+            }
+        current = self.current_version()
+        result = []
+        for migration in self.migrations:
+            record = records.get(migration.version, {})
+            status = record.get("status") or ("completed" if migration.version <= current else "pending")
+            result.append({
+                "version": migration.version,
+                "name": migration.name,
+                "auto": migration.auto,
+                "status": status,
+                "step": record.get("step", 0),
+                "steps": len(migration.steps),
+                "rows_processed": record.get("rows_processed", 0),
+                "completed_at": record.get("completed_at"),
+                "error": record.get("error"),
+            })
+        return result
+
+    def run(self, target: Optional[int] = None, auto_only: bool = False) -> List[int]:
+        """
+        Apply pending migrations up to target (inclusive).
+
+        Raises:
+            MigrationInProgressError: Another live process owns a pending migration
+
+        Returns:
+            Versions applied by this call
+        """
+        applied = []
+        for migration in self.pending(auto_only=auto_only):
+            if target is not None and migration.version > target:
+                break
+            self._apply(migration)
+            applied.append(migration.version)
+        return applied
+
+    def _apply(self, migration: Migration):
+        with self.engine.connect() as conn:
+            record = self._claim(conn, migration)
+            if record is None:
+                return
+            step_index = record["step"]
+            checkpoint = json.loads(record["checkpoint"]) if record["checkpoint"] else None
+            rows = record["rows_processed"]
+            logger.info(f"Applying migration {migration.version} ({migration.name}) from step {step_index}")
+
+            try:
+                while step_index < len(migration.steps):
+                    step = migration.steps[step_index]
+                    ctx = MigrationContext(self, conn, migration, step_index, checkpoint, rows)
+                    step.run(ctx)
+                    step_index += 1
+                    checkpoint = None
+                    rows = ctx.rows_processed
+                    conn.exec_driver_sql(
+                        "UPDATE schema_migrations SET step = ?, checkpoint = NULL, rows_processed = ?, "
+                        "heartbeat_at = ? WHERE version = ?",
+                        (step_index, rows, _timestamp(), migration.version),
+                    )
+                    if self.progress:
+                        self.progress(migration, step_index, rows)
+            except Exception as e:
+                conn.exec_driver_sql(
+                    "UPDATE schema_migrations SET status = 'failed', error = ?, owner = NULL WHERE version = ?",
+                    (str(e), migration.version),
+                )
+                raise
+
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            conn.exec_driver_sql(
+                "UPDATE schema_migrations SET status = 'completed', completed_at = ?, owner = NULL, "
+                "error = NULL WHERE version = ?",
+                (_timestamp(), migration.version),
+            )
+            if migration.version > conn.exec_driver_sql("PRAGMA user_version").scalar():
+                conn.exec_driver_sql(f"PRAGMA user_version = {int(migration.version)}")
+            conn.exec_driver_sql("COMMIT")
+            logger.info(f"Migration {migration.version} ({migration.name}) completed")
+
+    def _claim(self, conn: Connection, migration: Migration) -> Optional[Dict[str, Any]]:
+        """Mark the migration as ours (resuming any checkpoint). None if already completed."""
+        now = datetime.utcnow()
+        stamp = _timestamp(now)
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            row = conn.exec_driver_sql(
+                "SELECT * FROM schema_migrations WHERE version = ?", (migration.version,)
+            ).mappings().first()
+            if row and row["status"] == "completed":
+                conn.exec_driver_sql("COMMIT")
+                return None
+            if row and row["status"] == "running" and row["owner"] != self.owner and row["heartbeat_at"]:
+                heartbeat = datetime.fromisoformat(str(row["heartbeat_at"]))
+                if now - heartbeat < timedelta(seconds=self.stale_after):
+                    raise MigrationInProgressError(
+                        f"Migration {migration.version} ({migration.name}) is running in {row['owner']}"
+                    )
+            if row:
+                conn.exec_driver_sql(
+                    "UPDATE schema_migrations SET status = 'running', owner = ?, heartbeat_at = ?, error = NULL "
+                    "WHERE version = ?",
+                    (self.owner, stamp, migration.version),
+                )
+            else:
+                conn.exec_driver_sql(
+                    "INSERT INTO schema_migrations (version, name, status, step, rows_processed, owner, "
+                    "heartbeat_at, started_at) VALUES (?, ?, 'running', 0, 0, ?, ?, ?)",
+                    (migration.version, migration.name, self.owner, stamp, stamp),
+                )
+            record = conn.exec_driver_sql(
+                "SELECT * FROM schema_migrations WHERE version = ?", (migration.version,)
+            ).mappings().first()
+            conn.exec_driver_sql("COMMIT")
+            return dict(record)
+        except Exception:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
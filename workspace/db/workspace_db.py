@@ -8,13 +8,14 @@ Manages workspace-level tracking database using SQLAlchemy + SQLite.
 Follows meridian-core patterns for connection pooling, WAL mode, etc.
 """
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Iterable
 from datetime import datetime, timedelta
 import json
 import logging
 
-from sqlalchemy import create_engine, text, func
+from sqlalchemy import create_engine, text, func, update
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool
 
@@ -35,11 +36,45 @@ from .models import (
     DriftScan,
     ConfigurationSnapshot,
     ConfigurationChange,
+    ChangeLogEntry,
+    ChangeLogCursor,
+    CHANGE_LOG_TABLES,
+    change_log_trigger_sql,
 )
+from .schema_migrations import MigrationRunner, MigrationInProgressError
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def atomic(session: Session) -> Iterator[Session]:
+    """
+    Run a block of ORM work as one SQLite transaction.
+    
+    The engine uses AUTOCOMMIT, so session.commit() does not group statements.
+    This issues BEGIN IMMEDIATE on the session's connection, flushes pending
+    objects at the end of the block and commits once (or rolls back on error).
+    
+    Args:
+        session: Session bound to a WorkspaceDB engine
+    
+    Usage:
+        with atomic(session):
+            session.add_all(rows)
+    """
+    conn = session.connection()
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        yield session
+        session.flush()
+    except Exception:
+        conn.exec_driver_sql("ROLLBACK")
+        session.rollback()
+        raise
+    conn.exec_driver_sql("COMMIT")
+    session.commit()
+
+
 class WorkspaceDB:
     """
     Workspace database manager.
@@ -54,13 +89,20 @@ class WorkspaceDB:
     - Automatic schema management
     """
     
-    def __init__(self, db_path: Optional[str] = None, workspace_root: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        workspace_root: Optional[Path] = None,
+        auto_migrate: bool = True
+    ):
         """
         Initialize workspace database.
         
         Args:
             db_path: Path to SQLite database. Defaults to workspace.db in workspace_root
             workspace_root: Workspace root directory. Defaults to current directory parent
+            auto_migrate: Apply pending automatic schema migrations (`wms db migrate`
+                          opens the database without them to report or run them itself)
         """
         if workspace_root is None:
             workspace_root = Path.cwd()
@@ -117,12 +159,39 @@ class WorkspaceDB:
         # Ensure tables exist
         Base.metadata.create_all(self.engine)
         
+        # Install change data capture triggers (idempotent)
+        self._install_change_log_triggers()
+        
+        # Apply pending automatic schema migrations (one PRAGMA read when up to date)
+        if auto_migrate:
+            self._apply_schema_migrations()
+        
         logger.info(f"Workspace database initialized: {db_path}")
     
     def _get_session(self) -> Session:
         """Get a new database session."""
         return self.SessionLocal()
     
+    def _apply_schema_migrations(self):
+        """Run auto migrations; big rebuilds/backfills wait for `wms db migrate`."""
+        runner = MigrationRunner(self.engine)
+        if not runner.pending(auto_only=True):
+            return
+        try:
+            applied = runner.run(auto_only=True)
+            if applied:
+                logger.info(f"Applied schema migrations: {applied}")
+        except MigrationInProgressError as e:
+            logger.warning(f"{e}; continuing on the current schema")
+    
+    def _install_change_log_triggers(self):
+        """Create AFTER INSERT/UPDATE/DELETE triggers feeding change_log."""
+        with self.engine.connect() as conn:
+            for table in CHANGE_LOG_TABLES:
+                for statement in change_log_trigger_sql(table):
+                    conn.execute(text(statement))
+            conn.commit()
+    
     # ========================================================================
     # WORKSPACE TASK METHODS
     # ========================================================================
@@ -227,15 +296,19 @@ class WorkspaceDB:
             return query.all()
     
     def update_task_status(self, task_id: str, status: str) -> bool:
-        """Update task status."""
-        with self._get_session() as session:
-            task = session.query(WorkspaceTask).filter(WorkspaceTask.id == task_id).first()
-            if not task:
-                return False
-            task.status = status
-            task.updated = datetime.utcnow()
-            session.commit()
-            return True
+        """
+        Set task status unconditionally (one UPDATE, bumps the task version).
+        
+        Lifecycle changes that must not race other agents should use
+        workspace.wms.task_lifecycle transitions instead.
+        """
+        with self.engine.connect() as conn:
+            result = conn.execute(
+                update(WorkspaceTask)
+                .where(WorkspaceTask.id == task_id)
+                .values(status=status, updated=datetime.utcnow(), version=WorkspaceTask.version + 1)
+            )
+            return result.rowcount > 0
     
     # ========================================================================
     # SESSION METHODS
@@ -337,7 +410,7 @@ class WorkspaceDB:
                 detected_by=detected_by or "manual",
                 action_required=action_required,
                 related_task_id=related_task_id,
-                metadata=json.dumps(metadata) if metadata else None,
+                extra_metadata=json.dumps(metadata) if metadata else None,
             )
             session.add(issue)
             session.commit()
@@ -513,7 +586,7 @@ class WorkspaceDB:
                 detected_rule=detected_rule,
                 detected_by=detected_by,
                 related_task_id=related_task_id,
-                metadata=json.dumps(metadata) if metadata else None,
+                extra_metadata=json.dumps(metadata) if metadata else None,
             )
             session.add(detection)
             session.commit()
@@ -606,6 +679,140 @@ class WorkspaceDB:
                 "low": low or 0,
             }
     
+    # ========================================================================
+    # CHANGE DATA CAPTURE METHODS
+    # ========================================================================
+    
+    def changes_since(
+        self,
+        seq: int = 0,
+        tables: Optional[Iterable[str]] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[ChangeLogEntry]:
+        """
+        Stream change_log entries with seq greater than the given position.
+        
+        Entries are read in seq order using keyset pagination, so memory stays
+        bounded regardless of how far behind the caller is.
+        
+        Args:
+            seq: Last seq already processed (0 for everything still in the log)
+            tables: Optional table names to restrict to
+            batch_size: Rows fetched per query
+        
+        Yields:
+            ChangeLogEntry instances in ascending seq order
+        """
+        tables = list(tables) if tables else None
+        last_seq = seq
+        while True:
+            with self._get_session() as session:
+                query = session.query(ChangeLogEntry).filter(ChangeLogEntry.seq > last_seq)
+                if tables:
+                    query = query.filter(ChangeLogEntry.table.in_(tables))
+                batch = query.order_by(ChangeLogEntry.seq).limit(batch_size).all()
+            
+            if not batch:
+                return
+            
+            for entry in batch:
+                yield entry
+            last_seq = batch[-1].seq
+            
+            if len(batch) < batch_size:
+                return
+    
+    @staticmethod
+    def change_cursor_name(consumer: str, tables: Optional[Iterable[str]] = None) -> str:
+        """
+        Cursor key of a consumer reading a set of tables.
+        
+        A cursor filtered to some tables moves past entries of the others
+        without reading them, so each table set gets its own cursor
+        ("doc_sync[architecture_decisions,workspace_tasks]").
+        """
+        if tables is None:
+            return consumer
+        return f"{consumer}[{','.join(sorted(set(tables)))}]"
+    
+    def get_change_cursor(self, consumer: str, tables: Optional[Iterable[str]] = None) -> int:
+        """Get last processed seq for a consumer and table set (0 if never recorded)."""
+        consumer = self.change_cursor_name(consumer, tables)
+        with self._get_session() as session:
+            cursor = session.query(ChangeLogCursor).filter(ChangeLogCursor.consumer == consumer).first()
+            return cursor.last_seq if cursor else 0
+    
+    def set_change_cursor(self, consumer: str, seq: int, tables: Optional[Iterable[str]] = None) -> None:
+        """Record that a consumer has processed every change (of a table set) up to seq."""
+        consumer = self.change_cursor_name(consumer, tables)
+        with self._get_session() as session:
+            cursor = session.query(ChangeLogCursor).filter(ChangeLogCursor.consumer == consumer).first()
+            if cursor:
+                cursor.last_seq = max(cursor.last_seq, seq)
+                cursor.updated_at = datetime.utcnow()
+            else:
+                session.add(ChangeLogCursor(consumer=consumer, last_seq=seq))
+            session.commit()
+    
+    def consume_changes(
+        self,
+        consumer: str,
+        tables: Optional[Iterable[str]] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[ChangeLogEntry]:
+        """
+        Stream changes not yet seen by a consumer, advancing its cursor.
+        
+        The cursor is advanced after each batch has been handed out, so a
+        consumer that stops early re-reads at most one batch next time.
+        Each table set has its own cursor (change_cursor_name): reading with
+        a filter never skips entries a later read with another filter needs.
+        
+        Args:
+            consumer: Consumer name (e.g. "json_exporter", "doc_sync")
+            tables: Optional table names to restrict to
+            batch_size: Rows fetched per query
+        
+        Yields:
+            ChangeLogEntry instances in ascending seq order
+        """
+        tables = None if tables is None else [*tables]
+        start = self.get_change_cursor(consumer, tables)
+        last_seq = start
+        pending = 0
+        for entry in self.changes_since(start, tables=tables, batch_size=batch_size):
+            yield entry
+            last_seq = entry.seq
+            pending += 1
+            if pending >= batch_size:
+                self.set_change_cursor(consumer, last_seq, tables)
+                pending = 0
+        if last_seq > start:
+            self.set_change_cursor(consumer, last_seq, tables)
+    
+    def compact_change_log(self) -> int:
+        """
+        Delete change_log entries already processed by every registered consumer.
+        
+        The newest entry of each table is always kept: MAX(seq) per table is the
+        version rule caches and governance verdicts are keyed by, and it must
+        never go back.
+        
+        Returns:
+            Number of entries deleted (0 if no consumer is registered)
+        """
+        with self._get_session() as session:
+            low_water = session.query(func.min(ChangeLogCursor.last_seq)).scalar()
+            if not low_water:
+                return 0
+            newest = session.query(func.max(ChangeLogEntry.seq)).group_by(ChangeLogEntry.table)
+            deleted = session.query(ChangeLogEntry).filter(
+                ChangeLogEntry.seq <= low_water,
+                ChangeLogEntry.seq.not_in(newest),
+            ).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+    
     # ========================================================================
     # JSON EXPORT/IMPORT
     # ========================================================================
@@ -11,6 +11,7 @@ DOMAIN: Cross-repo workspace management
 import sys
 from pathlib import Path
 from datetime import datetime
+import fnmatch
 import json
 
 # Add workspace to path
@@ -19,41 +20,43 @@ sys.path.insert(0, str(workspace_root))
 
 from workspace.db import WorkspaceDB
 from workspace.wms.context_manager import ContextManager, get_quick_context
+from workspace.wms.file_inventory import FileInventory
 
 
-def find_governance_docs(workspace_root: Path) -> dict:
+def _workspace_inventory(workspace_root: Path) -> FileInventory:
+    """File inventory of the workspace, brought up to date."""
+    inventory = FileInventory(WorkspaceDB(workspace_root=workspace_root).engine, workspace_root)
+    inventory.scan()
+    return inventory
+
+
+def find_governance_docs(workspace_root: Path, inventory: FileInventory = None) -> dict:
     """Find all governance documentation files."""
+    inventory = inventory or _workspace_inventory(workspace_root)
     docs = {
         'ai_guidelines': [],
         'adr': [],
         'house_model': [],
         'cross_repo_guide': []
     }
+    patterns = {
+        'ai_guidelines': 'AI-GUIDELINES.md',
+        'adr': 'ADR-001*.md',
+        'house_model': '*AI-HOUSE-MODEL*.md',
+        'cross_repo_guide': '*CROSS-REPO*.md',
+    }
     
-    # Search for AI-GUIDELINES.md
-    for path in workspace_root.rglob('AI-GUIDELINES.md'):
-        if 'venv' not in str(path) and '.git' not in str(path):
-            docs['ai_guidelines'].append(path)
-    
-    # Search for ADR-001 files
-    for path in workspace_root.rglob('ADR-001*.md'):
-        if 'venv' not in str(path) and '.git' not in str(path):
-            docs['adr'].append(path)
-    
-    # Search for AI-HOUSE-MODEL files
-    for path in workspace_root.rglob('*AI-HOUSE-MODEL*.md'):
-        if 'venv' not in str(path) and '.git' not in str(path):
-            docs['house_model'].append(path)
-    
-    # Search for CROSS-REPO-GUIDE files
-    for path in workspace_root.rglob('*CROSS-REPO*.md'):
-        if 'venv' not in str(path) and '.git' not in str(path):
-            docs['cross_repo_guide'].append(path)
+    # One inventory query for every markdown file, matched against each pattern
+    markdown = [f for f in inventory.files(exts=['.md']) if 'venv' not in f.workspace_path]
+    for key, pattern in patterns.items():
+        for entry in markdown:
+            if fnmatch.fnmatchcase(entry.name, pattern):
+                docs[key].append(inventory.path(entry))
     
     return docs
 
 
-def extract_critical_rules(workspace_root: Path, context_repo: str = None) -> str:
+def extract_critical_rules(workspace_root: Path, context_repo: str = None, inventory: FileInventory = None) -> str:
     """Extract critical governance rules from documentation."""
     rules = []
     
@@ -68,7 +71,7 @@ def extract_critical_rules(workspace_root: Path, context_repo: str = None) -> st
     
     # Fallback to workspace root or first found
     if not ai_guidelines:
-        candidates = list(workspace_root.rglob('AI-GUIDELINES.md'))
+        candidates = find_governance_docs(workspace_root, inventory)['ai_guidelines']
         if candidates:
             # Prefer meridian-core as source of truth
             for candidate in candidates:
@@ -150,7 +153,13 @@ def generate_governance_context(workspace_root: Path, context_repo: str = None,
                 pass
         
         # Extract critical rules
-        critical_rules = extract_critical_rules(workspace_root, context_repo or (current_context.repo if current_context else None))
+        inventory = FileInventory(db.engine, workspace_root)
+        inventory.scan()
+        critical_rules = extract_critical_rules(
+            workspace_root,
+            context_repo or (current_context.repo if current_context else None),
+            inventory,
+        )
         
         # Generate content
         content = f"""# GOVERNANCE-CONTEXT.md
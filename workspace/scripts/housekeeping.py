@@ -23,6 +23,7 @@ import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple
+import fnmatch
 import json
 import shutil
 
@@ -32,6 +33,9 @@ sys.path.insert(0, str(workspace_root))
 
 from workspace.db import WorkspaceDB
 from workspace.wms.architecture_validator import ArchitectureValidator
+from workspace.wms.coverage import CoverageTracker
+from workspace.wms.duplicate_finder import DuplicateFinder
+from workspace.wms.file_inventory import FileInventory
 from workspace.db.models import (
     WorkspaceTask,
     WorkspaceSession,
@@ -50,6 +54,7 @@ class Housekeeping:
         self.db = WorkspaceDB(workspace_root=workspace_root)
         self.session = self.db._get_session()
         self.validator = ArchitectureValidator(self.session, workspace_root)
+        self.inventory = FileInventory(self.db.engine, workspace_root)
         self.report = {
             'timestamp': datetime.utcnow().isoformat(),
             'tasks_completed': [],
@@ -67,6 +72,12 @@ class Housekeeping:
         print()
         print(f"Workspace: {self.workspace_root}")
         print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        # File checks below query the inventory instead of walking the disk
+        scan = self.inventory.scan()
+        print(f"Inventory: {scan['entries']:,} entries ({scan['dirs_listed']:,} changed directories re-listed)")
+        coverage = CoverageTracker(self.db.engine).update()
+        print(f"Coverage: {coverage['files']:,} counted files ({coverage['changed']:,} changed state)")
         print()
         
         try:
@@ -226,24 +237,20 @@ class Housekeeping:
         temp_dirs = ['.pytest_cache', '.mypy_cache', '.ruff_cache']
         
         cleaned = []
-        for pattern in temp_patterns:
-            for path in self.workspace_root.rglob(pattern):
-                if path.is_file():
-                    try:
-                        if path.stat().st_mtime < (datetime.now().timestamp() - days_old * 86400):
-                            path.unlink()
-                            cleaned.append(str(path.relative_to(self.workspace_root)))
-                    except:
-                        pass
-        
-        for dir_pattern in temp_dirs:
-            for path in self.workspace_root.rglob(dir_pattern):
-                if path.is_dir():
-                    try:
-                        shutil.rmtree(path)
-                        cleaned.append(str(path.relative_to(self.workspace_root)))
-                    except:
-                        pass
+        for entry in self.inventory.files(include_ignored=True):
+            if any(fnmatch.fnmatchcase(entry.name, pattern) for pattern in temp_patterns):
+                if self._remove_if_older(self.inventory.path(entry), days_old):
+                    cleaned.append(entry.workspace_path)
+        
+        for entry in self.inventory.files(include_ignored=True, kinds=('dir',)):
+            path = self.inventory.path(entry)
+            # __pycache__ is not descended (gitignored); a stale one goes as a whole
+            if entry.name in temp_dirs or (entry.name == '__pycache__' and self._is_older(path, days_old)):
+                try:
+                    shutil.rmtree(path)
+                    cleaned.append(entry.workspace_path)
+                except:
+                    pass
         
         if cleaned:
             self.report['files_cleaned'].extend(cleaned)
@@ -253,6 +260,24 @@ class Housekeeping:
             print(f"   ℹ️  No temporary files to clean")
         print()
     
+    @staticmethod
+    def _is_older(path: Path, days_old: int) -> bool:
+        """Check the disk, not the inventory: in-place edits leave inventory mtimes stale."""
+        try:
+            return path.stat().st_mtime < (datetime.now().timestamp() - days_old * 86400)
+        except OSError:
+            return False
+    
+    def _remove_if_older(self, path: Path, days_old: int) -> bool:
+        """Delete a file last modified more than days_old days ago."""
+        if not path.is_file() or not self._is_older(path, days_old):
+            return False
+        try:
+            path.unlink()
+            return True
+        except:
+            return False
+    
     def check_orphaned_files(self):
         """Check for orphaned files (referenced but don't exist)."""
         print("6. Checking for orphaned file references...")
@@ -326,15 +351,10 @@ class Housekeeping:
         log_dirs = ['logs', '*.log']
         cleaned = []
         
-        for log_dir in log_dirs:
-            for path in self.workspace_root.rglob(log_dir):
-                if path.is_file():
-                    try:
-                        if path.stat().st_mtime < (datetime.now().timestamp() - days_old * 86400):
-                            path.unlink()
-                            cleaned.append(str(path.relative_to(self.workspace_root)))
-                    except:
-                        pass
+        for entry in self.inventory.files(include_ignored=True):
+            if any(fnmatch.fnmatchcase(entry.name, pattern) for pattern in log_dirs):
+                if self._remove_if_older(self.inventory.path(entry), days_old):
+                    cleaned.append(entry.workspace_path)
         
         if cleaned:
             self.report['files_cleaned'].extend(cleaned)
@@ -344,35 +364,29 @@ class Housekeeping:
             print(f"   ℹ️  No old log files to clean")
         print()
     
-    def check_duplicate_files(self):
-        """Check for duplicate files (same name in multiple locations)."""
+    def check_duplicate_files(self, show: int = 5):
+        """Check for duplicate files (identical content in several locations)."""
         print("9. Checking for duplicate files...")
         
-        # Simple check: files with same name in different repos
-        file_names = {}
-        repos = ['meridian-core', 'meridian-trading', 'meridian-research']
-        
-        for repo in repos:
-            repo_path = self.workspace_root / repo
-            if not repo_path.exists():
-                continue
-            
-            for py_file in repo_path.rglob('*.py'):
-                name = py_file.name
-                if name not in file_names:
-                    file_names[name] = []
-                file_names[name].append(str(py_file.relative_to(self.workspace_root)))
-        
-        duplicates = {name: paths for name, paths in file_names.items() if len(paths) > 1}
+        result = DuplicateFinder(self.db.engine, self.workspace_root).find()
+        duplicates = result['sets']
         
         if duplicates:
-            count = sum(len(paths) - 1 for paths in duplicates.values())
-            self.report['warnings'].append(f"Found {len(duplicates)} duplicate file name(s) ({count} potential duplicates)")
-            print(f"   ⚠️  Found {len(duplicates)} duplicate file name(s):")
-            for name, paths in list(duplicates.items())[:5]:
-                print(f"      • {name}: {len(paths)} locations")
+            count = sum(len(dup.paths) - 1 for dup in duplicates)
+            wasted_kb = result['wasted_bytes'] / 1024
+            self.report['warnings'].append(
+                f"Found {len(duplicates)} duplicate file set(s) ({count} redundant copies, {wasted_kb:,.0f} KB)"
+            )
+            self.report['duplicate_files'] = [
+                {'paths': dup.paths, 'size': dup.size, 'wasted_bytes': dup.wasted_bytes}
+                for dup in duplicates
+            ]
+            print(f"   ⚠️  Found {len(duplicates)} duplicate file set(s), {wasted_kb:,.0f} KB wasted:")
+            for dup in duplicates[:show]:
+                print(f"      • {dup.paths[0]} (+{len(dup.paths) - 1} copies, {dup.wasted_bytes:,} bytes)")
         else:
-            print(f"   ✅ No duplicate file names found")
+            print(f"   ✅ No duplicate files found")
+        print(f"   ({result['candidates']:,} size-matched candidates, {result['full_hashed']:,} fully hashed)")
         print()
     
     def generate_report(self):
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Drop duplicate indexes and create the composite/partial indexes from the models.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Index migration for databases created before index rationalization
+DOMAIN: Cross-repo workspace management
+
+Usage:
+    python workspace/scripts/migrate_indexes.py --dry-run
+    python workspace/scripts/migrate_indexes.py
+"""
+
+import sys
+from pathlib import Path
+import argparse
+
+# Add workspace to path
+workspace_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(workspace_root))
+
+from workspace.db import WorkspaceDB
+from workspace.db.indexes import rationalize_indexes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rationalize workspace database indexes")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would change")
+    args = parser.parse_args()
+
+    db = WorkspaceDB(workspace_root=Path.cwd())
+    print(f"Database: {db.db_path}")
+    print()
+
+    plan = rationalize_indexes(db.engine, dry_run=args.dry_run)
+
+    verb = "Would drop" if args.dry_run else "Dropped"
+    print(f"{verb} {len(plan['drop'])} index(es):")
+    for name in plan["drop"]:
+        print(f"   - {name}")
+    verb = "Would create" if args.dry_run else "Created"
+    print(f"{verb} {len(plan['create'])} index(es):")
+    for name in plan["create"]:
+        print(f"   + {name}")
+
+    if not plan["drop"] and not plan["create"]:
+        print("✅ Indexes already match the models")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
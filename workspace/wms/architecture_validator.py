@@ -8,21 +8,49 @@ DOMAIN: Cross-repo workspace management
 """
 
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import Any, List, Optional, Dict, Iterable, Set, Tuple, Union
+from sqlalchemy import bindparam, case, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from datetime import datetime
+import hashlib
 import json
+import logging
 import re
-import time
 
+from workspace.db import atomic
 from workspace.db.models import (
     ArchitectureComponent,
     CodeComponentMapping,
+    ComponentMappingRule,
     CodeChange,
     UnregisteredFile,
     Violation,
     WorkspaceTask,
 )
+from workspace.wms.path_index import ComponentPathIndex, PathMatch, split_path
+from workspace.wms.mapping_rules import MappingRuleMatcher, RuleMatch, rule_regex
+from workspace.wms.precommit import refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def unregistered_file_id(repo: str, file_path: str) -> str:
+    """Stable UnregisteredFile id for a path, identical across processes and runs."""
+    digest = hashlib.sha1(f"{repo}\0{file_path}".encode("utf-8")).hexdigest()
+    return f"unreg-{digest[:24]}"
+
+
+def code_change_id(repo: str, commit_hash: str, file_path: str) -> str:
+    """Stable CodeChange id for a validated file, so re-validating a commit never duplicates rows."""
+    digest = hashlib.sha1(f"{repo}\0{commit_hash}\0{file_path}".encode("utf-8")).hexdigest()
+    return f"change-{digest[:24]}"
+
+
+def mapping_rule_id(pattern_type: str, pattern: str) -> str:
+    """Stable ComponentMappingRule id for a pattern, identical across processes and runs."""
+    digest = hashlib.sha1(f"{pattern_type}\0{pattern}".encode("utf-8")).hexdigest()
+    return f"rule-{digest[:24]}"
 
 
 class ArchitectureValidator:
@@ -31,6 +59,10 @@ class ArchitectureValidator:
     def __init__(self, db_session: Session, workspace_root: Path):
         self.db = db_session
         self.workspace_root = workspace_root
+        # Shared per database; answers "which component owns this path" without a query
+        self.path_index = ComponentPathIndex.for_engine(db_session.get_bind())
+        # Glob/prefix rules, consulted when a file has no explicit mapping
+        self.mapping_rules = MappingRuleMatcher.for_engine(db_session.get_bind())
     
     def validate_file_mapping(self, file_path: str, repo: str) -> Tuple[bool, Optional[str], List[str]]:
         """
@@ -45,55 +77,22 @@ class ArchitectureValidator:
         """
         violations = []
         
-        # Check if file is mapped
-        mapping = self.db.query(CodeComponentMapping).filter_by(
-            file_path=file_path
-        ).first()
+        # Check if file is mapped (exactly, through a mapped directory or by a rule)
+        match = self.path_index.lookup(file_path) or self.mapping_rules.match(repo, file_path)
         
-        if not mapping:
-            # Check if it's in unregistered files
-            unregistered = self.db.query(UnregisteredFile).filter_by(
-                file_path=file_path
-            ).first()
-            
-            if not unregistered:
-                # Generate unique ID using file_path hash (more unique than timestamp)
-                file_hash = abs(hash(file_path)) % 100000
-                timestamp_str = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-                unregistered_id = f"unreg-{timestamp_str}-{file_hash:05d}"
-                
-                # Check if ID already exists (unlikely but possible)
-                existing = self.db.query(UnregisteredFile).filter_by(id=unregistered_id).first()
-                if existing:
-                    # Use a different ID with more entropy
-                    unregistered_id = f"unreg-{timestamp_str}-{file_hash:05d}-{int(time.time() * 1000000) % 100000}"
-                
-                # Add to unregistered files
-                unregistered = UnregisteredFile(
-                    id=unregistered_id,
-                    file_path=file_path,
-                    repo=repo,
-                    status="unregistered",
-                    first_detected=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    detection_count=1
-                )
-                self.db.add(unregistered)
-                self.db.commit()
-            else:
-                # Update existing unregistered file
-                unregistered.last_seen = datetime.utcnow()
-                unregistered.detection_count += 1
-                self.db.commit()
+        if not match:
+            self.record_unregistered([file_path], repo)
+            self.db.commit()
             
             violations.append(f"File '{file_path}' is not mapped to any architecture component")
             return False, None, violations
         
         # File is mapped - validate against component
-        component = mapping.component
-        violations.extend(self._validate_file_scope(file_path, component))
+        component = self.db.get(ArchitectureComponent, match.component_id)
+        if component:
+            violations.extend(self._validate_file_scope(file_path, component))
         
-        return True, component.id, violations
+        return True, match.component_id, violations
     
     def validate_changed_files(
         self,
@@ -104,6 +103,11 @@ class ArchitectureValidator:
         """
         Validate all changed files are mapped to components.
         
+        Resolves mappings through the path index, loads components,
+        unregistered entries and already-tracked changes with a few IN (...)
+        queries, and writes all UnregisteredFile/CodeChange rows in one
+        transaction, so large commits don't cost several queries per file.
+        
         Args:
             changed_files: List of file paths (relative to repo root)
             repo: Repository name
@@ -121,25 +125,300 @@ class ArchitectureValidator:
             'untracked_list': []
         }
         
-        for file_path in changed_files:
-            is_mapped, component_id, violations = self.validate_file_mapping(file_path, repo)
+        with atomic(self.db):
+            validated = self._validate_files_batch(changed_files, repo)
             
-            if is_mapped:
-                results['tracked_files'] += 1
-            else:
-                results['untracked_files'] += 1
-                results['untracked_list'].append(file_path)
-                results['valid'] = False
+            # Changes git ingest already recorded for this commit (under its own ids)
+            tracked_changes = set()
+            if commit_hash:
+                tracked_changes = {
+                    row.file_path for row in self._query_in(
+                        self.db.query(CodeChange.file_path).filter(CodeChange.commit_hash == commit_hash),
+                        CodeChange.file_path,
+                        changed_files,
+                    )
+                }
             
-            if violations:
-                results['violations'].extend(violations)
+            changes = []
+            for file_path in changed_files:
+                is_mapped, match, violations = validated[file_path]
+                
+                if is_mapped:
+                    results['tracked_files'] += 1
+                else:
+                    results['untracked_files'] += 1
+                    results['untracked_list'].append(file_path)
+                    results['valid'] = False
+                
+                if violations:
+                    results['violations'].extend(violations)
+                
+                # Track code change
+                if commit_hash and file_path not in tracked_changes:
+                    tracked_changes.add(file_path)
+                    changes.append(self._new_code_change(file_path, repo, commit_hash, match, violations))
             
-            # Track code change
-            if commit_hash:
-                self._track_code_change(file_path, repo, commit_hash, component_id, violations)
+            if changes:
+                # Deterministic ids: a change validated before is skipped, not a conflict
+                self.db.connection().execute(sqlite_insert(CodeChange).on_conflict_do_nothing(), changes)
         
         return results
     
+    def _validate_files_batch(
+        self,
+        file_paths: List[str],
+        repo: str
+    ) -> Dict[str, Tuple[bool, Optional[Union[PathMatch, RuleMatch]], List[str]]]:
+        """
+        Batch equivalent of validate_file_mapping (caller commits).
+        
+        Returns:
+            Dict of file_path -> (is_mapped, match, violations). Unmapped files
+            are added to / bumped in unregistered_files once per occurrence.
+        """
+        matches = self.path_index.lookup_many(file_paths)
+        unmatched = [path for path, match in matches.items() if match is None]
+        matches.update(self.mapping_rules.match_many(repo, unmatched))
+        components = {
+            c.id: c for c in self._query_in(
+                self.db.query(ArchitectureComponent),
+                ArchitectureComponent.id,
+                [m.component_id for m in matches.values() if m],
+            )
+        }
+        self.record_unregistered([path for path in file_paths if matches[path] is None], repo)
+        
+        results = {}
+        for file_path in file_paths:
+            match = matches[file_path]
+            if match:
+                component = components.get(match.component_id)
+                scope = self._validate_file_scope(file_path, component) if component else []
+                results[file_path] = (True, match, scope)
+            else:
+                results[file_path] = (
+                    False, None, [f"File '{file_path}' is not mapped to any architecture component"]
+                )
+        
+        return results
+    
+    def record_unregistered(self, file_paths: List[str], repo: str) -> int:
+        """
+        Record sightings of unmapped files (caller commits).
+        
+        One INSERT ... ON CONFLICT(file_path) DO UPDATE executed for the whole
+        batch: new paths are inserted under their stable id, known ones get
+        last_seen/detection_count bumped once per occurrence in file_paths.
+        
+        Returns:
+            Number of sightings recorded
+        """
+        if not file_paths:
+            return 0
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": unregistered_file_id(repo, file_path),
+                "file_path": file_path,
+                "repo": repo,
+                "status": "unregistered",
+                "first_detected": now,
+                "last_seen": now,
+                "detection_count": 1,
+            }
+            for file_path in file_paths
+        ]
+        stmt = sqlite_insert(UnregisteredFile)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UnregisteredFile.file_path],
+            set_={
+                "last_seen": stmt.excluded.last_seen,
+                "detection_count": UnregisteredFile.detection_count + 1,
+                # Seen again after being deleted
+                "status": case((UnregisteredFile.status == "removed", "unregistered"), else_=UnregisteredFile.status),
+            },
+        )
+        self.db.connection().execute(stmt, rows)
+        # Loaded instances no longer match the table
+        for obj in self.db.identity_map.values():
+            if isinstance(obj, UnregisteredFile):
+                self.db.expire(obj)
+        return len(rows)
+    
+    def apply_file_events(
+        self,
+        repo: str,
+        added: Iterable[str] = (),
+        removed: Iterable[str] = (),
+        added_dirs: Iterable[str] = (),
+        removed_dirs: Iterable[str] = ()
+    ) -> Dict[str, int]:
+        """
+        Reflect files and directories appearing in or leaving a repo (caller commits).
+        
+        Added files without a mapping or rule are recorded as unregistered;
+        removed ones still pending are marked 'removed'. Exact mappings of
+        removed paths get missing_since set, those of added paths cleared.
+        
+        Args:
+            repo: Repository name
+            added: Files (relative to repo root) that now exist
+            removed: Files (relative to repo root) that no longer exist
+            added_dirs: Directories that now exist
+            removed_dirs: Directories that no longer exist
+        
+        Returns:
+            Dict with unregistered, retired, missing and restored counts
+        """
+        added, removed = [*added], [*removed]
+        matches = self.path_index.lookup_many(added)
+        unmapped = [path for path in added if not (matches[path] or self.mapping_rules.match(repo, path))]
+        result = {"unregistered": self.record_unregistered(unmapped, repo), "retired": 0}
+        
+        conn = self.db.connection()
+        if removed:
+            result["retired"] = conn.execute(
+                update(UnregisteredFile)
+                .where(
+                    UnregisteredFile.file_path == bindparam("b_path"),
+                    UnregisteredFile.repo == repo,
+                    UnregisteredFile.status == "unregistered",
+                )
+                .values(status="removed"),
+                [{"b_path": path} for path in removed],
+            ).rowcount
+        result.update(self._set_mapping_presence(repo, [*removed, *removed_dirs], [*added, *added_dirs]))
+        return result
+    
+    def reconcile_files(self, repo: str, files: Iterable[str], dirs: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Bring unregistered files and mapping staleness in line with a full listing of a repo (caller commits).
+        
+        Unmapped files the table has never seen are recorded, pending ones
+        that are gone are marked 'removed', and every mapping of the repo's
+        components gets missing_since set or cleared.
+        
+        Args:
+            repo: Repository name
+            files: Every file (relative to repo root) present in the repo
+            dirs: Every directory present in the repo
+        
+        Returns:
+            Dict with unregistered, retired, missing and restored counts
+        """
+        files = set(files)
+        present = files | set(dirs)
+        known = {
+            file_path: status
+            for file_path, status in self.db.query(UnregisteredFile.file_path, UnregisteredFile.status)
+            .filter(UnregisteredFile.repo == repo)
+        }
+        new = [path for path in sorted(files) if known.get(path, "removed") == "removed"]
+        gone = [path for path, status in known.items() if status == "unregistered" and path not in files]
+        result = self.apply_file_events(repo, added=new, removed=gone)
+        
+        mappings = self.db.query(CodeComponentMapping.file_path).join(ArchitectureComponent).filter(
+            ArchitectureComponent.repo == repo
+        )
+        mapped = {file_path for (file_path,) in mappings}
+        normalized = {file_path: "/".join(split_path(file_path)) for file_path in mapped}
+        presence = self._set_mapping_presence(
+            repo,
+            missing=[fp for fp, path in normalized.items() if path not in present],
+            present=[fp for fp, path in normalized.items() if path in present],
+        )
+        result["missing"] += presence["missing"]
+        result["restored"] += presence["restored"]
+        return result
+    
+    def _set_mapping_presence(self, repo: str, missing: List[str], present: List[str]) -> Dict[str, int]:
+        """Set/clear missing_since on the exact mappings of paths in `repo`'s components."""
+        conn = self.db.connection()
+        in_repo = CodeComponentMapping.component_id.in_(
+            select(ArchitectureComponent.id).where(ArchitectureComponent.repo == repo)
+        )
+        result = {"missing": 0, "restored": 0}
+        if missing:
+            result["missing"] = conn.execute(
+                update(CodeComponentMapping)
+                .where(CodeComponentMapping.file_path == bindparam("b_path"),
+                       CodeComponentMapping.missing_since.is_(None), in_repo)
+                .values(missing_since=datetime.utcnow()),
+                [{"b_path": path} for path in missing],
+            ).rowcount
+        if present:
+            result["restored"] = conn.execute(
+                update(CodeComponentMapping)
+                .where(CodeComponentMapping.file_path == bindparam("b_path"),
+                       CodeComponentMapping.missing_since.isnot(None), in_repo)
+                .values(missing_since=None),
+                [{"b_path": path} for path in present],
+            ).rowcount
+        if result["missing"] or result["restored"]:
+            for obj in self.db.identity_map.values():
+                if isinstance(obj, CodeComponentMapping):
+                    self.db.expire(obj)
+        return result
+    
+    def _new_code_change(
+        self,
+        file_path: str,
+        repo: str,
+        commit_hash: str,
+        match: Optional[Union[PathMatch, RuleMatch]],
+        violations: List[str]
+    ) -> Dict[str, Any]:
+        """
+        code_changes row (insert values) for a validated file.
+        
+        Only used for files git ingest has not recorded for this commit (those
+        rows carry the real change type), so without history it is "modified".
+        """
+        component_id = match.component_id if match else None
+        return {
+            "id": code_change_id(repo, commit_hash, file_path),
+            "commit_hash": commit_hash,
+            "repo": repo,
+            "change_type": "modified",
+            "file_path": file_path,
+            "component_id": component_id,
+            "mapping_id": match.mapping_id if match else None,
+            "is_tracked": component_id is not None,
+            "is_validated": False,
+            "validation_status": "untracked" if not component_id else "pending",
+            "within_component_scope": len(violations) == 0,
+            "scope_violations": json.dumps(violations) if violations else None,
+            "changed_at": datetime.utcnow(),
+        }
+    
+    @staticmethod
+    def _unique_id(base_id: str, used_ids: Set[str]) -> str:
+        """Suffix base_id until it is unique within the current batch."""
+        candidate, n = base_id, 1
+        while candidate in used_ids:
+            n += 1
+            candidate = f"{base_id}-{n}"
+        used_ids.add(candidate)
+        return candidate
+    
+    @staticmethod
+    def _query_in(query, column, values: Iterable[str], chunk_size: int = 500) -> List:
+        """Run query filtered by column IN values, chunked under SQLite's variable limit."""
+        values = list(dict.fromkeys(values))
+        rows = []
+        for start in range(0, len(values), chunk_size):
+            rows.extend(query.filter(column.in_(values[start:start + chunk_size])).all())
+        return rows
+    
+    def _commit_mapping_change(self):
+        """Commit a mapping/rule/component change and keep the pre-commit snapshot current."""
+        self.db.commit()
+        try:
+            refresh_snapshot(Path(self.db.get_bind().url.database))
+        except Exception as e:
+            # The hooks rebuild a stale snapshot themselves; never fail the write over it
+            logger.warning(f"Could not refresh pre-commit snapshot: {e}")
+    
     def map_file_to_component(
         self,
         file_path: str,
@@ -171,7 +450,7 @@ class ArchitectureValidator:
             existing.component_id = component_id
             existing.mapping_reason = mapping_reason
             existing.mapping_type = mapping_type
-            self.db.commit()
+            self._commit_mapping_change()
             return existing
         
         # Create new mapping
@@ -198,9 +477,168 @@ class ArchitectureValidator:
             unregistered.reviewed_at = datetime.utcnow()
             unregistered.reviewed_by = created_by
         
-        self.db.commit()
+        self._commit_mapping_change()
         return mapping
     
+    def map_files_bulk(
+        self,
+        mappings: Iterable[Tuple[str, str, str, str]],
+        mapping_type: str = "direct",
+        created_by: str = "manual"
+    ) -> Dict[str, int]:
+        """
+        Map many files in one transaction (same semantics as map_file_to_component).
+        
+        Args:
+            mappings: (repo, file_path, component_id, mapping_reason) tuples
+            mapping_type: Type of mapping (direct, indirect, dependency)
+            created_by: Who created the mappings
+        
+        Returns:
+            Dict with created and updated counts
+        """
+        by_path = {file_path: (repo, component_id, reason) for repo, file_path, component_id, reason in mappings}
+        if not by_path:
+            return {"created": 0, "updated": 0}
+        now = datetime.utcnow()
+        stamp = now.strftime('%Y%m%d%H%M%S')
+        
+        existing = self._query_in(self.db.query(CodeComponentMapping), CodeComponentMapping.file_path, by_path)
+        existing_paths = set()
+        for mapping in existing:
+            _, component_id, reason = by_path[mapping.file_path]
+            mapping.component_id = component_id
+            mapping.mapping_reason = reason
+            mapping.mapping_type = mapping_type
+            existing_paths.add(mapping.file_path)
+        
+        used_ids: Set[str] = set()
+        created = []
+        for file_path, (repo, component_id, reason) in by_path.items():
+            if file_path in existing_paths:
+                continue
+            digest = hashlib.sha1(f"{repo}\0{file_path}".encode("utf-8")).hexdigest()[:8]
+            created.append(CodeComponentMapping(
+                id=self._unique_id(f"mapping-{stamp}-{digest}", used_ids),
+                file_path=file_path,
+                component_id=component_id,
+                mapping_type=mapping_type,
+                mapping_reason=reason,
+                is_validated=False,
+                created_at=now,
+                created_by=created_by
+            ))
+        self.db.add_all(created)
+        
+        unregistered = self._query_in(
+            self.db.query(UnregisteredFile).filter_by(status="unregistered"), UnregisteredFile.file_path, by_path
+        )
+        for uf in unregistered:
+            repo, component_id, _ = by_path[uf.file_path]
+            if uf.repo == repo:
+                uf.status = "mapped"
+                uf.assigned_component_id = component_id
+                uf.reviewed_at = now
+                uf.reviewed_by = created_by
+        
+        self._commit_mapping_change()
+        return {"created": len(created), "updated": len(existing)}
+    
+    def add_mapping_rule(
+        self,
+        pattern: str,
+        component_id: str,
+        pattern_type: str = "glob",
+        priority: int = 0,
+        reason: Optional[str] = None,
+        created_by: str = "manual"
+    ) -> ComponentMappingRule:
+        """
+        Add (or update) a glob/prefix rule mapping matching files to a component.
+        
+        Args:
+            pattern: Pattern over "<repo>/<path>", e.g. "meridian-core/src/**/orchestration/*.py"
+            component_id: Component ID
+            pattern_type: glob or prefix
+            priority: Higher wins when several rules match
+            reason: Why matching files belong to the component
+            created_by: Who created the rule
+        
+        Returns:
+            ComponentMappingRule instance
+        
+        Raises:
+            ValueError: Invalid pattern/type or unknown component
+        """
+        rule_regex(pattern, pattern_type)
+        if not self.db.get(ArchitectureComponent, component_id):
+            raise ValueError(f"Unknown component: {component_id}")
+        
+        existing = self.db.query(ComponentMappingRule).filter_by(
+            pattern=pattern,
+            pattern_type=pattern_type
+        ).first()
+        
+        if existing:
+            existing.component_id = component_id
+            existing.priority = priority
+            existing.reason = reason or existing.reason
+            existing.is_active = True
+            self._commit_mapping_change()
+            return existing
+        
+        rule = ComponentMappingRule(
+            id=mapping_rule_id(pattern_type, pattern),
+            component_id=component_id,
+            pattern=pattern,
+            pattern_type=pattern_type,
+            priority=priority,
+            reason=reason,
+            is_active=True,
+            created_at=datetime.utcnow(),
+            created_by=created_by
+        )
+        
+        self.db.add(rule)
+        self._commit_mapping_change()
+        return rule
+    
+    def explain_file_mapping(self, file_path: str, repo: str) -> Dict[str, Any]:
+        """
+        Explain which mapping or rule decides the component for a file.
+        
+        Args:
+            file_path: Path to file (relative to repo root)
+            repo: Repository name
+        
+        Returns:
+            Dict with component_id, matched_by (mapping, directory_mapping, rule
+            or None), the explicit mapping if any and all matching rules in
+            precedence order
+        """
+        mapping = self.path_index.lookup(file_path)
+        rules = self.mapping_rules.explain(repo, file_path)
+        
+        if mapping:
+            matched_by = "mapping" if mapping.exact else "directory_mapping"
+            component_id = mapping.component_id
+        elif rules["winner"]:
+            matched_by = "rule"
+            component_id = rules["winner"]["component_id"]
+        else:
+            matched_by = None
+            component_id = None
+        
+        return {
+            "file_path": file_path,
+            "repo": repo,
+            "component_id": component_id,
+            "matched_by": matched_by,
+            "mapping": mapping._asdict() if mapping else None,
+            "rule": rules["winner"],
+            "rule_candidates": rules["candidates"],
+        }
+    
     def register_component(
         self,
         component_name: str,
@@ -242,7 +680,7 @@ class ArchitectureValidator:
             existing.approved_scope = json.dumps(approved_scope) if approved_scope else existing.approved_scope
             existing.boundaries = json.dumps(boundaries) if boundaries else existing.boundaries
             existing.updated_at = datetime.utcnow()
-            self.db.commit()
+            self._commit_mapping_change()
             return existing
         
         # Create new component
@@ -262,7 +700,7 @@ class ArchitectureValidator:
         )
         
         self.db.add(component)
-        self.db.commit()
+        self._commit_mapping_change()
         return component
     
     def get_unregistered_files(self, repo: Optional[str] = None) -> List[UnregisteredFile]:
@@ -296,51 +734,6 @@ class ArchitectureValidator:
         
         return violations
     
-    def _track_code_change(
-        self,
-        file_path: str,
-        repo: str,
-        commit_hash: str,
-        component_id: Optional[str],
-        violations: List[str]
-    ):
-        """Track a code change."""
-        # Check if change already tracked
-        existing = self.db.query(CodeChange).filter_by(
-            commit_hash=commit_hash,
-            file_path=file_path
-        ).first()
-        
-        if existing:
-            return existing
-        
-        # Get mapping
-        mapping = None
-        if component_id:
-            mapping = self.db.query(CodeComponentMapping).filter_by(
-                file_path=file_path
-            ).first()
-        
-        change = CodeChange(
-            id=f"change-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{hash(file_path + commit_hash) % 10000}",
-            commit_hash=commit_hash,
-            repo=repo,
-            change_type="modified",  # Default - should be determined from git
-            file_path=file_path,
-            component_id=component_id,
-            mapping_id=mapping.id if mapping else None,
-            is_tracked=component_id is not None,
-            is_validated=False,
-            validation_status="untracked" if not component_id else "pending",
-            within_component_scope=len(violations) == 0,
-            scope_violations=json.dumps(violations) if violations else None,
-            changed_at=datetime.utcnow()
-        )
-        
-        self.db.add(change)
-        self.db.commit()
-        return change
-    
     def validate_task_files(self, task: WorkspaceTask) -> List[Violation]:
         """
         Validate files related to a task are mapped to components.
@@ -364,12 +757,12 @@ class ArchitectureValidator:
         if not related_files:
             return violations
         
+        with atomic(self.db):
+            validated = self._validate_files_batch(related_files, task.assigned_repo or "unknown")
+        
         # Validate each file
         for file_path in related_files:
-            is_mapped, component_id, file_violations = self.validate_file_mapping(
-                file_path,
-                task.assigned_repo or "unknown"
-            )
+            is_mapped, _match, file_violations = validated[file_path]
             
             if not is_mapped:
                 violations.append(Violation(
@@ -395,4 +788,3 @@ class ArchitectureValidator:
                     ))
         
         return violations
-
@@ -13,6 +13,7 @@ from pathlib import Path
 from datetime import datetime
 
 from workspace.db.models import WorkspaceTask, BastardReport
+from workspace.wms.keyword_rules import KeywordMatcher
 
 
 class BastardIntegration:
@@ -21,6 +22,7 @@ class BastardIntegration:
     def __init__(self, db_session: Session, skills_dir: Optional[Path] = None):
         self.db = db_session
         self.skills_dir = skills_dir or Path(__file__).parent.parent / "skills"
+        self.keywords = KeywordMatcher.for_engine(db_session.get_bind())
     
     def evaluate_plan(
         self,
@@ -73,17 +75,7 @@ class BastardIntegration:
         Returns:
             BastardReport with evaluation results
         """
-        # TODO: Implement actual Meridian orchestration call
-        # For now, return placeholder report
-        
-        # Build evaluation prompt
-        prompt = self._build_completion_evaluation_prompt(task)
-        
-        # Call The Bastard (mocked)
-        verdict = self._call_bastard_mocked(prompt, 1, "completed")
-        
-        # Parse verdict
-        report = self._parse_bastard_verdict(verdict, task, "completion", 1)
+        report = self.grade_completion(task)
         
         # Save to database
         self.db.add(report)
@@ -95,6 +87,28 @@ class BastardIntegration:
         
         return report
     
+    def grade_completion(self, task: WorkspaceTask) -> BastardReport:
+        """
+        Completion report for a task, not yet saved (bulk completion saves many at once).
+        
+        Args:
+            task: Task to evaluate
+        
+        Returns:
+            Unsaved BastardReport
+        """
+        # TODO: Implement actual Meridian orchestration call
+        # For now, return placeholder report
+        
+        # Build evaluation prompt
+        prompt = self._build_completion_evaluation_prompt(task)
+        
+        # Call The Bastard (mocked)
+        verdict = self._call_bastard_mocked(prompt, 1, "completed")
+        
+        # Parse verdict
+        return self._parse_bastard_verdict(verdict, task, "completion", 1)
+    
     def _build_plan_evaluation_prompt(
         self,
         task: WorkspaceTask,
@@ -162,11 +176,8 @@ Be brutal. This is final validation.
         
         For now, returns placeholder verdict.
         """
-        # Mock evaluation - check for over-engineering keywords
-        over_engineering_keywords = ["kubernetes", "vault", "microservices"]
-        solution_lower = solution.lower()
-        
-        if any(kw in solution_lower for kw in over_engineering_keywords) and actual_users <= 5:
+        # Mock evaluation - check for over-engineering keywords (keyword_rules)
+        if actual_users <= 5 and self.keywords.find(solution, "over_engineering"):
             return f"""
 OVER_ENGINEERED
 
@@ -23,9 +23,21 @@ from workspace.wms.bastard_integration import BastardIntegration
 from workspace.wms.workflow_engine import WorkflowEngine
 
 
-# Initialize database
 WORKSPACE_ROOT = Path.cwd()
-db = WorkspaceDB(workspace_root=WORKSPACE_ROOT)
+_db = None
+
+
+def get_db() -> WorkspaceDB:
+    """
+    Workspace database of the current directory, opened on first use.
+    
+    Opening it creates missing tables and applies automatic migrations, so
+    only commands that need it do; --help never touches workspace.db.
+    """
+    global _db
+    if _db is None:
+        _db = WorkspaceDB(workspace_root=WORKSPACE_ROOT)
+    return _db
 
 
 @click.group()
@@ -49,7 +61,7 @@ def context():
 @click.option('--notes', help='Optional notes about what you\'re working on')
 def set(repo: str, notes: str):
     """Set work context to a repo"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         manager = ContextManager(WORKSPACE_ROOT, session)
         
@@ -65,7 +77,7 @@ def set(repo: str, notes: str):
 @context.command()
 def show():
     """Show current work context"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         manager = ContextManager(WORKSPACE_ROOT, session)
         
@@ -87,7 +99,7 @@ def show():
 @context.command()
 def clear():
     """Clear current work context"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         manager = ContextManager(WORKSPACE_ROOT, session)
         manager.clear_context()
@@ -113,7 +125,7 @@ def task():
 @click.option('--priority', default='medium', type=click.Choice(['low', 'medium', 'high', 'critical']))
 def create(title: str, description: str, users: int, solution: str, priority: str):
     """Create a new task with validation"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         # Initialize engines
         governance = GovernanceEngine(session, workspace_root=WORKSPACE_ROOT)
@@ -143,7 +155,7 @@ def create(title: str, description: str, users: int, solution: str, priority: st
 @click.argument('task_id')
 def start(task_id: str):
     """Start working on a task"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         governance = GovernanceEngine(session, workspace_root=WORKSPACE_ROOT)
         bastard = BastardIntegration(session, WORKSPACE_ROOT / "workspace" / "skills")
@@ -161,7 +173,7 @@ def start(task_id: str):
 @click.argument('task_id')
 def complete(task_id: str):
     """Complete a task (triggers final Bastard evaluation)"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         governance = GovernanceEngine(session, workspace_root=WORKSPACE_ROOT)
         bastard = BastardIntegration(session, WORKSPACE_ROOT / "workspace" / "skills")
@@ -180,7 +192,7 @@ def complete(task_id: str):
 @task.command()
 def list():
     """List all tasks"""
-    session = db._get_session()
+    session = get_db()._get_session()
     try:
         from workspace.db.models import WorkspaceTask
         
@@ -214,6 +226,928 @@ def list():
         session.close()
 
 
+@task.group()
+def bulk():
+    """Apply one transition to many tasks in a single transaction"""
+    pass
+
+
+def _bulk_filters(task_ids: tuple, filters: tuple) -> dict:
+    """`--filter KEY=VALUE` options (and task ids) as a find_tasks filter dict."""
+    parsed = {}
+    for item in filters:
+        key, sep, value = item.partition('=')
+        if not sep or not value:
+            raise click.BadParameter(f"'{item}' is not KEY=VALUE", param_hint='--filter')
+        parsed[key.strip()] = value.strip()
+    if task_ids:
+        if 'id' in parsed:
+            raise click.UsageError("Give task ids or --filter id=..., not both")
+        parsed['id'] = ','.join(task_ids)
+    if not parsed:
+        raise click.UsageError("Select tasks with task ids and/or --filter (e.g. --filter status=pending)")
+    return parsed
+
+
+def _run_bulk(name: str, task_ids: tuple, filters: tuple, dry_run: bool):
+    """Select tasks, apply the bulk transition and print one line per task."""
+    from workspace.wms.task_lifecycle import APPLIED, CONFLICT
+    
+    query = _bulk_filters(task_ids, filters)
+    session = get_db()._get_session()
+    try:
+        governance = GovernanceEngine(session, workspace_root=WORKSPACE_ROOT)
+        bastard = BastardIntegration(session, WORKSPACE_ROOT / "workspace" / "skills")
+        workflow = WorkflowEngine(session, governance, bastard, workspace_root=WORKSPACE_ROOT)
+        
+        try:
+            tasks = workflow.find_tasks(query)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--filter')
+        if not tasks:
+            click.echo("No tasks match")
+            return
+        before = {t.id: t.status for t in tasks}
+        
+        apply = {'start': workflow.bulk_start, 'complete': workflow.bulk_complete, 'block': workflow.bulk_block}[name]
+        results = apply(tasks, dry_run=dry_run)
+        
+        counts = {}
+        for r in results:
+            counts[r.outcome] = counts.get(r.outcome, 0) + 1
+            if r.outcome == APPLIED:
+                icon = '⚠️ ' if r.transition != name else '✅'
+                click.echo(f"{icon} {r.task_id}  {before[r.task_id]} -> {r.status} ({r.transition})")
+            elif r.outcome == CONFLICT:
+                click.echo(f"🔄 {r.task_id}  changed by another agent (now {r.status}), skipped")
+            else:
+                click.echo(f"❌ {r.task_id}  cannot {name} from {r.status}")
+        
+        if dry_run:
+            counts['allowed'] = counts.pop(APPLIED, 0)
+        summary = ', '.join(f"{count} {outcome}" for outcome, count in sorted(counts.items()) if count)
+        if dry_run:
+            summary += " (dry run, nothing written)"
+        elif counts.get(APPLIED):
+            summary += " (one transaction)"
+        click.echo(f"\n📝 {len(results)} task(s): {summary}")
+    finally:
+        session.close()
+
+
+_FILTER_HELP = 'KEY=VALUE (repeatable): id, status, repo, priority, assigned_to, title; a,b = either, * = wildcard'
+
+
+@bulk.command(name='start')
+@click.argument('task_ids', nargs=-1)
+@click.option('--filter', 'filters', multiple=True, help=_FILTER_HELP)
+@click.option('--dry-run', is_flag=True, help='Only show what would change')
+def bulk_start(task_ids: tuple, filters: tuple, dry_run: bool):
+    """Start every selected task that is pending, planning or approved"""
+    _run_bulk('start', task_ids, filters, dry_run)
+
+
+@bulk.command(name='complete')
+@click.argument('task_ids', nargs=-1)
+@click.option('--filter', 'filters', multiple=True, help=_FILTER_HELP)
+@click.option('--dry-run', is_flag=True, help='Only show what would change')
+def bulk_complete(task_ids: tuple, filters: tuple, dry_run: bool):
+    """Complete every selected IN_PROGRESS task (Bastard rejects are blocked)"""
+    _run_bulk('complete', task_ids, filters, dry_run)
+
+
+@bulk.command(name='block')
+@click.argument('task_ids', nargs=-1)
+@click.option('--filter', 'filters', multiple=True, help=_FILTER_HELP)
+@click.option('--dry-run', is_flag=True, help='Only show what would change')
+def bulk_block(task_ids: tuple, filters: tuple, dry_run: bool):
+    """Block every selected task that has not finished"""
+    _run_bulk('block', task_ids, filters, dry_run)
+
+
+# ============================================================================
+# MAPPING COMMANDS
+# ============================================================================
+
+@wms.group(name='map')
+def map_group():
+    """Code-to-component mapping"""
+    pass
+
+
+@map_group.group()
+def rule():
+    """Glob/prefix mapping rules"""
+    pass
+
+
+@rule.command(name='add')
+@click.argument('pattern')
+@click.argument('component')
+@click.option('--type', 'pattern_type', default='glob', type=click.Choice(['glob', 'prefix']))
+@click.option('--priority', default=0, help='Higher wins when several rules match')
+@click.option('--reason', help='Why matching files belong to the component')
+def rule_add(pattern: str, component: str, pattern_type: str, priority: int, reason: str):
+    """Map files matching PATTERN (over <repo>/<path>) to COMPONENT (id or name)"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import ArchitectureComponent
+        from workspace.wms.architecture_validator import ArchitectureValidator
+        
+        comp = session.get(ArchitectureComponent, component)
+        if not comp:
+            repo = pattern.replace('\\', '/').lstrip('./').split('/')[0]
+            comp = session.query(ArchitectureComponent).filter_by(component_name=component, repo=repo).first()
+        if not comp:
+            click.echo(f"❌ Component not found: {component}")
+            sys.exit(1)
+        
+        validator = ArchitectureValidator(session, WORKSPACE_ROOT)
+        try:
+            r = validator.add_mapping_rule(pattern, comp.id, pattern_type=pattern_type, priority=priority,
+                                           reason=reason, created_by='cli')
+        except ValueError as e:
+            click.echo(f"❌ {e}")
+            sys.exit(1)
+        click.echo(f"✅ {r.id}: {r.pattern} ({r.pattern_type}, priority {r.priority}) -> {comp.component_name}")
+    finally:
+        session.close()
+
+
+@rule.command(name='list')
+@click.option('--all', 'show_all', is_flag=True, help='Include disabled rules')
+def rule_list(show_all: bool):
+    """List mapping rules in precedence order"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import ComponentMappingRule
+        from workspace.wms.mapping_rules import compile_rules
+        
+        query = session.query(ComponentMappingRule)
+        if not show_all:
+            query = query.filter_by(is_active=True)
+        rules = {r.id: r for r in query.all()}
+        if not rules:
+            click.echo("No mapping rules found")
+            return
+        
+        ordered, _ = compile_rules(
+            (r.id, r.component_id, r.pattern, r.pattern_type, r.priority, r.reason) for r in rules.values()
+        )
+        for compiled in ordered:
+            r = rules[compiled.id]
+            icon = '✅' if r.is_active else '⏸️'
+            click.echo(f"{icon} [{r.priority:>3}] {r.pattern} ({r.pattern_type}) -> "
+                       f"{r.component.component_name if r.component else r.component_id}")
+            click.echo(f"      {r.id}{' - ' + r.reason if r.reason else ''}")
+    finally:
+        session.close()
+
+
+@rule.command(name='disable')
+@click.argument('rule_id')
+def rule_disable(rule_id: str):
+    """Disable a mapping rule"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import ComponentMappingRule
+        from workspace.wms.precommit import refresh_snapshot
+        
+        r = session.get(ComponentMappingRule, rule_id)
+        if not r:
+            click.echo(f"❌ Rule not found: {rule_id}")
+            sys.exit(1)
+        r.is_active = False
+        session.commit()
+        refresh_snapshot(Path(get_db().engine.url.database))
+        click.echo(f"⏸️  Disabled {rule_id}")
+    finally:
+        session.close()
+
+
+@map_group.command()
+@click.argument('repo')
+@click.argument('file_path')
+def explain(repo: str, file_path: str):
+    """Show which mapping or rule assigns FILE_PATH (relative to REPO) to a component"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import ArchitectureComponent
+        from workspace.wms.architecture_validator import ArchitectureValidator
+        
+        result = ArchitectureValidator(session, WORKSPACE_ROOT).explain_file_mapping(file_path, repo)
+        
+        def name(component_id):
+            comp = session.get(ArchitectureComponent, component_id)
+            return comp.component_name if comp else component_id
+        
+        if result['matched_by'] is None:
+            click.echo(f"❌ {repo}/{file_path} is not mapped (no mapping or rule matches)")
+        else:
+            click.echo(f"✅ {repo}/{file_path} -> {name(result['component_id'])}")
+            if result['mapping']:
+                kind = 'explicit mapping' if result['matched_by'] == 'mapping' else 'directory mapping'
+                click.echo(f"   By {kind} {result['mapping']['mapping_id']} ({result['mapping']['mapped_path']})")
+            else:
+                click.echo(f"   By rule {result['rule']['rule_id']}: {result['rule']['pattern']}")
+        
+        if result['rule_candidates']:
+            click.echo("\nMatching rules (precedence order):")
+            for i, c in enumerate(result['rule_candidates']):
+                marker = '→' if result['matched_by'] == 'rule' and i == 0 else ' '
+                click.echo(f" {marker} [{c['priority']:>3}] {c['pattern']} ({c['pattern_type']}) -> "
+                           f"{name(c['component_id'])}")
+    finally:
+        session.close()
+
+
+@map_group.command()
+@click.option('--repo', help='Only files of this repo')
+@click.option('--top', default=3, help='Suggestions shown per file')
+@click.option('--limit', default=50, help='Files shown (0 = all)')
+@click.option('--apply-above', type=float, help='Map files whose best suggestion has at least this confidence')
+def suggest(repo: str, top: int, limit: int, apply_above: float):
+    """Suggest components for unregistered files from the existing mappings"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import ArchitectureComponent
+        from workspace.wms.architecture_validator import ArchitectureValidator
+        from workspace.wms.path_classifier import PathClassifier
+        
+        validator = ArchitectureValidator(session, WORKSPACE_ROOT)
+        classifier = PathClassifier.from_session(session)
+        if not classifier.components:
+            click.echo("❌ No existing mappings to learn from")
+            sys.exit(1)
+        
+        files = [(uf.repo, uf.file_path) for uf in validator.get_unregistered_files(repo)]
+        if not files:
+            click.echo("✅ No unregistered files")
+            return
+        
+        stats = classifier.evaluate(apply_above if apply_above is not None else 0.9)
+        click.echo(f"🧠 Learned from {stats['examples']} mappings, {len(classifier.components)} components "
+                   f"(leave-one-out accuracy {stats['accuracy']:.0%}, {stats['precision']:.0%} at "
+                   f"{stats['covered']:.0%} coverage above threshold)")
+        
+        names = {c.id: c.component_name for c in session.query(ArchitectureComponent).all()}
+        suggestions = classifier.suggest(files, top_k=top)
+        ranked = sorted(zip(files, suggestions), key=lambda item: -(item[1][0].confidence if item[1] else 0))
+        shown = ranked[:limit] if limit else ranked
+        
+        click.echo(f"\n💡 Suggestions for {len(files)} unregistered file(s):\n")
+        for (file_repo, file_path), options in shown:
+            if not options:
+                click.echo(f"   {file_repo}/{file_path}: no components in repo")
+                continue
+            best = options[0]
+            icon = '✅' if apply_above is not None and best.confidence >= apply_above else '  '
+            click.echo(f"{icon} {file_repo}/{file_path}")
+            for option in options:
+                click.echo(f"      {option.confidence:>4.0%}  {names.get(option.component_id, option.component_id)}")
+        if len(shown) < len(ranked):
+            click.echo(f"   ... and {len(ranked) - len(shown)} more (--limit 0 shows all)")
+        
+        if apply_above is None:
+            return
+        accepted = [
+            (file_repo, file_path, options[0].component_id,
+             f"Suggested from path tokens (confidence {options[0].confidence:.2f})")
+            for (file_repo, file_path), options in ranked
+            if options and options[0].confidence >= apply_above
+        ]
+        if not accepted:
+            click.echo(f"\nNo suggestion reaches {apply_above:.2f}")
+            return
+        result = validator.map_files_bulk(accepted, created_by='wms-suggest')
+        click.echo(f"\n✅ Mapped {len(accepted)} file(s) at confidence >= {apply_above:.2f} "
+                   f"({result['created']} new, {result['updated']} updated)")
+    finally:
+        session.close()
+
+
+# ============================================================================
+# HISTORY COMMANDS
+# ============================================================================
+
+@wms.group()
+def history():
+    """Git history of the Meridian repos"""
+    pass
+
+
+@history.command()
+@click.option('--repo', 'repos', multiple=True, help='Repo to ingest (repeatable, default: all)')
+@click.option('--workers', default=4, show_default=True, help='Repos ingested in parallel')
+@click.option('--batch-size', default=2000, show_default=True, help='Changes per transaction')
+@click.option('--full', is_flag=True, help='Ignore resume points and walk the whole history again')
+def ingest(repos: tuple, workers: int, batch_size: int, full: bool):
+    """Backfill code changes from git log (resumes after the last ingested commit)"""
+    from workspace.wms.git_history import GitHistoryIngester
+
+    def progress(repo, commits, changes):
+        click.echo(f"   {repo}: {commits:,} commits, {changes:,} changes", err=True)
+
+    ingester = GitHistoryIngester(get_db().engine, WORKSPACE_ROOT, batch_size=batch_size, progress=progress)
+    results = ingester.ingest(repos=repos or None, workers=workers, full=full)
+
+    failed = False
+    for r in results:
+        if r['status'] == 'ingested':
+            click.echo(f"✅ {r['repo']}: {r['commits']:,} commits, {r['changes']:,} new changes ({r['seconds']}s)")
+        elif r['status'] == 'up_to_date':
+            click.echo(f"✅ {r['repo']}: up to date")
+        elif r['status'] == 'error':
+            click.echo(f"❌ {r['repo']}: {r['error']}")
+            failed = True
+        else:
+            click.echo(f"⚠️  {r['repo']}: skipped ({r['status'].replace('_', ' ')})")
+    if failed:
+        sys.exit(1)
+
+
+# ============================================================================
+# IMPORT GRAPH COMMANDS
+# ============================================================================
+
+@wms.group(name='imports')
+def imports_group():
+    """Cross-repo import graph and import rules"""
+    pass
+
+
+@imports_group.command(name='scan')
+@click.option('--repo', 'repos', multiple=True, help='Repo to scan (repeatable, default: all)')
+@click.option('--workers', type=int, help='Parser processes (default: CPU count)')
+@click.option('--full', is_flag=True, help='Re-read and re-parse every file, ignoring the caches')
+def imports_scan(repos: tuple, workers: int, full: bool):
+    """Update the import graph and record import rule violations"""
+    from workspace.wms.import_graph import ImportGraphBuilder
+
+    def progress(message):
+        click.echo(f"   {message}", err=True)
+
+    builder = ImportGraphBuilder(get_db().engine, WORKSPACE_ROOT, workers=workers, progress=progress)
+    r = builder.scan(repos=repos or None, full=full)
+
+    for repo in r['missing']:
+        click.echo(f"⚠️  {repo}: not found under {WORKSPACE_ROOT}")
+    click.echo(f"✅ {r['files']:,} files, {r['edges']:,} imports checked "
+               f"({r['read']:,} read, {r['parsed']:,} parsed, {r['removed']:,} removed) in {r['seconds']}s")
+    for path in r['parse_errors'][:10]:
+        click.echo(f"   ⚠️  Could not parse {path}")
+    if r['fixed_violations']:
+        click.echo(f"✅ {r['fixed_violations']} import violation(s) fixed")
+    if r['violations']:
+        click.echo(f"❌ {r['violations']} forbidden import(s), {r['new_violations']} new")
+        sys.exit(1)
+    click.echo("✅ No forbidden imports")
+
+
+@imports_group.group(name='rule')
+def import_rule():
+    """Allowed/forbidden import rules"""
+    pass
+
+
+@import_rule.command(name='add')
+@click.argument('source_repo')
+@click.argument('target')
+@click.option('--allow', is_flag=True, help='Exempt TARGET from a broader forbidden rule')
+@click.option('--reason', required=True, help='Why the rule exists')
+def import_rule_add(source_repo: str, target: str, allow: bool, reason: str):
+    """Forbid SOURCE_REPO from importing TARGET (a module prefix or a repo name)"""
+    session = get_db()._get_session()
+    try:
+        from workspace.wms.import_graph import add_import_rule
+
+        try:
+            r = add_import_rule(session, source_repo, target, 'allowed' if allow else 'forbidden', reason)
+        except ValueError as e:
+            click.echo(f"❌ {e}")
+            sys.exit(1)
+        click.echo(f"✅ {r.id}: {r.source_repo} {r.rule_type} {r.target_module}")
+    finally:
+        session.close()
+
+
+@import_rule.command(name='list')
+def import_rule_list():
+    """List import rules by source repo"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import ImportRule
+
+        rules = session.query(ImportRule).order_by(ImportRule.source_repo, ImportRule.target_module).all()
+        if not rules:
+            click.echo("No import rules found")
+            return
+        for r in rules:
+            icon = '✅' if r.rule_type == 'allowed' else '🚫'
+            click.echo(f"{icon} {r.source_repo} {r.rule_type} {r.target_module}")
+            click.echo(f"      {r.id} - {r.reason}")
+    finally:
+        session.close()
+
+
+# ============================================================================
+# CODE CREEP COMMANDS
+# ============================================================================
+
+@wms.group()
+def creep():
+    """Code copied between repos (near-duplicate detection)"""
+    pass
+
+
+@creep.command(name='scan')
+@click.option('--repo', 'repos', multiple=True, help='Repo to compare (repeatable, default: all)')
+@click.option('--threshold', default=0.8, show_default=True, help='Minimum estimated similarity')
+@click.option('--workers', type=int, help='Processes computing new signatures (default: CPU count)')
+@click.option('--dry-run', is_flag=True, help='Report pairs without opening or resolving issues')
+@click.option('--show', default=20, show_default=True, help='Pairs listed')
+def creep_scan(repos: tuple, threshold: float, workers: int, dry_run: bool, show: int):
+    """Find near-duplicate Python files across repos and track them as code_creep issues"""
+    from workspace.wms.near_duplicates import NearDuplicateDetector
+
+    def progress(message):
+        click.echo(f"   {message}", err=True)
+
+    r = NearDuplicateDetector(get_db().engine, WORKSPACE_ROOT, threshold=threshold, workers=workers,
+                              progress=progress).scan(repos=repos or None, record=not dry_run)
+
+    for repo in r['missing']:
+        click.echo(f"⚠️  {repo}: not found under {WORKSPACE_ROOT}")
+    click.echo(f"🔍 {r['files']:,} files ({r['signed']:,} large enough to compare, {r['computed']:,} new "
+               f"signatures), {r['candidates']:,} candidate pairs in {r['seconds']}s")
+    for pair in r['pairs'][:show]:
+        click.echo(f"   {pair.similarity:>5.0%}  {pair.first[0]}/{pair.first[1]}")
+        click.echo(f"          {pair.second[0]}/{pair.second[1]}")
+    if len(r['pairs']) > show:
+        click.echo(f"   ... and {len(r['pairs']) - show} more")
+    if not dry_run:
+        click.echo(f"\n📝 code_creep issues: {r['opened']} opened, {r['updated']} updated, "
+                   f"{r['reopened']} reopened, {r['resolved']} resolved")
+
+
+# ============================================================================
+# FILE INVENTORY COMMANDS
+# ============================================================================
+
+@wms.group()
+def inventory():
+    """Inventory of the files under the workspace root"""
+    pass
+
+
+@inventory.command(name='scan')
+@click.option('--full', is_flag=True, help='List every directory again, not only changed ones')
+@click.option('--workers', default=8, show_default=True, help='Threads listing directories')
+def inventory_scan(full: bool, workers: int):
+    """Update file_inventory from the disk (gitignore-aware)"""
+    from workspace.wms.file_inventory import FileInventory
+    
+    from workspace.wms.coverage import CoverageTracker
+    
+    r = FileInventory(get_db().engine, WORKSPACE_ROOT, workers=workers).scan(full=full)
+    click.echo(f"✅ {r['entries']:,} entries: {r['added']:,} added, {r['updated']:,} updated, "
+               f"{r['removed']:,} removed ({r['seconds']}s)")
+    click.echo(f"   {r['dirs_listed']:,} of {r['dirs_stated']:,} directories re-listed")
+    c = CoverageTracker(get_db().engine).update()
+    click.echo(f"   Coverage: {c['changed']:,} of {c['files']:,} counted files changed state")
+
+
+@inventory.command(name='duplicates')
+@click.option('--repo', 'repos', multiple=True, help="Repo to search (repeatable, '' for the workspace root)")
+@click.option('--ext', 'exts', multiple=True, help='Only this extension, e.g. .yaml (repeatable)')
+@click.option('--min-size', default=1, show_default=True, help='Ignore smaller files (bytes)')
+@click.option('--workers', default=8, show_default=True, help='Threads computing full hashes')
+@click.option('--show', default=20, show_default=True, help='Duplicate sets listed')
+def inventory_duplicates(repos: tuple, exts: tuple, min_size: int, workers: int, show: int):
+    """Find files with identical content (size, 4 KB head hash, then full BLAKE2)"""
+    from workspace.wms.duplicate_finder import DuplicateFinder
+
+    r = DuplicateFinder(get_db().engine, WORKSPACE_ROOT, workers=workers, min_size=min_size).find(
+        repos=repos or None, exts=exts or None
+    )
+    click.echo(f"🔍 {r['files']:,} files, {r['candidates']:,} size-matched: {r['head_hashed']:,} head-hashed, "
+               f"{r['full_hashed']:,} fully hashed, {r['cached']:,} from cache ({r['seconds']}s)")
+
+    if not r['sets']:
+        click.echo("✅ No duplicate files")
+        return
+    click.echo(f"\n⚠️  {len(r['sets'])} duplicate set(s), {r['wasted_bytes']:,} bytes wasted")
+    for dup in r['sets'][:show]:
+        click.echo(f"   {dup.wasted_bytes:>12,}  {dup.size:,} bytes x {len(dup.paths)}")
+        for path in dup.paths:
+            click.echo(f"      {path}")
+    if len(r['sets']) > show:
+        click.echo(f"   ... and {len(r['sets']) - show} more")
+
+
+@wms.command()
+@click.option('--debounce', default=0.5, show_default=True, help='Seconds without events before applying a batch')
+@click.option('--max-delay', default=5.0, show_default=True, help='Longest a batch waits under constant events')
+def watch(debounce: float, max_delay: float):
+    """Keep the inventory and unregistered files current from inotify events (Linux)"""
+    import signal
+    from workspace.wms.file_watcher import WatcherError, WorkspaceWatcher
+    
+    def progress(message):
+        click.echo(f"   {message}")
+    
+    # Leave through the finally blocks (watches closed, lock released)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    watcher = WorkspaceWatcher(get_db().engine, WORKSPACE_ROOT, debounce=debounce, max_delay=max_delay, progress=progress)
+    click.echo(f"👀 Watching {WORKSPACE_ROOT} (Ctrl-C to stop)")
+    try:
+        watcher.run()
+    except WatcherError as e:
+        click.echo(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("👋 Watcher stopped")
+
+
+# ============================================================================
+# COVERAGE COMMANDS
+# ============================================================================
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def _sparkline(values) -> str:
+    """One block per value on a 0-100% scale ('·' for days without files)."""
+    return "".join(
+        "·" if v is None else SPARK_BLOCKS[min(len(SPARK_BLOCKS) - 1, int(v / 100 * len(SPARK_BLOCKS)))]
+        for v in values
+    )
+
+
+@wms.command()
+@click.option('--by', 'scope_type', type=click.Choice(['repo', 'dir', 'component']), default='repo',
+              show_default=True, help='Break coverage down by repo, top-level directory or component')
+@click.option('--repo', help='Only this repo')
+@click.option('--days', default=30, show_default=True, help='Days of history in the trend line')
+@click.option('--full', is_flag=True, help='Re-classify every file instead of only changed ones')
+def coverage(scope_type: str, repo: str, days: int, full: bool):
+    """Mapping coverage with its daily trend toward the target"""
+    from datetime import datetime, timedelta
+    from workspace.db.models import ArchitectureComponent
+    from workspace.wms.coverage import TARGET_COVERAGE, CoverageTracker
+    
+    tracker = CoverageTracker(get_db().engine)
+    tracker.update(full=full)
+    rows = tracker.counts(scope_type, repo=repo)
+    if not rows:
+        click.echo("No coverage data - run: python workspace/wms/cli.py inventory scan")
+        return
+    history = tracker.history(scope_type, repo=repo, days=days)
+    
+    names = {}
+    if scope_type == 'component':
+        session = get_db()._get_session()
+        try:
+            names = dict(session.query(ArchitectureComponent.id, ArchitectureComponent.component_name))
+        finally:
+            session.close()
+    
+    today = datetime.utcnow().date()  # History days are UTC
+    calendar = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+    click.echo(f"📊 Mapping coverage by {scope_type} (target {TARGET_COVERAGE:.0f}%, trend over {days} days)")
+    click.echo("")
+    for r in rows:
+        # Carry the last point forward over days without an update
+        points = dict((day, point.coverage) for day, point in history.get((r.repo, r.scope), []))
+        series, last = [], None
+        for day in calendar:
+            last = points.get(day, last)
+            series.append(last)
+        first = next((v for v in series if v is not None), None)
+        pct = r.coverage
+        trend = f"{pct - first:+.1f} pts" if pct is not None and first is not None else ""
+        label = r.repo if scope_type == 'repo' else f"{r.repo}:{names.get(r.scope, r.scope)}"
+        shown = f"{pct:5.1f}%" if pct is not None else "    - "
+        icon = '✅' if pct is not None and pct >= TARGET_COVERAGE else '⚠️ '
+        click.echo(f"{icon} {label:40} {shown}  {_sparkline(series)}  {trend}")
+        click.echo(f"      {r.mapped:,} mapped, {r.unregistered:,} unregistered, {r.ignored:,} ignored")
+    
+    total = tracker.total()
+    if scope_type == 'repo' and not repo and total.coverage is not None:
+        gap = TARGET_COVERAGE - total.coverage
+        click.echo("")
+        click.echo(f"All repos: {total.coverage:.1f}% of {total.mapped + total.unregistered:,} files mapped"
+                   + (f", {gap:.1f} pts to target" if gap > 0 else " - target reached"))
+
+
+# ============================================================================
+# DRIFT COMMANDS
+# ============================================================================
+
+@wms.group()
+def drift():
+    """Architecture drift detection"""
+    pass
+
+
+@drift.command(name='scan')
+@click.option('--full/--incremental', default=False,
+              help='Evaluate every file, or only files changed since the last scan (default)')
+@click.option('--repo', 'repos', multiple=True, help='Repo to scan (repeatable, default: all)')
+@click.option('--workers', type=int, help='Repos evaluated in parallel (default: CPU count)')
+@click.option('--show', default=20, show_default=True, help='New detections listed')
+def drift_scan(full: bool, repos: tuple, workers: int, show: int):
+    """Check placement, scope, dependency and pattern rules and record drift"""
+    from workspace.wms.drift_scanner import SEVERITIES, DriftScanner
+
+    def progress(message):
+        click.echo(f"   {message}", err=True)
+
+    r = DriftScanner(get_db().engine, WORKSPACE_ROOT, workers=workers, progress=progress).scan(
+        full=full, repos=repos or None
+    )
+
+    for repo in r['missing']:
+        click.echo(f"⚠️  {repo}: not found under {WORKSPACE_ROOT}")
+    click.echo(f"🔍 {r['scan_id']} ({r['scan_type']}) in {r['seconds']}s")
+    for repo, info in r['repos'].items():
+        commit = info['commit'][:12] if info['commit'] else 'no git'
+        click.echo(f"   {repo}: {info['checked']:,} file(s), {info['mode']} at {commit}")
+    slowest = sorted(r['timings'].items(), key=lambda item: -item[1])[:3]
+    if slowest:
+        click.echo("   Slowest rules: " + ", ".join(f"{rule} {seconds:.2f}s" for rule, seconds in slowest))
+
+    click.echo(f"\n🆕 {r['new']} new, ✅ {r['resolved']} resolved")
+    new_detections = sorted(r['new_detections'], key=lambda item: SEVERITIES.index(item[1].severity))
+    for repo, finding in new_detections[:show]:
+        click.echo(f"   [{finding.severity}] {repo}/{finding.file_path} ({finding.rule})")
+        click.echo(f"      {finding.details}")
+    if len(new_detections) > show:
+        click.echo(f"   ... and {len(new_detections) - show} more")
+
+    open_counts = r['open']
+    click.echo(f"\nOpen drift: {sum(open_counts.values())} "
+               f"(HIGH {open_counts['HIGH']}, MEDIUM {open_counts['MEDIUM']}, LOW {open_counts['LOW']})")
+    if open_counts['HIGH']:
+        sys.exit(1)
+
+
+# ============================================================================
+# CONFIG COMMANDS
+# ============================================================================
+
+@wms.group()
+def config():
+    """Configuration change tracking"""
+    pass
+
+
+@config.command(name='scan')
+@click.option('--repo', 'repos', multiple=True, help='Repo to scan (repeatable, default: all)')
+@click.option('--full', is_flag=True, help='Re-read every configuration file, not only ones whose stat changed')
+@click.option('--show', default=20, show_default=True, help='Changes listed')
+def config_scan(repos: tuple, full: bool, show: int):
+    """Update the configuration Merkle trees and record key-level changes"""
+    from workspace.wms.config_tracker import ConfigTracker
+
+    r = ConfigTracker(get_db().engine, WORKSPACE_ROOT).scan(repos=repos or None, full=full)
+
+    for repo in r['missing']:
+        click.echo(f"⚠️  {repo}: not found under {WORKSPACE_ROOT}")
+    click.echo(f"🔍 Configuration scanned in {r['seconds']}s")
+    for repo, info in r['repos'].items():
+        state = "baseline" if info['baseline'] else f"{info['changed_files']} file(s) changed"
+        click.echo(f"   {repo}: {info['files']} config file(s), {info['read']} read, {state}, "
+                   f"root {info['root_hash'][:12]}")
+
+    changes = r['changes']
+    click.echo(f"\n📝 {len(changes)} key change(s)")
+    for change in changes[:show]:
+        key = change.key or '(whole file)'
+        click.echo(f"   {change.change_type:<8} {change.repo}/{change.file_path} {key}")
+    if len(changes) > show:
+        click.echo(f"   ... and {len(changes) - show} more")
+
+
+@config.command(name='changes')
+@click.option('--repo', help='Only this repo')
+@click.option('--limit', default=30, show_default=True, help='Changes listed')
+def config_changes(repo: str, limit: int):
+    """Show the most recent configuration changes"""
+    from workspace.db.models import ConfigurationChange
+
+    session = get_db()._get_session()
+    try:
+        query = session.query(ConfigurationChange)
+        if repo:
+            query = query.filter(ConfigurationChange.repo == repo)
+        changes = query.order_by(ConfigurationChange.changed_at.desc()).limit(limit).all()
+        if not changes:
+            click.echo("No configuration changes recorded")
+            return
+        for change in changes:
+            commit = f" @ {change.commit_hash[:8]}" if change.commit_hash else ""
+            click.echo(f"{change.changed_at:%Y-%m-%d %H:%M} {change.change_type:<8} "
+                       f"{change.repo}/{change.file_path} {change.config_key or '(whole file)'}{commit}")
+            if change.change_type != 'added':
+                click.echo(f"      - {change.old_value}")
+            if change.change_type != 'removed':
+                click.echo(f"      + {change.new_value}")
+    finally:
+        session.close()
+
+
+# ============================================================================
+# GOVERNANCE COMMANDS
+# ============================================================================
+
+@wms.group()
+def governance():
+    """Governance rules applied to tasks"""
+    pass
+
+
+@governance.group()
+def keyword():
+    """Keyword rules for task routing and over-engineering checks"""
+    pass
+
+
+@keyword.command(name='add')
+@click.argument('word')
+@click.option('--category', required=True, type=click.Choice(['routing', 'over_engineering']))
+@click.option('--repo', 'target', help='Repo a routing keyword sends tasks to')
+@click.option('--priority', default=0, help='Routing: higher wins when keywords of several repos occur')
+@click.option('--reason', help='Why the keyword belongs to the category')
+def keyword_add(word: str, category: str, target: str, priority: int, reason: str):
+    """Add a keyword rule (whole words/phrases, case-insensitive)"""
+    from workspace.wms.keyword_rules import add_keyword_rule
+
+    session = get_db()._get_session()
+    try:
+        rule = add_keyword_rule(session, word, category, target=target, priority=priority, reason=reason,
+                                created_by='cli')
+        click.echo(f"✅ Keyword rule added: {rule.id} ({rule.category}: {rule.keyword})")
+    except ValueError as e:
+        click.echo(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        session.close()
+
+
+@keyword.command(name='list')
+def keyword_list():
+    """List keyword rules by category"""
+    session = get_db()._get_session()
+    try:
+        from workspace.db.models import KeywordRule
+
+        rules = session.query(KeywordRule).order_by(
+            KeywordRule.category, KeywordRule.priority.desc(), KeywordRule.keyword
+        ).all()
+        if not rules:
+            click.echo("No keyword rules found")
+            return
+        for r in rules:
+            icon = '✅' if r.is_active else '⏸️'
+            target = f" -> {r.target} (priority {r.priority})" if r.target else ""
+            click.echo(f"{icon} {r.category}: {r.keyword}{target}")
+            click.echo(f"      {r.id}" + (f" - {r.reason}" if r.reason else ""))
+    finally:
+        session.close()
+
+
+@keyword.command(name='test')
+@click.argument('text')
+def keyword_test(text: str):
+    """Show the keyword hits in TEXT and where it would be routed"""
+    from workspace.wms.keyword_rules import KeywordMatcher
+
+    matcher = KeywordMatcher.for_engine(get_db().engine)
+    for hit in matcher.find(text):
+        target = f" -> {hit.target}" if hit.target else ""
+        click.echo(f"   [{hit.start}:{hit.end}] {text[hit.start:hit.end]!r} {hit.category}{target}")
+    click.echo(f"Route: {matcher.route(text) or 'unclear (ask the user)'}")
+
+
+@governance.command()
+@click.option('--repo', 'repos', multiple=True, help='Only tasks assigned to this repo (repeatable)')
+@click.option('--workers', type=int, help='Processes evaluating task chunks (default: CPU count)')
+@click.option('--chunk-size', default=2000, show_default=True, help='Tasks per chunk')
+@click.option('--no-cache', is_flag=True, help='Evaluate every task, ignoring cached verdicts')
+@click.option('--dry-run', is_flag=True, help='Report changes without writing violations')
+@click.option('--show', default=20, show_default=True, help='New violations listed')
+def revalidate(repos: tuple, workers: int, chunk_size: int, no_cache: bool, dry_run: bool, show: int):
+    """Re-check all non-terminal tasks against the current placement, scale and file rules"""
+    from workspace.wms.revalidation import TaskRevalidator
+
+    def progress(message):
+        click.echo(f"   {message}", err=True)
+
+    r = TaskRevalidator(get_db().engine, workers=workers, chunk_size=chunk_size, use_cache=not no_cache,
+                        progress=progress).run(repos=repos or None, record=not dry_run)
+
+    click.echo(f"🔍 {r['tasks']:,} tasks revalidated in {r['seconds']}s, "
+               f"{r['tasks_with_violations']:,} with violations")
+    click.echo(f"   {r['cache_hits']:,} unchanged (cached verdicts), {r['evaluated']:,} evaluated")
+    for f in r['findings'][:show]:
+        click.echo(f"   {f.task_id}  {f.severity}: {f.message}")
+    if len(r['findings']) > show:
+        click.echo(f"   ... and {len(r['findings']) - show} more")
+    click.echo(f"\n📝 Violations: {r['opened']:,} opened, {r['reopened']:,} reopened, {r['fixed']:,} fixed, "
+               f"{r['unchanged']:,} unchanged" + (" (dry run, nothing written)" if dry_run else ""))
+
+
+# ============================================================================
+# DATABASE COMMANDS
+# ============================================================================
+
+@wms.group(name='db')
+def db_group():
+    """Workspace database maintenance"""
+    pass
+
+
+@db_group.command()
+@click.option('--status', 'show_status', is_flag=True, help='Only show migration status')
+@click.option('--target', type=int, help='Stop after this migration version')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows per chunk transaction')
+@click.option('--pause', default=0.05, show_default=True, help='Seconds to yield between chunks')
+def migrate(show_status: bool, target: int, chunk_size: int, pause: float):
+    """Apply pending schema migrations (chunked and resumable)"""
+    from workspace.db.schema_migrations import MigrationRunner, MigrationError
+    
+    def progress(migration, step, rows):
+        click.echo(f"   {migration.version} {migration.name}: step {step}/{len(migration.steps)}, "
+                   f"{rows:,} rows", err=True)
+    
+    # Without auto migrations: --status reports them pending, and --target may stop before them
+    db = WorkspaceDB(workspace_root=WORKSPACE_ROOT, auto_migrate=False)
+    runner = MigrationRunner(db.engine, chunk_size=chunk_size, pause=pause, progress=progress)
+    
+    if not show_status:
+        try:
+            applied = runner.run(target=target)
+        except MigrationError as e:
+            click.echo(f"❌ {e}")
+            click.echo("   Re-run the command to resume from the last checkpoint")
+            sys.exit(1)
+        click.echo(f"✅ Applied {len(applied)} migration(s)" if applied else "✅ Schema is up to date")
+    
+    click.echo(f"\nSchema version: {runner.current_version()}")
+    for m in runner.status():
+        icon = {'completed': '✅', 'running': '🔄', 'failed': '❌'}.get(m['status'], '⏳')
+        mode = '' if m['auto'] else ' (manual)'
+        click.echo(f"{icon} {m['version']:>3} {m['name']}{mode} - {m['status']}")
+        if m['status'] in ('running', 'failed'):
+            click.echo(f"      step {m['step']}/{m['steps']}, {m['rows_processed']:,} rows")
+        if m['error']:
+            click.echo(f"      {m['error']}")
+
+
+@db_group.command()
+@click.option('--tables', 'show_tables', default=15, show_default=True, help='Largest tables listed')
+def profile(show_tables: int):
+    """Show database size, the largest tables and cache hit rates"""
+    from workspace.wms.verdict_cache import cache_statistics
+
+    db = get_db()
+    db_file = Path(db.db_path)
+    wal_file = db_file.with_name(db_file.name + '-wal')
+    with db.engine.connect() as conn:
+        pragma = {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ('page_size', 'page_count', 'freelist_count', 'journal_mode')
+        }
+        tables = conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).scalars().all()
+        counts = sorted(
+            ((conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{name}"').scalar(), name) for name in tables),
+            reverse=True
+        )
+
+    size_mb = db_file.stat().st_size / 1e6 if db_file.exists() else 0.0
+    wal_mb = wal_file.stat().st_size / 1e6 if wal_file.exists() else 0.0
+    click.echo(f"\nDatabase: {db_file}")
+    click.echo(f"   {size_mb:.1f} MB (+{wal_mb:.1f} MB WAL, {pragma['journal_mode']}), "
+               f"{pragma['page_count']:,} pages of {pragma['page_size']:,} bytes, {pragma['freelist_count']:,} free")
+
+    click.echo(f"\nLargest tables ({len(counts)} total):")
+    for rows, name in counts[:show_tables]:
+        click.echo(f"   {rows:>12,}  {name}")
+
+    click.echo("\nCaches:")
+    stats = cache_statistics(get_db().engine)
+    if not stats:
+        click.echo("   No cache lookups recorded yet")
+    for s in stats:
+        rate = f"{s['hit_rate']:.1%}" if s['hit_rate'] is not None else "n/a"
+        entries = f"{s['entries']:,} entries, " if s['entries'] is not None else ""
+        click.echo(f"   {s['name']}: {entries}hit rate {rate} ({s['hits']:,} hits, {s['misses']:,} misses), "
+                   f"{s['evictions']:,} evicted")
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
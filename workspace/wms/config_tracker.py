@@ -0,0 +1,462 @@
+"""
+Config Tracker - Merkle-tree hashing of the repos' configuration files.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Detect configuration changes cheaply and record them key by key
+DOMAIN: Cross-repo workspace management
+
+The configuration files of a repo (CONFIG_PATTERNS: pyproject, requirements,
+.env templates, skill YAML, JSON registries, ...) are the leaves of a Merkle
+tree that mirrors their directories. A directory's hash covers its children's
+(name, hash) pairs, and the root hash is ConfigurationSnapshot.configuration_hash.
+
+Nodes live in config_merkle_nodes. The configuration files are found through
+file_inventory and then stat'ed again. An edit in place does not touch the
+directory's mtime, so the incremental inventory scan may still hold the old
+stat. A leaf is re-read only when its inode, size or mtime differ from the
+stat its hash was computed from. Only the ancestors of changed leaves are
+re-hashed, so a scan costs one stat per configuration file plus
+O(changed x depth).
+
+Changed leaves are parsed into flattened key -> value entries (TOML, JSON,
+YAML, setup.cfg/ini, requirements, KEY=VALUE). One ConfigurationChange row
+is written per added, removed or modified key, with old and new values, in
+the same transaction as the tree and the snapshot. Values of secret-looking
+keys are replaced by a short hash, so changes still show without the values.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import configparser
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import subprocess
+import time
+import tomllib
+
+from sqlalchemy import bindparam, delete, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from workspace.db.models import (
+    ArchitectureComponent,
+    ConfigMerkleNode,
+    ConfigurationChange,
+    ConfigurationSnapshot,
+    FileInventoryEntry,
+)
+from workspace.wms.constants import REPOS
+from workspace.wms.file_inventory import FileInventory
+from workspace.wms.path_index import ComponentPathIndex
+
+try:
+    import yaml
+except ImportError:  # YAML files are then tracked as a whole
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+# Matched against "/<path relative to the repo>" (fnmatch: * also matches /)
+CONFIG_PATTERNS = (
+    "*/pyproject.toml",
+    "*/setup.cfg",
+    "*/Pipfile",
+    "*/requirements*.txt",
+    "*/.env.example",
+    "*/.env.template",
+    "*/.env.sample",
+    "*/*.env.example",
+    "*/*.env.template",
+    "*/skills/*.yaml",
+    "*/skills/*.yml",
+    "*-skill.yaml",
+    "*registry*.json",
+    "*/config/*.json",
+    "*/config/*.yaml",
+    "*/config/*.yml",
+    "*/config/*.toml",
+)
+_CONFIG_REGEX = re.compile("|".join(fnmatch.translate(pattern) for pattern in CONFIG_PATTERNS))
+
+# Key of the single entry of a file that is tracked as a whole (unparseable, or YAML without PyYAML)
+WHOLE_FILE = ""
+
+MAX_VALUE_CHARS = 2000
+_SECRET_KEY = re.compile(r"secret|passw|token|api[_-]?key|private[_-]?key|credential", re.IGNORECASE)
+_REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def is_config_file(path: str) -> bool:
+    """Whether a repo-relative path is tracked as configuration."""
+    return _CONFIG_REGEX.match("/" + path) is not None
+
+
+def _value(key: str, value: Any) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+    if _SECRET_KEY.search(key.rsplit(".", 1)[-1]):
+        return f"<redacted:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:8]}>"
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS] + "…"
+
+
+def _flatten(data: Any, prefix: str = "", out: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Dotted key -> value; lists of scalars stay one value, other lists are indexed."""
+    out = {} if out is None else out
+    if isinstance(data, dict) and data:
+        for key, value in data.items():
+            _flatten(value, f"{prefix}.{key}" if prefix else str(key), out)
+    elif isinstance(data, list) and any(isinstance(item, (dict, list)) for item in data):
+        for i, item in enumerate(data):
+            _flatten(item, f"{prefix}[{i}]", out)
+    else:
+        out[prefix] = _value(prefix, data)
+    return out
+
+
+def parse_config(path: str, raw: bytes) -> Dict[str, str]:
+    """Flattened entries of one configuration file; WHOLE_FILE if it cannot be parsed."""
+    text = raw.decode("utf-8", errors="replace")
+    name = posixpath.basename(path)
+    try:
+        if name.endswith(".toml") or name == "Pipfile":
+            return _flatten(tomllib.loads(text))
+        if name.endswith(".json"):
+            return _flatten(json.loads(text))
+        if name.endswith((".yaml", ".yml")) and yaml is not None:
+            return _flatten(yaml.safe_load(text))
+        if name.endswith((".cfg", ".ini")):
+            parser = configparser.ConfigParser(interpolation=None)
+            parser.read_string(text)
+            return _flatten({section: dict(parser[section]) for section in parser.sections()})
+        if name.startswith("requirements") and name.endswith(".txt"):
+            entries = {}
+            for line in text.splitlines():
+                line = line.split(" #", 1)[0].strip()
+                if not line or line.startswith("#"):
+                    continue
+                match = _REQUIREMENT_NAME.match(line)
+                key = match.group(1).lower().replace("_", "-") if match and not line.startswith("-") else line
+                entries[key] = _value(key, line)
+            return entries
+        if ".env" in name:
+            entries = {}
+            for line in text.splitlines():
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, _, value = line.removeprefix("export ").partition("=")
+                entries[key.strip()] = _value(key.strip(), value.strip().strip("'\""))
+            return entries
+    except Exception as e:  # Broken files are still tracked, as a whole
+        logger.debug(f"Could not parse {path}: {e}")
+    return {WHOLE_FILE: _value(WHOLE_FILE, text)}
+
+
+def _dir_hash(children: Iterable[Tuple[str, bool, str]]) -> str:
+    digest = hashlib.sha256()
+    for name, is_dir, child_hash in sorted(children):
+        digest.update(f"{name}\0{'d' if is_dir else 'f'}\0{child_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _ancestors(path: str) -> List[str]:
+    """Parent directories of path, deepest first, ending with the root ''."""
+    parents = []
+    while path:
+        path = posixpath.dirname(path)
+        parents.append(path)
+    return parents
+
+
+class ConfigChange(NamedTuple):
+    """One key-level configuration change."""
+    repo: str
+    file_path: str
+    key: str
+    change_type: str  # added, removed, modified
+    old_value: Optional[str]
+    new_value: Optional[str]
+
+
+class _Node(NamedTuple):
+    is_dir: bool
+    hash: str
+    inode: Optional[int]
+    size: Optional[int]
+    mtime_ns: Optional[int]
+    entries: Optional[str]
+
+
+class ConfigTracker:
+    """Keeps the configuration Merkle trees current and records ConfigurationChange rows."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory containing the repos
+            progress: Called with a short message per repo
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.progress = progress
+
+    def scan(
+        self,
+        repos: Optional[Sequence[str]] = None,
+        full: bool = False,
+        update_inventory: bool = True,
+        changed_by: str = "config-scan"
+    ) -> Dict[str, Any]:
+        """
+        Update the trees from file_inventory and record what changed.
+
+        The first scan of a repo only records its tree and a full snapshot.
+
+        Args:
+            repos: Repo names (default: all Meridian repos)
+            full: Re-read every configuration file instead of trusting the stat cache
+            update_inventory: Bring file_inventory up to date first (not needed
+                              while the watcher runs)
+            changed_by: Stored on the ConfigurationChange rows
+
+        Returns:
+            Dict with repos (per repo: files, read, changed_files, root_hash,
+            baseline), missing (repos not on disk), changes (ConfigChange list)
+            and seconds
+        """
+        started = time.monotonic()
+        repos = [*(repos or REPOS)]
+        missing = [repo for repo in repos if not (self.workspace_root / repo).is_dir()]
+        repos = [repo for repo in repos if repo not in missing]
+        if update_inventory:
+            FileInventory(self.engine, self.workspace_root).scan()
+
+        # (inode, size, mtime_ns) of every non-ignored configuration file
+        current: Dict[str, Dict[str, Tuple[int, int, int]]] = {repo: {} for repo in repos}
+        with self.engine.connect() as conn:
+            for repo, path, inode, size, mtime_ns in conn.execute(select(
+                FileInventoryEntry.repo, FileInventoryEntry.path, FileInventoryEntry.inode,
+                FileInventoryEntry.size, FileInventoryEntry.mtime_ns,
+            ).where(
+                FileInventoryEntry.repo.in_(repos),
+                FileInventoryEntry.kind == "file",
+                FileInventoryEntry.ignored.is_(False),
+            )):
+                if is_config_file(path):
+                    current[repo][path] = (inode, size, mtime_ns)
+            names = dict(conn.execute(select(ArchitectureComponent.id, ArchitectureComponent.component_name)).all())
+        # The inventory only re-lists directories whose mtime changed: take the stat from disk
+        for repo, files in current.items():
+            for path in [*files]:
+                try:
+                    st = os.stat(self.workspace_root / repo / path, follow_symlinks=False)
+                except OSError:
+                    del files[path]  # Removed since the inventory
+                    continue
+                files[path] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        path_index = ComponentPathIndex.for_engine(self.engine)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        changes: List[ConfigChange] = []
+        for repo in repos:
+            result, repo_changes = self._scan_repo(repo, current[repo], full, path_index, names, changed_by)
+            results[repo] = result
+            changes.extend(repo_changes)
+            if self.progress:
+                self.progress(f"{repo}: {result['files']} config file(s), {result['read']} read, "
+                              f"{len(repo_changes)} change(s)")
+        return {"repos": results, "missing": missing, "changes": changes, "seconds": round(time.monotonic() - started, 2)}
+
+    def root_hash(self, repo: str) -> Optional[str]:
+        """Stored Merkle root of a repo (None before its first scan)."""
+        with self.engine.connect() as conn:
+            return conn.execute(select(ConfigMerkleNode.hash).where(
+                ConfigMerkleNode.repo == repo, ConfigMerkleNode.path == ""
+            )).scalar()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _scan_repo(
+        self,
+        repo: str,
+        files: Dict[str, Tuple[int, int, int]],
+        full: bool,
+        path_index: ComponentPathIndex,
+        names: Dict[str, str],
+        changed_by: str
+    ) -> Tuple[Dict[str, Any], List[ConfigChange]]:
+        with self.engine.connect() as conn:
+            stored = {
+                row.path: _Node(row.is_dir, row.hash, row.inode, row.size, row.mtime_ns, row.entries)
+                for row in conn.execute(select(
+                    ConfigMerkleNode.path, ConfigMerkleNode.is_dir, ConfigMerkleNode.hash, ConfigMerkleNode.inode,
+                    ConfigMerkleNode.size, ConfigMerkleNode.mtime_ns, ConfigMerkleNode.entries,
+                ).where(ConfigMerkleNode.repo == repo))
+            }
+        baseline = "" not in stored
+
+        # Leaves: re-read only on a stat change, and only record them if the content changed
+        nodes = dict(stored)
+        upserts: Dict[str, _Node] = {}
+        changed_leaves: Dict[str, Tuple[Optional[_Node], Optional[_Node]]] = {}
+        read = 0
+        for path, stat in files.items():
+            old = stored.get(path)
+            if old is not None and not old.is_dir and not full and (old.inode, old.size, old.mtime_ns) == stat:
+                continue
+            try:
+                raw = (self.workspace_root / repo / path).read_bytes()
+            except OSError:
+                continue  # Vanished since the inventory; picked up next time
+            read += 1
+            digest = hashlib.sha256(raw).hexdigest()
+            if old is not None and not old.is_dir and old.hash == digest:
+                new = old._replace(inode=stat[0], size=stat[1], mtime_ns=stat[2])
+            else:
+                new = _Node(False, digest, *stat,
+                            json.dumps(parse_config(path, raw), sort_keys=True))
+                changed_leaves[path] = (old if old is not None and not old.is_dir else None, new)
+            nodes[path] = upserts[path] = new
+        removed = [path for path, node in stored.items() if not node.is_dir and path not in files]
+        for path in removed:
+            changed_leaves[path] = (stored[path], None)
+            del nodes[path]
+
+        # Re-hash only the directories above changed leaves, deepest first
+        dirty: Set[str] = set()
+        for path in changed_leaves:
+            dirty.update(_ancestors(path))
+        children: Dict[str, Set[str]] = {}
+        if dirty:
+            for path in nodes.keys() | dirty:
+                if path:
+                    parent = posixpath.dirname(path)
+                    if parent in dirty:
+                        children.setdefault(parent, set()).add(path)
+        deleted_dirs = []
+        for directory in sorted(dirty, key=lambda d: (-d.count("/") if d else 1, d)):
+            kids = [path for path in children.get(directory, []) if path in nodes]
+            if not kids and directory:
+                if directory in nodes:
+                    del nodes[directory]
+                    deleted_dirs.append(directory)
+                continue
+            node = _Node(True, _dir_hash(
+                (posixpath.basename(path), nodes[path].is_dir, nodes[path].hash) for path in kids
+            ), None, None, None, None)
+            if directory == "" or stored.get(directory) != node:
+                nodes[directory] = upserts[directory] = node
+            if not directory:
+                break
+        if "" not in nodes:
+            nodes[""] = upserts[""] = _Node(True, _dir_hash(()), None, None, None, None)
+
+        root = nodes[""].hash
+        root_changed = baseline or stored[""].hash != root
+        changes = [] if baseline else self._key_changes(repo, changed_leaves)
+
+        now = datetime.utcnow()
+        head = self._head(repo)
+        owners = path_index.lookup_many({change.file_path for change in changes})
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                if upserts:
+                    stmt = sqlite_insert(ConfigMerkleNode)
+                    conn.execute(stmt.on_conflict_do_update(
+                        index_elements=[ConfigMerkleNode.repo, ConfigMerkleNode.path],
+                        set_={column: stmt.excluded[column] for column in
+                              ("is_dir", "hash", "inode", "size", "mtime_ns", "entries", "updated_at")},
+                    ), [
+                        {"repo": repo, "path": path, **node._asdict(), "updated_at": now}
+                        for path, node in upserts.items()
+                    ])
+                gone = removed + deleted_dirs
+                if gone:
+                    conn.execute(delete(ConfigMerkleNode).where(
+                        ConfigMerkleNode.repo == repo, ConfigMerkleNode.path == bindparam("b_path")
+                    ), [{"b_path": path} for path in gone])
+                if root_changed:
+                    conn.execute(insert(ConfigurationSnapshot).values(
+                        id=f"cfgsnap-{hashlib.sha1(f'{repo}:{root}:{now.isoformat()}'.encode('utf-8')).hexdigest()[:24]}",
+                        repo=repo,
+                        snapshot_type="full" if baseline else "incremental",
+                        configuration_hash=root,
+                        snapshot_data=json.dumps({
+                            path: node.hash for path, node in sorted(nodes.items()) if not node.is_dir
+                        }),
+                        taken_at=now,
+                        taken_by=changed_by,
+                        notes=None if baseline else f"{len(changed_leaves)} file(s), {len(changes)} key(s) changed",
+                    ))
+                if changes:
+                    conn.execute(insert(ConfigurationChange), [
+                        {
+                            "id": "cfgchg-" + hashlib.sha1(
+                                f"{repo}:{c.file_path}:{c.key}:{root}:{now.isoformat()}".encode("utf-8")
+                            ).hexdigest()[:24],
+                            "repo": repo,
+                            "change_type": c.change_type,
+                            "component_name": names.get(owners[c.file_path].component_id)
+                            if owners.get(c.file_path) else None,
+                            "file_path": c.file_path,
+                            "config_key": c.key,
+                            "old_value": c.old_value,
+                            "new_value": c.new_value,
+                            "changed_at": now,
+                            "changed_by": changed_by,
+                            "commit_hash": head,
+                        }
+                        for c in changes
+                    ])
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+
+        return {
+            "files": len(files),
+            "read": read,
+            "changed_files": len(changed_leaves),
+            "root_hash": root,
+            "baseline": baseline,
+        }, changes
+
+    @staticmethod
+    def _key_changes(
+        repo: str,
+        changed_leaves: Dict[str, Tuple[Optional[_Node], Optional[_Node]]]
+    ) -> List[ConfigChange]:
+        changes = []
+        for path, (old, new) in sorted(changed_leaves.items()):
+            before = json.loads(old.entries) if old is not None and old.entries else {}
+            after = json.loads(new.entries) if new is not None and new.entries else {}
+            for key in sorted(before.keys() | after.keys()):
+                if key not in before:
+                    changes.append(ConfigChange(repo, path, key, "added", None, after[key]))
+                elif key not in after:
+                    changes.append(ConfigChange(repo, path, key, "removed", before[key], None))
+                elif before[key] != after[key]:
+                    changes.append(ConfigChange(repo, path, key, "modified", before[key], after[key]))
+        return changes
+
+    def _head(self, repo: str) -> Optional[str]:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
+            cwd=self.workspace_root / repo, capture_output=True, text=True
+        )
+        return completed.stdout.strip() or None if completed.returncode == 0 else None
@@ -0,0 +1,14 @@
+"""
+WMS Constants - Values shared across the WMS modules.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Single definition of the workspace repos and other cross-module constants
+DOMAIN: Cross-repo workspace management
+
+Standard library only, so scripts that avoid importing SQLAlchemy (the
+pre-commit hook) can use it too.
+"""
+
+# Repos checked out under the workspace root, in ingest/report order
+REPOS = ['meridian-core', 'meridian-trading', 'meridian-research', 'workspace']
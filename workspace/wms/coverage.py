@@ -0,0 +1,422 @@
+"""
+Mapping Coverage - Materialized mapping coverage per repo, top-level directory and component.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Keep coverage counts and their daily history current without walking the repos
+DOMAIN: Cross-repo workspace management
+
+coverage_files holds the state of every counted file: non-ignored files of
+file_inventory in the four repos with a COVERAGE_EXTENSIONS suffix. A file is
+mapped (explicit mapping, mapped directory or rule), ignored (its
+unregistered_files row was reviewed as 'ignored') or unregistered.
+
+update() only re-classifies files that may have changed:
+
+- files added to or removed from file_inventory (primary-key anti-joins)
+- files owned by, or lying under, a mapping changed since the last update
+- files whose unregistered_files row changed
+
+Changes come from change_log (consumer "coverage"). The difference between
+each file's old and new state is applied to coverage_counts as deltas. A
+changed mapping rule, a large backlog of changes or full=True re-classifies
+everything. Every update also rewrites the day's coverage_history rows.
+
+Coverage = mapped / (mapped + unregistered); ignored files are left out.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+from workspace.db.models import ChangeLogCursor, CoverageCount, CoverageFile, CoverageHistory
+from workspace.wms.constants import REPOS
+from workspace.wms.mapping_rules import MappingRuleMatcher
+from workspace.wms.path_index import ComponentPathIndex, split_path
+
+# Suffixes counted (the set analyze_file_mapping.py has always measured)
+COVERAGE_EXTENSIONS = (".py", ".md", ".json", ".yaml", ".yml", ".toml")
+
+TARGET_COVERAGE = 70.0
+
+CONSUMER = "coverage"
+TRACKED_TABLES = ("code_component_mappings", "component_mapping_rules", "unregistered_files")
+
+# More changed rows than this and re-classifying everything is cheaper
+FULL_REBUILD_THRESHOLD = 5000
+
+SCOPE_TYPES = ("repo", "dir", "component")
+
+_Key = Tuple[str, str]  # (repo, path)
+_State = Tuple[str, str, Optional[str], Optional[str]]  # (top_dir, state, component_id, source_id)
+
+
+class CoverageRow(NamedTuple):
+    """Counts of one scope."""
+    repo: str
+    scope_type: str
+    scope: str
+    mapped: int
+    unregistered: int
+    ignored: int
+
+    @property
+    def total(self) -> int:
+        return self.mapped + self.unregistered + self.ignored
+
+    @property
+    def coverage(self) -> Optional[float]:
+        """Percentage of non-ignored files that are mapped (None without any)."""
+        counted = self.mapped + self.unregistered
+        return self.mapped / counted * 100 if counted else None
+
+
+def top_dir(path: str) -> str:
+    head, sep, _ = path.partition("/")
+    return head if sep else "."
+
+
+class CoverageTracker:
+    """Maintains coverage_files, coverage_counts and coverage_history."""
+
+    def __init__(self, engine: Engine, progress: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            progress: Called with a short message when an update is done
+        """
+        self.engine = engine
+        self.progress = progress
+        self.path_index = ComponentPathIndex.for_engine(engine)
+        self.mapping_rules = MappingRuleMatcher.for_engine(engine)
+
+    # ------------------------------------------------------------------
+    # Updating
+    # ------------------------------------------------------------------
+
+    def update(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Bring coverage in line with file_inventory, mappings, rules and unregistered files.
+
+        Args:
+            full: Re-classify every file
+
+        Returns:
+            Dict with files (counted), changed (files whose state changed),
+            full (whether everything was re-classified) and seconds
+        """
+        started = time.monotonic()
+        with self.engine.connect() as conn:
+            raw = conn.connection.driver_connection
+            cursor = self._cursor(conn)
+            last_seq = cursor or 0
+            changes = raw.execute(
+                'SELECT "table", pk, MAX(seq) FROM change_log WHERE seq > ? AND "table" IN (?, ?, ?) '
+                'GROUP BY "table", pk',
+                (last_seq, *TRACKED_TABLES),
+            ).fetchall()
+            max_seq = max([last_seq, *(seq for _, _, seq in changes)])
+            changed_ids: Dict[str, List[str]] = {table: [] for table in TRACKED_TABLES}
+            for table, pk, _ in changes:
+                changed_ids[table].append(pk)
+
+            full = (
+                full
+                or cursor is None
+                or bool(changed_ids["component_mapping_rules"])
+                or len(changes) > FULL_REBUILD_THRESHOLD
+                or raw.execute("SELECT 1 FROM coverage_files LIMIT 1").fetchone() is None
+            )
+            if full:
+                old = {
+                    (repo, path): (top, state, component_id, source_id)
+                    for repo, path, top, state, component_id, source_id in raw.execute(
+                        "SELECT repo, path, top_dir, state, component_id, source_id FROM coverage_files"
+                    )
+                }
+                present = set(self._counted_files(raw))
+                dirty = set(old) | present
+            else:
+                added = self._counted_files(raw, missing_only=True)
+                removed = [
+                    (repo, path) for repo, path in raw.execute(
+                        "SELECT c.repo, c.path FROM coverage_files c WHERE NOT EXISTS ("
+                        "SELECT 1 FROM file_inventory i WHERE i.repo = c.repo AND i.path = c.path "
+                        "AND i.kind = 'file' AND i.ignored = 0)"
+                    )
+                ]
+                dirty = set(added) | set(removed)
+                dirty |= self._mapping_files(raw, changed_ids["code_component_mappings"])
+                dirty |= self._unregistered_files(raw, changed_ids["unregistered_files"])
+                old = self._states(raw, dirty)
+                present = set(added) | (set(old) - set(removed))
+
+            new = self._classify(raw, [key for key in dirty if key in present])
+            deletes = [key for key in dirty if key in old and key not in new]
+            if full:
+                # Counts are rebuilt from scratch rather than patched
+                updates = [*new.items()]
+                deltas = self._deltas({}, updates, [])
+            else:
+                updates = [(key, state) for key, state in new.items() if old.get(key) != state]
+                deltas = self._deltas(old, updates, deletes)
+            self._write(conn, updates, deletes, deltas, max_seq, reset=full)
+            files = raw.execute("SELECT COUNT(*) FROM coverage_files").fetchone()[0]
+        changed = sum(1 for key, state in updates if old.get(key) != state) + len(deletes)
+
+        result = {
+            "files": files,
+            "changed": changed,
+            "full": full,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+        if self.progress:
+            self.progress(f"coverage: {result['changed']:,} of {files:,} files changed"
+                          f"{' (full)' if full else ''}")
+        return result
+
+    @staticmethod
+    def _cursor(conn: Connection) -> Optional[int]:
+        """Last change_log seq applied (None before the first update)."""
+        row = conn.execute(
+            select(ChangeLogCursor.last_seq).where(ChangeLogCursor.consumer == CONSUMER)
+        ).first()
+        return row[0] if row else None
+
+    @staticmethod
+    def _counted_files(raw, missing_only: bool = False) -> List[_Key]:
+        """Counted inventory files (only those without a coverage_files row with missing_only)."""
+        placeholders = ", ".join("?" * len(COVERAGE_EXTENSIONS))
+        repos = ", ".join("?" * len(REPOS))
+        sql = (
+            f"SELECT i.repo, i.path FROM file_inventory i WHERE i.ext IN ({placeholders}) "
+            f"AND i.repo IN ({repos}) AND i.kind = 'file' AND i.ignored = 0"
+        )
+        if missing_only:
+            sql += " AND NOT EXISTS (SELECT 1 FROM coverage_files c WHERE c.repo = i.repo AND c.path = i.path)"
+        return [(repo, path) for repo, path in raw.execute(sql, (*COVERAGE_EXTENSIONS, *REPOS))]
+
+    @staticmethod
+    def _mapping_files(raw, mapping_ids: Sequence[str]) -> set:
+        """Counted files a changed mapping owned before or may own now."""
+        dirty = set()
+        for start in range(0, len(mapping_ids), 500):
+            chunk = mapping_ids[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            dirty.update(raw.execute(
+                f"SELECT repo, path FROM coverage_files WHERE source_id IN ({marks})", chunk
+            ).fetchall())
+            for (file_path,) in raw.execute(
+                f"SELECT file_path FROM code_component_mappings WHERE id IN ({marks})", chunk
+            ).fetchall():
+                path = "/".join(split_path(file_path or ""))
+                if not path:
+                    continue
+                # The path itself, or everything below it when it is a directory
+                dirty.update(raw.execute(
+                    "SELECT repo, path FROM coverage_files WHERE path = ? OR (path > ? AND path < ?)",
+                    (path, f"{path}/", f"{path}0"),
+                ).fetchall())
+        return dirty
+
+    @staticmethod
+    def _unregistered_files(raw, unregistered_ids: Sequence[str]) -> set:
+        """Counted files whose unregistered_files row changed."""
+        if not unregistered_ids:
+            return set()
+        dirty = set()
+        for start in range(0, len(unregistered_ids), 500):
+            chunk = unregistered_ids[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            dirty.update(raw.execute(
+                f"SELECT repo, file_path FROM unregistered_files WHERE id IN ({marks})", chunk
+            ).fetchall())
+        # Deleted rows leave no path behind: re-check every file a row could have affected
+        dirty.update(raw.execute(
+            "SELECT repo, path FROM coverage_files WHERE state = 'ignored' "
+            "OR (state = 'unregistered' AND component_id IS NOT NULL)"
+        ).fetchall())
+        return dirty
+
+    @staticmethod
+    def _states(raw, keys: Iterable[_Key]) -> Dict[_Key, _State]:
+        states = {}
+        for repo, path in keys:
+            row = raw.execute(
+                "SELECT top_dir, state, component_id, source_id FROM coverage_files WHERE repo = ? AND path = ?",
+                (repo, path),
+            ).fetchone()
+            if row:
+                states[(repo, path)] = tuple(row)
+        return states
+
+    def _classify(self, raw, keys: List[_Key]) -> Dict[_Key, _State]:
+        """Current state of counted files."""
+        reviewed = {
+            (repo, file_path): (status, component_id)
+            for repo, file_path, status, component_id in raw.execute(
+                "SELECT repo, file_path, status, assigned_component_id FROM unregistered_files "
+                "WHERE status = 'ignored' OR assigned_component_id IS NOT NULL"
+            )
+        }
+        by_repo: Dict[str, List[str]] = {}
+        for repo, path in keys:
+            by_repo.setdefault(repo, []).append(path)
+
+        states: Dict[_Key, _State] = {}
+        for repo, paths in by_repo.items():
+            matches = self.path_index.lookup_many(paths)
+            rules = self.mapping_rules.match_many(repo, [path for path in paths if matches[path] is None])
+            for path in paths:
+                match = matches[path] or rules.get(path)
+                if match is not None:
+                    source = match.mapping_id if matches[path] is not None else match.rule_id
+                    states[(repo, path)] = (top_dir(path), "mapped", match.component_id, source)
+                    continue
+                status, component_id = reviewed.get((repo, path), (None, None))
+                state = "ignored" if status == "ignored" else "unregistered"
+                states[(repo, path)] = (top_dir(path), state, component_id, None)
+        return states
+
+    @staticmethod
+    def _deltas(
+        old: Dict[_Key, _State],
+        updates: List[Tuple[_Key, _State]],
+        deletes: List[_Key]
+    ) -> Dict[Tuple[str, str, str], Counter]:
+        deltas: Dict[Tuple[str, str, str], Counter] = {}
+
+        def apply(repo: str, state: _State, sign: int):
+            top, kind, component_id, _source = state
+            scopes = [("repo", ""), ("dir", top)]
+            if component_id:
+                scopes.append(("component", component_id))
+            for scope_type, scope in scopes:
+                deltas.setdefault((repo, scope_type, scope), Counter())[kind] += sign
+
+        for key, state in updates:
+            if key in old:
+                apply(key[0], old[key], -1)
+            apply(key[0], state, 1)
+        for key in deletes:
+            apply(key[0], old[key], -1)
+        return deltas
+
+    def _write(
+        self,
+        conn: Connection,
+        updates: List[Tuple[_Key, _State]],
+        deletes: List[_Key],
+        deltas: Dict[Tuple[str, str, str], Counter],
+        max_seq: int,
+        reset: bool = False
+    ):
+        now = datetime.utcnow()
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            if reset:
+                conn.exec_driver_sql("DELETE FROM coverage_counts")
+            if updates:
+                stmt = sqlite_insert(CoverageFile)
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[CoverageFile.repo, CoverageFile.path],
+                    set_={column: stmt.excluded[column] for column in ("top_dir", "state", "component_id", "source_id")},
+                ), [
+                    {"repo": repo, "path": path, "top_dir": top, "state": state,
+                     "component_id": component_id, "source_id": source_id}
+                    for (repo, path), (top, state, component_id, source_id) in updates
+                ])
+            if deletes:
+                conn.exec_driver_sql("DELETE FROM coverage_files WHERE repo = ? AND path = ?", deletes)
+            rows = [
+                {"repo": repo, "scope_type": scope_type, "scope": scope, "mapped": delta["mapped"],
+                 "unregistered": delta["unregistered"], "ignored": delta["ignored"], "updated_at": now}
+                for (repo, scope_type, scope), delta in deltas.items()
+                if any(delta.values())
+            ]
+            if rows:
+                stmt = sqlite_insert(CoverageCount)
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[CoverageCount.repo, CoverageCount.scope_type, CoverageCount.scope],
+                    set_={
+                        "mapped": CoverageCount.mapped + stmt.excluded.mapped,
+                        "unregistered": CoverageCount.unregistered + stmt.excluded.unregistered,
+                        "ignored": CoverageCount.ignored + stmt.excluded.ignored,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                ), rows)
+            # Today's point of every series; emptied scopes record their zero before they go
+            conn.exec_driver_sql(
+                "INSERT INTO coverage_history (day, repo, scope_type, scope, mapped, unregistered, ignored) "
+                "SELECT ?, repo, scope_type, scope, mapped, unregistered, ignored FROM coverage_counts WHERE true "
+                "ON CONFLICT (day, repo, scope_type, scope) DO UPDATE SET mapped = excluded.mapped, "
+                "unregistered = excluded.unregistered, ignored = excluded.ignored",
+                (now.strftime("%Y-%m-%d"),),
+            )
+            conn.exec_driver_sql("DELETE FROM coverage_counts WHERE mapped = 0 AND unregistered = 0 AND ignored = 0")
+            stmt = sqlite_insert(ChangeLogCursor)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[ChangeLogCursor.consumer],
+                set_={"last_seq": stmt.excluded.last_seq, "updated_at": stmt.excluded.updated_at},
+            ), {"consumer": CONSUMER, "last_seq": max_seq, "updated_at": now})
+            conn.exec_driver_sql("COMMIT")
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def counts(self, scope_type: str = "repo", repo: Optional[str] = None) -> List[CoverageRow]:
+        """Current counts of every scope of one type, by repo and scope."""
+        query = select(
+            CoverageCount.repo, CoverageCount.scope_type, CoverageCount.scope,
+            CoverageCount.mapped, CoverageCount.unregistered, CoverageCount.ignored,
+        ).where(CoverageCount.scope_type == scope_type)
+        if repo is not None:
+            query = query.where(CoverageCount.repo == repo)
+        with self.engine.connect() as conn:
+            return [CoverageRow(*row) for row in conn.execute(query.order_by(CoverageCount.repo, CoverageCount.scope))]
+
+    def history(
+        self,
+        scope_type: str = "repo",
+        repo: Optional[str] = None,
+        days: int = 30
+    ) -> Dict[Tuple[str, str], List[Tuple[str, CoverageRow]]]:
+        """
+        Daily series of one scope type, oldest first.
+
+        Returns:
+            Dict of (repo, scope) -> [(day, CoverageRow), ...] for the last
+            `days` days that have a point
+        """
+        with self.engine.connect() as conn:
+            first_day = conn.exec_driver_sql(
+                "SELECT date('now', ?)", (f"-{max(0, days - 1)} days",)
+            ).scalar()
+            query = select(
+                CoverageHistory.day, CoverageHistory.repo, CoverageHistory.scope_type, CoverageHistory.scope,
+                CoverageHistory.mapped, CoverageHistory.unregistered, CoverageHistory.ignored,
+            ).where(CoverageHistory.scope_type == scope_type, CoverageHistory.day >= first_day)
+            if repo is not None:
+                query = query.where(CoverageHistory.repo == repo)
+            series: Dict[Tuple[str, str], List[Tuple[str, CoverageRow]]] = {}
+            for day, *row in conn.execute(query.order_by(CoverageHistory.day)):
+                point = CoverageRow(*row)
+                series.setdefault((point.repo, point.scope), []).append((day, point))
+        return series
+
+    def total(self) -> CoverageRow:
+        """All repos together."""
+        rows = self.counts("repo")
+        return CoverageRow(
+            "", "repo", "",
+            sum(r.mapped for r in rows), sum(r.unregistered for r in rows), sum(r.ignored for r in rows),
+        )
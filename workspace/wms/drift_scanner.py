@@ -0,0 +1,660 @@
+"""
+Drift Scanner - Detects drift between the Meridian repos and the registered architecture.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Fill drift_detections/drift_scans from placement, scope, dependency and pattern rules
+DOMAIN: Cross-repo workspace management
+
+Rules (RULES):
+- placement: a component's expected_path is missing (HIGH when a file of the
+  same name exists elsewhere in the repo, i.e. it was moved)
+- scope: a mapped file lies in one of its component's boundaries
+  forbidden_paths; a Python file belongs to no component
+- dependency: an import breaks an import rule, or one of its component's
+  boundaries forbidden_imports
+- pattern: Python module names that are not snake_case; tests outside a
+  tests directory
+
+Each repo is evaluated in its own worker process (import parsing is CPU-bound).
+The database work stays in the calling process: file lists come from
+file_inventory, ownership from the path index and mapping rules. Results are
+diffed against the open detections. Only new and resolved detections are written,
+together with the DriftScan row, in one transaction.
+
+An incremental scan only evaluates files that changed since the last scan:
+the git diff from the commit recorded for the repo, plus files that were
+uncommitted then or are uncommitted now. A repo falls back to a full scan
+when it has no usable previous commit. All repos do when components,
+mappings or rules changed since the last scan, or when the package structure
+did (see _structure), since imports of unchanged files may then resolve
+differently.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import posixpath
+import re
+import subprocess
+import time
+import uuid
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from workspace.db.models import ArchitectureComponent, ChangeLogEntry, DriftDetection, DriftScan
+from workspace.wms.constants import REPOS
+from workspace.wms.file_inventory import FileInventory
+from workspace.wms.git_history import GitError
+from workspace.wms.import_graph import (
+    forbidding_rule, import_edges, load_import_rules, module_names, parse_imports
+)
+from workspace.wms.mapping_rules import MappingRuleMatcher
+from workspace.wms.path_index import ComponentPathIndex
+
+logger = logging.getLogger(__name__)
+
+# Rule -> (violation_type, severity); placement is downgraded to MEDIUM when nothing was found elsewhere
+RULES: Dict[str, Tuple[str, str]] = {
+    "placement.expected_path": ("component_placement", "HIGH"),
+    "scope.forbidden_path": ("scope", "MEDIUM"),
+    "scope.unmapped": ("scope", "LOW"),
+    "dependency.import_rule": ("dependency", "HIGH"),
+    "dependency.component_boundary": ("dependency", "MEDIUM"),
+    "pattern.module_name": ("pattern", "LOW"),
+    "pattern.test_location": ("pattern", "LOW"),
+}
+SEVERITIES = ("HIGH", "MEDIUM", "LOW")
+DETECTED_BY = "drift-scan"
+
+# Changes to these can alter the detections of files that did not change
+RULE_INPUT_TABLES = ("architecture_components", "code_component_mappings", "component_mapping_rules", "import_rules")
+
+_MODULE_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+_TEST_DIRS = {"tests", "test"}
+
+
+def detection_id(repo: str, rule: str, file_path: str) -> str:
+    """Deterministic id, so the same drift keeps one DriftDetection row across scans."""
+    digest = hashlib.sha1(f"{repo}:{rule}:{file_path}".encode("utf-8")).hexdigest()
+    return f"drift-{digest[:24]}"
+
+
+class Finding(NamedTuple):
+    """One detection produced by a rule."""
+    rule: str
+    severity: str
+    file_path: str
+    details: str
+    component_name: Optional[str] = None
+    expected_location: Optional[str] = None
+    actual_location: Optional[str] = None
+
+
+class _Component(NamedTuple):
+    name: str
+    expected_path: Optional[str]
+    forbidden_paths: Tuple[str, ...]
+    forbidden_imports: Tuple[str, ...]
+
+
+class RepoJob(NamedTuple):
+    """Everything a worker needs to evaluate one repo (no database access)."""
+    repo: str
+    repo_path: str
+    files: List[str]  # Every non-ignored file of the repo
+    check: Optional[List[str]]  # Files to evaluate; None evaluates all of them
+    components: Dict[str, _Component]  # By id, components of this repo
+    owners: Dict[str, str]  # Evaluated file -> owning component id (mapped files only)
+    modules: Dict[str, str]  # Evaluated .py file -> dotted module name
+    package_owners: Dict[str, Set[str]]  # Top-level module name -> repos defining it
+    import_rules: list  # load_import_rules() of this repo
+
+
+class RepoResult(NamedTuple):
+    repo: str
+    findings: List[Finding]
+    scope: Optional[Set[str]]  # File paths whose detections were re-evaluated; None for the whole repo
+    checked: int
+    timings: Dict[str, float]
+
+
+def scan_repo(job: RepoJob) -> RepoResult:
+    """Evaluate all rules for one repo (process pool entry point)."""
+    timings: Dict[str, float] = {}
+    findings: List[Finding] = []
+    check = job.files if job.check is None else job.check
+    existing = set(job.files)
+
+    def timed(rule: str, started: float):
+        timings[rule] = timings.get(rule, 0.0) + time.perf_counter() - started
+
+    # Placement: components whose expected file (or a same-named one) is among the checked files
+    started = time.perf_counter()
+    by_name: Dict[str, List[str]] = {}
+    for path in job.files:
+        by_name.setdefault(posixpath.basename(path), []).append(path)
+    dirs = {posixpath.dirname(path) for path in job.files}
+    checked_names = None if job.check is None else {posixpath.basename(path) for path in check}
+    scope = None if job.check is None else set(check)
+    for component in job.components.values():
+        expected = (component.expected_path or "").strip("/")
+        if not expected:
+            continue
+        name = posixpath.basename(expected)
+        if checked_names is not None:
+            if expected not in scope and name not in checked_names:
+                continue
+            scope.add(expected)
+        if expected in existing or any(d == expected or d.startswith(expected + "/") for d in dirs):
+            continue
+        elsewhere = sorted(by_name.get(name, ()))
+        if elsewhere:
+            findings.append(Finding(
+                "placement.expected_path", "HIGH", expected,
+                f"{component.name} is expected at {expected} but found at {', '.join(elsewhere[:5])}",
+                component.name, expected, elsewhere[0]
+            ))
+        else:
+            findings.append(Finding(
+                "placement.expected_path", "MEDIUM", expected,
+                f"{component.name} is expected at {expected}, which does not exist",
+                component.name, expected, None
+            ))
+    timed("placement.expected_path", started)
+
+    check_existing = [path for path in check if path in existing]
+
+    # Scope: forbidden paths of the owning component, Python files without a component
+    started = time.perf_counter()
+    for path in check_existing:
+        component = job.components.get(job.owners.get(path, ""))
+        if component is None:
+            continue
+        hits = [forbidden for forbidden in component.forbidden_paths if forbidden in path]
+        if hits:
+            findings.append(Finding(
+                "scope.forbidden_path", "MEDIUM", path,
+                f"Path violates {component.name} boundaries: {', '.join(hits)}", component.name
+            ))
+    timed("scope.forbidden_path", started)
+
+    started = time.perf_counter()
+    for path in check_existing:
+        if path.endswith(".py") and path not in job.owners:
+            findings.append(Finding("scope.unmapped", "LOW", path, "Python file is not mapped to any component"))
+    timed("scope.unmapped", started)
+
+    # Dependency: parse the imports once, evaluate both rule kinds
+    started = time.perf_counter()
+    edges_by_file = {}
+    for path in check_existing:
+        module = job.modules.get(path)
+        if module is None:
+            continue
+        try:
+            with open(os.path.join(job.repo_path, path), "rb") as f:
+                imports, _error = parse_imports(f.read())
+        except OSError:
+            continue
+        if imports:
+            edges_by_file[path] = import_edges(job.repo, path, module, imports, job.package_owners)
+    parse_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for path, edges in edges_by_file.items():
+        broken = []
+        for edge in edges:
+            rule = forbidding_rule(job.import_rules, edge)
+            if rule:
+                broken.append((edge, rule))
+        if broken:
+            edge, rule = broken[0]
+            findings.append(Finding(
+                "dependency.import_rule", "HIGH", path,
+                "; ".join(f"line {e.line} imports {e.module} ({r.reason})" for e, r in broken),
+                None, None, f"{path}:{edge.line}"
+            ))
+    timed("dependency.import_rule", started)
+    timings["dependency.import_rule"] += parse_seconds
+
+    started = time.perf_counter()
+    for path, edges in edges_by_file.items():
+        component = job.components.get(job.owners.get(path, ""))
+        if component is None or not component.forbidden_imports:
+            continue
+        broken = [
+            edge for edge in edges
+            if any(edge.module == p or edge.module.startswith(p + ".") for p in component.forbidden_imports)
+        ]
+        if broken:
+            findings.append(Finding(
+                "dependency.component_boundary", "MEDIUM", path,
+                f"{component.name} must not import " + ", ".join(f"{e.module} (line {e.line})" for e in broken),
+                component.name, None, f"{path}:{broken[0].line}"
+            ))
+    timed("dependency.component_boundary", started)
+
+    # Pattern: module naming, test placement
+    started = time.perf_counter()
+    for path in check_existing:
+        if path.endswith(".py") and not _MODULE_NAME.match(posixpath.basename(path)[:-3]):
+            findings.append(Finding("pattern.module_name", "LOW", path, "Python module name is not snake_case"))
+    timed("pattern.module_name", started)
+
+    started = time.perf_counter()
+    for path in check_existing:
+        name = posixpath.basename(path)
+        if not name.endswith(".py") or not (name.startswith("test_") or name.endswith("_test.py")):
+            continue
+        if _TEST_DIRS.isdisjoint(path.split("/")[:-1]):
+            findings.append(Finding(
+                "pattern.test_location", "LOW", path, "Test module outside a tests directory",
+                None, f"tests/{name}", path
+            ))
+    timed("pattern.test_location", started)
+
+    return RepoResult(job.repo, findings, scope, len(check), timings)
+
+
+class DriftScanner:
+    """Runs drift scans over the Meridian repos and records them in drift_scans/drift_detections."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory containing the repos
+            workers: Repos evaluated at the same time (default: CPU count)
+            progress: Called with a short message after each phase
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.progress = progress
+
+    def scan(
+        self,
+        full: bool = False,
+        repos: Optional[Sequence[str]] = None,
+        triggered_by: str = "user"
+    ) -> Dict[str, Any]:
+        """
+        Scan the repos and record the result.
+
+        Args:
+            full: Evaluate every file instead of the ones changed since the last scan
+            repos: Repo names under workspace_root (default: all Meridian repos)
+            triggered_by: Stored on the DriftScan row (user, ci_cd, scheduled)
+
+        Returns:
+            Dict with scan_id, scan_type, repos (per repo: mode, commit,
+            checked), missing, new, resolved, open (by severity), timings
+            and seconds
+        """
+        started = time.monotonic()
+        repos = [*(repos or REPOS)]
+        missing = [repo for repo in repos if not (self.workspace_root / repo).is_dir()]
+        repos = [repo for repo in repos if repo not in missing]
+        scan_id = f"scan-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+        with self.engine.connect() as conn:
+            change_seq = conn.execute(
+                select(func.coalesce(func.max(ChangeLogEntry.seq), 0))
+                .where(ChangeLogEntry.table.in_(RULE_INPUT_TABLES))
+            ).scalar()
+            previous = None if full else self._previous_commits(conn, change_seq)
+            scan_type = "full" if previous is None else "incremental"
+            conn.execute(insert(DriftScan).values(
+                id=scan_id, scan_type=scan_type, scan_start=datetime.utcnow(), status="running",
+                repos_scanned=json.dumps(repos), triggered_by=triggered_by, change_seq=change_seq,
+            ))
+
+        try:
+            plans = {repo: self._plan(repo, (previous or {}).get(repo)) for repo in repos}
+            self._update_inventory(plans)
+            jobs = self._jobs(plans)
+            self._report(f"{sum(len(j.files) if j.check is None else len(j.check) for j in jobs):,} file(s) "
+                         f"to evaluate in {len(jobs)} repo(s)")
+            results = self._run(jobs)
+            summary = self._write(scan_id, plans, results)
+        except BaseException:
+            with self.engine.connect() as conn:
+                conn.execute(update(DriftScan).where(DriftScan.id == scan_id).values(
+                    status="failed", scan_end=datetime.utcnow()
+                ))
+            raise
+
+        timings: Dict[str, float] = {}
+        for result in results:
+            for rule, seconds in result.timings.items():
+                timings[rule] = timings.get(rule, 0.0) + seconds
+        return {
+            "scan_id": scan_id,
+            "scan_type": scan_type,
+            "repos": {
+                result.repo: {
+                    "mode": "full" if plans[result.repo]["changed"] is None else "incremental",
+                    "commit": plans[result.repo]["commit"],
+                    "checked": result.checked,
+                }
+                for result in results
+            },
+            "missing": missing,
+            **summary,
+            "timings": {rule: round(seconds, 4) for rule, seconds in timings.items()},
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+    def _report(self, message: str):
+        if self.progress:
+            self.progress(message)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _previous_commits(conn: Connection, change_seq: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """repo_commits of the last completed scan, or None if a full scan is needed."""
+        row = conn.execute(
+            select(DriftScan.repo_commits, DriftScan.change_seq)
+            .where(DriftScan.status == "completed", DriftScan.repo_commits.is_not(None))
+            .order_by(DriftScan.scan_start.desc())
+            .limit(1)
+        ).first()
+        if row is None:
+            return None
+        if row.change_seq is None or row.change_seq < change_seq:
+            logger.info("Components, mappings or rules changed since the last drift scan; scanning in full")
+            return None
+        return json.loads(row.repo_commits)
+
+    def _plan(self, repo: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        HEAD, uncommitted files and (incremental) changed files of a repo.
+
+        changed is None when the repo has to be evaluated in full.
+        """
+        repo_path = self.workspace_root / repo
+        head = self._git(repo_path, "rev-parse", "--verify", "--quiet", "HEAD", check=False) or None
+        dirty: List[str] = []
+        if head:
+            dirty = sorted(set(self._lines(repo_path, "diff", "--name-only", "--relative", "HEAD"))
+                           | set(self._lines(repo_path, "ls-files", "--others", "--exclude-standard")))
+        plan = {"commit": head, "dirty": dirty, "changed": None, "structure": (previous or {}).get("structure")}
+
+        base = (previous or {}).get("commit")
+        if not head or not base:
+            return plan
+        if base != head:
+            try:
+                self._git(repo_path, "merge-base", "--is-ancestor", base, "HEAD")
+            except GitError:
+                logger.warning(f"{repo}: {base[:12]} is no longer in HEAD's history, scanning in full")
+                return plan
+        changed = set(self._lines(repo_path, "diff", "--name-only", "--relative", "--no-renames", base))
+        changed.update(dirty)
+        changed.update(previous.get("dirty", ()))  # Reverted since: the stored result came from the dirty copy
+        plan["changed"] = sorted(changed)
+        return plan
+
+    def _update_inventory(self, plans: Dict[str, Dict[str, Any]]):
+        """Bring file_inventory up to date: a walk for full scans, just the changed paths otherwise."""
+        inventory = FileInventory(self.engine, self.workspace_root)
+        if any(plan["changed"] is None for plan in plans.values()):
+            inventory.scan()
+            return
+        files = [f"{repo}/{path}" for repo, plan in plans.items() for path in plan["changed"]]
+        if files:
+            inventory.refresh(dirs={posixpath.dirname(path) for path in files}, files=files)
+
+    def _jobs(self, plans: Dict[str, Dict[str, Any]]) -> List[RepoJob]:
+        inventory = FileInventory(self.engine, self.workspace_root)
+        files_by_repo: Dict[str, List[str]] = {}
+        for entry in inventory.files(repos=REPOS):
+            files_by_repo.setdefault(entry.repo, []).append(entry.path)
+        modules, package_owners = module_names({
+            repo: [path for path in paths if path.endswith(".py")] for repo, paths in files_by_repo.items()
+        })
+
+        with self.engine.connect() as conn:
+            rules = load_import_rules(conn, [*plans])
+            components: Dict[str, Dict[str, _Component]] = {}
+            for row in conn.execute(select(ArchitectureComponent).where(ArchitectureComponent.repo.in_([*plans]))):
+                try:
+                    boundaries = json.loads(row.boundaries) if row.boundaries else {}
+                except ValueError:
+                    boundaries = {}
+                if not isinstance(boundaries, dict):
+                    boundaries = {}
+                components.setdefault(row.repo, {})[row.id] = _Component(
+                    row.component_name,
+                    row.expected_path,
+                    tuple(boundaries.get("forbidden_paths") or ()),
+                    tuple(boundaries.get("forbidden_imports") or ()),
+                )
+
+        structure = self._structure(files_by_repo, package_owners, {r.target for r in rules if r.target_is_repo})
+        stale = [repo for repo, plan in plans.items()
+                 if plan["changed"] is not None and plan["structure"] != structure]
+        if stale:
+            # Module names or package owners moved: imports of unchanged files may resolve differently
+            logger.info(f"Package structure changed since the last drift scan; scanning {', '.join(stale)} in full")
+            for repo in stale:
+                plans[repo]["changed"] = None
+        for plan in plans.values():
+            plan["structure"] = structure
+
+        path_index = ComponentPathIndex.for_engine(self.engine)
+        mapping_rules = MappingRuleMatcher.for_engine(self.engine)
+        jobs = []
+        for repo, plan in plans.items():
+            files = files_by_repo.get(repo, [])
+            check = plan["changed"]
+            if check is None:
+                evaluated = files
+            else:
+                present = set(files)
+                evaluated = [path for path in check if path in present]
+            owners = {path: match.component_id for path, match in path_index.lookup_many(evaluated).items() if match}
+            unmatched = [path for path in evaluated if path not in owners]
+            owners.update(
+                (path, match.component_id) for path, match in mapping_rules.match_many(repo, unmatched).items() if match
+            )
+            jobs.append(RepoJob(
+                repo=repo,
+                repo_path=str(self.workspace_root / repo),
+                files=files,
+                check=check,
+                components=components.get(repo, {}),
+                owners=owners,
+                modules={path: modules[(repo, path)] for path in evaluated if (repo, path) in modules},
+                package_owners=package_owners,
+                import_rules=[rule for rule in rules if rule.source_repo == repo],
+            ))
+        return jobs
+
+    @staticmethod
+    def _structure(
+        files_by_repo: Dict[str, List[str]],
+        package_owners: Dict[str, Set[str]],
+        target_repos: Set[str]
+    ) -> str:
+        """
+        Digest of what import resolution depends on besides the file itself.
+
+        That is the package directories of every repo (module names, relative
+        imports) and the top-level names of repos that import rules target.
+        """
+        packages = sorted(
+            f"{repo}/{path}" for repo, paths in files_by_repo.items() for path in paths
+            if path == "__init__.py" or path.endswith("/__init__.py")
+        )
+        owned = sorted(
+            f"{repo}:{name}" for name, repos in package_owners.items() for repo in repos if repo in target_repos
+        )
+        return hashlib.sha1(json.dumps([packages, owned]).encode("utf-8")).hexdigest()
+
+    def _run(self, jobs: List[RepoJob]) -> List[RepoResult]:
+        """Evaluate the repos, one worker process each."""
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            return [scan_repo(job) for job in jobs]
+        # spawn: forked children would inherit the parent's SQLite connections
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return [*pool.map(scan_repo, jobs)]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _write(self, scan_id: str, plans: Dict[str, Dict[str, Any]], results: List[RepoResult]) -> Dict[str, Any]:
+        """Insert/reopen new detections, resolve vanished ones and complete the DriftScan row (one transaction)."""
+        now = datetime.utcnow()
+        found: Dict[str, Tuple[str, Finding]] = {}
+        for result in results:
+            for finding in result.findings:
+                found[detection_id(result.repo, finding.rule, finding.file_path)] = (result.repo, finding)
+        scopes = {result.repo: result.scope for result in results}
+
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                existing = {
+                    row.id: row for row in conn.execute(
+                        select(DriftDetection.id, DriftDetection.repo, DriftDetection.file_path,
+                               DriftDetection.status, DriftDetection.severity, DriftDetection.violation_details)
+                        .where(DriftDetection.repo.in_([*scopes]), DriftDetection.detected_by == DETECTED_BY)
+                    )
+                }
+
+                inserts, reopens, refreshes = [], [], []
+                for did, (repo, finding) in found.items():
+                    row = {
+                        "b_id": did,
+                        "severity": finding.severity,
+                        "violation_details": finding.details,
+                        "actual_location": finding.actual_location,
+                        "expected_location": finding.expected_location,
+                        "component_name": finding.component_name,
+                    }
+                    current = existing.get(did)
+                    if current is None:
+                        inserts.append({
+                            "id": did,
+                            "repo": repo,
+                            "violation_type": RULES[finding.rule][0],
+                            "severity": finding.severity,
+                            "file_path": finding.file_path,
+                            "component_name": finding.component_name,
+                            "detected_rule": finding.rule,
+                            "expected_location": finding.expected_location,
+                            "actual_location": finding.actual_location,
+                            "violation_details": finding.details,
+                            "detected_at": now,
+                            "detected_by": DETECTED_BY,
+                            "status": "open",
+                        })
+                    elif current.status == "resolved":
+                        reopens.append(row)
+                    elif current.severity != finding.severity or current.violation_details != finding.details:
+                        refreshes.append(row)
+
+                resolved = [
+                    {"b_id": did} for did, current in existing.items()
+                    if current.status == "open" and did not in found
+                    and (scopes[current.repo] is None or current.file_path in scopes[current.repo])
+                ]
+
+                if inserts:
+                    conn.execute(insert(DriftDetection), inserts)
+                detail_values = {
+                    "severity": bindparam("severity"),
+                    "violation_details": bindparam("violation_details"),
+                    "actual_location": bindparam("actual_location"),
+                    "expected_location": bindparam("expected_location"),
+                    "component_name": bindparam("component_name"),
+                }
+                by_id = DriftDetection.id == bindparam("b_id")
+                if reopens:
+                    conn.execute(update(DriftDetection).where(by_id).values(
+                        status="open", detected_at=now, resolved_at=None, resolved_by=None, **detail_values
+                    ), reopens)
+                if refreshes:
+                    conn.execute(update(DriftDetection).where(by_id).values(**detail_values), refreshes)
+                if resolved:
+                    conn.execute(update(DriftDetection).where(by_id).values(
+                        status="resolved", resolved_at=now, resolved_by=DETECTED_BY
+                    ), resolved)
+
+                open_counts = dict(conn.execute(
+                    select(DriftDetection.severity, func.count())
+                    .where(DriftDetection.repo.in_([*scopes]), DriftDetection.status == "open")
+                    .group_by(DriftDetection.severity)
+                ).all())
+                timings: Dict[str, float] = {}
+                for result in results:
+                    for rule, seconds in result.timings.items():
+                        timings[rule] = round(timings.get(rule, 0.0) + seconds, 4)
+                new_count = len(inserts) + len(reopens)
+                conn.execute(update(DriftScan).where(DriftScan.id == scan_id).values(
+                    status="completed",
+                    scan_end=datetime.utcnow(),
+                    violations_found=sum(open_counts.values()),
+                    violations_high=open_counts.get("HIGH", 0),
+                    violations_medium=open_counts.get("MEDIUM", 0),
+                    violations_low=open_counts.get("LOW", 0),
+                    repo_commits=json.dumps({
+                        repo: {"commit": plan["commit"], "dirty": plan["dirty"], "structure": plan["structure"]}
+                        for repo, plan in plans.items()
+                    }),
+                    rule_timings=json.dumps(timings),
+                    detections_new=new_count,
+                    detections_resolved=len(resolved),
+                ))
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+
+        return {
+            "new": new_count,
+            "resolved": len(resolved),
+            "open": {severity: open_counts.get(severity, 0) for severity in SEVERITIES},
+            "new_detections": [
+                (repo, finding) for did, (repo, finding) in found.items()
+                if did not in existing or existing[did].status == "resolved"
+            ],
+        }
+
+    # ------------------------------------------------------------------
+    # Git
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _lines(cls, repo_path: Path, *args: str) -> List[str]:
+        return [line for line in cls._git(repo_path, "-c", "core.quotepath=off", *args).splitlines() if line]
+
+    @staticmethod
+    def _git(repo_path: Path, *args: str, check: bool = True) -> str:
+        completed = subprocess.run(
+            ["git", *args], cwd=repo_path, capture_output=True, text=True, encoding="utf-8", errors="replace"
+        )
+        if check and completed.returncode != 0:
+            raise GitError(f"git {' '.join(args)} failed in {repo_path}: {completed.stderr.strip()}")
+        return completed.stdout.strip()
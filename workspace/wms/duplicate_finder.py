@@ -0,0 +1,254 @@
+"""
+Duplicate Finder - Identical files across the workspace, by content.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Find copy-paste duplicates without reading every file
+DOMAIN: Cross-repo workspace management
+
+Candidates are narrowed in three passes. Only files sharing a size (from
+file_inventory) can be identical. Within a size bucket, a BLAKE2 hash of the
+first 4 KB splits most unrelated files apart. Only files still sharing
+(size, head hash) get a full BLAKE2 over an mmap of the file. The full
+hashes run in a thread pool, since hashlib releases the GIL on large buffers.
+
+Both hashes are cached on the file_inventory row together with the
+(inode, mtime, size) they were computed at. A later run reads a file only if
+that stat changed. Candidates are stat'ed again before hashing, because the
+inventory keeps stale stats for files edited in place.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import hashlib
+import logging
+import mmap
+import os
+import time
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Engine
+
+from workspace.db.models import FileInventoryEntry
+
+logger = logging.getLogger(__name__)
+
+HEAD_BYTES = 4096
+
+
+class DuplicateSet(NamedTuple):
+    """Files with identical content."""
+    content_hash: str
+    size: int
+    paths: List[str]  # Workspace-relative, sorted
+    copies: int  # Distinct inodes (hard links share the data)
+
+    @property
+    def wasted_bytes(self) -> int:
+        return self.size * (self.copies - 1)
+
+
+class _Candidate:
+    __slots__ = ("repo", "path", "stat", "head_hash", "content_hash", "dirty")
+
+    def __init__(self, repo: str, path: str, stat: str, head_hash: Optional[str], content_hash: Optional[str]):
+        self.repo = repo
+        self.path = path
+        self.stat = stat
+        self.head_hash = head_hash
+        self.content_hash = content_hash
+        self.dirty = False
+
+    @property
+    def workspace_path(self) -> str:
+        return "/".join(part for part in (self.repo, self.path) if part)
+
+    @property
+    def inode(self) -> str:
+        return self.stat.split(":", 1)[0]
+
+
+def _head_hash(path: Path) -> Tuple[str, Optional[str]]:
+    """(head hash, full hash if the whole file fit in the head)."""
+    with open(path, "rb") as f:
+        head = f.read(HEAD_BYTES + 1)
+    head_hash = hashlib.blake2b(head[:HEAD_BYTES], digest_size=16).hexdigest()
+    if len(head) <= HEAD_BYTES:
+        return head_hash, hashlib.blake2b(head, digest_size=32).hexdigest()
+    return head_hash, None
+
+
+def _content_hash(path: Path) -> str:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def _groups(candidates: List[_Candidate], key: Callable[[_Candidate], Any]) -> List[List[_Candidate]]:
+    """Groups of at least two candidates sharing key."""
+    groups: Dict[Any, List[_Candidate]] = {}
+    for candidate in candidates:
+        groups.setdefault(key(candidate), []).append(candidate)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+class DuplicateFinder:
+    """Groups inventoried files by content, hashing as few of them as possible."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        workers: int = 8,
+        min_size: int = 1
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory file_inventory paths are relative to
+            workers: Threads computing full hashes
+            min_size: Smaller files are ignored (empty files are all "identical")
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.workers = workers
+        self.min_size = max(1, min_size)
+
+    def find(
+        self,
+        repos: Optional[Sequence[str]] = None,
+        exts: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Find sets of identical files among the non-ignored inventory files.
+
+        Args:
+            repos: Only these repos ('' for the workspace root outside them; default: all)
+            exts: Only these extensions (".yaml")
+
+        Returns:
+            Dict with sets (DuplicateSet list, most wasted bytes first),
+            wasted_bytes, files, candidates, head_hashed, full_hashed, cached
+            and seconds
+        """
+        started = time.monotonic()
+        query = select(
+            FileInventoryEntry.repo, FileInventoryEntry.path, FileInventoryEntry.size,
+            FileInventoryEntry.head_hash, FileInventoryEntry.content_hash, FileInventoryEntry.hashed_stat,
+        ).where(
+            FileInventoryEntry.kind == "file",
+            FileInventoryEntry.ignored.is_(False),
+            FileInventoryEntry.size >= self.min_size,
+        )
+        if repos is not None:
+            query = query.where(FileInventoryEntry.repo.in_([*repos]))
+        if exts is not None:
+            query = query.where(FileInventoryEntry.ext.in_([ext.lower() for ext in exts]))
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+
+        # Pass 1: size buckets, then fresh stats for the files that share one
+        by_size: Dict[int, list] = {}
+        for row in rows:
+            by_size.setdefault(row.size, []).append(row)
+        candidates = []
+        for bucket in by_size.values():
+            if len(bucket) < 2:
+                continue
+            for row in bucket:
+                try:
+                    st = os.stat(self.workspace_root / row.repo / row.path, follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_size < self.min_size:
+                    continue
+                stat = f"{st.st_ino}:{st.st_mtime_ns}:{st.st_size}"
+                if stat == row.hashed_stat:
+                    candidates.append(_Candidate(row.repo, row.path, stat, row.head_hash, row.content_hash))
+                else:
+                    candidates.append(_Candidate(row.repo, row.path, stat, None, None))
+        size_groups = _groups(candidates, lambda c: c.stat.rsplit(":", 1)[1])
+        cached = sum(1 for group in size_groups for c in group if c.head_hash is not None)
+
+        # Pass 2: hash of the first 4 KB
+        head_hashed = 0
+        for group in size_groups:
+            for c in group:
+                if c.head_hash is not None:
+                    continue
+                try:
+                    c.head_hash, c.content_hash = _head_hash(self.workspace_root / c.workspace_path)
+                except OSError as e:
+                    logger.debug(f"Could not read {c.workspace_path}: {e}")
+                    continue
+                c.dirty = True
+                head_hashed += 1
+        head_groups = [
+            group
+            for size_group in size_groups
+            for group in _groups([c for c in size_group if c.head_hash is not None], lambda c: c.head_hash)
+        ]
+
+        # Pass 3: full hash of what still collides, in parallel
+        pending = [c for group in head_groups for c in group if c.content_hash is None]
+        if pending:
+            def full_hash(c: _Candidate) -> Optional[str]:
+                try:
+                    return _content_hash(self.workspace_root / c.workspace_path)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Could not hash {c.workspace_path}: {e}")
+                    return None
+
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+                for c, content_hash in zip(pending, pool.map(full_hash, pending)):
+                    if content_hash is not None:
+                        c.content_hash = content_hash
+                        c.dirty = True
+        full_hashed = sum(1 for c in pending if c.content_hash is not None)
+
+        sets = []
+        for head_group in head_groups:
+            for group in _groups([c for c in head_group if c.content_hash is not None], lambda c: c.content_hash):
+                sets.append(DuplicateSet(
+                    content_hash=group[0].content_hash,
+                    size=int(group[0].stat.rsplit(":", 1)[1]),
+                    paths=sorted(c.workspace_path for c in group),
+                    copies=len({c.inode for c in group}),
+                ))
+        sets.sort(key=lambda s: (-s.wasted_bytes, s.paths[0]))
+
+        self._store([c for group in size_groups for c in group if c.dirty])
+        return {
+            "sets": sets,
+            "wasted_bytes": sum(s.wasted_bytes for s in sets),
+            "files": len(rows),
+            "candidates": sum(len(group) for group in size_groups),
+            "head_hashed": head_hashed,
+            "full_hashed": full_hashed,
+            "cached": cached,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+    def _store(self, computed: List[_Candidate]):
+        """Cache new hashes on the inventory rows, keyed by the stat they were computed at."""
+        if not computed:
+            return
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                conn.execute(update(FileInventoryEntry).where(
+                    FileInventoryEntry.repo == bindparam("b_repo"),
+                    FileInventoryEntry.path == bindparam("b_path"),
+                ).values(
+                    head_hash=bindparam("b_head"),
+                    content_hash=bindparam("b_content"),
+                    hashed_stat=bindparam("b_stat"),
+                ), [
+                    {"b_repo": c.repo, "b_path": c.path, "b_head": c.head_hash,
+                     "b_content": c.content_hash, "b_stat": c.stat}
+                    for c in computed
+                ])
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
@@ -0,0 +1,569 @@
+"""
+File Inventory - Persistent list of the files under the workspace root.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Walk the workspace once and let every scanner query file_inventory instead of the disk
+DOMAIN: Cross-repo workspace management
+
+The walker runs os.scandir over directories in a thread pool (scandir and
+stat release the GIL) and prunes what .gitignore files exclude: an ignored
+entry is recorded with ignored=1 but an ignored directory is not descended,
+and .git is skipped entirely. Symlinks are recorded, never followed.
+
+Re-scans are incremental: a directory whose mtime and .gitignore are
+unchanged keeps its stored entries without being listed again, so only the
+directories themselves are stat'ed. In-place edits do not touch the
+directory mtime, so such files keep their stored size/mtime until a
+`full` scan; consumers that need fresh stats (e.g. the import graph) stat
+the files themselves.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+import fnmatch
+import os
+import re
+import stat as stat_module
+import time
+
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from workspace.db.models import FileInventoryEntry
+from workspace.wms.constants import REPOS
+from workspace.wms.mapping_rules import glob_to_regex
+
+# Never recorded or descended
+ALWAYS_SKIP = {".git"}
+
+# Directories handed to a worker thread at once
+VISIT_BATCH = 64
+
+# (kind, size, mtime_ns, inode, ignored)
+_Stat = Tuple[str, int, int, int, bool]
+
+
+class InventoryFile(NamedTuple):
+    """One inventory row."""
+    repo: str
+    path: str
+    size: int
+    mtime_ns: int
+    ext: str
+    kind: str
+    ignored: bool
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def workspace_path(self) -> str:
+        """Path relative to the workspace root."""
+        return "/".join(part for part in (self.repo, self.path) if part)
+
+
+class InventoryChanges(NamedTuple):
+    """Entries written by FileInventory.refresh()."""
+    added: List[InventoryFile]
+    updated: List[InventoryFile]
+    removed: List[InventoryFile]  # As stored before the refresh
+
+
+class GitIgnore:
+    """Ignore rules in effect in one directory: its own .gitignore after its parents'."""
+
+    def __init__(self, rules: Tuple[Tuple[Pattern, bool, bool], ...] = ()):
+        self.rules = rules  # (regex over the workspace-relative path, negated, directories only)
+
+    def child(self, base: str, text: str) -> "GitIgnore":
+        """Rules for a directory `base` (workspace-relative) with .gitignore contents `text`."""
+        rules = list(self.rules)
+        prefix = re.escape(f"{base}/") if base else ""
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            # A slash at the start or in the middle anchors the pattern to this directory
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            if anchored:
+                regex = prefix + glob_to_regex(line)
+            else:
+                regex = prefix + "(?:.*/)?" + glob_to_regex(line)
+            rules.append((re.compile(regex), negated, dir_only))
+        return GitIgnore(tuple(rules))
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        result = False
+        for regex, negated, dir_only in self.rules:
+            if (is_dir or not dir_only) and regex.fullmatch(rel):
+                result = not negated
+        return result
+
+
+def split_workspace_path(rel: str) -> Tuple[str, str]:
+    """(repo, path) for a workspace-relative path; repo is '' outside the four repos."""
+    head, _, tail = rel.partition("/")
+    if head in REPOS:
+        return head, tail
+    return "", rel
+
+
+def _scope(rel: str, subtree: bool) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    WHERE clause over file_inventory for directory `rel`.
+
+    subtree=False selects the directory itself and its direct children,
+    subtree=True everything below it. Both are (repo, path) primary key ranges.
+    """
+    repo, path = split_workspace_path(rel)
+    if not rel:
+        if subtree:
+            return "NOT (repo = '' AND path = '')", ()
+        return "(repo = '' AND instr(path, '/') = 0) OR (repo != '' AND path = '')", ()
+    if not path:
+        if subtree:
+            return "repo = ? AND path != ''", (repo,)
+        return "repo = ? AND instr(path, '/') = 0", (repo,)
+    if subtree:
+        return "repo = ? AND path > ? AND path < ?", (repo, f"{path}/", f"{path}0")
+    return (
+        "repo = ? AND (path = ? OR (path > ? AND path < ? AND instr(substr(path, ?), '/') = 0))",
+        (repo, path, f"{path}/", f"{path}0", len(path) + 2),
+    )
+
+
+def _kind(mode: int) -> str:
+    if stat_module.S_ISLNK(mode):
+        return "symlink"
+    if stat_module.S_ISDIR(mode):
+        return "dir"
+    if stat_module.S_ISREG(mode):
+        return "file"
+    return "other"
+
+
+def _inventory_file(rel: str, entry: _Stat) -> InventoryFile:
+    kind, size, mtime_ns, _inode, ignored = entry
+    repo, path = split_workspace_path(rel)
+    return InventoryFile(repo, path, size, mtime_ns, _ext(path) if kind != "dir" else "", kind, ignored)
+
+
+def _ext(rel: str) -> str:
+    name = rel.rsplit("/", 1)[-1]
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot > 0 else ""
+
+
+class _Visit(NamedTuple):
+    rel: str  # Workspace-relative ('' for the root)
+    ignore: GitIgnore  # Rules of the parent directory
+    force: bool  # List the directory even if its mtime is unchanged
+
+
+class FileInventory:
+    """Maintains file_inventory and answers file queries from it."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        workers: int = 8,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory to inventory (contains the repos)
+            workers: Threads listing directories
+            progress: Called with a short message when the scan is done
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.workers = max(1, workers)
+        self.progress = progress
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def scan(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Bring file_inventory up to date with the disk.
+
+        Args:
+            full: List every directory and stat every entry again
+
+        Returns:
+            Dict with entries, dirs_stated, dirs_listed, added, updated,
+            removed and seconds
+        """
+        started = time.monotonic()
+        with self.engine.connect() as conn:
+            stored, children = self._load(conn)
+        current, counts = self._walk([_Visit("", GitIgnore(), full)], stored, children, full)
+
+        added = [rel for rel in current if rel not in stored]
+        updated = [rel for rel, entry in current.items() if rel in stored and stored[rel] != entry]
+        removed = [rel for rel in stored if rel not in current]
+        self._write(current, added + updated, removed)
+
+        result = {
+            "entries": len(current),
+            **counts,
+            "added": len(added),
+            "updated": len(updated),
+            "removed": len(removed),
+            "seconds": round(time.monotonic() - started, 2),
+        }
+        if self.progress:
+            self.progress(f"{result['entries']:,} entries, {counts['dirs_listed']:,} of "
+                          f"{counts['dirs_stated']:,} directories listed")
+        return result
+
+    def refresh(self, dirs: Iterable[str] = (), files: Iterable[str] = ()) -> InventoryChanges:
+        """
+        Update only the given directories and files (e.g. after watcher events).
+
+        Each directory is listed again. Subdirectories it already had keep
+        their stored subtree; new ones are walked in full, and vanished or
+        newly ignored ones lose theirs. A changed .gitignore re-lists the
+        subtree it governs, including one edited in place and passed in
+        `files`. Directories that no longer exist are handled by
+        their nearest existing ancestor. Files are re-stat'ed in place.
+
+        Args:
+            dirs: Workspace-relative directories whose listing changed
+            files: Workspace-relative files whose content or metadata changed
+
+        Returns:
+            InventoryChanges with the entries written
+        """
+        rules: Dict[str, Optional[GitIgnore]] = {}
+        files = set(files)
+        # An edited .gitignore changes what its directory's subtree ignores
+        dirs = set(dirs) | {rel.rpartition("/")[0] for rel in files if rel.rpartition("/")[2] == ".gitignore"}
+        targets = set()
+        for rel in dirs:
+            while rel and not self._is_dir(rel):
+                rel = rel.rpartition("/")[0]
+            targets.add(rel)
+        # Parents first, so a directory's own listing overrides the stored entry its parent kept
+        targets = sorted(targets, key=lambda rel: (rel.count("/") + bool(rel), rel))
+
+        before: Dict[str, _Stat] = {}
+        after: Dict[str, _Stat] = {}
+        walked_roots: List[str] = []
+        with self.engine.connect() as conn:
+            for rel in targets:
+                if any(rel == root or rel.startswith(f"{root}/") for root in walked_roots):
+                    continue  # Already walked in full below an earlier target
+                ignore = self._parent_rules(rel, rules)
+                if ignore is None:
+                    continue  # Ignored: nothing below it is inventoried
+                stored, _ = self._load(conn, *_scope(rel, subtree=False))
+                entries, subdirs, _ = self._visit(_Visit(rel, ignore, False), stored, {}, True)
+                if not entries:
+                    continue  # Vanished meanwhile; its parent's events cover it
+
+                walk = []
+                for visit in subdirs:
+                    known = stored.get(visit.rel)
+                    if visit.force or known is None or known[0] != "dir" or known[4]:
+                        walk.append(visit)
+                    else:
+                        entries[visit.rel] = known  # Kept up to date by its own events
+                walked = {visit.rel for visit in walk}
+                walked_roots.extend(walked)
+                sub_stored: Dict[str, _Stat] = {}
+                sub_children: Dict[str, List[str]] = {}
+                for child, known in stored.items():
+                    if child == rel or known[0] != "dir" or known[4]:
+                        continue
+                    current = entries.get(child)
+                    if child in walked or current is None or current[0] != "dir" or current[4]:
+                        found, found_children = self._load(conn, *_scope(child, subtree=True))
+                        sub_stored.update(found)
+                        for parent, names in found_children.items():
+                            sub_children.setdefault(parent, []).extend(names)
+                if walk:
+                    sub_stored.update({child: stored[child] for child in walked if child in stored})
+                    entries.update(self._walk(walk, sub_stored, sub_children, False)[0])
+                before.update(stored)
+                before.update(sub_stored)
+                after.update(entries)
+
+            # Files edited in place: a new stat, same ignore status
+            listed = set(after)
+            for rel in files - listed:
+                repo, path = split_workspace_path(rel)
+                stored, _ = self._load(conn, "repo = ? AND path = ?", (repo, path))
+                current = self._stat_entry(rel)
+                if rel in stored and current is not None:
+                    before[rel] = stored[rel]
+                    after[rel] = current[:4] + (stored[rel][4],)
+
+        added = [rel for rel in after if rel not in before]
+        updated = [rel for rel, entry in after.items() if rel in before and before[rel] != entry]
+        removed = [rel for rel in before if rel not in after]
+        self._write(after, added + updated, removed)
+        return InventoryChanges(
+            added=[_inventory_file(rel, after[rel]) for rel in added],
+            updated=[_inventory_file(rel, after[rel]) for rel in updated],
+            removed=[_inventory_file(rel, before[rel]) for rel in removed],
+        )
+
+    def _is_dir(self, rel: str) -> bool:
+        entry = self._stat_entry(rel)
+        return entry is not None and entry[0] == "dir"
+
+    def _parent_rules(self, rel: str, rules: Dict[str, Optional[GitIgnore]]) -> Optional[GitIgnore]:
+        """Ignore rules of rel's parent, or None when rel is ignored or lies in an ignored directory."""
+        if not rel:
+            return GitIgnore()
+        parent, _, name = rel.rpartition("/")
+        if name in ALWAYS_SKIP:
+            return None
+        ignore = self._dir_rules(parent, rules)
+        if ignore is None or ignore.ignored(rel, True):
+            return None
+        return ignore
+
+    def _dir_rules(self, rel: str, rules: Dict[str, Optional[GitIgnore]]) -> Optional[GitIgnore]:
+        """Ignore rules in effect inside directory rel (its own .gitignore included)."""
+        if rel not in rules:
+            ignore = self._parent_rules(rel, rules)
+            if ignore is not None:
+                text = self._read_gitignore(rel)
+                if text is not None:
+                    ignore = ignore.child(rel, text)
+            rules[rel] = ignore
+        return rules[rel]
+
+    def _load(self, conn, where: str = "", params: Sequence[Any] = ()) -> Tuple[Dict[str, _Stat], Dict[str, List[str]]]:
+        """Stored entries (all, or those matching `where`) and their parent -> children index."""
+        stored: Dict[str, _Stat] = {}
+        children: Dict[str, List[str]] = {}
+        # Raw cursor: a full scan loads every row of the table
+        rows = conn.connection.driver_connection.execute(
+            "SELECT repo, path, kind, size, mtime_ns, inode, ignored FROM file_inventory"
+            + (f" WHERE {where}" if where else ""),
+            tuple(params),
+        ).fetchall()
+        for repo, path, kind, size, mtime_ns, inode, ignored in rows:
+            rel = f"{repo}/{path}" if repo and path else repo or path
+            stored[rel] = (kind, size, mtime_ns, inode, bool(ignored))
+            if rel:
+                children.setdefault(rel.rpartition("/")[0], []).append(rel)
+        return stored, children
+
+    def _walk(
+        self,
+        roots: List[_Visit],
+        stored: Dict[str, _Stat],
+        children: Dict[str, List[str]],
+        full: bool
+    ) -> Tuple[Dict[str, _Stat], Dict[str, int]]:
+        """Visit the trees below `roots` in the thread pool; returns their current entries."""
+        current: Dict[str, _Stat] = {}
+        counts = {"dirs_stated": 0, "dirs_listed": 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._visit_many, roots, stored, children, full)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entries, subdirs, stated, listed = future.result()
+                    current.update(entries)
+                    counts["dirs_stated"] += stated
+                    counts["dirs_listed"] += listed
+                    # Batches keep the per-task overhead low when most directories are unchanged
+                    for start in range(0, len(subdirs), VISIT_BATCH):
+                        batch = subdirs[start:start + VISIT_BATCH]
+                        pending.add(pool.submit(self._visit_many, batch, stored, children, full))
+        return current, counts
+
+    def _visit_many(
+        self,
+        visits: List[_Visit],
+        stored: Dict[str, _Stat],
+        children: Dict[str, List[str]],
+        full: bool
+    ) -> Tuple[Dict[str, _Stat], List[_Visit], int, int]:
+        entries: Dict[str, _Stat] = {}
+        subdirs: List[_Visit] = []
+        listed = 0
+        for visit in visits:
+            found, below, was_listed = self._visit(visit, stored, children, full)
+            entries.update(found)
+            subdirs.extend(below)
+            listed += was_listed
+        return entries, subdirs, len(visits), listed
+
+    def _visit(
+        self,
+        visit: _Visit,
+        stored: Dict[str, _Stat],
+        children: Dict[str, List[str]],
+        full: bool
+    ) -> Tuple[Dict[str, _Stat], List[_Visit], int]:
+        """Stat one (non-ignored) directory and list it if it changed; runs in a worker thread."""
+        rel = visit.rel
+        abs_path = os.path.join(self.workspace_root, rel) if rel else str(self.workspace_root)
+        try:
+            st = os.stat(abs_path, follow_symlinks=False)
+        except OSError:
+            return {}, [], 0
+        entries: Dict[str, _Stat] = {rel: ("dir", st.st_size, st.st_mtime_ns, st.st_ino, False)}
+
+        previous = stored.get(rel)
+        unchanged = not full and previous is not None and previous[2] == st.st_mtime_ns
+
+        # A new or deleted .gitignore changes the directory mtime; edits in place only its own
+        gitignore_rel = f"{rel}/.gitignore" if rel else ".gitignore"
+        gitignore = None
+        if not unchanged or gitignore_rel in stored:
+            gitignore = self._stat_entry(gitignore_rel)
+        ignore = visit.ignore
+        if gitignore is not None:
+            text = self._read_gitignore(rel)
+            if text is not None:
+                ignore = ignore.child(rel, text)
+        # Changed ignore rules can flip entries anywhere below, so list the whole subtree
+        known = stored.get(gitignore_rel)
+        force = visit.force or (gitignore[:4] if gitignore else None) != (known[:4] if known else None)
+
+        if unchanged and not force:
+            # Same listing as last time: keep the stored entries, descend into subdirectories
+            subdirs = []
+            for child in children.get(rel, ()):
+                entry = stored[child]
+                if entry[0] == "dir" and not entry[4]:
+                    subdirs.append(_Visit(child, ignore, False))
+                else:
+                    entries[child] = entry
+            return entries, subdirs, 0
+
+        subdirs = []
+        try:
+            with os.scandir(abs_path) as listing:
+                for item in listing:
+                    if item.name in ALWAYS_SKIP:
+                        continue
+                    child = f"{rel}/{item.name}" if rel else item.name
+                    try:
+                        child_stat = item.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    kind = _kind(child_stat.st_mode)
+                    is_ignored = ignore.ignored(child, kind == "dir")
+                    if kind == "dir" and not is_ignored:
+                        subdirs.append(_Visit(child, ignore, force))
+                        continue
+                    entries[child] = (kind, child_stat.st_size, child_stat.st_mtime_ns, child_stat.st_ino, is_ignored)
+        except OSError:
+            pass
+        return entries, subdirs, 1
+
+    def _read_gitignore(self, rel: str) -> Optional[str]:
+        path = os.path.join(self.workspace_root, rel, ".gitignore")
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _stat_entry(self, rel: str) -> Optional[_Stat]:
+        try:
+            st = os.stat(os.path.join(self.workspace_root, rel), follow_symlinks=False)
+        except OSError:
+            return None
+        return (_kind(st.st_mode), st.st_size, st.st_mtime_ns, st.st_ino, False)
+
+    def _write(self, current: Dict[str, _Stat], changed: List[str], removed: List[str]):
+        if not changed and not removed:
+            return
+        rows = []
+        for rel in changed:
+            kind, size, mtime_ns, inode, ignored = current[rel]
+            repo, path = split_workspace_path(rel)
+            rows.append({
+                "repo": repo, "path": path, "size": size, "mtime_ns": mtime_ns, "inode": inode,
+                "ext": _ext(path) if kind != "dir" else "", "kind": kind, "ignored": ignored,
+            })
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                if rows:
+                    stmt = sqlite_insert(FileInventoryEntry)
+                    conn.execute(stmt.on_conflict_do_update(
+                        index_elements=[FileInventoryEntry.repo, FileInventoryEntry.path],
+                        set_={column: stmt.excluded[column]
+                              for column in ("size", "mtime_ns", "inode", "ext", "kind", "ignored")},
+                    ), rows)
+                if removed:
+                    conn.execute(
+                        delete(FileInventoryEntry).where(
+                            FileInventoryEntry.repo == bindparam("b_repo"),
+                            FileInventoryEntry.path == bindparam("b_path"),
+                        ),
+                        [dict(zip(("b_repo", "b_path"), split_workspace_path(rel))) for rel in removed],
+                    )
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def files(
+        self,
+        repos: Optional[Sequence[str]] = None,
+        exts: Optional[Sequence[str]] = None,
+        name: Optional[str] = None,
+        include_ignored: bool = False,
+        kinds: Sequence[str] = ("file",)
+    ) -> List[InventoryFile]:
+        """
+        Inventory entries, by default the non-ignored regular files.
+
+        Args:
+            repos: Only these repos ('' for the workspace root outside them)
+            exts: Only these extensions (".py"; case-insensitive)
+            name: fnmatch pattern for the file name ("ADR-001*.md")
+            include_ignored: Also return entries matched by a .gitignore
+            kinds: Entry kinds (file, dir, symlink, other)
+        """
+        query = select(
+            FileInventoryEntry.repo, FileInventoryEntry.path, FileInventoryEntry.size,
+            FileInventoryEntry.mtime_ns, FileInventoryEntry.ext, FileInventoryEntry.kind,
+            FileInventoryEntry.ignored,
+        ).where(FileInventoryEntry.kind.in_(list(kinds)))
+        if repos is not None:
+            query = query.where(FileInventoryEntry.repo.in_(list(repos)))
+        if exts is not None:
+            query = query.where(FileInventoryEntry.ext.in_([ext.lower() for ext in exts]))
+        if not include_ignored:
+            query = query.where(FileInventoryEntry.ignored.is_(False))
+        with self.engine.connect() as conn:
+            found = [InventoryFile(*row[:6], bool(row[6])) for row in conn.execute(query)]
+        if name is not None:
+            found = [f for f in found if fnmatch.fnmatchcase(f.name, name)]
+        return found
+
+    def path(self, entry: InventoryFile) -> Path:
+        """Absolute path of an inventory entry."""
+        return self.workspace_root / entry.workspace_path
+
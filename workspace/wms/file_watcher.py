@@ -0,0 +1,414 @@
+"""
+File Watcher - Keeps file_inventory and unregistered-file state current from inotify events.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Answer "which files are unregistered" from state that is already current
+DOMAIN: Cross-repo workspace management
+
+Linux only. The kernel's inotify API is called through libc with ctypes, so no
+watch service or extra package is needed. Every non-ignored directory in
+file_inventory gets a watch. Events only mark directories to re-list
+(create/delete/move) and files to re-stat (close_write/attrib). A batch is
+applied once no event has arrived for `debounce` seconds, or `max_delay`
+after its first event:
+
+1. FileInventory.refresh() re-lists the marked directories (one transaction).
+2. New directories get watches and are re-listed once more, which catches
+   files created before their watch existed; watches of removed or newly
+   ignored directories are dropped.
+3. One transaction records added unmapped files as UnregisteredFile, marks
+   removed ones 'removed', and sets/clears CodeComponentMapping.missing_since.
+4. The coverage counts are updated (CoverageTracker.update()).
+
+On start, and after a kernel queue overflow, the inventory is re-scanned and
+each repo reconciled in full. The database's own files are never watched for,
+so the watcher's writes do not wake it up.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import ctypes
+import ctypes.util
+import errno
+import fcntl
+import logging
+import os
+import select
+import struct
+import time
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from workspace.db import atomic
+from workspace.wms.architecture_validator import ArchitectureValidator
+from workspace.wms.constants import REPOS
+from workspace.wms.coverage import CoverageTracker
+from workspace.wms.file_inventory import FileInventory, InventoryChanges, InventoryFile
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Events that change a directory listing vs. a file's stat
+LISTING_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+CONTENT_EVENTS = IN_CLOSE_WRITE | IN_ATTRIB
+WATCH_MASK = LISTING_EVENTS | CONTENT_EVENTS | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+
+LOCK_FILE = ".wms-watch.lock"
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; followed by the NUL-padded name
+
+
+class WatcherError(Exception):
+    """The watcher cannot start or keep running."""
+
+
+class Inotify:
+    """Minimal ctypes binding of inotify_init1/inotify_add_watch/inotify_rm_watch."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            self._libc.inotify_init1.argtypes = [ctypes.c_int]
+            self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError) as e:
+            raise WatcherError(f"inotify is not available ({e}); the watcher needs Linux") from e
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise WatcherError(f"inotify_init1 failed: {os.strerror(err)}")
+        self._poll = select.poll()
+        self._poll.register(self.fd, select.POLLIN)
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Watch descriptor for path (the existing one if the inode is already watched)."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        # EINVAL: the kernel already dropped it (directory deleted)
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: Optional[float]) -> List[Tuple[int, int, str]]:
+        """(wd, mask, name) events, waiting up to timeout seconds (None: forever)."""
+        if not self._poll.poll(None if timeout is None else max(0, int(timeout * 1000))):
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WorkspaceWatcher:
+    """Applies inotify events to file_inventory, UnregisteredFile and mapping staleness."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory containing the repos
+            debounce: Seconds without events before a batch is applied
+            max_delay: Longest a batch waits under a steady stream of events
+            progress: Called with a one-line summary of each applied batch
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root).resolve()
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.progress = progress
+        self.inventory = FileInventory(engine, self.workspace_root)
+        self.coverage = CoverageTracker(engine)
+        self._session_factory = sessionmaker(bind=engine)
+        self._inotify: Optional[Inotify] = None
+        self._paths: Dict[int, str] = {}  # wd -> workspace-relative directory
+        self._wds: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._touched: Set[str] = set()
+        self._overflow = False
+        self._watch_limit_hit = False
+        self._skip = self._database_files() | {LOCK_FILE}
+
+    def _database_files(self) -> Set[str]:
+        """Workspace-relative paths of the database and its journals."""
+        database = self.engine.url.database
+        if not database or database == ":memory:":
+            return set()
+        path = Path(database).resolve()
+        try:
+            rel = path.relative_to(self.workspace_root).as_posix()
+        except ValueError:
+            return set()
+        return {rel + suffix for suffix in ("", "-wal", "-shm", "-journal")}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def run(self, stop: Optional[Callable[[], bool]] = None):
+        """
+        Watch until stop() returns True (checked after every wait) or forever.
+
+        Raises:
+            WatcherError: inotify unavailable or another watcher already runs
+        """
+        lock = self._lock()
+        try:
+            self.start()
+            pending_since: Optional[float] = time.monotonic() if self._dirty else None
+            last_event = pending_since or 0.0
+            while stop is None or not stop():
+                timeout = None
+                if pending_since is not None:
+                    now = time.monotonic()
+                    timeout = min(last_event + self.debounce, pending_since + self.max_delay) - now
+                    if timeout <= 0:
+                        self.flush()
+                        pending_since = None
+                        if self._dirty:
+                            # Directories that just got watches are re-listed once more
+                            pending_since = last_event = time.monotonic()
+                        continue
+                elif stop is not None:
+                    timeout = 1.0
+                if self._handle(self._inotify.read(timeout)):
+                    last_event = time.monotonic()
+                    if pending_since is None:
+                        pending_since = last_event
+        finally:
+            self.close()
+            os.close(lock)
+
+    def _lock(self) -> int:
+        path = self.workspace_root / LOCK_FILE
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            raise WatcherError(f"another watcher holds {path}")
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        return fd
+
+    def start(self) -> Dict[str, int]:
+        """Scan the inventory, reconcile every repo and watch every non-ignored directory."""
+        self._inotify = self._inotify or Inotify()
+        # Known directories are watched before the scan so nothing changes unseen in between;
+        # ones the scan finds are re-listed after they get their watch
+        self._watch(["", *self._inventoried_dirs()])
+        result = self.inventory.scan()
+        self._dirty.update(self._watch(self._inventoried_dirs()))
+        self._reconcile()
+        self.coverage.update()
+        if self.progress:
+            self.progress(f"watching {len(self._wds):,} directories, {result['entries']:,} entries")
+        return result
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._paths.clear()
+        self._wds.clear()
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def _handle(self, events: List[Tuple[int, int, str]]) -> bool:
+        """Record what events invalidate; True when something needs applying."""
+        relevant = False
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self._overflow = relevant = True
+                continue
+            if mask & IN_IGNORED:
+                rel = self._paths.pop(wd, None)
+                if rel is not None and self._wds.get(rel) == wd:
+                    del self._wds[rel]
+                continue
+            parent = self._paths.get(wd)
+            if parent is None or not name:
+                continue
+            rel = f"{parent}/{name}" if parent else name
+            if rel in self._skip:
+                continue
+            if mask & LISTING_EVENTS:
+                self._dirty.add(parent)
+                relevant = True
+            elif mask & CONTENT_EVENTS and not mask & IN_ISDIR:
+                self._touched.add(rel)
+                relevant = True
+        return relevant
+
+    def flush(self) -> Optional[InventoryChanges]:
+        """Apply the collected events."""
+        started = time.monotonic()
+        dirty, touched = self._dirty, self._touched
+        self._dirty, self._touched = set(), set()
+        if self._overflow:
+            self._overflow = False
+            logger.warning("inotify queue overflowed; rescanning the workspace")
+            self.start()
+            return None
+        if not dirty and not touched:
+            return None
+
+        changes = self.inventory.refresh(dirty, touched)
+        gone = [entry for entry in changes.removed if entry.kind == "dir"]
+        gone += [entry for entry in changes.updated if entry.kind == "dir" and entry.ignored]
+        self._unwatch(entry.workspace_path for entry in gone)
+        new = [
+            entry.workspace_path
+            for entry in changes.added + changes.updated
+            if entry.kind == "dir" and not entry.ignored and entry.workspace_path not in self._wds
+        ]
+        self._dirty.update(self._watch(new))
+        counts = self._apply(changes)
+        self.coverage.update()
+
+        if self.progress and (changes.added or changes.updated or changes.removed):
+            self.progress(
+                f"{len(changes.added)} added, {len(changes.updated)} updated, {len(changes.removed)} removed; "
+                f"{counts['unregistered']} unregistered, {counts['retired']} retired, "
+                f"{counts['missing']} mapping(s) missing, {counts['restored']} restored "
+                f"({time.monotonic() - started:.2f}s)"
+            )
+        return changes
+
+    def _inventoried_dirs(self) -> List[str]:
+        return [entry.workspace_path for entry in self.inventory.files(kinds=("dir",))]
+
+    def _watch(self, rels: Iterable[str]) -> List[str]:
+        """Add watches; returns the directories that got a new one."""
+        added = []
+        for rel in rels:
+            if rel in self._wds:
+                continue
+            try:
+                wd = self._inotify.add_watch(os.path.join(self.workspace_root, rel))
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    if not self._watch_limit_hit:
+                        self._watch_limit_hit = True
+                        logger.warning("inotify watch limit reached at %s directories; raise "
+                                       "fs.inotify.max_user_watches to watch the rest", len(self._wds))
+                elif e.errno not in (errno.ENOENT, errno.ENOTDIR):
+                    logger.warning("cannot watch %s: %s", rel or ".", e)
+                continue
+            stale = self._paths.get(wd)
+            if stale is not None and self._wds.get(stale) == wd:
+                del self._wds[stale]  # Same inode, moved
+            self._paths[wd] = rel
+            self._wds[rel] = wd
+            added.append(rel)
+        return added
+
+    def _unwatch(self, rels: Iterable[str]):
+        for rel in rels:
+            prefix = f"{rel}/"
+            for watched in [w for w in self._wds if w == rel or w.startswith(prefix)]:
+                wd = self._wds.pop(watched)
+                self._paths.pop(wd, None)
+                self._inotify.rm_watch(wd)
+
+    # ------------------------------------------------------------------
+    # Registration state
+    # ------------------------------------------------------------------
+
+    def _apply(self, changes: InventoryChanges) -> Dict[str, int]:
+        """One transaction for the unregistered-file and mapping updates of a batch."""
+        by_repo: Dict[str, Dict[str, List[str]]] = {}
+
+        def collect(entries: List[InventoryFile], key: str):
+            for entry in entries:
+                if not entry.repo or entry.ignored or not entry.path:
+                    continue
+                kind = "dirs" if entry.kind == "dir" else "files"
+                by_repo.setdefault(entry.repo, {}).setdefault(f"{key}_{kind}", []).append(entry.path)
+
+        collect(changes.added, "added")
+        collect(changes.removed, "removed")
+        totals = {"unregistered": 0, "retired": 0, "missing": 0, "restored": 0}
+        if not by_repo:
+            return totals
+        session = self._session_factory()
+        try:
+            validator = ArchitectureValidator(session, self.workspace_root)
+            with atomic(session):
+                for repo, paths in by_repo.items():
+                    counts = validator.apply_file_events(
+                        repo,
+                        added=paths.get("added_files", ()),
+                        removed=paths.get("removed_files", ()),
+                        added_dirs=paths.get("added_dirs", ()),
+                        removed_dirs=paths.get("removed_dirs", ()),
+                    )
+                    for key in totals:
+                        totals[key] += counts[key]
+        finally:
+            session.close()
+        return totals
+
+    def _reconcile(self) -> Dict[str, int]:
+        """Reconcile every repo present on disk with the inventory."""
+        present = {entry.repo for entry in self.inventory.files(kinds=("dir",)) if entry.repo and not entry.path}
+        totals = {"unregistered": 0, "retired": 0, "missing": 0, "restored": 0}
+        session = self._session_factory()
+        try:
+            validator = ArchitectureValidator(session, self.workspace_root)
+            with atomic(session):
+                for repo in REPOS:
+                    if repo not in present:
+                        continue
+                    entries = self.inventory.files(repos=[repo], kinds=("file", "dir"))
+                    counts = validator.reconcile_files(
+                        repo,
+                        files=[e.path for e in entries if e.kind == "file"],
+                        dirs=[e.path for e in entries if e.kind == "dir" and e.path],
+                    )
+                    for key in totals:
+                        totals[key] += counts[key]
+        finally:
+            session.close()
+        return totals
@@ -0,0 +1,440 @@
+"""
+Git History Ingester - Backfill code_changes from the repos' git history.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Record every committed file change with its real change type, line stats, author and message
+DOMAIN: Cross-repo workspace management
+
+For each repo, `git log --raw --numstat` is streamed through a generator
+parser (raw lines give the change type and paths, numstat lines the line
+counts, in the same order). Files are resolved to components through the
+path index and mapping rules, and CodeChange rows are bulk-inserted in
+batches that end on a commit boundary. Every batch commits together with the
+repo's git_ingest_state row, so an interrupted run resumes after the last
+fully ingested commit.
+
+Repos are ingested in parallel worker processes; SQLite serializes their
+(short) batch transactions.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set
+import codecs
+import hashlib
+import logging
+import multiprocessing
+import subprocess
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+from workspace.db.models import CodeChange, GitIngestState
+from workspace.db.workspace_db import WorkspaceDB
+from workspace.wms.constants import REPOS
+from workspace.wms.mapping_rules import MappingRuleMatcher
+from workspace.wms.path_index import ComponentPathIndex
+
+logger = logging.getLogger(__name__)
+
+# Field/record separators for --format (never appear in paths or numstat lines)
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+_END = "\x1d"
+LOG_FORMAT = f"{_RECORD}%H{_FIELD}%an{_FIELD}%aI{_FIELD}%B{_END}"
+
+CHANGE_TYPES = {
+    "A": "added",
+    "C": "added",  # Copy: a new file with the content of another
+    "D": "deleted",
+    "M": "modified",
+    "R": "renamed",
+    "T": "modified",  # Type change (file <-> symlink)
+}
+
+
+class FileChange(NamedTuple):
+    """One file in a commit."""
+    path: str
+    change_type: str  # added, modified, deleted, renamed
+    lines_added: Optional[int]  # None for binary files
+    lines_removed: Optional[int]
+    old_path: Optional[str] = None  # Source path of renames/copies
+
+
+class GitCommit(NamedTuple):
+    """One commit with its file changes."""
+    hash: str
+    author: str
+    authored_at: datetime  # UTC, naive (like the rest of the database)
+    message: str
+    files: List[FileChange]
+
+
+class GitError(Exception):
+    """Git command failed."""
+    pass
+
+
+def git_log_command(since: Optional[str] = None) -> List[str]:
+    """
+    git log invocation for the ingester, oldest commit first.
+
+    --topo-order guarantees parents come before children, so after an
+    interruption "<last ingested>..HEAD" is exactly what is still missing.
+    --relative limits the log to the repo directory and makes paths relative
+    to it (a no-op at the top of a repo).
+    """
+    return [
+        "git", "-c", "core.quotePath=false", "log",
+        "--reverse", "--topo-order", "--no-color", "-M",
+        "--raw", "--numstat", "--no-abbrev", "--relative",
+        f"--format={LOG_FORMAT}",
+        f"{since}..HEAD" if since else "HEAD",
+    ]
+
+
+def _unquote_path(path: str) -> str:
+    """Undo git's C-style quoting of unusual paths ("a\\tb.py" -> a<TAB>b.py)."""
+    if len(path) < 2 or not (path.startswith('"') and path.endswith('"')):
+        return path
+    raw = codecs.escape_decode(path[1:-1].encode("utf-8"))[0]
+    return raw.decode("utf-8", errors="replace")
+
+
+def _parse_raw(line: str) -> tuple:
+    """':100644 100644 <sha> <sha> R087\\told\\tnew' -> (change_type, path, old_path)."""
+    meta, *paths = line.split("\t")
+    status = meta.rsplit(" ", 1)[-1][:1]
+    paths = [_unquote_path(p) for p in paths]
+    if len(paths) > 1:
+        return CHANGE_TYPES.get(status, "modified"), paths[1], paths[0]
+    return CHANGE_TYPES.get(status, "modified"), paths[0], None
+
+
+def _parse_numstat(line: str) -> tuple:
+    """'12\\t3\\tpath' -> (12, 3); binary files ('-\\t-\\tpath') -> (None, None)."""
+    added, removed, _ = line.split("\t", 2)
+    return (
+        int(added) if added.isdigit() else None,
+        int(removed) if removed.isdigit() else None,
+    )
+
+
+def _build_commit(header: str, raws: List[str], numstats: List[str]) -> GitCommit:
+    commit_hash, author, authored_at, message = header.split(_FIELD, 3)
+    when = datetime.fromisoformat(authored_at).astimezone(timezone.utc).replace(tzinfo=None)
+    # Both sections list the commit's diff queue in the same order
+    stats = [_parse_numstat(n) for n in numstats] if len(numstats) == len(raws) else [(None, None)] * len(raws)
+    files = []
+    for raw, (added, removed) in zip(raws, stats):
+        change_type, path, old_path = _parse_raw(raw)
+        files.append(FileChange(path, change_type, added, removed, old_path))
+    return GitCommit(commit_hash, author, when, message.strip(), files)
+
+
+def parse_git_log(lines: Iterable[str]) -> Iterator[GitCommit]:
+    """
+    Parse the output of git_log_command() line by line.
+
+    Yields each commit as soon as the next one starts, so memory use does not
+    grow with the length of the history.
+    """
+    header = None
+    raws: List[str] = []
+    numstats: List[str] = []
+    in_header = False
+    for line in lines:
+        line = line.rstrip("\n")
+        if in_header:
+            header += "\n" + line
+            if line.endswith(_END):
+                header = header[:-1]
+                in_header = False
+            continue
+        if line.startswith(_RECORD):
+            if header is not None:
+                yield _build_commit(header, raws, numstats)
+            header, raws, numstats = line[1:], [], []
+            if header.endswith(_END):
+                header = header[:-1]
+            else:
+                in_header = True
+        elif line.startswith(":"):
+            raws.append(line)
+        elif line:
+            numstats.append(line)
+    if header is not None:
+        yield _build_commit(header, raws, numstats)
+
+
+def change_id(repo: str, commit_hash: str, file_path: str) -> str:
+    """Deterministic CodeChange id, so re-ingesting a commit never duplicates rows."""
+    digest = hashlib.sha1(f"{repo}:{commit_hash}:{file_path}".encode("utf-8")).hexdigest()
+    return f"change-git-{digest[:24]}"
+
+
+class GitHistoryIngester:
+    """Backfills code_changes from git history, resumable per repo."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        batch_size: int = 2000,
+        progress: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory containing the repos
+            batch_size: CodeChange rows per transaction (rounded up to whole commits)
+            progress: Called as progress(repo, commits, changes) after each batch
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.batch_size = batch_size
+        self.progress = progress
+        self.path_index = ComponentPathIndex.for_engine(engine)
+        self.mapping_rules = MappingRuleMatcher.for_engine(engine)
+
+    def ingest(
+        self,
+        repos: Optional[Sequence[str]] = None,
+        workers: int = 4,
+        full: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Ingest new history of several repos in parallel.
+
+        Each repo runs in its own worker process (parsing and row building are
+        CPU-bound Python, so threads would serialize on the GIL); their batch
+        transactions interleave on the database. Per-batch progress is only
+        reported when ingesting in this process (workers=1).
+
+        Args:
+            repos: Repo names under workspace_root (default: all Meridian repos)
+            workers: Repos ingested at the same time
+            full: Ignore the resume points and walk the whole history again
+                  (rows that already exist are skipped)
+
+        Returns:
+            One result dict per repo (see ingest_repo)
+        """
+        repos = repos or REPOS
+        workers = max(1, min(workers, len(repos)))
+        if workers == 1:
+            return [self._ingest_safely(repo, full) for repo in repos]
+
+        db_path = str(Path(self.engine.url.database).resolve())
+        # spawn: forked children would inherit the parent's SQLite connections
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(_ingest_in_worker, db_path, str(self.workspace_root), repo, full, self.batch_size)
+                for repo in repos
+            ]
+            return [future.result() for future in futures]
+
+    def _ingest_safely(self, repo: str, full: bool) -> Dict[str, Any]:
+        try:
+            return self.ingest_repo(repo, full=full)
+        except GitError as e:
+            logger.error(f"History ingest failed for {repo}: {e}")
+            return {"repo": repo, "status": "error", "error": str(e), "commits": 0, "changes": 0}
+
+    def ingest_repo(self, repo: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Ingest the history of one repo from its resume point up to HEAD.
+
+        Returns:
+            Dict with repo, status (ingested, up_to_date, missing, not_a_repo,
+            empty), commits, changes, last_commit and seconds
+        """
+        started = time.monotonic()
+        repo_path = self.workspace_root / repo
+        result = {"repo": repo, "status": "ingested", "commits": 0, "changes": 0, "last_commit": None}
+        if not repo_path.exists():
+            return {**result, "status": "missing"}
+        if self._git(repo_path, "rev-parse", "--is-inside-work-tree", check=False) != "true":
+            return {**result, "status": "not_a_repo"}
+        head = self._git(repo_path, "rev-parse", "--verify", "--quiet", "HEAD", check=False)
+        if not head:
+            return {**result, "status": "empty"}
+        branch = self._git(repo_path, "rev-parse", "--abbrev-ref", "HEAD")
+        branch = None if branch == "HEAD" else branch  # Detached HEAD
+
+        since = None if full else self._resume_point(repo, repo_path)
+        if since == head:
+            return {**result, "status": "up_to_date", "last_commit": head}
+
+        with self.engine.connect() as conn:
+            if since is None:
+                # Walking the whole history: totals are rebuilt from scratch
+                conn.execute(GitIngestState.__table__.delete().where(GitIngestState.repo == repo))
+            process = subprocess.Popen(
+                git_log_command(since),
+                cwd=repo_path,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+            finished = False
+            try:
+                batch: List[GitCommit] = []
+                pending = 0
+                for commit in parse_git_log(process.stdout):
+                    batch.append(commit)
+                    pending += len(commit.files)
+                    if pending >= self.batch_size:
+                        result["changes"] += self._write_batch(conn, repo, branch, batch)
+                        result["commits"] += len(batch)
+                        result["last_commit"] = batch[-1].hash
+                        batch, pending = [], 0
+                        if self.progress:
+                            self.progress(repo, result["commits"], result["changes"])
+                if batch:
+                    result["changes"] += self._write_batch(conn, repo, branch, batch)
+                    result["commits"] += len(batch)
+                    result["last_commit"] = batch[-1].hash
+                finished = True
+            finally:
+                if not finished:
+                    process.kill()
+                process.stdout.close()
+                stderr = process.stderr.read()
+                process.stderr.close()
+                process.wait()
+            if process.returncode != 0:
+                raise GitError(f"git log in {repo_path} exited with {process.returncode}: {stderr.strip()}")
+
+        if result["commits"] == 0:
+            result["status"] = "up_to_date"
+        result["seconds"] = round(time.monotonic() - started, 2)
+        return result
+
+    def _resume_point(self, repo: str, repo_path: Path) -> Optional[str]:
+        """Last ingested commit, if it is still part of HEAD's history."""
+        with self.engine.connect() as conn:
+            last_commit = conn.execute(
+                GitIngestState.__table__.select()
+                .with_only_columns(GitIngestState.last_commit)
+                .where(GitIngestState.repo == repo)
+            ).scalar()
+        if not last_commit:
+            return None
+        try:
+            self._git(repo_path, "merge-base", "--is-ancestor", last_commit, "HEAD")
+        except GitError:
+            # History was rewritten (rebase, force push): walk it all again
+            logger.warning(f"{repo}: {last_commit[:12]} is no longer in HEAD's history, re-ingesting from the start")
+            return None
+        return last_commit
+
+    def _write_batch(self, conn: Connection, repo: str, branch: Optional[str], commits: List[GitCommit]) -> int:
+        """
+        Insert CodeChange rows for whole commits and advance the resume point in one transaction.
+
+        Returns:
+            Number of rows inserted (changes already in code_changes are skipped)
+        """
+        paths = list({f.path for commit in commits for f in commit.files})
+        matches = self.path_index.lookup_many(paths)
+        matches.update(self.mapping_rules.match_many(repo, [p for p, m in matches.items() if m is None]))
+
+        rows = []
+        for commit in commits:
+            for f in commit.files:
+                match = matches[f.path]
+                component_id = match.component_id if match else None
+                rows.append({
+                    "id": change_id(repo, commit.hash, f.path),
+                    "commit_hash": commit.hash,
+                    "repo": repo,
+                    "change_type": f.change_type,
+                    "file_path": f.path,
+                    "component_id": component_id,
+                    "mapping_id": match.mapping_id if match else None,
+                    "is_tracked": component_id is not None,
+                    "is_validated": False,
+                    "validation_status": "untracked" if not component_id else "pending",
+                    "lines_added": f.lines_added,
+                    "lines_removed": f.lines_removed,
+                    "changed_at": commit.authored_at,
+                    "changed_by": commit.author[:100],
+                    "commit_message": commit.message,
+                    "branch": branch,
+                })
+
+        recorded = len(rows)
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            # Changes the validator already recorded for these commits (under other ids)
+            existing = self._existing_changes(conn, repo, [c.hash for c in commits])
+            rows = [r for r in rows if (r["commit_hash"], r["file_path"]) not in existing]
+            inserted = 0
+            if rows:
+                inserted = conn.execute(insert(CodeChange).prefix_with("OR IGNORE"), rows).rowcount
+
+            state = sqlite_insert(GitIngestState).values(
+                repo=repo,
+                branch=branch,
+                last_commit=commits[-1].hash,
+                commits_ingested=len(commits),
+                changes_ingested=recorded,
+                updated_at=datetime.utcnow(),
+            )
+            conn.execute(state.on_conflict_do_update(
+                index_elements=[GitIngestState.repo],
+                set_={
+                    "branch": state.excluded.branch,
+                    "last_commit": state.excluded.last_commit,
+                    "commits_ingested": GitIngestState.commits_ingested + state.excluded.commits_ingested,
+                    "changes_ingested": GitIngestState.changes_ingested + state.excluded.changes_ingested,
+                    "updated_at": state.excluded.updated_at,
+                },
+            ))
+            conn.exec_driver_sql("COMMIT")
+        except Exception:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        return inserted
+
+    @staticmethod
+    def _existing_changes(conn: Connection, repo: str, commit_hashes: List[str], chunk_size: int = 500) -> Set[tuple]:
+        existing = set()
+        table = CodeChange.__table__
+        for i in range(0, len(commit_hashes), chunk_size):
+            chunk = commit_hashes[i:i + chunk_size]
+            existing.update(
+                tuple(row) for row in conn.execute(
+                    table.select()
+                    .with_only_columns(table.c.commit_hash, table.c.file_path)
+                    .where(table.c.commit_hash.in_(chunk), table.c.repo == repo)
+                )
+            )
+        return existing
+
+    @staticmethod
+    def _git(repo_path: Path, *args: str, check: bool = True) -> str:
+        completed = subprocess.run(
+            ["git", *args], cwd=repo_path, capture_output=True, text=True, encoding="utf-8", errors="replace"
+        )
+        if check and completed.returncode != 0:
+            raise GitError(f"git {' '.join(args)} failed in {repo_path}: {completed.stderr.strip()}")
+        return completed.stdout.strip()
+
+
+def _ingest_in_worker(db_path: str, workspace_root: str, repo: str, full: bool, batch_size: int) -> Dict[str, Any]:
+    """Process pool entry point: ingest one repo through a fresh engine."""
+    db = WorkspaceDB(db_path=db_path, workspace_root=Path(workspace_root))
+    try:
+        return GitHistoryIngester(db.engine, Path(workspace_root), batch_size)._ingest_safely(repo, full)
+    finally:
+        db.engine.dispose()
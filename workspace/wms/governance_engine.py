@@ -13,12 +13,14 @@ from sqlalchemy.orm import Session
 
 from workspace.db.models import (
     ArchitectureDecision,
-    ComponentPlacement,
-    ImportRule,
     Violation,
     WorkspaceTask,
 )
 from workspace.wms.architecture_validator import ArchitectureValidator
+from workspace.wms.keyword_rules import KeywordMatcher
+from workspace.wms.placement_rules import PlacementRuleCache
+from workspace.wms.revalidation import TaskFacts, TaskRules
+from workspace.wms.verdict_cache import Verdict, VerdictCache
 from pathlib import Path
 
 
@@ -29,6 +31,9 @@ class GovernanceEngine:
         self.db = db_session
         self.workspace_root = workspace_root or Path.cwd()
         self.architecture_validator = ArchitectureValidator(db_session, self.workspace_root)
+        self.keywords = KeywordMatcher.for_engine(db_session.get_bind())
+        self.placement_rules = PlacementRuleCache.for_engine(db_session.get_bind())
+        self.verdicts = VerdictCache(db_session.get_bind())
     
     def validate_task_placement(self, task: WorkspaceTask, proposed_repo: str) -> List[Violation]:
         """
@@ -43,9 +48,10 @@ class GovernanceEngine:
         """
         violations = []
         
-        # Check component placement rules
-        for rule in self._get_placement_rules():
-            if self._violates_placement(task, proposed_repo, rule):
+        # Check component placement rules (one pass over the text for all of them)
+        task_text = task.title + " " + (task.description or "")
+        for rule in self.placement_rules.mentioned(task_text):
+            if rule.correct_repo and proposed_repo != rule.correct_repo:
                 violations.append(Violation(
                     id=f"viol-{task.id}-{len(violations)+1}",
                     task_id=task.id,
@@ -77,27 +83,18 @@ class GovernanceEngine:
         """
         violations = []
         
-        # Check for over-engineering keywords
-        over_engineering_keywords = [
-            "kubernetes", "vault", "microservices", "service mesh",
-            "kafka", "consul", "distributed", "cloud-native"
-        ]
-        
-        solution_lower = proposed_solution.lower()
-        
-        # If single user and enterprise solution
+        # If single user and enterprise solution (over_engineering keyword rules)
         if actual_users <= 5:
-            for keyword in over_engineering_keywords:
-                if keyword in solution_lower:
-                    violations.append(Violation(
-                        id=f"viol-{task.id}-scale-{len(violations)+1}",
-                        task_id=task.id,
-                        violation_type="over_engineering",
-                        severity="HIGH",
-                        message=f"Over-engineering: {keyword} for {actual_users} user(s)",
-                        rule_violated="Start Small, Scale Smart principle",
-                        fix_required=f"Use Tier 1 solution for {actual_users} users"
-                    ))
+            for keyword in self.keywords.keywords(proposed_solution, "over_engineering"):
+                violations.append(Violation(
+                    id=f"viol-{task.id}-scale-{len(violations)+1}",
+                    task_id=task.id,
+                    violation_type="over_engineering",
+                    severity="HIGH",
+                    message=f"Over-engineering: {keyword} for {actual_users} user(s)",
+                    rule_violated="Start Small, Scale Smart principle",
+                    fix_required=f"Use Tier 1 solution for {actual_users} users"
+                ))
         
         return violations
     
@@ -111,48 +108,87 @@ class GovernanceEngine:
         Returns:
             Repo name where task should be implemented, or None if unclear
         """
-        desc_lower = task_description.lower()
+        # Routing keyword rules: domain repos outrank meridian-core; None means ask the user
+        return self.keywords.route(task_description)
+    
+    def determine_correct_repos(self, task_descriptions: List[str]) -> List[Optional[str]]:
+        """
+        determine_correct_repo for many tasks at once (e.g. bulk imports).
         
-        # Check for domain-specific keywords
-        trading_keywords = ["trading", "tdom", "larry williams", "market", "strategy"]
-        research_keywords = ["research", "query", "investigation", "analysis"]
+        Args:
+            task_descriptions: Task descriptions
         
-        if any(kw in desc_lower for kw in trading_keywords):
-            return "meridian-trading"
-        elif any(kw in desc_lower for kw in research_keywords):
-            return "meridian-research"
+        Returns:
+            Repo name or None per description, in order
+        """
+        return self.keywords.route_many(task_descriptions)
+    
+    def task_verdict(self, task: WorkspaceTask) -> Verdict:
+        """
+        Repo a task is validated against and its violation fingerprints.
         
-        # Check for generic/framework keywords
-        framework_keywords = [
-            "orchestration", "learning engine", "proposal manager",
-            "voting system", "abstract", "base class"
-        ]
+        Served from the verdict cache while the task's text and the rules are
+        unchanged. Call before the session writes: the cache commits on its own
+        connection.
         
-        if any(kw in desc_lower for kw in framework_keywords):
-            return "meridian-core"
+        Args:
+            task: Task to validate (unassigned tasks are routed)
         
-        # Default: ask user
-        return None
-    
-    def _get_placement_rules(self) -> List[ComponentPlacement]:
-        """Get all component placement rules."""
-        return self.db.query(ComponentPlacement).all()
+        Returns:
+            Verdict with assigned_repo and findings
+        """
+        facts = TaskFacts.of(task)
+        key = facts.verdict_key
+        version = self.verdicts.rules_version
+        cached = self.verdicts.lookup({key}, version).get(key)
+        if cached:
+            self.verdicts.record(version, {}, [key])
+            return cached
+        
+        engine = self.db.get_bind()
+        rules = TaskRules.for_engine(engine, None if facts.related_files else {})
+        verdict = rules.verdict(facts)
+        self.verdicts.record(version, {key: verdict})
+        return verdict
     
-    def _violates_placement(
+    def verdict_violations(
         self,
         task: WorkspaceTask,
-        repo: str,
-        rule: ComponentPlacement
-    ) -> bool:
-        """Check if task violates placement rule."""
-        # Check if task mentions the component type
-        task_text = (task.title + " " + (task.description or "")).lower()
-        if rule.component_name.lower() in task_text:
-            # Check if repo is not the required one
-            if rule.correct_repo and repo != rule.correct_repo:
-                return True
-        
-        return False
+        verdict: Verdict,
+        violation_type: str,
+        id_infix: str = ""
+    ) -> List[Violation]:
+        """
+        Violation rows for the findings of one type in a verdict.
+        
+        Args:
+            task: Task the verdict belongs to
+            verdict: Result of task_verdict
+            violation_type: component_placement, over_engineering, unmapped_file or scope_violation
+            id_infix: Inserted into the ids (viol-<task>-<infix><n>)
+        
+        Returns:
+            List of violations (not added to the session)
+        """
+        violations = []
+        for v_type, severity, message, rule_violated, fix_required, file_path in verdict.findings:
+            if v_type == violation_type:
+                violations.append(Violation(
+                    id=f"viol-{task.id}-{id_infix}{len(violations)+1}",
+                    task_id=task.id,
+                    violation_type=v_type,
+                    severity=severity,
+                    message=message,
+                    file_path=file_path,
+                    rule_violated=rule_violated,
+                    fix_required=fix_required
+                ))
+        return violations
+    
+    @property
+    def rules_version(self) -> Optional[int]:
+        """Version of the placement/import rules; changes whenever either table is written."""
+        return self.placement_rules.version
     
     def validate_task_files(self, task: WorkspaceTask) -> List[Violation]:
         """
@@ -0,0 +1,556 @@
+"""
+Import Graph - Cross-repo Python import graph and ImportRule enforcement.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Catch imports that break the repo dependency rules (e.g. meridian-core importing a domain adapter)
+DOMAIN: Cross-repo workspace management
+
+Every *.py file of the Meridian repos is a node and its import statements
+are the edges. Parsing is the expensive part, so the imports of each file
+content are cached in import_cache by SHA-1 and only new content is parsed
+(in worker processes when there is a lot of it). A file whose size and
+mtime still match its import_graph_files row is not even read.
+
+Edges are resolved to absolute module names and checked against
+import_rules: a forbidden rule matches imports of its target module (or of
+any module of a target repo), allowed rules carve exceptions out of those.
+Matches are kept as forbidden_import Violation rows with file and line;
+earlier ones that no longer occur are marked fixed.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+import ast
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from workspace.db.models import ImportCache, ImportGraphFile, ImportRule, Violation
+from workspace.wms.constants import REPOS
+
+logger = logging.getLogger(__name__)
+
+RULE_TYPES = ('allowed', 'forbidden')
+VIOLATION_TYPE = "forbidden_import"
+
+# Directory names never walked (besides hidden ones): caches, virtualenvs, build output
+SKIP_DIRS = {"__pycache__", "node_modules", "venv", "env", "build", "dist", "site-packages"}
+
+# Below this many files to parse, worker start-up costs more than it saves
+PARALLEL_THRESHOLD = 200
+
+
+class ImportEdge(NamedTuple):
+    """One module imported by a file, resolved to an absolute dotted name."""
+    repo: str
+    file_path: str
+    line: int
+    module: str
+    target_repo: Optional[str]  # Repo defining the module's top-level package, if known
+
+
+class _Rule(NamedTuple):
+    id: str
+    source_repo: str
+    allowed: bool
+    target: str
+    target_is_repo: bool
+    reason: str
+
+    def matches(self, edge: ImportEdge) -> bool:
+        if self.target_is_repo:
+            return edge.target_repo == self.target and edge.target_repo != edge.repo
+        return edge.module == self.target or edge.module.startswith(self.target + ".")
+
+
+def parse_imports(source: bytes) -> Tuple[List[list], Optional[str]]:
+    """
+    Import statements of one Python source.
+
+    Returns:
+        ([[line, level, module, [names]], ...], error). `import a.b` gives
+        [line, 0, "a.b", []], `from ..a import b` gives [line, 2, "a", ["b"]].
+        error is the SyntaxError message, in which case imports is empty.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        return [], str(e)
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend([node.lineno, 0, alias.name, []] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append([node.lineno, node.level, node.module or "", [alias.name for alias in node.names]])
+    imports.sort(key=lambda entry: entry[0])
+    return imports, None
+
+
+def iter_python_files(repo_path: Path) -> Iterator[Tuple[str, int, int]]:
+    """Yield (path relative to repo_path, mtime_ns, size) of every .py file, skipping hidden and SKIP_DIRS dirs."""
+    stack = [("", str(repo_path))]
+    while stack:
+        prefix, directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not name.startswith(".") and name not in SKIP_DIRS:
+                        stack.append((f"{prefix}{name}/", entry.path))
+                elif name.endswith(".py") and entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield f"{prefix}{name}", stat.st_mtime_ns, stat.st_size
+
+
+def module_name(file_path: str, packages: Set[str], root_package: Optional[str] = None) -> str:
+    """
+    Dotted module name of a file, from the package directories around it.
+
+    Args:
+        file_path: Path relative to the repo root ("pkg/sub/mod.py")
+        packages: Directories (relative, "" for the root) containing __init__.py
+        root_package: Package name of the repo root when it is itself a package
+    """
+    dirs = file_path.split("/")[:-1]
+    names = file_path[:-3].split("/")
+    if names[-1] == "__init__":
+        names.pop()
+    start = len(dirs)
+    while start > 0 and "/".join(dirs[:start]) in packages:
+        start -= 1
+    names = names[start:]
+    if start == 0 and "" in packages and root_package:
+        names.insert(0, root_package)
+    return ".".join(names)
+
+
+def resolve_import(entry: list, module: str, is_package: bool) -> List[str]:
+    """Absolute module names imported by one parse_imports entry of `module`."""
+    _line, level, name, names = entry
+    if not names:
+        return [name]
+    if level:
+        package = module.split(".") if is_package else module.split(".")[:-1]
+        package = package[:max(0, len(package) - (level - 1))]
+        base = ".".join(package + ([name] if name else []))
+    else:
+        base = name
+    if names == ["*"]:
+        return [base]
+    return [f"{base}.{n}" if base else n for n in names]
+
+
+def violation_id(rule_id: str, repo: str, file_path: str, module: str) -> str:
+    """Deterministic id, so the same offending import keeps one Violation row across scans."""
+    digest = hashlib.sha1(f"{rule_id}:{repo}:{file_path}:{module}".encode("utf-8")).hexdigest()
+    return f"viol-import-{digest[:24]}"
+
+
+def load_import_rules(conn: Connection, repos: Iterable[str]) -> List[_Rule]:
+    """Well-formed import rules whose source is one of repos."""
+    rules = []
+    for row in conn.execute(select(ImportRule).where(ImportRule.source_repo.in_([*repos]))):
+        if row.rule_type not in RULE_TYPES or not row.target_module:
+            logger.warning(f"Ignoring import rule {row.id}: rule_type={row.rule_type!r}, "
+                           f"target_module={row.target_module!r}")
+            continue
+        rules.append(_Rule(
+            id=row.id,
+            source_repo=row.source_repo,
+            allowed=row.rule_type == "allowed",
+            target=row.target_module,
+            target_is_repo=row.target_module in REPOS,
+            reason=row.reason,
+        ))
+    return rules
+
+
+def module_names(
+    paths_by_repo: Dict[str, Iterable[str]]
+) -> Tuple[Dict[Tuple[str, str], str], Dict[str, Set[str]]]:
+    """
+    Module name of every .py file, and which repos define each top-level name.
+
+    Returns:
+        ({(repo, file_path): module}, {top-level name: {repo, ...}})
+    """
+    modules: Dict[Tuple[str, str], str] = {}
+    owners: Dict[str, Set[str]] = {}
+    for repo, paths in paths_by_repo.items():
+        paths = [*paths]
+        packages = {
+            path[:-len("__init__.py")].rstrip("/") for path in paths
+            if path == "__init__.py" or path.endswith("/__init__.py")
+        }
+        root_package = repo if repo.isidentifier() else None
+        for file_path in paths:
+            module = module_name(file_path, packages, root_package)
+            modules[(repo, file_path)] = module
+            if module:
+                owners.setdefault(module.split(".", 1)[0], set()).add(repo)
+    return modules, owners
+
+
+def import_edges(
+    repo: str,
+    file_path: str,
+    module: str,
+    imports: List[list],
+    owners: Dict[str, Set[str]]
+) -> List[ImportEdge]:
+    """Edges of one file from its parse_imports entries (see module_names for module/owners)."""
+    is_package = file_path == "__init__.py" or file_path.endswith("/__init__.py")
+    edges = []
+    for entry in imports:
+        for target in resolve_import(entry, module, is_package):
+            candidates = owners.get(target.split(".", 1)[0], ())
+            if repo in candidates:
+                target_repo = repo
+            elif len(candidates) == 1:
+                target_repo = next(iter(candidates))
+            else:
+                target_repo = None  # Third-party/stdlib, or ambiguous
+            edges.append(ImportEdge(repo, file_path, entry[0], target, target_repo))
+    return edges
+
+
+def forbidding_rule(rules: List[_Rule], edge: ImportEdge) -> Optional[_Rule]:
+    """The forbidden rule an edge breaks (rules of the edge's repo), unless an allowed rule exempts it."""
+    rule = next((r for r in rules if not r.allowed and r.matches(edge)), None)
+    if rule is None or any(r.allowed and r.matches(edge) for r in rules):
+        return None
+    return rule
+
+
+def add_import_rule(
+    db_session: Session,
+    source_repo: str,
+    target_module: str,
+    rule_type: str,
+    reason: str
+) -> ImportRule:
+    """
+    Add an import rule (commits).
+
+    Args:
+        source_repo: Repo whose files the rule applies to
+        target_module: Dotted module prefix, or a repo name for every module of that repo
+        rule_type: forbidden, or allowed to exempt imports from a broader forbidden rule
+        reason: Why the rule exists (shown on violations)
+
+    Raises:
+        ValueError: Unknown repo/rule type or the same rule already exists
+    """
+    if source_repo not in REPOS:
+        raise ValueError(f"Unknown repo '{source_repo}' (expected one of {', '.join(REPOS)})")
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Unknown rule type '{rule_type}' (expected one of {', '.join(RULE_TYPES)})")
+    digest = hashlib.sha1(f"{source_repo}:{rule_type}:{target_module}".encode("utf-8")).hexdigest()
+    rule_id = f"import-rule-{digest[:12]}"
+    if db_session.get(ImportRule, rule_id):
+        raise ValueError(f"Rule already exists: {rule_id}")
+    rule = ImportRule(
+        id=rule_id,
+        source_repo=source_repo,
+        rule_type=rule_type,
+        target_module=target_module,
+        reason=reason,
+        created_at=datetime.utcnow()
+    )
+    db_session.add(rule)
+    db_session.commit()
+    return rule
+
+
+class ImportGraphBuilder:
+    """Builds the import graph of the Meridian repos and records ImportRule violations."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory containing the repos
+            workers: Parser processes (default: CPU count)
+            progress: Called with a short message after each phase
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.progress = progress
+
+    def scan(self, repos: Optional[Sequence[str]] = None, full: bool = False) -> Dict[str, Any]:
+        """
+        Update the graph from the working trees and re-evaluate the import rules.
+
+        Args:
+            repos: Repo names under workspace_root (default: all Meridian repos)
+            full: Re-read and re-parse every file instead of trusting the caches
+
+        Returns:
+            Dict with files, read (hashed), parsed, removed, edges, violations
+            (currently detected), new_violations (incl. reopened), fixed_violations, parse_errors,
+            missing (repos not found) and seconds
+        """
+        started = time.monotonic()
+        repos = list(repos or REPOS)
+        missing = [repo for repo in repos if not (self.workspace_root / repo).is_dir()]
+        repos = [repo for repo in repos if repo not in missing]
+
+        files: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        for repo in repos:
+            for file_path, mtime_ns, size in iter_python_files(self.workspace_root / repo):
+                files[(repo, file_path)] = (mtime_ns, size)
+        self._report(f"{len(files):,} Python files in {len(repos)} repo(s)")
+
+        with self.engine.connect() as conn:
+            known = {
+                (row.repo, row.file_path): row
+                for row in conn.execute(select(
+                    ImportGraphFile.repo, ImportGraphFile.file_path, ImportGraphFile.content_hash,
+                    ImportGraphFile.mtime_ns, ImportGraphFile.size
+                ))
+            }
+
+            hashes: Dict[Tuple[str, str], str] = {}
+            changed: List[Dict[str, Any]] = []
+            sources: Dict[str, bytes] = {}
+            read = 0
+            now = datetime.utcnow()
+            for key, (mtime_ns, size) in files.items():
+                row = known.get(key)
+                if row and not full and row.mtime_ns == mtime_ns and row.size == size:
+                    hashes[key] = row.content_hash
+                    continue
+                try:
+                    with open(os.path.join(self.workspace_root, key[0], key[1]), "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue  # Vanished since the walk
+                read += 1
+                digest = hashlib.sha1(data).hexdigest()
+                hashes[key] = digest
+                sources.setdefault(digest, data)
+                if not row or row.content_hash != digest or row.mtime_ns != mtime_ns or row.size != size:
+                    changed.append({
+                        "repo": key[0], "file_path": key[1], "content_hash": digest,
+                        "mtime_ns": mtime_ns, "size": size, "updated_at": now,
+                    })
+
+            imports: Dict[str, Tuple[List[list], Optional[str]]] = {}
+            if not full:
+                imports.update(self._load_cached(conn, set(hashes.values())))
+            parsed = self._parse_all({h: data for h, data in sources.items() if h not in imports})
+            imports.update(parsed)
+            self._report(f"{read:,} file(s) read, {len(parsed):,} parsed")
+
+            # Other repos' stored files still tell which repo owns which top-level package
+            all_paths = {key for key in known if key[0] not in repos} | set(hashes)
+            rules = load_import_rules(conn, repos)
+            edges = self._resolve_edges(all_paths, hashes, imports, {rule.source_repo for rule in rules})
+            found = self._evaluate(rules, edges)
+
+            removed = [key for key in known if key[0] in repos and key not in hashes]
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                self._write_graph(conn, parsed, changed, removed, now)
+                new_violations, fixed_violations = self._write_violations(conn, repos, found, now)
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+
+        return {
+            "files": len(hashes),
+            "read": read,
+            "parsed": len(parsed),
+            "removed": len(removed),
+            "edges": len(edges),
+            "violations": len(found),
+            "new_violations": new_violations,
+            "fixed_violations": fixed_violations,
+            "parse_errors": sorted(
+                f"{repo}/{file_path}" for (repo, file_path), digest in hashes.items()
+                if imports.get(digest, ([], None))[1]
+            ),
+            "missing": missing,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+    def _report(self, message: str):
+        if self.progress:
+            self.progress(message)
+
+    @staticmethod
+    def _load_cached(conn: Connection, hashes: Set[str], chunk_size: int = 500) -> Dict[str, Tuple[List[list], Optional[str]]]:
+        wanted = list(hashes)
+        cached = {}
+        for start in range(0, len(wanted), chunk_size):
+            rows = conn.execute(
+                select(ImportCache.content_hash, ImportCache.imports, ImportCache.parse_error)
+                .where(ImportCache.content_hash.in_(wanted[start:start + chunk_size]))
+            )
+            for row in rows:
+                cached[row.content_hash] = (json.loads(row.imports), row.parse_error)
+        return cached
+
+    def _parse_all(self, sources: Dict[str, bytes]) -> Dict[str, Tuple[List[list], Optional[str]]]:
+        """Parse sources by content hash, in worker processes when there are many."""
+        if self.workers == 1 or len(sources) < PARALLEL_THRESHOLD:
+            return {digest: parse_imports(data) for digest, data in sources.items()}
+        # spawn: forked children would inherit the parent's SQLite connections
+        context = multiprocessing.get_context("spawn")
+        chunksize = max(1, len(sources) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            return dict(zip(sources, pool.map(parse_imports, sources.values(), chunksize=chunksize)))
+
+    def _resolve_edges(
+        self,
+        all_paths: Iterable[Tuple[str, str]],
+        hashes: Dict[Tuple[str, str], str],
+        imports: Dict[str, Tuple[List[list], Optional[str]]],
+        source_repos: Set[str]
+    ) -> List[ImportEdge]:
+        """Edges of the scanned files in source_repos (the only ones rules apply to)."""
+        by_repo: Dict[str, List[str]] = {}
+        for repo, file_path in all_paths:
+            by_repo.setdefault(repo, []).append(file_path)
+        modules, owners = module_names(by_repo)
+
+        edges = []
+        for (repo, file_path), digest in hashes.items():
+            if repo in source_repos:
+                edges.extend(import_edges(
+                    repo, file_path, modules[(repo, file_path)], imports.get(digest, ([], None))[0], owners
+                ))
+        return edges
+
+    @staticmethod
+    def _evaluate(rules: List[_Rule], edges: List[ImportEdge]) -> Dict[str, Dict[str, Any]]:
+        """Violation rows (by id) for edges matching a forbidden rule and no allowed one."""
+        by_source: Dict[str, List[_Rule]] = {}
+        for rule in rules:
+            by_source.setdefault(rule.source_repo, []).append(rule)
+
+        found: Dict[str, Dict[str, Any]] = {}
+        for edge in edges:
+            repo_rules = by_source.get(edge.repo)
+            if not repo_rules:
+                continue
+            rule = forbidding_rule(repo_rules, edge)
+            if rule is None:
+                continue
+            vid = violation_id(rule.id, edge.repo, edge.file_path, edge.module)
+            if vid in found:
+                continue  # Same module imported again further down; the first line is reported
+            found[vid] = {
+                "id": vid,
+                "violation_type": VIOLATION_TYPE,
+                "severity": "HIGH",
+                "message": f"{edge.repo} must not import {rule.target}: "
+                           f"{edge.repo}/{edge.file_path}:{edge.line} imports {edge.module}",
+                "file_path": f"{edge.repo}/{edge.file_path}",
+                "line_number": edge.line,
+                "rule_violated": f"Import rule {rule.id}: {rule.reason}",
+                "fix_required": f"Remove the import of {edge.module}, or move the code into the repo that may use it",
+            }
+        return found
+
+    @staticmethod
+    def _write_graph(
+        conn: Connection,
+        parsed: Dict[str, Tuple[List[list], Optional[str]]],
+        changed: List[Dict[str, Any]],
+        removed: List[Tuple[str, str]],
+        now: datetime
+    ):
+        if parsed:
+            conn.execute(sqlite_insert(ImportCache).on_conflict_do_nothing(), [
+                {"content_hash": digest, "imports": json.dumps(found, separators=(",", ":")),
+                 "parse_error": error, "parsed_at": now}
+                for digest, (found, error) in parsed.items()
+            ])
+        if changed:
+            stmt = sqlite_insert(ImportGraphFile)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[ImportGraphFile.repo, ImportGraphFile.file_path],
+                set_={
+                    "content_hash": stmt.excluded.content_hash,
+                    "mtime_ns": stmt.excluded.mtime_ns,
+                    "size": stmt.excluded.size,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            ), changed)
+        for repo, file_path in removed:
+            conn.execute(delete(ImportGraphFile).where(
+                ImportGraphFile.repo == repo, ImportGraphFile.file_path == file_path
+            ))
+        if changed or removed:
+            # Content no file has any more
+            conn.execute(delete(ImportCache).where(
+                ImportCache.content_hash.not_in(select(ImportGraphFile.content_hash))
+            ))
+
+    @staticmethod
+    def _write_violations(
+        conn: Connection,
+        repos: List[str],
+        found: Dict[str, Dict[str, Any]],
+        now: datetime
+    ) -> Tuple[int, int]:
+        """Insert/reopen found violations and fix the scanned repos' ones that are gone; returns (new, fixed)."""
+        prefixes = tuple(f"{repo}/" for repo in repos)
+        existing = {
+            row.id: row for row in conn.execute(
+                select(Violation.id, Violation.status, Violation.file_path, Violation.message, Violation.line_number)
+                .where(Violation.violation_type == VIOLATION_TYPE, Violation.id.like("viol-import-%"))
+            )
+        }
+
+        new_rows = [dict(row, status="open", detected_at=now) for vid, row in found.items() if vid not in existing]
+        if new_rows:
+            conn.execute(insert(Violation), new_rows)
+
+        new_count, fixed_count = len(new_rows), 0
+        for vid, row in found.items():
+            current = existing.get(vid)
+            if current is None:
+                continue
+            if current.status == "fixed":
+                conn.execute(update(Violation).where(Violation.id == vid).values(
+                    status="open", resolved_at=None, detected_at=now,
+                    message=row["message"], line_number=row["line_number"]
+                ))
+                new_count += 1
+            elif current.line_number != row["line_number"] or current.message != row["message"]:
+                conn.execute(update(Violation).where(Violation.id == vid).values(
+                    message=row["message"], line_number=row["line_number"]
+                ))
+
+        for vid, current in existing.items():
+            if vid in found or current.status == "fixed" or not (current.file_path or "").startswith(prefixes):
+                continue
+            conn.execute(update(Violation).where(Violation.id == vid).values(status="fixed", resolved_at=now))
+            fixed_count += 1
+
+        return new_count, fixed_count
@@ -0,0 +1,203 @@
+"""
+Keyword Rules - Whole-word keyword matching for task routing and scale checks.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: One compiled matcher over keyword_rules instead of hardcoded `kw in text` loops
+DOMAIN: Cross-repo workspace management
+
+keyword_rules holds two kinds of rule. Routing rules map a domain term to the
+repo that owns it ("tdom" -> meridian-trading); the highest-priority hit
+decides. Over-engineering rules list terms ("kubernetes") that the scale
+check and the mocked Bastard flag for small user counts.
+
+All active rules compile into a single regex alternation between word
+boundaries, longest keyword first, so "market" no longer matches inside
+"marketing" and one pass over the text returns every hit with its position.
+Text is lower-cased once rather than matched case-insensitively, which runs
+about twice as fast. Spaces in keywords match any run of whitespace.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+import hashlib
+import re
+import sqlite3
+
+from sqlalchemy.orm import Session
+
+from workspace.db.models import KeywordRule
+from workspace.wms.constants import REPOS
+from workspace.wms.path_index import ChangeTrackedSnapshot
+
+CATEGORIES = ("routing", "over_engineering")
+
+_KEYWORD = re.compile(r"\w(?:.*\w)?", re.DOTALL)
+
+
+class KeywordHit(NamedTuple):
+    """One occurrence of a rule keyword in a text."""
+    rule_id: str
+    keyword: str
+    category: str
+    target: Optional[str]  # Repo for routing rules
+    priority: int
+    start: int
+    end: int
+
+
+class _Rule(NamedTuple):
+    id: str
+    keyword: str
+    category: str
+    target: Optional[str]
+    priority: int
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lower-case with single spaces; raises ValueError unless it starts and ends with a word character."""
+    normalized = " ".join(keyword.lower().split())
+    if not _KEYWORD.fullmatch(normalized):
+        raise ValueError(f"Keyword must start and end with a letter or digit: {keyword!r}")
+    return normalized
+
+
+def compile_keywords(rows: Iterable[Tuple]) -> Tuple[Optional[Pattern], Dict[str, List[_Rule]]]:
+    """
+    Compile (id, keyword, category, target, priority) rows.
+
+    Returns:
+        (pattern over lower-cased text or None without rules, normalized keyword -> rules)
+    """
+    by_keyword: Dict[str, List[_Rule]] = {}
+    for rule_id, keyword, category, target, priority in rows:
+        try:
+            normalized = normalize_keyword(keyword)
+        except ValueError:
+            continue
+        by_keyword.setdefault(normalized, []).append(_Rule(rule_id, normalized, category, target, priority or 0))
+    if not by_keyword:
+        return None, by_keyword
+    # Longest first: at one position the alternation takes the first alternative that matches
+    alternatives = "|".join(
+        re.escape(keyword).replace(r"\ ", r"\s+")
+        for keyword in sorted(by_keyword, key=lambda k: (-len(k), k))
+    )
+    return re.compile(rf"\b(?:{alternatives})\b"), by_keyword
+
+
+class KeywordMatcher(ChangeTrackedSnapshot):
+    """Compiled keyword_rules for one SQLite database."""
+
+    TABLES = ("keyword_rules",)
+
+    def __init__(self, db_path: str):
+        self._pattern: Optional[Pattern] = None
+        self._folded: Optional[Pattern] = None
+        self._rules: Dict[str, List[_Rule]] = {}
+        super().__init__(db_path)
+
+    def __len__(self) -> int:
+        return sum(len(rules) for rules in self._rules.values())
+
+    def _load(self, conn: sqlite3.Connection):
+        try:
+            rows = conn.execute(
+                "SELECT id, keyword, category, target, priority FROM keyword_rules WHERE is_active = 1"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []  # Table not created yet
+        self._pattern, self._rules = compile_keywords(rows)
+        self._folded = re.compile(self._pattern.pattern, re.IGNORECASE) if self._pattern else None
+
+    def find(self, text: str, category: Optional[str] = None) -> List[KeywordHit]:
+        """Every keyword occurrence in text (leftmost-longest, non-overlapping), optionally of one category."""
+        self.refresh()
+        return self._find(text, category)
+
+    def keywords(self, text: str, category: str) -> List[str]:
+        """Distinct keywords of a category found in text, in order of first occurrence."""
+        return [*dict.fromkeys(hit.keyword for hit in self.find(text, category))]
+
+    def route(self, text: str) -> Optional[str]:
+        """Repo of the highest-priority routing hit (earliest on ties), or None."""
+        self.refresh()
+        return self._route(text)
+
+    def route_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """route() for many texts against a single freshness check."""
+        self.refresh()
+        return [self._route(text) for text in texts]
+
+    def _find(self, text: str, category: Optional[str]) -> List[KeywordHit]:
+        if self._pattern is None or not text:
+            return []
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self._pattern.finditer(lowered)
+        else:
+            matches = self._folded.finditer(text)  # Lower-casing moved positions (rare non-ASCII)
+        hits = []
+        for m in matches:
+            keyword = m.group().lower()
+            if " " in keyword or "\t" in keyword or "\n" in keyword:
+                keyword = " ".join(keyword.split())
+            for rule in self._rules.get(keyword, ()):
+                if category is None or rule.category == category:
+                    hits.append(KeywordHit(rule.id, rule.keyword, rule.category, rule.target,
+                                           rule.priority, m.start(), m.end()))
+        return hits
+
+    def _route(self, text: str) -> Optional[str]:
+        best = None
+        for hit in self._find(text, "routing"):
+            if hit.target and (best is None or hit.priority > best.priority):
+                best = hit
+        return best.target if best else None
+
+
+def add_keyword_rule(
+    db_session: Session,
+    keyword: str,
+    category: str,
+    target: Optional[str] = None,
+    priority: int = 0,
+    reason: Optional[str] = None,
+    created_by: Optional[str] = None
+) -> KeywordRule:
+    """
+    Add a keyword rule (commits).
+
+    Args:
+        keyword: Word or phrase, matched case-insensitively on word boundaries
+        category: routing or over_engineering
+        target: Repo the keyword routes to (routing rules only)
+        priority: Higher wins when routing keywords of several repos occur
+
+    Raises:
+        ValueError: Invalid keyword/category/target or the same rule already exists
+    """
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown category '{category}' (expected one of {', '.join(CATEGORIES)})")
+    if category == "routing" and target not in REPOS:
+        raise ValueError(f"Routing rules need a target repo (one of {', '.join(REPOS)})")
+    if category != "routing" and target:
+        raise ValueError("Only routing rules have a target")
+    keyword = normalize_keyword(keyword)
+    rule_id = f"keyword-rule-{hashlib.sha1(f'{category}:{keyword}'.encode('utf-8')).hexdigest()[:12]}"
+    if db_session.get(KeywordRule, rule_id):
+        raise ValueError(f"Rule already exists: {rule_id}")
+    rule = KeywordRule(
+        id=rule_id,
+        keyword=keyword,
+        category=category,
+        target=target,
+        priority=priority,
+        reason=reason,
+        is_active=True,
+        created_at=datetime.utcnow(),
+        created_by=created_by,
+    )
+    db_session.add(rule)
+    db_session.commit()
+    return rule
@@ -0,0 +1,264 @@
+"""
+Mapping Rules - Glob/prefix rules that map many files to a component at once.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Resolve file paths to components from pattern rules instead of per-file mappings
+DOMAIN: Cross-repo workspace management
+
+Rules live in component_mapping_rules and match "<repo>/<path>", e.g.
+"meridian-core/src/**/orchestration/*.py" (glob) or "workspace/db" (prefix:
+the directory and everything below it). All active rules are compiled into
+a trie of their literal leading directories; each trie node holds one regex
+alternation of the rules that can apply below it, ordered by precedence, so
+a path is resolved by one walk down the trie and a single fullmatch:
+
+    1. higher priority
+    2. more specific pattern (longer literal text before the first wildcard)
+    3. rule id (stable tie-break)
+
+Explicit CodeComponentMapping rows always take precedence over rules.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+import re
+import sqlite3
+
+from workspace.wms.path_index import ChangeTrackedSnapshot, split_path
+
+PATTERN_TYPES = ("glob", "prefix")
+
+_WILDCARDS = re.compile(r"[*?\[]")
+
+# Resolved paths remembered per compiled rule set (cleared on reload or when full)
+MEMO_SIZE = 100_000
+
+
+class RuleMatch(NamedTuple):
+    """Rule that owns a path."""
+    rule_id: str
+    component_id: str
+    pattern: str
+    priority: int
+    mapping_id: Optional[str] = None  # Rule matches have no code_component_mappings row
+
+
+class _Rule(NamedTuple):
+    id: str
+    component_id: str
+    pattern: str
+    pattern_type: str
+    priority: int
+    reason: Optional[str]
+    regex: str
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a path glob to a regex for the whole path.
+
+    "*" and "?" stay within one path segment, "**/" matches zero or more
+    directories, a trailing "**" matches anything and "[...]" is a character
+    class ("[!...]" negated).
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:[^/]+/)*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 2) != -1:
+            end = pattern.find("]", i + 2)
+            body = pattern[i + 1:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def rule_regex(pattern: str, pattern_type: str = "glob") -> str:
+    """Regex (without anchors) for a rule pattern; raises ValueError if it is invalid."""
+    if pattern_type not in PATTERN_TYPES:
+        raise ValueError(f"Unknown pattern type '{pattern_type}' (expected one of {PATTERN_TYPES})")
+    normalized = "/".join(split_path(pattern))
+    if not normalized:
+        raise ValueError("Empty pattern")
+    if pattern_type == "prefix":
+        regex = re.escape(normalized) + "(?:/.*)?"
+    else:
+        regex = glob_to_regex(normalized)
+    re.compile(regex)
+    return regex
+
+
+def _specificity(pattern: str, pattern_type: str) -> int:
+    if pattern_type == "prefix":
+        return len(pattern)
+    wildcard = _WILDCARDS.search(pattern)
+    return wildcard.start() if wildcard else len(pattern)
+
+
+def _literal_prefix(segments: List[str]) -> List[str]:
+    """Leading path segments without wildcards."""
+    prefix = []
+    for segment in segments:
+        if _WILDCARDS.search(segment):
+            break
+        prefix.append(segment)
+    return prefix
+
+
+class _PrefixNode:
+    __slots__ = ("children", "rules", "regex")
+
+    def __init__(self):
+        self.children: Dict[str, "_PrefixNode"] = {}
+        self.rules: List[int] = []  # Rules whose literal prefix ends here
+        self.regex: Optional[Pattern] = None  # Rules of this node and all ancestors
+
+
+def compile_rules(rows: Iterable[Tuple]) -> Tuple[List[_Rule], _PrefixNode]:
+    """
+    Compile (id, component_id, pattern, pattern_type, priority, reason) rows.
+
+    Rules are placed in a trie by their literal leading segments (the prefix
+    automaton); every node holds one regex alternation of the rules that can
+    match a path passing through it, in precedence order.
+
+    Returns:
+        (rules in precedence order, trie root)
+    """
+    rules = sorted(
+        (
+            _Rule(rule_id, component_id, pattern, pattern_type, priority or 0, reason,
+                  rule_regex(pattern, pattern_type))
+            for rule_id, component_id, pattern, pattern_type, priority, reason in rows
+        ),
+        key=lambda r: (-r.priority, -_specificity(r.pattern, r.pattern_type), r.id),
+    )
+
+    root = _PrefixNode()
+    for i, rule in enumerate(rules):
+        node = root
+        for segment in _literal_prefix(split_path(rule.pattern)):
+            node = node.children.setdefault(segment, _PrefixNode())
+        node.rules.append(i)
+
+    def assign(node: _PrefixNode, inherited: List[int], inherited_regex: Optional[Pattern]):
+        if node.rules:
+            inherited = sorted(inherited + node.rules)
+            # Alternatives are tried in order, so the first one that matches is the winner
+            node.regex = re.compile("|".join(f"(?P<r{i}>{rules[i].regex})" for i in inherited))
+        else:
+            node.regex = inherited_regex
+        for child in node.children.values():
+            assign(child, inherited, node.regex)
+
+    assign(root, [], None)
+    return rules, root
+
+
+class MappingRuleMatcher(ChangeTrackedSnapshot):
+    """Compiled component_mapping_rules for one SQLite database."""
+
+    TABLES = ("component_mapping_rules",)
+
+    def __init__(self, db_path: str):
+        self._rules: List[_Rule] = []
+        self._root = _PrefixNode()
+        self._memo: Dict[Tuple[str, str], Optional[RuleMatch]] = {}
+        super().__init__(db_path)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _load(self, conn: sqlite3.Connection):
+        try:
+            rows = conn.execute(
+                "SELECT id, component_id, pattern, pattern_type, priority, reason "
+                "FROM component_mapping_rules WHERE is_active = 1"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []  # Table not created yet
+        self._rules, self._root = compile_rules(rows)
+        self._memo = {}
+
+    def match(self, repo: str, file_path: str) -> Optional[RuleMatch]:
+        """Winning rule for a file (path relative to the repo root), or None."""
+        self.refresh()
+        return self._match(repo, file_path)
+
+    def match_many(self, repo: str, file_paths: Iterable[str]) -> Dict[str, Optional[RuleMatch]]:
+        """Resolve many paths of one repo against a single freshness check."""
+        self.refresh()
+        return {file_path: self._match(repo, file_path) for file_path in file_paths}
+
+    def explain(self, repo: str, file_path: str) -> Dict[str, Any]:
+        """
+        Every rule matching the path in precedence order, and which one wins.
+
+        Returns:
+            Dict with the matched key, "winner" (rule dict or None) and "candidates"
+        """
+        self.refresh()
+        key = self._key(repo, file_path)
+        candidates = [
+            {
+                "rule_id": rule.id,
+                "component_id": rule.component_id,
+                "pattern": rule.pattern,
+                "pattern_type": rule.pattern_type,
+                "priority": rule.priority,
+                "reason": rule.reason,
+            }
+            for rule in self._rules
+            if re.fullmatch(rule.regex, key)
+        ]
+        return {"key": key, "winner": candidates[0] if candidates else None, "candidates": candidates}
+
+    @staticmethod
+    def _key(repo: str, file_path: str) -> str:
+        return "/".join(split_path(f"{repo}/{file_path}"))
+
+    def _match(self, repo: str, file_path: str) -> Optional[RuleMatch]:
+        key = (repo, file_path)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        result = self._memo[key] = self._resolve(repo, file_path)
+        return result
+
+    def _resolve(self, repo: str, file_path: str) -> Optional[RuleMatch]:
+        key = f"{repo}/{file_path}"
+        if "\\" in key or "//" in key or "./" in key or key.endswith("/"):
+            key = "/".join(split_path(key))
+        node = self._root
+        regex = node.regex
+        for segment in key.split("/"):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            regex = node.regex
+        if regex is None:
+            return None
+        m = regex.fullmatch(key)
+        if m is None:
+            return None
+        rule = self._rules[int(m.lastgroup[1:])]
+        return RuleMatch(rule.id, rule.component_id, rule.pattern, rule.priority)
@@ -0,0 +1,452 @@
+"""
+Near Duplicates - Python code copied between repos with small edits.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Detect code creep (copy-paste between meridian-core and the domain repos) and track it as issues
+DOMAIN: Cross-repo workspace management
+
+Each file is reduced to a normalized token stream: comments are dropped, and
+string and number literals become placeholders. Overlapping runs of
+SHINGLE_SIZE tokens are hashed, and a MinHash signature of NUM_PERM minima
+is computed over them with NumPy. Two signatures agree in a position with
+probability equal to the Jaccard similarity of the files' shingle sets.
+
+Locality-sensitive hashing cuts the search below all-pairs. Each signature is
+split into BANDS bands of ROWS rows. Only files that match exactly on at least
+one band become candidates: pairs near the threshold almost always do, and
+dissimilar pairs almost never. Candidates are then scored on their full
+signatures.
+
+Signatures are cached in minhash_signatures by SHA-1 of the file content, the
+same key import_graph_files uses. import_graph_files also serves as the stat
+cache, so unchanged files are not read. Pairs in different repos at or above the
+threshold are kept as code_creep CrossRepoIssue rows, one per file pair. They
+are opened, updated, reopened and resolved in bulk by each scan.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+from workspace.db.models import CrossRepoIssue, ImportGraphFile, MinHashSignature
+from workspace.wms.constants import REPOS
+from workspace.wms.import_graph import iter_python_files
+
+ISSUE_TYPE = "code_creep"
+DETECTED_BY = "near-dup-scan"
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SEED = 1
+PARAMS = f"k{SHINGLE_SIZE}-p{NUM_PERM}-s{SEED}"
+
+# Files with fewer tokens are boilerplate (__init__.py, constants) rather than copied logic
+MIN_TOKENS = 60
+
+# Below this many files to sign, worker start-up costs more than it saves
+PARALLEL_THRESHOLD = 200
+
+# Signature columns hashed at once (bounds the NUM_PERM x chunk intermediate)
+_CHUNK = 4096
+
+_TOKEN = re.compile(r"""
+    (?P<str>[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'))
+  | (?P<comment>\#[^\n]*)
+  | (?P<num>\b\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?[jJ]?)
+  | (?P<name>[^\W\d]\w*)
+  | (?P<op>[^\s\w])
+""", re.VERBOSE)
+
+# Multiply-shift hash family: h_i(x) = (a_i * x + b_i) >> 32 over uint64 (wrapping)
+_rng = np.random.default_rng(SEED)
+_A = (_rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_BASE = np.uint64(1099511628211)
+_BAND_COEF = _rng.integers(0, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+
+
+def normalized_tokens(source: str) -> List[str]:
+    """Token stream without comments, with literals replaced by placeholders."""
+    tokens = []
+    for match in _TOKEN.finditer(source):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        tokens.append("<s>" if kind == "str" else "<n>" if kind == "num" else match.group())
+    return tokens
+
+
+def signature(source: bytes) -> Tuple[Optional[bytes], int]:
+    """(MinHash signature as uint32 bytes, token count); no signature below MIN_TOKENS."""
+    tokens = normalized_tokens(source.decode("utf-8", errors="replace"))
+    if len(tokens) < max(MIN_TOKENS, SHINGLE_SIZE):
+        return None, len(tokens)
+    ids = {}
+    token_ids = np.fromiter(
+        (ids.setdefault(token, zlib.crc32(token.encode("utf-8"))) for token in tokens),
+        dtype=np.uint64, count=len(tokens),
+    )
+    count = len(tokens) - SHINGLE_SIZE + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        shingles = shingles * _SHINGLE_BASE + token_ids[offset:offset + count]
+    shingles = np.unique(shingles)
+    minima = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(shingles), _CHUNK):
+        chunk = shingles[start:start + _CHUNK]
+        hashed = (_A[:, None] * chunk[None, :] + _B[:, None]) >> np.uint64(32)
+        np.minimum(minima, hashed.min(axis=1), out=minima)
+    return minima.astype(np.uint32).tobytes(), len(tokens)
+
+
+def candidate_pairs(signatures: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Index pairs (i < j) sharing at least one LSH band.
+
+    Args:
+        signatures: (files, NUM_PERM) uint32 matrix
+        groups: Optional label per file; pairs within one label are skipped
+
+    Returns:
+        (pairs, 2) int array, unique
+    """
+    found = []
+    for band in range(BANDS):
+        rows = signatures[:, band * ROWS:(band + 1) * ROWS].astype(np.uint64)
+        keys = (rows * _BAND_COEF).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Only keys shared by several files form buckets worth splitting out
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        shared = np.zeros(len(keys), dtype=bool)
+        shared[1:] |= same
+        shared[:-1] |= same
+        order, sorted_keys = order[shared], sorted_keys[shared]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for bucket in np.split(order, bounds) if len(order) else ():
+            i, j = np.triu_indices(len(bucket), k=1)
+            left, right = bucket[i], bucket[j]
+            if groups is not None:
+                keep = groups[left] != groups[right]
+                left, right = left[keep], right[keep]
+            found.append(np.stack([np.minimum(left, right), np.maximum(left, right)], axis=1))
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(found), axis=0)
+
+
+def issue_id(first: Tuple[str, str], second: Tuple[str, str]) -> str:
+    """Stable issue id for a file pair (order-insensitive)."""
+    a, b = sorted([first, second])
+    return f"CREEP-{hashlib.sha1(f'{a[0]}:{a[1]}|{b[0]}:{b[1]}'.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _severity(similarity: float) -> str:
+    if similarity >= 0.95:
+        return "HIGH"
+    if similarity >= 0.85:
+        return "MEDIUM"
+    return "LOW"
+
+
+class NearDuplicate(NamedTuple):
+    """Two files in different repos with similar token streams."""
+    first: Tuple[str, str]  # (repo, file_path)
+    second: Tuple[str, str]
+    similarity: float  # Estimated Jaccard similarity of the shingle sets
+
+    @property
+    def issue_id(self) -> str:
+        return issue_id(self.first, self.second)
+
+
+class NearDuplicateDetector:
+    """Finds near-duplicate Python files across repos and keeps code_creep issues current."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workspace_root: Path,
+        threshold: float = 0.8,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workspace_root: Directory containing the repos
+            threshold: Minimum estimated similarity reported
+            workers: Processes computing new signatures (default: CPU count)
+            progress: Called with a short message after each phase
+        """
+        self.engine = engine
+        self.workspace_root = Path(workspace_root)
+        self.threshold = threshold
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.progress = progress
+
+    def scan(self, repos: Optional[Sequence[str]] = None, record: bool = True) -> Dict[str, Any]:
+        """
+        Compare the Python files of the repos and update the code_creep issues.
+
+        Args:
+            repos: Repo names under workspace_root (default: all Meridian repos)
+            record: Open/update/resolve CrossRepoIssue rows (False only reports)
+
+        Returns:
+            Dict with files, signed (files with a signature), computed (new
+            signatures), candidates (LSH pairs), pairs (NearDuplicate list,
+            most similar first), opened, updated, reopened, resolved, missing
+            and seconds
+        """
+        started = time.monotonic()
+        repos = [*(repos or REPOS)]
+        missing = [repo for repo in repos if not (self.workspace_root / repo).is_dir()]
+        repos = [repo for repo in repos if repo not in missing]
+
+        hashes, sources, unread = self._hash_files(repos)
+        with self.engine.connect() as conn:
+            cached = self._load_signatures(conn, set(hashes.values()))
+        # Unchanged files only need reading if their signature is not cached yet
+        for digest, (repo, file_path) in unread.items():
+            if digest in cached or digest in sources:
+                continue
+            try:
+                with open(os.path.join(self.workspace_root, repo, file_path), "rb") as f:
+                    sources[digest] = f.read()
+            except OSError:
+                continue
+        todo = {digest: data for digest, data in sources.items() if digest not in cached}
+        computed = self._sign_all(todo)
+        cached.update(computed)
+        self._report(f"{len(hashes):,} Python files, {len(computed):,} new signature(s)")
+
+        keys = sorted(key for key, digest in hashes.items() if cached.get(digest, (None, 0))[0] is not None)
+        pairs: List[NearDuplicate] = []
+        candidates = np.empty((0, 2), dtype=np.int64)
+        if keys:
+            matrix = np.stack([np.frombuffer(cached[hashes[key]][0], dtype=np.uint32) for key in keys])
+            repo_index = {repo: i for i, repo in enumerate(repos)}
+            groups = np.array([repo_index[repo] for repo, _ in keys])
+            candidates = candidate_pairs(matrix, groups)
+            if len(candidates):
+                similarity = (matrix[candidates[:, 0]] == matrix[candidates[:, 1]]).mean(axis=1)
+                for (i, j), score in zip(candidates, similarity):
+                    if score >= self.threshold:
+                        pairs.append(NearDuplicate(keys[i], keys[j], round(float(score), 3)))
+        pairs.sort(key=lambda pair: (-pair.similarity, pair.first, pair.second))
+        self._report(f"{len(candidates):,} LSH candidate pair(s), {len(pairs):,} at or above {self.threshold:.0%}")
+
+        counts = {"opened": 0, "updated": 0, "reopened": 0, "resolved": 0}
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                if computed:
+                    stmt = sqlite_insert(MinHashSignature)
+                    conn.execute(stmt.on_conflict_do_update(
+                        index_elements=[MinHashSignature.content_hash],
+                        set_={column: stmt.excluded[column] for column in ("params", "signature", "tokens", "computed_at")},
+                    ), [
+                        {"content_hash": digest, "params": PARAMS, "signature": sig, "tokens": tokens,
+                         "computed_at": datetime.utcnow()}
+                        for digest, (sig, tokens) in computed.items()
+                    ])
+                if set(repos) >= set(REPOS):
+                    # Content no scanned file has any more
+                    current = set(hashes.values())
+                    stale = [
+                        {"b_hash": digest}
+                        for digest in conn.execute(select(MinHashSignature.content_hash)).scalars()
+                        if digest not in current
+                    ]
+                    if stale:
+                        conn.execute(delete(MinHashSignature).where(
+                            MinHashSignature.content_hash == bindparam("b_hash")
+                        ), stale)
+                if record:
+                    counts = self._write_issues(conn, repos, pairs)
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+
+        return {
+            "files": len(hashes),
+            "signed": len(keys),
+            "computed": len(computed),
+            "candidates": len(candidates),
+            "pairs": pairs,
+            **counts,
+            "missing": missing,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+    def _report(self, message: str):
+        if self.progress:
+            self.progress(message)
+
+    def _hash_files(
+        self,
+        repos: List[str]
+    ) -> Tuple[Dict[Tuple[str, str], str], Dict[str, bytes], Dict[str, Tuple[str, str]]]:
+        """
+        Content hash per file. Files unchanged since import_graph_files recorded
+        them are not read; they are returned as hash -> one file with that content.
+        """
+        with self.engine.connect() as conn:
+            known = {
+                (row.repo, row.file_path): row
+                for row in conn.execute(select(
+                    ImportGraphFile.repo, ImportGraphFile.file_path, ImportGraphFile.content_hash,
+                    ImportGraphFile.mtime_ns, ImportGraphFile.size,
+                ).where(ImportGraphFile.repo.in_(repos)))
+            }
+        hashes: Dict[Tuple[str, str], str] = {}
+        sources: Dict[str, bytes] = {}
+        unread: Dict[str, Tuple[str, str]] = {}
+        for repo in repos:
+            for file_path, mtime_ns, size in iter_python_files(self.workspace_root / repo):
+                key = (repo, file_path)
+                row = known.get(key)
+                if row and row.mtime_ns == mtime_ns and row.size == size:
+                    hashes[key] = row.content_hash
+                    unread.setdefault(row.content_hash, key)
+                    continue
+                try:
+                    with open(os.path.join(self.workspace_root, repo, file_path), "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue  # Vanished since the walk
+                digest = hashlib.sha1(data).hexdigest()
+                hashes[key] = digest
+                sources.setdefault(digest, data)
+        return hashes, sources, unread
+
+    @staticmethod
+    def _load_signatures(
+        conn: Connection,
+        hashes: Set[str],
+        chunk_size: int = 500
+    ) -> Dict[str, Tuple[Optional[bytes], int]]:
+        wanted = [*hashes]
+        cached = {}
+        for start in range(0, len(wanted), chunk_size):
+            rows = conn.execute(
+                select(MinHashSignature.content_hash, MinHashSignature.signature, MinHashSignature.tokens)
+                .where(
+                    MinHashSignature.content_hash.in_(wanted[start:start + chunk_size]),
+                    MinHashSignature.params == PARAMS,
+                )
+            )
+            for row in rows:
+                cached[row.content_hash] = (row.signature, row.tokens)
+        return cached
+
+    def _sign_all(self, sources: Dict[str, bytes]) -> Dict[str, Tuple[Optional[bytes], int]]:
+        """Signatures by content hash, in worker processes when there are many."""
+        if self.workers == 1 or len(sources) < PARALLEL_THRESHOLD:
+            return {digest: signature(data) for digest, data in sources.items()}
+        # spawn: forked children would inherit the parent's SQLite connections
+        context = multiprocessing.get_context("spawn")
+        chunksize = max(1, len(sources) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            return dict(zip(sources, pool.map(signature, sources.values(), chunksize=chunksize)))
+
+    def _write_issues(self, conn: Connection, repos: List[str], pairs: List[NearDuplicate]) -> Dict[str, int]:
+        """Open new pairs, refresh or reopen known ones, resolve pairs no longer found."""
+        now = datetime.utcnow()
+        existing = {
+            row.id: row
+            for row in conn.execute(select(
+                CrossRepoIssue.id, CrossRepoIssue.status, CrossRepoIssue.repos_affected
+            ).where(CrossRepoIssue.issue_type == ISSUE_TYPE, CrossRepoIssue.detected_by == DETECTED_BY))
+        }
+
+        inserts, updates = [], []
+        reopened = 0
+        for pair in pairs:
+            (repo_a, path_a), (repo_b, path_b) = sorted([pair.first, pair.second])
+            values = {
+                "b_id": pair.issue_id,
+                "b_severity": _severity(pair.similarity),
+                "b_title": f"Near-duplicate code: {repo_a}/{path_a} ~ {repo_b}/{path_b} ({pair.similarity:.0%})"[:500],
+                "b_metadata": json.dumps({
+                    "files": [f"{repo_a}/{path_a}", f"{repo_b}/{path_b}"],
+                    "similarity": pair.similarity,
+                    "params": PARAMS,
+                    "last_seen": now.isoformat(),
+                }),
+            }
+            row = existing.get(pair.issue_id)
+            if row is None:
+                inserts.append({
+                    "id": pair.issue_id,
+                    "issue_type": ISSUE_TYPE,
+                    "severity": values["b_severity"],
+                    "title": values["b_title"],
+                    "description": (
+                        f"{repo_a}/{path_a} and {repo_b}/{path_b} share an estimated {pair.similarity:.0%} "
+                        f"of their normalized {SHINGLE_SIZE}-token shingles."
+                    ),
+                    "repos_affected": json.dumps([repo_a, repo_b]),
+                    "detected": now,
+                    "detected_by": DETECTED_BY,
+                    "status": "open",
+                    "action_required": (
+                        "Keep one implementation (in meridian-core if it is shared infrastructure) "
+                        "and import it instead of the copy"
+                    ),
+                    "extra_metadata": values["b_metadata"],
+                })
+            elif row.status == "closed":
+                continue  # Closed by hand: accepted duplication
+            else:
+                reopened += row.status != "open"
+                updates.append(values)
+
+        scanned = set(repos)
+        found = {pair.issue_id for pair in pairs}
+        gone = [
+            {"b_id": issue_id_}
+            for issue_id_, row in existing.items()
+            if row.status == "open"
+            and issue_id_ not in found
+            and set(json.loads(row.repos_affected or "[]")) <= scanned
+        ]
+
+        if inserts:
+            conn.execute(insert(CrossRepoIssue), inserts)
+        if updates:
+            conn.execute(update(CrossRepoIssue).where(CrossRepoIssue.id == bindparam("b_id")).values(
+                severity=bindparam("b_severity"),
+                title=bindparam("b_title"),
+                extra_metadata=bindparam("b_metadata"),
+                status="open",
+                resolved_at=None,
+                resolved_by=None,
+                resolution_notes=None,
+            ), updates)
+        if gone:
+            conn.execute(update(CrossRepoIssue).where(CrossRepoIssue.id == bindparam("b_id")).values(
+                status="resolved",
+                resolved_at=now,
+                resolved_by=DETECTED_BY,
+                resolution_notes=f"Similarity fell below {self.threshold:.0%} or a file was removed",
+            ), gone)
+        return {"opened": len(inserts), "updated": len(updates) - reopened, "reopened": reopened, "resolved": len(gone)}
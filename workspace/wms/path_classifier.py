@@ -0,0 +1,265 @@
+"""
+Path Classifier - Suggest architecture components for unmapped files from their paths.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Propose component mappings in bulk, learned from the existing mappings
+DOMAIN: Cross-repo workspace management
+
+Each path is tokenized into directory names, the parent directory, the file
+stem, snake_case/CamelCase word parts and the extension. Every component
+gets a token profile: the normalized mean of the tf-idf vectors of the
+paths mapped to it. Queries are stored as a sparse matrix (CSR index arrays)
+and scored against all profiles at once with NumPy, in chunks.
+
+A component can only be suggested for files of its own repo. Confidence is
+a softmax over the cosine scores with temperature TEMPERATURE. It includes
+a "no component" option scored NULL_SCORE, so a file whose tokens match
+nothing well gets a low confidence instead of falling back to a catch-all.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+import math
+import re
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from workspace.db.models import ArchitectureComponent, CodeComponentMapping
+from workspace.wms.path_index import split_path
+
+# Softmax temperature and the score of "no component"; tuned by leave-one-out on the existing mappings
+TEMPERATURE = 0.08
+NULL_SCORE = 0.2
+
+# Query rows scored per NumPy batch (bounds the nnz x components intermediate)
+CHUNK_ROWS = 4096
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_WORD = re.compile(r"[^a-z0-9]+")
+
+
+class Suggestion(NamedTuple):
+    """A candidate component for a file."""
+    component_id: str
+    confidence: float  # 0..1, share of the softmax including "no component"
+    score: float  # Cosine similarity to the component's profile
+
+
+@lru_cache(maxsize=65536)
+def _words(text: str) -> Tuple[str, ...]:
+    # Cached: directory names repeat across nearly every path of a repo
+    return tuple(f"w:{w}" for w in _WORD.split(_CAMEL.sub("_", text).lower()) if len(w) > 1 and not w.isdigit())
+
+
+def path_tokens(file_path: str) -> List[str]:
+    """Tokens of a path relative to its repo root (a trailing name without a suffix counts as a directory)."""
+    segments = split_path(file_path)
+    if not segments:
+        return []
+    name = segments[-1]
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem:
+        dirs, stem, ext = segments, "", ""
+    else:
+        dirs = segments[:-1]
+    tokens = set()
+    for segment in dirs:
+        tokens.add(f"dir:{segment.lower()}")
+        tokens.update(_words(segment))
+    if dirs:
+        tokens.add(f"parent:{dirs[-1].lower()}")
+    if stem:
+        tokens.add(f"stem:{stem.lower()}")
+        tokens.update(_words(stem))
+    if ext:
+        tokens.add(f"ext:{ext.lower()}")
+    return sorted(tokens)
+
+
+class PathClassifier:
+    """Component token profiles learned from (repo, path, component) examples."""
+
+    def __init__(self, temperature: float = TEMPERATURE, null_score: float = NULL_SCORE):
+        self.temperature = temperature
+        self.null_score = null_score
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.components: List[str] = []
+        self.component_repos = np.zeros(0, dtype=object)
+        self._profiles_t = np.zeros((0, 0), dtype=np.float32)  # vocabulary x components
+        self._examples: List[Tuple[str, str, str]] = []
+
+    @classmethod
+    def from_session(cls, session: Session, **kwargs) -> "PathClassifier":
+        """Classifier trained on every code_component_mappings row."""
+        rows = (
+            session.query(ArchitectureComponent.repo, CodeComponentMapping.file_path, CodeComponentMapping.component_id)
+            .join(ArchitectureComponent, ArchitectureComponent.id == CodeComponentMapping.component_id)
+            .all()
+        )
+        classifier = cls(**kwargs)
+        classifier.fit([tuple(row) for row in rows])
+        return classifier
+
+    def __len__(self) -> int:
+        return len(self._examples)
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def fit(self, examples: Sequence[Tuple[str, str, str]]) -> "PathClassifier":
+        """
+        Learn profiles.
+
+        Args:
+            examples: (repo, file_path, component_id) triples; file_path is relative to the repo root
+        """
+        self._examples = [example for example in examples if path_tokens(example[1])]
+        token_lists = [path_tokens(file_path) for _, file_path, _ in self._examples]
+
+        self.vocabulary = {}
+        df: List[int] = []
+        for tokens in token_lists:
+            for token in tokens:
+                index = self.vocabulary.setdefault(token, len(df))
+                if index == len(df):
+                    df.append(0)
+                df[index] += 1
+        n = len(token_lists)
+        self.idf = np.array([math.log((1 + n) / (1 + d)) + 1 for d in df], dtype=np.float32)
+
+        component_index: Dict[str, int] = {}
+        repos: List[str] = []
+        for repo, _, component_id in self._examples:
+            if component_id not in component_index:
+                component_index[component_id] = len(repos)
+                repos.append(repo)
+        self.components = [*component_index]
+        self.component_repos = np.array(repos, dtype=object)
+
+        indptr, indices, data = self._csr(token_lists)
+        labels = np.array([component_index[c] for _, _, c in self._examples], dtype=np.int64)
+        # Profile = normalized sum of the normalized example vectors
+        rows = np.repeat(labels, np.diff(indptr))
+        sums = np.zeros((len(self.vocabulary), len(self.components)), dtype=np.float32)
+        np.add.at(sums, (indices, rows), data)
+        self._sums_t = sums
+        self._labels = labels
+        self._train = (indptr, indices, data)
+        norms = np.linalg.norm(sums, axis=0)
+        self._profiles_t = sums / np.where(norms > 0, norms, 1)
+        return self
+
+    def _csr(self, token_lists: Iterable[List[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """L2-normalized tf-idf rows as CSR arrays (tokens outside the vocabulary are dropped)."""
+        indptr = [0]
+        indices: List[int] = []
+        for tokens in token_lists:
+            indices.extend(self.vocabulary[t] for t in tokens if t in self.vocabulary)
+            indptr.append(len(indices))
+        indptr_a = np.array(indptr, dtype=np.int64)
+        indices_a = np.array(indices, dtype=np.int64)
+        data = self.idf[indices_a] if len(indices_a) else np.zeros(0, dtype=np.float32)
+        squares = np.zeros(len(indptr) - 1, dtype=np.float32)
+        nonempty = np.diff(indptr_a) > 0
+        if nonempty.any():
+            squares[nonempty] = np.add.reduceat(data ** 2, indptr_a[:-1][nonempty])
+        row_norms = np.repeat(np.sqrt(squares), np.diff(indptr_a))
+        return indptr_a, indices_a, (data / np.where(row_norms > 0, row_norms, 1)).astype(np.float32)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _scores(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                profiles_t: np.ndarray, start: int, end: int) -> np.ndarray:
+        """Cosine scores (rows start..end) x components for CSR rows."""
+        out = np.zeros((end - start, profiles_t.shape[1]), dtype=np.float32)
+        lo, hi = indptr[start], indptr[end]
+        if hi == lo:
+            return out
+        contributions = data[lo:hi, None] * profiles_t[indices[lo:hi]]
+        counts = np.diff(indptr[start:end + 1])
+        nonempty = counts > 0
+        out[nonempty] = np.add.reduceat(contributions, (indptr[start:end] - lo)[nonempty], axis=0)
+        return out
+
+    def _confidence(self, scores: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+        """Softmax over allowed components plus the "no component" option."""
+        logits = np.where(allowed, scores / self.temperature, -np.inf)
+        null = np.full((len(scores), 1), self.null_score / self.temperature, dtype=np.float32)
+        peak = np.maximum(logits.max(axis=1, keepdims=True), null)
+        weights = np.exp(logits - peak)
+        return weights / (weights.sum(axis=1, keepdims=True) + np.exp(null - peak))
+
+    def suggest(self, files: Sequence[Tuple[str, str]], top_k: int = 3) -> List[List[Suggestion]]:
+        """
+        Top-k components for each (repo, file_path), best first.
+
+        Files whose repo has no trained component get an empty list.
+        """
+        if not self.components or not files:
+            return [[] for _ in files]
+        indptr, indices, data = self._csr(path_tokens(file_path) for _, file_path in files)
+        file_repos = np.array([repo for repo, _ in files], dtype=object)
+        k = min(top_k, len(self.components))
+        results: List[List[Suggestion]] = []
+        for start in range(0, len(files), CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, len(files))
+            scores = self._scores(indptr, indices, data, self._profiles_t, start, end)
+            allowed = file_repos[start:end, None] == self.component_repos[None, :]
+            confidence = self._confidence(scores, allowed)
+            best = np.argsort(-confidence, axis=1, kind="stable")[:, :k]
+            for row in range(end - start):
+                results.append([
+                    Suggestion(self.components[c], float(confidence[row, c]), float(scores[row, c]))
+                    for c in best[row]
+                    if allowed[row, c]
+                ])
+        return results
+
+    def evaluate(self, threshold: float = 0.9) -> Dict[str, float]:
+        """
+        Leave-one-out accuracy on the training mappings.
+
+        Each example is scored against profiles rebuilt without it, which
+        only changes its own component's profile and is done in closed form.
+
+        Returns:
+            Dict with examples, accuracy, covered (share at or above
+            threshold) and precision (accuracy among those)
+        """
+        n = len(self._examples)
+        if not n:
+            return {"examples": 0, "accuracy": 0.0, "covered": 0.0, "precision": 0.0}
+        indptr, indices, data = self._train
+        sums_t = self._sums_t
+        sum_norms_sq = (sums_t ** 2).sum(axis=0)
+        example_repos = np.array([repo for repo, _, _ in self._examples], dtype=object)
+        correct = np.zeros(n, dtype=bool)
+        confident = np.zeros(n, dtype=bool)
+        for start in range(0, n, CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, n)
+            raw = self._scores(indptr, indices, data, sums_t, start, end)  # x . sum_c
+            labels = self._labels[start:end]
+            rows = np.arange(end - start)
+            own = raw[rows, labels]
+            # ||x|| = 1: removing x from its own sum gives (x.sum - 1) / ||sum - x||
+            own_norm_sq = np.maximum(sum_norms_sq[labels] - 2 * own + 1, 0)
+            scores = raw / np.sqrt(np.where(sum_norms_sq > 0, sum_norms_sq, 1))
+            scores[rows, labels] = np.where(own_norm_sq > 1e-9, (own - 1) / np.sqrt(np.maximum(own_norm_sq, 1e-9)), 0)
+            allowed = example_repos[start:end, None] == self.component_repos[None, :]
+            confidence = self._confidence(scores, allowed)
+            best = confidence.argmax(axis=1)
+            correct[start:end] = best == labels
+            confident[start:end] = confidence[rows, best] >= threshold
+        covered = confident.mean()
+        return {
+            "examples": n,
+            "accuracy": float(correct.mean()),
+            "covered": float(covered),
+            "precision": float(correct[confident].mean()) if confident.any() else 0.0,
+        }
@@ -0,0 +1,185 @@
+"""
+Component Path Index - In-memory trie of code-to-component mappings.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Resolve which architecture component owns a file path without a query per path
+DOMAIN: Cross-repo workspace management
+
+All CodeComponentMapping rows are loaded with one query into a trie keyed by
+path segment. A lookup walks the trie once (O(path depth)) and returns the
+deepest mapping on the way, so a mapping on a directory owns every file below
+it while a file mapping still wins for that file.
+
+Freshness (ChangeTrackedSnapshot) is checked with PRAGMA data_version on a
+connection owned by the index: it only changes when another connection
+commits. When it does, the change_log tail for the snapshot's tables tells
+whether they actually changed before anything is reloaded. That tail, the
+highest seq among the tables' change_log entries, only ever grows: seq is
+AUTOINCREMENT and compact_change_log keeps the newest entry of every table.
+It therefore doubles as a version of the snapshot's data.
+"""
+
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, NamedTuple, Optional
+import sqlite3
+import sys
+
+from sqlalchemy.engine import Engine
+
+
+class PathMatch(NamedTuple):
+    """Mapping that owns a path."""
+    mapping_id: str
+    component_id: str
+    mapped_path: str  # The mapping's file_path (a directory for prefix matches)
+    exact: bool  # True when the mapping is for the path itself
+
+
+class _Node:
+    __slots__ = ("children", "match")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.match: Optional[PathMatch] = None
+
+
+def split_path(file_path: str) -> list:
+    """Normalized, interned path segments ("./src//a.py" -> ["src", "a.py"])."""
+    return [
+        sys.intern(segment)
+        for segment in file_path.replace("\\", "/").split("/")
+        if segment and segment != "."
+    ]
+
+
+class ChangeTrackedSnapshot:
+    """
+    Base for in-process snapshots of tables that reload only when those tables change.
+
+    Subclasses set TABLES (all must be in CHANGE_LOG_TABLES) and implement
+    _load(conn). Use for_engine(engine) to share one instance per database
+    within a process.
+    """
+
+    TABLES: tuple = ()
+
+    _instances: Dict[tuple, "ChangeTrackedSnapshot"] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Dedicated connection: data_version is per connection and must not see our own writes
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._lock = Lock()
+        self._data_version: Optional[int] = None
+        self._change_seq: Optional[int] = None
+        self.loads = 0
+        self.refresh(force=True)
+
+    @classmethod
+    def for_engine(cls, engine: Engine):
+        """Shared instance for the database behind engine."""
+        key = (cls, str(Path(engine.url.database).resolve()))
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = cls(key[1])
+            return instance
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload if TABLES changed since the last load.
+
+        Returns:
+            True if the snapshot was rebuilt
+        """
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self._data_version:
+                return False
+            self._data_version = version
+
+            seq = self._tables_change_seq()
+            if not force and seq is not None and seq == self._change_seq:
+                return False
+
+            self._load(self._conn)
+            self._change_seq = seq
+            self.loads += 1
+            return True
+
+    def _load(self, conn: sqlite3.Connection):
+        raise NotImplementedError
+
+    def _tables_change_seq(self) -> Optional[int]:
+        placeholders = ", ".join("?" for _ in self.TABLES)
+        try:
+            return self._conn.execute(
+                f'SELECT COALESCE(MAX(seq), 0) FROM change_log WHERE "table" IN ({placeholders})',
+                self.TABLES,
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            # No change_log (database not initialized through WorkspaceDB): always reload
+            return None
+
+
+class ComponentPathIndex(ChangeTrackedSnapshot):
+    """Path trie over code_component_mappings for one SQLite database."""
+
+    TABLES = ("code_component_mappings",)
+
+    def __init__(self, db_path: str):
+        self._root = _Node()
+        self._size = 0
+        super().__init__(db_path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _load(self, conn: sqlite3.Connection):
+        rows = conn.execute("SELECT id, file_path, component_id FROM code_component_mappings").fetchall()
+        self._root, self._size = self._build(rows)
+
+    def lookup(self, file_path: str) -> Optional[PathMatch]:
+        """Mapping owning file_path (exact file or deepest mapped directory), or None."""
+        self.refresh()
+        return self._lookup(split_path(file_path))
+
+    def lookup_many(self, file_paths: Iterable[str]) -> Dict[str, Optional[PathMatch]]:
+        """Resolve many paths against a single freshness check."""
+        self.refresh()
+        return {file_path: self._lookup(split_path(file_path)) for file_path in file_paths}
+
+    def _lookup(self, segments: list) -> Optional[PathMatch]:
+        node = self._root
+        best = None
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.match is not None:
+                best = node.match
+        else:
+            if node.match is not None:
+                return node.match
+        return best._replace(exact=False) if best is not None else None
+
+    @staticmethod
+    def _build(rows) -> tuple:
+        root = _Node()
+        size = 0
+        for mapping_id, file_path, component_id in rows:
+            segments = split_path(file_path or "")
+            if not segments:
+                continue
+            node = root
+            for segment in segments:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _Node()
+                node = child
+            node.match = PathMatch(mapping_id, component_id, file_path, True)
+            size += 1
+        return root, size
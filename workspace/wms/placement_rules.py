@@ -0,0 +1,136 @@
+"""
+Placement Rules - Process-level cache of the component placement rules.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Validate task placement without re-querying and re-scanning every rule per task
+DOMAIN: Cross-repo workspace management
+
+A task violates a ComponentPlacement rule when its title or description
+mentions the component name (case-insensitive substring) and it is proposed
+for a repo other than correct_repo.
+
+The rules are loaded once per rules version: the highest change_log seq of
+the governance rule tables (component_placements and import_rules), which
+the change data capture triggers bump on every write. All component names
+are compiled into a single trie-shaped regex. Scanning it at every position
+of the lower-cased task text finds every mentioned name in one pass,
+including names that overlap or contain one another. The per-task cost no
+longer grows with the number of rules.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+import re
+import sqlite3
+
+from workspace.wms.path_index import ChangeTrackedSnapshot
+
+
+class PlacementRule(NamedTuple):
+    """One component_placements row, as needed to validate tasks."""
+    id: str
+    component_name: str
+    component_type: str
+    correct_repo: Optional[str]
+    correct_location: Optional[str]
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Regex alternation of words shaped as a trie ("ab|ac" -> "a(?:b|c)").
+
+    Python's re tries alternatives one by one, so a flat alternation of
+    many words costs one attempt per word at every position. The trie
+    shares common prefixes, and its greedy optional tails prefer the
+    longest word.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def compile_placement_rules(
+    rows: Iterable[Tuple]
+) -> Tuple[Optional[Pattern], Dict[str, List[PlacementRule]], Dict[str, List[str]]]:
+    """
+    Compile (id, component_name, component_type, correct_repo, correct_location) rows.
+
+    Returns:
+        (pattern over lower-cased text, or None without rules;
+         lower-cased name -> rules in load order;
+         name -> the names it starts with, itself included)
+    """
+    by_name: Dict[str, List[PlacementRule]] = {}
+    for row in rows:
+        rule = PlacementRule(*row)
+        name = (rule.component_name or "").lower()
+        if name:
+            by_name.setdefault(name, []).append(rule)
+    if not by_name:
+        return None, by_name, {}
+    # The lookahead tries every position; the trie reports the longest name there,
+    # and the names it starts with also occur at that position
+    prefixes = {name: [name[:i] for i in range(1, len(name) + 1) if name[:i] in by_name] for name in by_name}
+    return re.compile(f"(?=({trie_regex(by_name)}))", re.DOTALL), by_name, prefixes
+
+
+class PlacementRuleCache(ChangeTrackedSnapshot):
+    """Compiled component_placements for one SQLite database, reloaded when the rules version moves."""
+
+    TABLES = ("component_placements", "import_rules")
+
+    def __init__(self, db_path: str):
+        self._pattern: Optional[Pattern] = None
+        self._by_name: Dict[str, List[PlacementRule]] = {}
+        self._prefixes: Dict[str, List[str]] = {}
+        self._order: Dict[str, int] = {}
+        super().__init__(db_path)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def version(self) -> Optional[int]:
+        """Rules version the cache was built at (None without change_log)."""
+        self.refresh()
+        return self._change_seq
+
+    def _load(self, conn: sqlite3.Connection):
+        try:
+            rows = conn.execute(
+                "SELECT id, component_name, component_type, correct_repo, correct_location "
+                "FROM component_placements ORDER BY rowid"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []  # Table not created yet
+        self._pattern, self._by_name, self._prefixes = compile_placement_rules(rows)
+        self._order = {row[0]: i for i, row in enumerate(rows)}
+
+    def rules(self) -> List[PlacementRule]:
+        """All rules in load order."""
+        self.refresh()
+        found = [rule for rules in self._by_name.values() for rule in rules]
+        return sorted(found, key=lambda rule: self._order[rule.id])
+
+    def mentioned(self, text: str) -> List[PlacementRule]:
+        """Rules whose component name occurs in text (case-insensitive), in load order."""
+        self.refresh()
+        if self._pattern is None or not text:
+            return []
+        names = set()
+        for longest in self._pattern.findall(text.lower()):
+            names.update(self._prefixes[longest])
+        found = [rule for name in names for rule in self._by_name[name]]
+        return sorted(found, key=lambda rule: self._order[rule.id])
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+WMS Pre-commit - Architecture check for staged files, without SQLAlchemy.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Block commits of files that are unmapped or outside component boundaries, fast enough for a git hook
+DOMAIN: Cross-repo workspace management
+
+The mappings, compiled mapping rules and component boundaries are written to
+a compact JSON snapshot next to workspace.db. This module only uses the
+standard library and is run as a script by the hooks (importing the
+workspace package would pull in SQLAlchemy), so a check is: load the
+snapshot, compare its change_log position with the database (one read-only
+query), run `git diff --cached` and resolve each path with dict lookups.
+
+The snapshot is rebuilt when mappings, rules or components change (the
+ArchitectureValidator refreshes it after such writes) and, as a fallback,
+by the hook itself when it finds it stale; only that rebuild imports the
+workspace package.
+
+Usage:
+    python workspace/wms/precommit.py install [--repo meridian-core] [--warn-only]
+    python workspace/wms/precommit.py build
+    python workspace/wms/precommit.py check --repo meridian-core [FILE ...]   (what the hooks run)
+"""
+
+# Hooks run this on every commit: keep imports to what a check needs (no
+# pathlib/typing/argparse/subprocess, which together cost more than the check)
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import sys
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = ".wms-precommit.json"
+
+# Tables the snapshot is compiled from (all are in CHANGE_LOG_TABLES)
+SNAPSHOT_TABLES = ("code_component_mappings", "component_mapping_rules", "architecture_components")
+
+HOOK_MARKER = "# Installed by workspace/wms/precommit.py"
+
+WORKSPACE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def default_snapshot_path(db_path: str) -> str:
+    """Snapshot file for a database (stored next to it)."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), SNAPSHOT_NAME)
+
+
+def normalize_path(file_path: str) -> str:
+    """Same normalization as the path index ("./src//a.py" -> "src/a.py")."""
+    return "/".join(s for s in file_path.replace("\\", "/").split("/") if s and s != ".")
+
+
+def _change_seq(conn: sqlite3.Connection) -> int:
+    placeholders = ", ".join("?" for _ in SNAPSHOT_TABLES)
+    return conn.execute(
+        f'SELECT COALESCE(MAX(seq), 0) FROM change_log WHERE "table" IN ({placeholders})',
+        SNAPSHOT_TABLES,
+    ).fetchone()[0]
+
+
+def change_seq(db_path: str) -> int | None:
+    """Latest change_log position for SNAPSHOT_TABLES, or None if it cannot be read."""
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        return _change_seq(conn)
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+# ============================================================================
+# SNAPSHOT BUILD (imports the workspace package for the rule compiler)
+# ============================================================================
+
+def build_snapshot(db_path: str) -> dict:
+    """
+    Compile mappings, active rules and component boundaries from the database.
+
+    Rules are stored in precedence order with their regex and literal key
+    prefix, so the hook never has to translate globs.
+    """
+    if sys.flags.no_site:
+        # Hooks start the interpreter with -S; the rule compiler needs site-packages
+        import site
+        site.main()
+    if WORKSPACE_ROOT not in sys.path:
+        sys.path.insert(0, WORKSPACE_ROOT)
+    from workspace.wms.mapping_rules import compile_rules, _literal_prefix
+    from workspace.wms.path_index import split_path
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        # Read everything in one snapshot so change_seq matches the data
+        conn.execute("BEGIN")
+        seq = _change_seq(conn)
+        mappings = conn.execute("SELECT file_path, component_id FROM code_component_mappings").fetchall()
+        rule_rows = conn.execute(
+            "SELECT id, component_id, pattern, pattern_type, priority, reason "
+            "FROM component_mapping_rules WHERE is_active = 1"
+        ).fetchall()
+        components = conn.execute("SELECT id, component_name, boundaries FROM architecture_components").fetchall()
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    rules, _ = compile_rules(rule_rows)
+    snapshot_components = {}
+    for component_id, name, boundaries in components:
+        try:
+            forbidden = json.loads(boundaries).get("forbidden_paths", []) if boundaries else []
+        except (ValueError, AttributeError):
+            forbidden = []
+        snapshot_components[component_id] = {"name": name, "forbidden_paths": forbidden}
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "db_path": os.path.abspath(db_path),
+        "change_seq": seq,
+        "mappings": {
+            normalize_path(path): component_id for path, component_id in mappings if normalize_path(path or "")
+        },
+        "rules": [
+            ["/".join(_literal_prefix(split_path(rule.pattern))), rule.regex, rule.component_id, rule.pattern]
+            for rule in rules
+        ],
+        "components": snapshot_components,
+    }
+
+
+def write_snapshot(db_path: str, snapshot_path: str | None = None) -> str:
+    """Build the snapshot and replace the file atomically."""
+    snapshot_path = snapshot_path or default_snapshot_path(db_path)
+    data = build_snapshot(db_path)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+def refresh_snapshot(db_path: str, snapshot_path: str | None = None, create: bool = False) -> bool:
+    """
+    Rebuild the snapshot if the database changed since it was written.
+
+    Args:
+        db_path: workspace.db
+        snapshot_path: Snapshot file (default: next to the database)
+        create: Also build it when there is no snapshot yet (otherwise only
+                existing snapshots, i.e. installed hooks, are kept current)
+
+    Returns:
+        True if the snapshot was rewritten
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(db_path)
+    snapshot = load_snapshot(snapshot_path)
+    if snapshot is None and not create and not os.path.exists(snapshot_path):
+        return False
+    if snapshot is not None and snapshot["change_seq"] == change_seq(db_path):
+        return False
+    write_snapshot(db_path, snapshot_path)
+    return True
+
+
+def load_snapshot(snapshot_path: str) -> dict | None:
+    """Parsed snapshot, or None if missing, unreadable or from another format version."""
+    try:
+        with open(snapshot_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get("version") == SNAPSHOT_VERSION else None
+
+
+# ============================================================================
+# CHECK
+# ============================================================================
+
+class SnapshotValidator:
+    """Resolves paths against a loaded snapshot (mirrors ArchitectureValidator)."""
+
+    def __init__(self, snapshot: dict):
+        self.mappings: dict[str, str] = snapshot["mappings"]
+        self.rules: list[list] = snapshot["rules"]
+        self.components: dict[str, dict] = snapshot["components"]
+        self._compiled: dict[int, re.Pattern] = {}
+
+    def resolve(self, repo: str, file_path: str) -> str | None:
+        """Component owning the file: explicit/directory mapping first, then the winning rule."""
+        path = normalize_path(file_path)
+        # Deepest mapped path (the file itself or one of its directories) wins
+        candidate = path
+        while candidate:
+            component_id = self.mappings.get(candidate)
+            if component_id is not None:
+                return component_id
+            candidate = candidate.rpartition("/")[0]
+
+        key = normalize_path(f"{repo}/{path}")
+        for i, (prefix, regex, component_id, _) in enumerate(self.rules):
+            if prefix and key != prefix and not key.startswith(prefix + "/"):
+                continue
+            compiled = self._compiled.get(i)
+            if compiled is None:
+                compiled = self._compiled[i] = re.compile(regex)
+            if compiled.fullmatch(key):
+                return component_id
+        return None
+
+    def violations(self, repo: str, file_path: str) -> list[str]:
+        """Violations for one staged file (empty if it may be committed)."""
+        component_id = self.resolve(repo, file_path)
+        if component_id is None:
+            return [f"File '{file_path}' is not mapped to any architecture component"]
+        component = self.components.get(component_id) or {}
+        return [
+            f"File path violates component boundaries of {component.get('name', component_id)}: {forbidden}"
+            for forbidden in component.get("forbidden_paths", [])
+            if forbidden in file_path
+        ]
+
+
+def staged_files(repo_dir: str | None = None) -> list[str]:
+    """Added/copied/modified/renamed staged files, relative to repo_dir."""
+    import subprocess
+
+    out = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "--relative", "-z"],
+        cwd=repo_dir,
+        capture_output=True,
+        check=True,
+    ).stdout
+    return split_null(out)
+
+
+def split_null(data: bytes) -> list[str]:
+    """Paths from NUL-separated git output (-z)."""
+    return [p for p in data.decode("utf-8", errors="replace").split("\0") if p]
+
+
+def check(
+    repo: str,
+    db_path: str,
+    snapshot_path: str | None = None,
+    files: list[str] | None = None,
+    warn_only: bool = False
+) -> int:
+    """
+    Validate staged files (or the given files) of a repo.
+
+    Args:
+        repo: Repository name
+        db_path: workspace.db (only read to detect a stale snapshot)
+        snapshot_path: Snapshot file (default: next to the database)
+        files: Paths relative to the repo (default: git diff --cached in the cwd)
+        warn_only: Report violations but return 0
+
+    Returns:
+        Exit code: 0 if the commit may proceed, 1 if it is blocked
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(db_path)
+    snapshot = load_snapshot(snapshot_path)
+    if snapshot is None or snapshot["change_seq"] != change_seq(db_path):
+        if os.path.exists(db_path):
+            try:
+                write_snapshot(db_path, snapshot_path)
+                snapshot = load_snapshot(snapshot_path)
+            except Exception as e:
+                print(f"⚠️  WMS: could not rebuild architecture snapshot ({e}), using the last one", file=sys.stderr)
+        if snapshot is None:
+            print(f"⚠️  WMS: no architecture snapshot at {snapshot_path}, skipping check", file=sys.stderr)
+            return 0
+
+    if files is None:
+        files = staged_files()
+    validator = SnapshotValidator(snapshot)
+    problems = [(f, v) for f in files for v in [validator.violations(repo, f)] if v]
+    if not problems:
+        return 0
+
+    print(f"❌ WMS: {len(problems)} staged file(s) in {repo} violate architecture alignment:", file=sys.stderr)
+    for file_path, violations in problems[:50]:
+        for violation in violations:
+            print(f"   • {violation}", file=sys.stderr)
+    if len(problems) > 50:
+        print(f"   ... and {len(problems) - 50} more", file=sys.stderr)
+    print("   Map files with: python workspace/wms/cli.py map rule add <pattern> <component>", file=sys.stderr)
+    if warn_only:
+        return 0
+    print("   (bypass once with git commit --no-verify)", file=sys.stderr)
+    return 1
+
+
+# ============================================================================
+# HOOK INSTALLER
+# ============================================================================
+
+def hook_script(repo: str, repo_dir: str, db_path: str, warn_only: bool = False) -> str:
+    """pre-commit hook content for one repo."""
+    args = " --warn-only" if warn_only else ""
+    return (
+        "#!/bin/sh\n"
+        f"{HOOK_MARKER}\n"
+        # Paths relative to the repo directory (it may be a subdirectory of the git work tree);
+        # git runs alongside the interpreter start-up and hands the paths over on stdin
+        f'cd "{os.path.abspath(repo_dir)}" || exit 1\n'
+        "git diff --cached --name-only --diff-filter=ACMR --relative -z | "
+        f'"{sys.executable}" -S "{os.path.abspath(__file__)}" --db "{os.path.abspath(db_path)}" '
+        f'check --repo "{repo}" --stdin{args}\n'
+    )
+
+
+def install_hooks(
+    workspace_root: str,
+    db_path: str,
+    repos: list[str] | None = None,
+    warn_only: bool = False,
+    force: bool = False
+) -> dict[str, str]:
+    """
+    Install the pre-commit hook in each repo and build the snapshot.
+
+    Hooks that were not installed by this module are left alone unless force.
+
+    Returns:
+        Dict of repo -> installed, updated, skipped (foreign hook), missing or not_a_repo
+    """
+    import subprocess
+
+    if not repos:
+        if WORKSPACE_ROOT not in sys.path:
+            sys.path.insert(0, WORKSPACE_ROOT)
+        from workspace.wms.constants import REPOS
+        repos = REPOS
+
+    results = {}
+    for repo in repos:
+        repo_dir = os.path.join(workspace_root, repo)
+        if not os.path.isdir(repo_dir):
+            results[repo] = "missing"
+            continue
+        found = subprocess.run(
+            ["git", "rev-parse", "--git-path", "hooks"], cwd=repo_dir, capture_output=True, text=True
+        )
+        if found.returncode != 0:
+            results[repo] = "not_a_repo"
+            continue
+        hooks_dir = os.path.join(repo_dir, found.stdout.strip())  # Relative unless already absolute
+        hook = os.path.join(hooks_dir, "pre-commit")
+        if os.path.exists(hook) and not force:
+            with open(hook, encoding="utf-8", errors="replace") as f:
+                if HOOK_MARKER not in f.read():
+                    results[repo] = "skipped"
+                    continue
+        status = "updated" if os.path.exists(hook) else "installed"
+        os.makedirs(hooks_dir, exist_ok=True)
+        with open(hook, "w", encoding="utf-8") as f:
+            f.write(hook_script(repo, repo_dir, db_path, warn_only))
+        os.chmod(hook, 0o755)
+        results[repo] = status
+    write_snapshot(db_path)
+    return results
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="wms-precommit", description=__doc__.split("\n")[1])
+    parser.add_argument("--db", default=os.path.join(WORKSPACE_ROOT, "workspace.db"), help="workspace.db path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check_cmd = commands.add_parser("check", help="Validate staged files (run by the hook)")
+    check_cmd.add_argument("--repo", required=True)
+    check_cmd.add_argument("--stdin", action="store_true", help="Read NUL-separated paths from stdin")
+    check_cmd.add_argument("--warn-only", action="store_true", help="Report violations without blocking")
+    check_cmd.add_argument("files", nargs="*", help="Files to check instead of the staged ones")
+
+    commands.add_parser("build", help="Rebuild the snapshot")
+
+    install_cmd = commands.add_parser("install", help="Install the pre-commit hook in the repos")
+    install_cmd.add_argument("--repo", dest="repos", action="append", help="Repo (repeatable, default: all)")
+    install_cmd.add_argument("--warn-only", action="store_true", help="Hooks report but never block")
+    install_cmd.add_argument("--force", action="store_true", help="Replace pre-commit hooks not installed by WMS")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        files = split_null(sys.stdin.buffer.read()) if args.stdin else (args.files or None)
+        return check(args.repo, args.db, files=files, warn_only=args.warn_only)
+
+    if args.command == "build":
+        path = write_snapshot(args.db)
+        print(f"✅ Snapshot written: {path}")
+        return 0
+
+    results = install_hooks(WORKSPACE_ROOT, args.db, args.repos, warn_only=args.warn_only, force=args.force)
+    for repo, status in results.items():
+        icon = {"installed": "✅", "updated": "✅", "skipped": "⚠️ "}.get(status, "⏭️ ")
+        note = " (existing pre-commit hook, use --force to replace)" if status == "skipped" else ""
+        print(f"{icon} {repo}: {status.replace('_', ' ')}{note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,480 @@
+"""
+Task Revalidation - Re-check open tasks against the current governance rules.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Keep task violations current when decisions, placements or mappings change
+DOMAIN: Cross-repo workspace management
+
+WorkflowEngine.create_task validates a task once, when it is created. Tasks
+created before a new ComponentPlacement, keyword rule or component mapping
+landed are never checked against it. The revalidation pipeline evaluates
+every non-terminal task against the rules the governance engine applies:
+- placement: component_placements mentioned in the task vs its assigned repo
+  (or, when it has none, the repo routing picks)
+- scale: over_engineering keywords in the proposed solution for <= 5 users
+  (stored in extra_metadata by create_task; older tasks have none)
+- file alignment: related_files that no component owns, or that lie in a
+  component's forbidden_paths
+
+Tasks are streamed from the database in chunks. Tasks whose verdict is
+cached for their text and the current rules version (verdict_cache.py) are
+not evaluated again. The remaining tasks of each chunk are evaluated by a
+worker process, which loads the rule snapshots once, when it starts. The
+database work stays in the calling process. Findings are diffed against the
+task's existing violations of these four types by (type, rule, message).
+Only new violations are inserted, fixed ones that reappear are reopened, and
+open ones that no longer occur are marked fixed, all in one transaction.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Engine
+
+from workspace.db.models import ArchitectureComponent, Violation, WorkspaceTask
+from workspace.wms.keyword_rules import KeywordMatcher
+from workspace.wms.mapping_rules import MappingRuleMatcher
+from workspace.wms.path_index import ComponentPathIndex
+from workspace.wms.placement_rules import PlacementRuleCache
+from workspace.wms.verdict_cache import Verdict, VerdictCache, task_hash
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "closed", "cancelled")
+
+# Violation types the pipeline owns; others (e.g. forbidden_import) are left alone
+VIOLATION_TYPES = ("component_placement", "over_engineering", "unmapped_file", "scope_violation")
+
+CHUNK_SIZE = 2000
+PARALLEL_THRESHOLD = 5000
+
+# Same threshold as GovernanceEngine.validate_scale_appropriateness
+SMALL_SCALE_USERS = 5
+
+
+# create_task's repo when routing finds no keyword
+DEFAULT_REPO = "meridian-core"
+
+
+class TaskFacts(NamedTuple):
+    """What the rules read from a task (JSON columns still serialized)."""
+    id: str
+    title: str
+    description: Optional[str]
+    assigned_repo: Optional[str]
+    related_files: Optional[str]
+    extra_metadata: Optional[str]
+
+    @classmethod
+    def of(cls, task: WorkspaceTask) -> "TaskFacts":
+        return cls(task.id, task.title, task.description, task.assigned_repo,
+                   task.related_files, task.extra_metadata)
+
+    @property
+    def scale_inputs(self) -> Tuple[Optional[str], int]:
+        """(proposed solution, actual users) kept by create_task, (None, 1) without."""
+        try:
+            metadata = json.loads(self.extra_metadata) if self.extra_metadata else {}
+        except ValueError:
+            metadata = {}
+        if not isinstance(metadata, dict):
+            return None, 1
+        users = metadata.get("actual_users")
+        return metadata.get("proposed_solution") or None, users if isinstance(users, int) else 1
+
+    @property
+    def verdict_key(self) -> str:
+        solution, users = self.scale_inputs
+        return task_hash(self.title, self.description, self.related_files, self.assigned_repo, solution, users)
+
+
+class Finding(NamedTuple):
+    """One violation a task has under the current rules."""
+    task_id: str
+    violation_type: str
+    severity: str
+    message: str
+    rule_violated: str
+    fix_required: str
+    file_path: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return (self.task_id, self.violation_type, self.rule_violated, self.message)
+
+
+def violation_id(key: Tuple[str, str, str, str]) -> str:
+    """Stable id of a revalidation violation."""
+    return f"viol-{hashlib.sha1(chr(0).join(key).encode('utf-8')).hexdigest()[:24]}"
+
+
+def _json_list(value: Optional[str]) -> List[str]:
+    try:
+        parsed = json.loads(value) if value else []
+    except ValueError:
+        return []
+    return [item for item in parsed if isinstance(item, str)] if isinstance(parsed, list) else []
+
+
+def load_forbidden_paths(engine: Engine) -> Dict[str, List[str]]:
+    """component id -> forbidden_paths of its boundaries."""
+    forbidden = {}
+    with engine.connect() as conn:
+        for component_id, boundaries in conn.execute(
+            select(ArchitectureComponent.id, ArchitectureComponent.boundaries)
+            .where(ArchitectureComponent.boundaries.is_not(None))
+        ):
+            try:
+                paths = json.loads(boundaries).get("forbidden_paths")
+            except (ValueError, AttributeError):
+                continue
+            if isinstance(paths, list):
+                forbidden[component_id] = [path for path in paths if isinstance(path, str)]
+    return forbidden
+
+
+class TaskRules:
+    """The governance rules as in-memory snapshots of one database."""
+
+    def __init__(
+        self,
+        placements: PlacementRuleCache,
+        keywords: KeywordMatcher,
+        path_index: ComponentPathIndex,
+        mapping_rules: MappingRuleMatcher,
+        forbidden_paths: Dict[str, List[str]]
+    ):
+        self.placements = placements
+        self.keywords = keywords
+        self.path_index = path_index
+        self.mapping_rules = mapping_rules
+        self.forbidden_paths = forbidden_paths
+
+    @classmethod
+    def for_engine(cls, engine: Engine, forbidden_paths: Optional[Dict[str, List[str]]] = None) -> "TaskRules":
+        """Rules from the shared snapshots of the database behind engine."""
+        return cls(
+            PlacementRuleCache.for_engine(engine),
+            KeywordMatcher.for_engine(engine),
+            ComponentPathIndex.for_engine(engine),
+            MappingRuleMatcher.for_engine(engine),
+            load_forbidden_paths(engine) if forbidden_paths is None else forbidden_paths,
+        )
+
+    def evaluate(self, task: TaskFacts) -> List[Finding]:
+        """Findings of one task, without duplicates."""
+        return [Finding(task.id, *fingerprint) for fingerprint in self.verdict(task).findings]
+
+    def verdict(self, task: TaskFacts) -> Verdict:
+        """
+        Repo the task is validated against and its violation fingerprints.
+
+        A task without an assigned repo is validated against the repo routing
+        sends it to, as create_task does.
+        """
+        findings: Dict[tuple, tuple] = {}
+
+        def add(violation_type, severity, message, rule_violated, fix_required, file_path=None):
+            findings.setdefault(
+                (violation_type, rule_violated, message),
+                (violation_type, severity, message, rule_violated, fix_required, file_path),
+            )
+
+        repo = task.assigned_repo or self.keywords.route(task.description or "") or DEFAULT_REPO
+        for rule in self.placements.mentioned(task.title + " " + (task.description or "")):
+            if rule.correct_repo and repo != rule.correct_repo:
+                add(
+                    "component_placement", "CRITICAL",
+                    f"Component belongs in {rule.correct_repo}, not {repo}",
+                    f"Component placement: {rule.component_name}",
+                    f"Move to {rule.correct_repo}/{rule.correct_location}",
+                )
+
+        solution, users = task.scale_inputs
+        if solution and users <= SMALL_SCALE_USERS:
+            for keyword in self.keywords.keywords(solution, "over_engineering"):
+                add(
+                    "over_engineering", "HIGH",
+                    f"Over-engineering: {keyword} for {users} user(s)",
+                    "Start Small, Scale Smart principle",
+                    f"Use Tier 1 solution for {users} users",
+                )
+
+        related_files = _json_list(task.related_files)
+        if related_files:
+            matches = self.path_index.lookup_many(related_files)
+            unmatched = [path for path, match in matches.items() if match is None]
+            matches.update(self.mapping_rules.match_many(repo, unmatched))
+            for file_path in related_files:
+                match = matches[file_path]
+                if match is None:
+                    add(
+                        "unmapped_file", "HIGH",
+                        f"File '{file_path}' is not mapped to any architecture component",
+                        "Code-to-architecture mapping requirement",
+                        f"Map file to component: python workspace/wms/cli.py map-file {file_path} <component_id>",
+                        file_path,
+                    )
+                    continue
+                for forbidden in self.forbidden_paths.get(match.component_id, ()):
+                    if forbidden in file_path:
+                        add(
+                            "scope_violation", "MEDIUM",
+                            f"File path violates component boundaries: {forbidden}",
+                            "Component scope boundaries",
+                            "Review component boundaries and move file if needed",
+                            file_path,
+                        )
+        return Verdict(repo, [*findings.values()])
+
+
+# Rules of a worker process, loaded once by _init_worker
+_worker_rules: Optional[TaskRules] = None
+
+
+def _init_worker(db_path: str, forbidden_paths: Dict[str, List[str]]):
+    global _worker_rules
+    _worker_rules = TaskRules(
+        PlacementRuleCache(db_path),
+        KeywordMatcher(db_path),
+        ComponentPathIndex(db_path),
+        MappingRuleMatcher(db_path),
+        forbidden_paths,
+    )
+
+
+def evaluate_chunk(tasks: List[TaskFacts]) -> List[Verdict]:
+    """Worker entry point: verdicts of a chunk of tasks, in order."""
+    return [_worker_rules.verdict(task) for task in tasks]
+
+
+class TaskRevalidator:
+    """Re-evaluates every non-terminal task and reconciles its violations."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        workers: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        use_cache: bool = True,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            workers: Processes evaluating chunks (default: CPU count)
+            chunk_size: Tasks per chunk
+            use_cache: Reuse verdicts of tasks unchanged since the rules last changed
+            progress: Callback for progress messages
+        """
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.use_cache = use_cache
+        self.progress = progress or (lambda message: None)
+
+    def run(self, repos: Optional[Sequence[str]] = None, record: bool = True) -> Dict[str, Any]:
+        """
+        Revalidate the non-terminal tasks.
+
+        Args:
+            repos: Only tasks assigned to these repos (default: all)
+            record: Write the violation changes and new verdicts (False: only report them)
+
+        Returns:
+            Dict with tasks, findings (Finding list of new and reopened
+            violations), opened, reopened, fixed, unchanged, tasks_with_violations,
+            cache_hits, evaluated and seconds
+        """
+        started = time.monotonic()
+        cache = VerdictCache(self.engine)
+        version = cache.rules_version
+        forbidden_paths = load_forbidden_paths(self.engine)
+
+        task_ids = set()
+        assigned: List[Tuple[str, str]] = []  # (task id, verdict key)
+        verdicts: Dict[str, Verdict] = {}
+        computed: Dict[str, Verdict] = {}
+        hits: List[str] = []
+
+        misses = self._misses(self._chunks(repos, task_ids), cache, version, assigned, verdicts, hits)
+        buffered: List[List[Tuple[str, TaskFacts]]] = []
+        pending = 0
+        if self.workers > 1:
+            for chunk in misses:
+                buffered.append(chunk)
+                pending += len(chunk)
+                if pending >= PARALLEL_THRESHOLD:
+                    break
+        if self.workers == 1 or pending < PARALLEL_THRESHOLD:
+            # Evaluating in-process is faster than starting workers for few tasks
+            rules = TaskRules.for_engine(self.engine, forbidden_paths)
+            for chunk in itertools.chain(buffered, misses):
+                for key, task in chunk:
+                    verdicts[key] = computed[key] = rules.verdict(task)
+        else:
+            # spawn: forked children would inherit the parent's SQLite connections
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(str(Path(self.engine.url.database).resolve()), forbidden_paths),
+            ) as pool:
+                futures = [(chunk, pool.submit(evaluate_chunk, [task for _, task in chunk])) for chunk in buffered]
+                futures.extend(
+                    (chunk, pool.submit(evaluate_chunk, [task for _, task in chunk])) for chunk in misses
+                )
+                for done, (chunk, future) in enumerate(futures, 1):
+                    for (key, _), verdict in zip(chunk, future.result()):
+                        verdicts[key] = computed[key] = verdict
+                    self.progress(f"{done}/{len(futures)} chunks evaluated")
+
+        findings = [
+            Finding(task_id, *fingerprint)
+            for task_id, key in assigned
+            for fingerprint in verdicts[key].findings
+        ]
+        self.progress(f"{len(task_ids):,} tasks ({len(hits):,} cached verdicts, {len(computed):,} evaluated), "
+                      f"{len(findings):,} violations found")
+
+        result = self._reconcile(task_ids, findings, record)
+        if record and self.use_cache:
+            result["evicted"] = cache.record(version, computed, hits)
+        result.update({
+            "tasks": len(task_ids),
+            "tasks_with_violations": len({finding.task_id for finding in findings}),
+            "cache_hits": len(hits),
+            "evaluated": len(computed),
+            "seconds": round(time.monotonic() - started, 2),
+        })
+        return result
+
+    def _misses(
+        self,
+        chunks: Iterator[List[TaskFacts]],
+        cache: VerdictCache,
+        version: int,
+        assigned: List[Tuple[str, str]],
+        verdicts: Dict[str, Verdict],
+        hits: List[str]
+    ) -> Iterator[List[Tuple[str, TaskFacts]]]:
+        """Resolve each chunk from the verdict cache; yield the (key, task) pairs left to evaluate."""
+        queued = set()
+        for chunk in chunks:
+            keyed = [(task.verdict_key, task) for task in chunk]
+            if self.use_cache:
+                wanted = {key for key, _ in keyed if key not in verdicts and key not in queued}
+                cached = cache.lookup(wanted, version)
+                verdicts.update(cached)
+                hits.extend(key for key, _ in keyed if key in cached)
+            misses = []
+            for key, task in keyed:
+                assigned.append((task.id, key))
+                if key not in verdicts and key not in queued:
+                    queued.add(key)
+                    misses.append((key, task))
+            if misses:
+                yield misses
+
+    def _chunks(self, repos: Optional[Sequence[str]], task_ids: set) -> Iterator[List[TaskFacts]]:
+        """Stream the non-terminal tasks in chunks, collecting their ids."""
+        query = select(
+            WorkspaceTask.id, WorkspaceTask.title, WorkspaceTask.description, WorkspaceTask.assigned_repo,
+            WorkspaceTask.related_files, WorkspaceTask.extra_metadata,
+        ).where(WorkspaceTask.status.not_in(TERMINAL_STATUSES))
+        if repos is not None:
+            query = query.where(WorkspaceTask.assigned_repo.in_([*repos]))
+        with self.engine.connect() as conn:
+            result = conn.execution_options(yield_per=self.chunk_size).execute(query)
+            for partition in result.partitions():
+                chunk = [TaskFacts(*row) for row in partition]
+                task_ids.update(task.id for task in chunk)
+                yield chunk
+
+    def _reconcile(self, task_ids: set, findings: List[Finding], record: bool) -> Dict[str, Any]:
+        """Insert/reopen new violations and fix vanished ones (one transaction)."""
+        now = datetime.utcnow()
+        found = {finding.key: finding for finding in findings}
+
+        with self.engine.connect() as conn:
+            if record:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                existing: Dict[tuple, List[Any]] = {}
+                for row in conn.execute(
+                    select(Violation.id, Violation.task_id, Violation.violation_type,
+                           Violation.rule_violated, Violation.message, Violation.status)
+                    .where(Violation.violation_type.in_(VIOLATION_TYPES), Violation.task_id.is_not(None))
+                ):
+                    if row.task_id in task_ids:
+                        key = (row.task_id, row.violation_type, row.rule_violated or "", row.message)
+                        existing.setdefault(key, []).append(row)
+
+                inserts, reopens, new = [], [], []
+                unchanged = 0
+                for key, finding in found.items():
+                    rows = existing.get(key, [])
+                    if any(row.status != "fixed" for row in rows):
+                        unchanged += 1
+                        continue
+                    new.append(finding)
+                    if rows:
+                        reopens.append({"b_id": rows[0].id, "b_detected": now})
+                    else:
+                        inserts.append({
+                            "id": violation_id(key),
+                            "task_id": finding.task_id,
+                            "violation_type": finding.violation_type,
+                            "severity": finding.severity,
+                            "message": finding.message,
+                            "file_path": finding.file_path,
+                            "rule_violated": finding.rule_violated,
+                            "fix_required": finding.fix_required,
+                            "status": "open",
+                            "detected_at": now,
+                        })
+                fixed = [
+                    {"b_id": row.id}
+                    for key, rows in existing.items() if key not in found
+                    for row in rows if row.status != "fixed"
+                ]
+
+                if record:
+                    if inserts:
+                        conn.execute(insert(Violation), inserts)
+                    if reopens:
+                        conn.execute(update(Violation).where(Violation.id == bindparam("b_id")).values(
+                            status="open",
+                            resolved_at=None,
+                            detected_at=bindparam("b_detected"),
+                        ), reopens)
+                    if fixed:
+                        conn.execute(update(Violation).where(Violation.id == bindparam("b_id")).values(
+                            status="fixed",
+                            resolved_at=now,
+                        ), fixed)
+                    conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                if record:
+                    conn.exec_driver_sql("ROLLBACK")
+                raise
+
+        return {
+            "findings": new,
+            "opened": len(inserts),
+            "reopened": len(reopens),
+            "fixed": len(fixed),
+            "unchanged": unchanged,
+        }
@@ -0,0 +1,157 @@
+"""
+Task Lifecycle - Task state machine with optimistic concurrency.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Status transitions that cannot be applied twice or lost between agents
+DOMAIN: Cross-repo workspace management
+
+Lifecycle (TRANSITIONS):
+
+    planning --approve--> approved --start--> in_progress --complete--> completed
+    planning | pending --start--> in_progress
+    planning | pending | approved | in_progress --block--> blocked --unblock--> planning
+
+(pending is the status of imported tasks that never went through planning.)
+
+A transition is a single conditional statement:
+
+    UPDATE workspace_tasks SET status = ?, version = version + 1, ...
+    WHERE id = ? AND status IN (<sources>) [AND version = ?]
+    RETURNING version
+
+The status check and the write happen atomically, and the write lock is held
+for that one statement only. Every applied transition bumps
+workspace_tasks.version. A caller that read the task (checked it, ran an
+evaluation) passes the version it read. If another agent moved the task in
+the meantime, nothing is written and the result is a conflict rather than a
+lost update: two agents starting the same task get one "applied" and one
+"conflict".
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection, Engine
+
+from workspace.db.models import WorkspaceTask
+
+
+class Transition(NamedTuple):
+    """A named move between task statuses."""
+    name: str
+    sources: Tuple[str, ...]  # Statuses the task may be in
+    target: str
+    stamp: Optional[str] = None  # Timestamp column set when applied
+
+
+TRANSITIONS: Dict[str, Transition] = {t.name: t for t in (
+    Transition("approve", ("planning", "pending"), "approved"),
+    Transition("start", ("planning", "pending", "approved"), "in_progress", "started_at"),
+    Transition("complete", ("in_progress",), "completed", "completed_at"),
+    Transition("block", ("planning", "pending", "approved", "in_progress"), "blocked"),
+    Transition("unblock", ("blocked",), "planning"),
+)}
+
+# TransitionResult.outcome values
+APPLIED = "applied"
+CONFLICT = "conflict"  # The task changed since expected_version was read
+INVALID = "invalid"  # The task is not in a source status of the transition
+NOT_FOUND = "not_found"
+
+
+class TransitionResult(NamedTuple):
+    """Outcome of one transition attempt."""
+    task_id: str
+    transition: str
+    outcome: str
+    status: Optional[str]  # After the attempt: the new status, or the unchanged current one
+    version: Optional[int]
+
+    @property
+    def applied(self) -> bool:
+        return self.outcome == APPLIED
+
+
+def get_transition(name: str) -> Transition:
+    """Transition by name; raises ValueError for unknown names."""
+    try:
+        return TRANSITIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transition '{name}' (expected one of {', '.join(TRANSITIONS)})") from None
+
+
+def apply_transition(
+    conn: Connection,
+    task_id: str,
+    name: str,
+    expected_version: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> TransitionResult:
+    """
+    Apply a transition with one conditional UPDATE (commits unless conn is in a transaction).
+
+    Args:
+        conn: Connection to the workspace database
+        task_id: Task to move
+        name: Transition name (see TRANSITIONS)
+        expected_version: Version the caller read; any other current version is a conflict
+        now: Timestamp for updated/stamp columns
+
+    Returns:
+        TransitionResult; only APPLIED changed the row
+    """
+    transition = get_transition(name)
+    now = now or datetime.utcnow()
+    values = {"status": transition.target, "version": WorkspaceTask.version + 1, "updated": now}
+    if transition.stamp:
+        values[transition.stamp] = now
+    stmt = update(WorkspaceTask).where(
+        WorkspaceTask.id == task_id,
+        WorkspaceTask.status.in_(transition.sources),
+    )
+    if expected_version is not None:
+        stmt = stmt.where(WorkspaceTask.version == expected_version)
+    row = conn.execute(stmt.values(**values).returning(WorkspaceTask.version)).first()
+    if row is not None:
+        return TransitionResult(task_id, name, APPLIED, transition.target, row.version)
+
+    # Nothing written: report why, from the row as it is now
+    current = conn.execute(
+        select(WorkspaceTask.status, WorkspaceTask.version).where(WorkspaceTask.id == task_id)
+    ).first()
+    if current is None:
+        return TransitionResult(task_id, name, NOT_FOUND, None, None)
+    if expected_version is not None and current.version != expected_version:
+        outcome = CONFLICT
+    else:
+        outcome = INVALID
+    return TransitionResult(task_id, name, outcome, current.status, current.version)
+
+
+def apply_transitions(
+    conn: Connection,
+    moves: Iterable[Tuple[str, str, Optional[int]]],
+    now: Optional[datetime] = None
+) -> List[TransitionResult]:
+    """
+    Apply (task_id, transition, expected_version) moves with apply_transition.
+
+    Run inside BEGIN IMMEDIATE to apply them as one transaction; every move
+    is still checked on its own, so a stale one is a conflict, not an abort.
+    """
+    now = now or datetime.utcnow()
+    return [apply_transition(conn, task_id, name, expected_version, now) for task_id, name, expected_version in moves]
+
+
+class TaskLifecycle:
+    """Task transitions against one database."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def transition(self, task_id: str, name: str, expected_version: Optional[int] = None) -> TransitionResult:
+        """Apply one transition on its own connection (see apply_transition)."""
+        with self.engine.connect() as conn:
+            return apply_transition(conn, task_id, name, expected_version)
@@ -0,0 +1,240 @@
+"""
+Verdict Cache - Memoized governance verdicts per task text and rules version.
+
+REPO: workspace (management plane)
+LAYER: Management Plane
+PURPOSE: Skip re-evaluating tasks whose text and rules have not changed
+DOMAIN: Cross-repo workspace management
+
+A verdict is the repo a task was validated against plus the fingerprints of
+its violations (type, severity, message, rule, fix, file). It depends only on
+what the rules read from the task and on the rules themselves, so it is keyed
+by:
+- task_hash: SHA-1 of the case-folded title and description (routing and
+  placement matching are case-insensitive), related_files, the assigned repo
+  and the proposed solution/user count
+- rules_version: the highest change_log seq of every table the governance
+  rules are built from (RULE_TABLES). Any rule write moves it. seq is
+  AUTOINCREMENT and compact_change_log keeps each table's newest entry, so
+  the version never returns to an earlier value. Verdicts computed under
+  older rules are therefore never returned; they age out of the cache.
+
+Lookups load the verdicts of many tasks at once, and a hit is then a dict
+lookup. Use counts and hit/miss counters are written in the same batch as
+new verdicts. Once the cache grows past max_entries, the least recently used
+verdicts are evicted.
+"""
+
+from datetime import datetime
+from typing import Any, Collection, Dict, List, NamedTuple, Optional, Sequence
+import hashlib
+import json
+import sqlite3
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+from workspace.db.models import CacheStat, GovernanceVerdict
+from workspace.wms.path_index import ChangeTrackedSnapshot
+
+CACHE_NAME = "governance_verdicts"
+
+# Tables the placement, routing, scale and file alignment rules are built from
+RULE_TABLES = (
+    "component_placements",
+    "import_rules",
+    "keyword_rules",
+    "architecture_components",
+    "code_component_mappings",
+    "component_mapping_rules",
+)
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Above this many keys, read the whole rules version instead of IN (...) chunks
+_BULK_LOOKUP = 2000
+
+
+class Verdict(NamedTuple):
+    """Cached outcome of validating one task."""
+    assigned_repo: Optional[str]
+    findings: List[tuple]  # (violation_type, severity, message, rule_violated, fix_required, file_path)
+
+
+def task_hash(
+    title: str,
+    description: Optional[str],
+    related_files: Optional[str] = None,
+    assigned_repo: Optional[str] = None,
+    proposed_solution: Optional[str] = None,
+    actual_users: Optional[int] = None
+) -> str:
+    """Key of a task's verdict: everything the governance rules read from it."""
+    text = (title + " " + (description or "")).lower()
+    payload = json.dumps(
+        [text, related_files or "", assigned_repo or "", proposed_solution or "", actual_users],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class RulesVersion(ChangeTrackedSnapshot):
+    """Current version of the governance rules (nothing is loaded, only the change_log seq is tracked)."""
+
+    TABLES = RULE_TABLES
+
+    def _load(self, conn: sqlite3.Connection):
+        pass
+
+    @property
+    def version(self) -> int:
+        self.refresh()
+        return self._change_seq or 0
+
+
+class VerdictCache:
+    """governance_verdicts for one database."""
+
+    def __init__(self, engine: Engine, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            engine: Engine bound to the workspace database
+            max_entries: Verdicts kept; least recently used ones beyond are evicted
+        """
+        self.engine = engine
+        self.max_entries = max_entries
+        self._rules_version = RulesVersion.for_engine(engine)
+
+    @property
+    def rules_version(self) -> int:
+        return self._rules_version.version
+
+    def lookup(self, hashes: Collection[str], rules_version: int) -> Dict[str, Verdict]:
+        """Cached verdicts of the given task hashes under a rules version."""
+        if not hashes:
+            return {}
+        query = select(GovernanceVerdict.task_hash, GovernanceVerdict.assigned_repo, GovernanceVerdict.findings)
+        query = query.where(GovernanceVerdict.rules_version == rules_version)
+        rows = []
+        with self.engine.connect() as conn:
+            if len(hashes) > _BULK_LOOKUP:
+                rows = conn.execute(query).all()
+            else:
+                wanted = [*hashes]
+                for start in range(0, len(wanted), 500):
+                    rows.extend(conn.execute(
+                        query.where(GovernanceVerdict.task_hash.in_(wanted[start:start + 500]))
+                    ).all())
+        return {
+            row.task_hash: Verdict(row.assigned_repo, [tuple(f) for f in json.loads(row.findings)])
+            for row in rows
+            if row.task_hash in hashes
+        }
+
+    def record(
+        self,
+        rules_version: int,
+        computed: Dict[str, Verdict],
+        hit_hashes: Sequence[str] = ()
+    ) -> int:
+        """
+        Store new verdicts, count uses of cached ones and prune (one transaction).
+
+        Args:
+            rules_version: Version the verdicts were computed/looked up at
+            computed: task hash -> verdict of the misses
+            hit_hashes: Task hashes served from the cache
+
+        Returns:
+            Number of evicted verdicts
+        """
+        now = datetime.utcnow()
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                if computed:
+                    stmt = sqlite_insert(GovernanceVerdict)
+                    conn.execute(stmt.on_conflict_do_update(
+                        index_elements=[GovernanceVerdict.task_hash, GovernanceVerdict.rules_version],
+                        set_={
+                            "assigned_repo": stmt.excluded.assigned_repo,
+                            "findings": stmt.excluded.findings,
+                            "last_used_at": stmt.excluded.last_used_at,
+                        },
+                    ), [
+                        {
+                            "task_hash": digest,
+                            "rules_version": rules_version,
+                            "assigned_repo": verdict.assigned_repo,
+                            "findings": json.dumps([*verdict.findings]),
+                            "hits": 0,
+                            "created_at": now,
+                            "last_used_at": now,
+                        }
+                        for digest, verdict in computed.items()
+                    ])
+                if hit_hashes:
+                    conn.execute(update(GovernanceVerdict).where(
+                        GovernanceVerdict.task_hash == bindparam("b_hash"),
+                        GovernanceVerdict.rules_version == rules_version,
+                    ).values(
+                        hits=GovernanceVerdict.hits + 1,
+                        last_used_at=now,
+                    ), [{"b_hash": digest} for digest in hit_hashes])
+                evicted = self._prune(conn)
+                self._count(conn, hits=len(hit_hashes), misses=len(computed), evictions=evicted, now=now)
+                conn.exec_driver_sql("COMMIT")
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+        return evicted
+
+    def _prune(self, conn: Connection) -> int:
+        """Evict the least recently used verdicts beyond max_entries."""
+        excess = conn.execute(select(func.count()).select_from(GovernanceVerdict)).scalar() - self.max_entries
+        if excess <= 0:
+            return 0
+        return conn.exec_driver_sql(
+            "DELETE FROM governance_verdicts WHERE rowid IN "
+            "(SELECT rowid FROM governance_verdicts ORDER BY last_used_at LIMIT ?)",
+            (excess,),
+        ).rowcount
+
+    @staticmethod
+    def _count(conn: Connection, hits: int, misses: int, evictions: int, now: datetime):
+        if not (hits or misses or evictions):
+            return
+        stmt = sqlite_insert(CacheStat).values(
+            name=CACHE_NAME, hits=hits, misses=misses, evictions=evictions, updated_at=now
+        )
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[CacheStat.name],
+            set_={
+                "hits": CacheStat.hits + stmt.excluded.hits,
+                "misses": CacheStat.misses + stmt.excluded.misses,
+                "evictions": CacheStat.evictions + stmt.excluded.evictions,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ))
+
+
+def cache_statistics(engine: Engine) -> List[Dict[str, Any]]:
+    """Counters of every persistent cache, with hit rates (for `wms db profile`)."""
+    stats = []
+    with engine.connect() as conn:
+        entries = {
+            CACHE_NAME: conn.execute(select(func.count()).select_from(GovernanceVerdict)).scalar(),
+        }
+        for row in conn.execute(select(CacheStat).order_by(CacheStat.name)):
+            lookups = row.hits + row.misses
+            stats.append({
+                "name": row.name,
+                "entries": entries.get(row.name),
+                "hits": row.hits,
+                "misses": row.misses,
+                "hit_rate": row.hits / lookups if lookups else None,
+                "evictions": row.evictions,
+                "updated_at": row.updated_at,
+            })
+    return stats
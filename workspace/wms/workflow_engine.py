@@ -7,16 +7,38 @@ PURPOSE: Task workflow orchestration for WMS
 DOMAIN: Cross-repo workspace management
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from datetime import datetime
-from workspace.db.models import WorkspaceTask, Violation
+from workspace.db.models import WorkspaceTask, Violation, BastardReport
+from workspace.db.workspace_db import atomic
 from workspace.wms.governance_engine import GovernanceEngine
 from workspace.wms.bastard_integration import BastardIntegration
+from workspace.wms.task_lifecycle import (
+    APPLIED,
+    CONFLICT,
+    INVALID,
+    TaskLifecycle,
+    TransitionResult,
+    apply_transitions,
+    get_transition,
+)
 from pathlib import Path
 
 
+# `wms task bulk --filter KEY=VALUE` keys
+TASK_FILTERS = {
+    "id": WorkspaceTask.id,
+    "status": WorkspaceTask.status,
+    "repo": WorkspaceTask.assigned_repo,
+    "priority": WorkspaceTask.priority,
+    "assigned_to": WorkspaceTask.assigned_to,
+    "title": WorkspaceTask.title,
+}
+
+
 class WorkflowEngine:
     """Orchestrates task workflows with validation."""
     
@@ -31,6 +53,7 @@ class WorkflowEngine:
         self.governance = governance
         self.bastard = bastard
         self.workspace_root = workspace_root or Path.cwd()
+        self.lifecycle = TaskLifecycle(db_session.get_bind())
     
     def create_task(
         self,
@@ -56,12 +79,6 @@ class WorkflowEngine:
         # Generate task ID
         task_id = self._generate_task_id()
         
-        # Determine correct repo
-        assigned_repo = self.governance.determine_correct_repo(description)
-        if not assigned_repo:
-            # Default to meridian-core if unclear
-            assigned_repo = "meridian-core"
-        
         # Create task
         task = WorkspaceTask(
             id=task_id,
@@ -69,16 +86,26 @@ class WorkflowEngine:
             description=description,
             status="planning",
             priority=priority.upper(),
-            assigned_repo=assigned_repo,
             assigned_by="governance_engine",
-            repos_affected=json.dumps([assigned_repo]) if assigned_repo else None
+            # Kept so revalidation can re-run the scale check when keyword rules change
+            extra_metadata=json.dumps({
+                "proposed_solution": proposed_solution,
+                "actual_users": actual_users
+            }) if proposed_solution else None
         )
         
+        # Determine correct repo and validate (memoized per task text and rules version;
+        # meridian-core if routing is unclear)
+        verdict = self.governance.task_verdict(task)
+        assigned_repo = verdict.assigned_repo
+        task.assigned_repo = assigned_repo
+        task.repos_affected = json.dumps([assigned_repo])
+        
         self.db.add(task)
         self.db.flush()  # Get task.id
         
         # Validate placement
-        violations = self.governance.validate_task_placement(task, assigned_repo)
+        violations = self.governance.verdict_violations(task, verdict, "component_placement")
         
         if violations:
             print(f"\n⚠️  Placement violations detected:")
@@ -93,9 +120,7 @@ class WorkflowEngine:
         
         # Validate scale appropriateness (if solution provided)
         if proposed_solution:
-            scale_violations = self.governance.validate_scale_appropriateness(
-                task, proposed_solution, actual_users
-            )
+            scale_violations = self.governance.verdict_violations(task, verdict, "over_engineering", "scale-")
             
             if scale_violations:
                 print(f"\n⚠️  Scale appropriateness violations:")
@@ -162,10 +187,12 @@ class WorkflowEngine:
             print(f"❌ Task must be APPROVED before starting (current: {task.status})")
             return False
         
-        # Start task
-        task.status = "in_progress"
-        task.started_at = datetime.utcnow()
-        self.db.commit()
+        # Start task (only if nobody moved it since it was read)
+        result = self.lifecycle.transition(task.id, "start", expected_version=task.version)
+        self.db.refresh(task)
+        if not result.applied:
+            self._report_rejected(result)
+            return False
         
         print(f"✅ Task started: {task.id}")
         print(f"   Repo: {task.assigned_repo}")
@@ -192,6 +219,9 @@ class WorkflowEngine:
             print(f"❌ Task is not IN_PROGRESS (current: {task.status})")
             return False
         
+        # The verdict applies to the task as read here
+        expected_version = task.version
+        
         # Final Bastard evaluation
         print(f"\n🔥 Running final Bastard evaluation...")
         report = self.bastard.evaluate_completion(task)
@@ -199,21 +229,144 @@ class WorkflowEngine:
         if report.overall_grade in ['F', 'D']:
             print(f"\n❌ The Bastard REJECTED completion:")
             print(f"   Grade: {report.overall_grade}")
-            task.status = "blocked"
-            self.db.commit()
+            result = self.lifecycle.transition(task.id, "block", expected_version=expected_version)
+            self.db.refresh(task)
+            if not result.applied:
+                self._report_rejected(result)
             return False
         
         # Task approved
         print(f"\n✅ The Bastard APPROVED completion:")
         print(f"   Grade: {report.overall_grade}")
         
-        task.status = "completed"
-        task.completed_at = datetime.utcnow()
-        self.db.commit()
+        result = self.lifecycle.transition(task.id, "complete", expected_version=expected_version)
+        self.db.refresh(task)
+        if not result.applied:
+            self._report_rejected(result)
+            return False
         
         print(f"✅ Task completed: {task.id}")
         return True
     
+    def find_tasks(self, filters: Dict[str, str]) -> List[WorkspaceTask]:
+        """
+        Tasks matching every filter (one query).
+        
+        Args:
+            filters: TASK_FILTERS key -> value. Commas separate alternatives and
+                `*` is a wildcard (status=pending,planning; id=WS-TASK-1*);
+                title matches substrings. Comparisons ignore case.
+        
+        Returns:
+            Matching tasks, oldest first
+        """
+        query = self.db.query(WorkspaceTask)
+        for key, value in filters.items():
+            if key not in TASK_FILTERS:
+                raise ValueError(f"Unknown task filter '{key}' (expected one of {', '.join(TASK_FILTERS)})")
+            column = func.lower(TASK_FILTERS[key])
+            conditions = []
+            for alternative in value.lower().split(","):
+                pattern = alternative.strip().replace("*", "%")
+                if key == "title":
+                    pattern = f"%{pattern}%"
+                conditions.append(column.like(pattern) if "%" in pattern else column == pattern)
+            query = query.filter(or_(*conditions))
+        return query.order_by(WorkspaceTask.created, WorkspaceTask.id).all()
+    
+    def bulk_start(self, tasks: List[WorkspaceTask], dry_run: bool = False) -> List[TransitionResult]:
+        """Start every task that can start, in one transaction (see bulk_transition)."""
+        return self.bulk_transition(tasks, "start", dry_run=dry_run)
+    
+    def bulk_block(self, tasks: List[WorkspaceTask], dry_run: bool = False) -> List[TransitionResult]:
+        """Block every task that can be blocked, in one transaction (see bulk_transition)."""
+        return self.bulk_transition(tasks, "block", dry_run=dry_run)
+    
+    def bulk_complete(self, tasks: List[WorkspaceTask], dry_run: bool = False) -> List[TransitionResult]:
+        """
+        Complete every IN_PROGRESS task The Bastard approves, in one transaction.
+        
+        Tasks graded F or D are blocked instead, as in complete_task. The
+        completion reports and grades are saved in the same transaction.
+        """
+        reports = {}
+        for task in tasks:
+            if task.status in get_transition("complete").sources:
+                reports[task.id] = self.bastard.grade_completion(task)
+        moves = {
+            task_id: "block" if report.overall_grade in ['F', 'D'] else "complete"
+            for task_id, report in reports.items()
+        }
+        return self.bulk_transition(tasks, "complete", moves=moves, reports=reports, dry_run=dry_run)
+    
+    def bulk_transition(
+        self,
+        tasks: List[WorkspaceTask],
+        name: str,
+        moves: Optional[Dict[str, str]] = None,
+        reports: Optional[Dict[str, BastardReport]] = None,
+        dry_run: bool = False
+    ) -> List[TransitionResult]:
+        """
+        Apply a transition to many tasks as one transaction.
+        
+        Tasks are checked in one pass against the statuses the transition
+        allows; the rest are reported as invalid without touching the database.
+        The allowed ones are applied under BEGIN IMMEDIATE, each against the
+        version read here, so a task another agent moved meanwhile comes back as
+        a conflict while the others still apply.
+        
+        Args:
+            tasks: Tasks as read (e.g. by find_tasks)
+            name: Transition requested
+            moves: task id -> transition actually applied (default: name for every allowed task)
+            reports: task id -> Bastard report saved if the task's transition applies
+            dry_run: Only validate; allowed tasks are returned as applied, nothing is written
+        
+        Returns:
+            One TransitionResult per task, in order
+        """
+        transition = get_transition(name)
+        if moves is None:
+            moves = {task.id: name for task in tasks if task.status in transition.sources}
+        reports = reports or {}
+        
+        results = {}
+        allowed = []
+        for task in tasks:
+            move = moves.get(task.id)
+            if move is None:
+                results[task.id] = TransitionResult(task.id, name, INVALID, task.status, task.version)
+            elif dry_run:
+                results[task.id] = TransitionResult(task.id, move, APPLIED, get_transition(move).target, task.version + 1)
+            else:
+                allowed.append((task.id, move, task.version))
+        
+        if allowed:
+            by_id = {task.id: task for task in tasks}
+            with atomic(self.db):
+                for result in apply_transitions(self.db.connection(), allowed):
+                    results[result.task_id] = result
+                    report = reports.get(result.task_id)
+                    if result.applied and report is not None:
+                        # Flushed with the block: only the grade column is dirty
+                        self.db.add(report)
+                        by_id[result.task_id].bastard_completion_grade = report.overall_grade
+            # Status/version were written underneath the ORM; reload on next access
+            for task in tasks:
+                self.db.expire(task)
+        
+        return [results[task.id] for task in tasks]
+    
+    @staticmethod
+    def _report_rejected(result: TransitionResult):
+        """Explain a transition that was not applied."""
+        if result.outcome == CONFLICT:
+            print(f"❌ Task {result.task_id} was changed by another agent "
+                  f"(now {result.status}, version {result.version}); re-read it and retry")
+        else:
+            print(f"❌ Cannot {result.transition} task {result.task_id} (current: {result.status})")
+    
     def _generate_task_id(self) -> str:
         """Generate next task ID."""
         latest = self.db.query(WorkspaceTask).order_by(WorkspaceTask.created.desc()).first()